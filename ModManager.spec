@@ -3,9 +3,11 @@ from PyInstaller.utils.hooks import collect_all
 
 datas = [('d:\\modmanager\\background', 'background'), ('d:\\modmanager\\json', 'json'), ('d:\\modmanager\\models', 'models')]
 binaries = []
-hiddenimports = ['models', 'models.panels', 'models.checkbox', 'models.table']
+hiddenimports = ['models', 'models.panels', 'models.checkbox', 'models.table', 'pypinyin', 'py7zr']
 tmp_ret = collect_all('models')
 datas += tmp_ret[0]; binaries += tmp_ret[1]; hiddenimports += tmp_ret[2]
+tmp_ret = collect_all('pypinyin')
+datas += tmp_ret[0]; binaries += tmp_ret[1]; hiddenimports += tmp_ret[2]
 
 
 a = Analysis(
@@ -42,6 +42,9 @@ def build():
         "--hidden-import=models.checkbox",  # 确保checkbox模块被包含
         "--hidden-import=models.table",  # 确保table模块被包含
         "--collect-all=models",  # 收集models包的所有子模块
+        "--hidden-import=pypinyin",  # 拼音搜索（在try中导入，需要显式包含）
+        "--collect-all=pypinyin",  # 收集pypinyin的拼音字典数据
+        "--hidden-import=py7zr",  # 7z压缩包支持（可选依赖，在try中导入）
     ]
     
     # 如果找到图标文件，添加到命令中
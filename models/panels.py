@@ -9,7 +9,7 @@ from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel,
     QLineEdit, QCheckBox, QFileDialog, QFormLayout, QDialog, QScrollArea, QFrame,
     QTableWidget, QTableWidgetItem, QHeaderView, QInputDialog, QMessageBox,
-    QTextEdit, QPlainTextEdit, QSplitter
+    QTextEdit, QPlainTextEdit, QSplitter, QComboBox
 )
 from PySide6.QtCore import Qt, QMimeData, QPoint, QThread, Signal, QTimer
 from PySide6.QtGui import QDrag, QPainter, QColor, QIcon, QPixmap, QCloseEvent
@@ -403,7 +403,7 @@ class BatchImportPanel(QWidget):
     
     def setup_ui(self):
         """设置UI"""
-        self.setFixedSize(400, 250)
+        self.setFixedSize(400, 300)
         
         self.setStyleSheet("""
             QWidget {
@@ -414,7 +414,7 @@ class BatchImportPanel(QWidget):
         """)
         
         layout = QVBoxLayout()
-        layout.setSpacing(20)
+        layout.setSpacing(16)
         layout.setContentsMargins(30, 30, 30, 30)
         self.setLayout(layout)
         
@@ -446,8 +446,31 @@ class BatchImportPanel(QWidget):
         for btn in [self.btn_hunt_box, self.btn_export_mods, self.btn_cancel]:
             btn.setFixedHeight(45)
         
+        # 导入方式（当前选择由主窗口读取并保存）
+        self.mode_combo = QComboBox()
+        self.mode_combo.addItem("复制文件", "copy")
+        self.mode_combo.addItem("移动文件（同一磁盘）", "move")
+        self.mode_combo.addItem("硬链接（同一磁盘，不占额外空间）", "hardlink")
+        self.mode_combo.addItem("引用原文件夹（不复制）", "reference")
+        self.mode_combo.setToolTip(
+            "移动：来源中的文件会被移走\n"
+            "硬链接：与来源共用同一份文件，修改任一处都会影响另一处\n"
+            "引用：只创建指向来源的符号链接，来源被删除后mod将失效"
+        )
+        self.mode_combo.setStyleSheet("""
+            QComboBox {
+                background-color: rgba(255, 255, 255, 200);
+                border: 1px solid #8B4513;
+                border-radius: 4px;
+                color: #8B4513;
+                font-size: 13px;
+                padding: 6px;
+            }
+        """)
+        
         # 注意：按钮事件由主窗口连接，不在这里连接
         
+        layout.addWidget(self.mode_combo)
         layout.addWidget(self.btn_hunt_box)
         layout.addWidget(self.btn_export_mods)
         layout.addWidget(self.btn_cancel)
@@ -657,35 +657,18 @@ class CustomModTable(QTableWidget):
         # 配置已保存，不打印详细信息
     
     def restore_saved_config(self):
-        """恢复保存的Mod配置"""
+        """恢复保存的Mod配置（通过主窗口一次性批量应用，不再逐个禁用再启用）"""
         # 获取主窗口以调用文件操作
         parent = self.parent()
-        while parent and not hasattr(parent, 'apply_mod_to_game'):
+        while parent and not hasattr(parent, 'apply_mod_batch'):
             parent = parent.parent()
         
-        # 首先禁用所有Mod（但不打印，因为这是批量操作的一部分）
-        for row, checkbox in self.checkbox_widgets.items():
-            name_item = self.item(row, 1)
-            if name_item:
-                mod_name = name_item.text()
-                checkbox.set_checked(False)
-                # 手动调用文件操作
-                if parent:
-                    parent.log_mod_usage(mod_name, False)
-                    parent.apply_mod_to_game(mod_name, False)
-        
-        # 然后启用保存的Mod
-        for mod_name in self.saved_enabled_mods:
-            for row in range(self.rowCount()):
-                name_item = self.item(row, 1)
-                if name_item and name_item.text() == mod_name:
-                    if row in self.checkbox_widgets:
-                        self.checkbox_widgets[row].set_checked(True)
-                        # 手动调用文件操作
-                        if parent:
-                            parent.log_mod_usage(mod_name, True)
-                            parent.apply_mod_to_game(mod_name, True)
-                    break
+        if parent:
+            current_enabled = self.get_enabled_mods()
+            saved_enabled = set(self.saved_enabled_mods)
+            disable_mods = [mod_name for mod_name in current_enabled if mod_name not in saved_enabled]
+            enable_mods = [mod_name for mod_name in self.saved_enabled_mods if mod_name not in current_enabled]
+            parent.apply_mod_batch(enable_mods, disable_mods, source='binary_restore')
         
         print(f"[成功] 批量禁用还原完成")
     
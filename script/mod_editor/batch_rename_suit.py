@@ -75,14 +75,14 @@ def parse_folder_name(folder_name, dict_data):
 
 
 def get_f_equip_folders(mod_file_path):
-    """获取nativePC/pl/f_equip/下的所有文件夹（忽略大小写，兼容zip/文件夹）"""
+    """获取nativePC/pl/f_equip/下的所有文件夹（忽略大小写，兼容zip/7z/文件夹）"""
+    from utils.archive import is_archive, open_archive
     folders = []
     
     try:
-        if mod_file_path.endswith('.zip'):
-            import zipfile
-            with zipfile.ZipFile(mod_file_path, 'r') as zip_file:
-                for name in zip_file.namelist():
+        if is_archive(mod_file_path):
+            with open_archive(mod_file_path) as archive:
+                for name in archive.namelist():
                     # 统一路径分隔
                     name = name.replace("\\", "/")
                     lower_name = name.lower()
@@ -118,12 +118,12 @@ def find_pl_number_in_mod(mod_file_path):
         m = re.search(r'pl(\d{4})', text, re.IGNORECASE)
         return m.group(1) if m else None
 
-    # zip模式
-    if mod_file_path.endswith('.zip'):
-        import zipfile
+    # 压缩包模式
+    from utils.archive import is_archive, open_archive
+    if is_archive(mod_file_path):
         try:
-            with zipfile.ZipFile(mod_file_path, 'r') as zip_file:
-                for name in zip_file.namelist():
+            with open_archive(mod_file_path) as archive:
+                for name in archive.namelist():
                     name = name.replace("\\", "/")
                     lower_name = name.lower()
                     if '/pl/f_equip/' in lower_name:
@@ -131,7 +131,7 @@ def find_pl_number_in_mod(mod_file_path):
                         if num:
                             return num
         except Exception as e:
-            print(f"扫描zip获取编号失败: {e}")
+            print(f"扫描压缩包获取编号失败: {e}")
         return None
 
     # 文件夹模式
@@ -211,6 +211,10 @@ def replace_suit_numbers(mod_file_path, old_id, new_id):
     """
     replaced_count = 0
     
+    if mod_file_path.lower().endswith('.7z'):
+        # 7z压缩包只能读取，不能原地改写
+        raise RuntimeError("7z压缩包不支持直接替换，请先导入为mod文件夹后再替换")
+    
     try:
         if mod_file_path.endswith('.zip'):
             import zipfile
@@ -587,10 +591,10 @@ class SuitRenameDialog(QDialog):
                         mod_path = self.main_window.get_mod_file_path(mod_name)
                         if mod_path and os.path.exists(mod_path):
                             file_list = []
-                            if mod_path.endswith(".zip"):
-                                import zipfile
-                                with zipfile.ZipFile(mod_path, "r") as zip_file:
-                                    file_list = zip_file.namelist()
+                            from utils.archive import is_archive, open_archive
+                            if is_archive(mod_path):
+                                with open_archive(mod_path) as archive:
+                                    file_list = archive.namelist()
                             elif os.path.isdir(mod_path):
                                 file_list = self.main_window.get_folder_files(mod_path)
                             if file_list:
@@ -20,7 +20,7 @@ from PySide6.QtWidgets import (
 )
 from PySide6.QtCore import Qt, QDate, QSize, QTimer, Signal, QThread
 from PySide6.QtCore import QItemSelectionModel
-from PySide6.QtGui import QColor, QPixmap, QFont, QIcon
+from PySide6.QtGui import QColor, QPixmap, QFont, QIcon, QShortcut, QKeySequence
 
 from config import (
     WINDOW_WIDTH, WINDOW_HEIGHT, WINDOW_TITLE,
@@ -137,6 +137,10 @@ def _import_panels():
 
 from utils.animation_utils import AnimatedTransition
 
+# 筛选类型下拉框：前5项是内置条件，之后是保存的查询，最后一项是管理入口
+SAVED_QUERY_COMBO_OFFSET = 5
+SAVED_QUERY_MANAGE = "__manage__"
+
 class MainWindow(QMainWindow):
     """Mod管理器主窗口"""
     
@@ -147,6 +151,8 @@ class MainWindow(QMainWindow):
         # 延迟初始化动画管理器，避免在窗口显示前出现问题
         self.animation_manager = None
         self.init_ui()
+        # 接受拖入的压缩包（多个时加入导入队列）
+        self.setAcceptDrops(True)
         # 在UI初始化后再初始化动画管理器
         try:
             self.animation_manager = AnimatedTransition(self)
@@ -246,6 +252,11 @@ class MainWindow(QMainWindow):
         
         # 3. 延迟加载已存在的模组（使用QTimer在窗口显示后再加载，避免阻塞窗口显示）
         QTimer.singleShot(100, self.load_existing_mods)
+        
+        # 4. 撤销/重做模组配置修改的快捷键（输入框获得焦点时由输入框自己处理）
+        QShortcut(QKeySequence(QKeySequence.StandardKey.Undo), self, self.undo_mod_config)
+        QShortcut(QKeySequence("Ctrl+Shift+Z"), self, self.redo_mod_config)
+        QShortcut(QKeySequence("Ctrl+Y"), self, self.redo_mod_config)
     
     def create_top_bar(self):
         """创建顶栏：左侧按钮组 + 右侧搜索设置区"""
@@ -357,6 +368,16 @@ class MainWindow(QMainWindow):
             return
         
         if hasattr(self, 'mod_table'):
+            # 冷存储中的mod先一次性解压恢复
+            mods_dir = os.path.join(self.get_project_root(), "mods")
+            pending_paths = []
+            for row, checkbox in self.mod_table.checkbox_widgets.items():
+                name_item = self.mod_table.item(row, 1)
+                if name_item and not checkbox.is_checked():
+                    pending_paths.append(os.path.join(mods_dir, self.mod_name_to_folder_name(name_item.text())))
+            if not self.ensure_mods_hot(pending_paths):
+                return
+            
             # 只启用当前未启用的mod
             for row, checkbox in self.mod_table.checkbox_widgets.items():
                 if not checkbox.is_checked():  # 只处理未启用的mod
@@ -455,6 +476,11 @@ class MainWindow(QMainWindow):
         # 保存面板引用
         self.batch_import_panel = panel
         
+        # 恢复上次使用的导入方式
+        mode_index = panel.mode_combo.findData(self.load_advanced_settings().get('batch_import_mode', 'copy'))
+        if mode_index >= 0:
+            panel.mode_combo.setCurrentIndex(mode_index)
+        
         # 连接按钮事件
         panel.btn_hunt_box.clicked.connect(lambda: self.handle_batch_import_result(1))
         panel.btn_export_mods.clicked.connect(lambda: self.handle_batch_import_result(2))
@@ -462,13 +488,20 @@ class MainWindow(QMainWindow):
     
     def handle_batch_import_result(self, result):
         """处理批量导入结果"""
+        # 读取并记住选择的导入方式
+        import_mode = self.batch_import_panel.mode_combo.currentData()
+        if result != 0 and import_mode != self.load_advanced_settings().get('batch_import_mode'):
+            settings = dict(self.load_advanced_settings())
+            settings['batch_import_mode'] = import_mode
+            self.save_advanced_settings(settings)
+        
         # 先隐藏面板
         self.hide_batch_import_panel()
         
         if result == 1:  # 从狩技盒子导入
-            self.import_from_hunt_box()
+            self.import_from_hunt_box(import_mode)
         elif result == 2:  # 从导出mods导入
-            self.import_from_export_mods()
+            self.import_from_export_mods(import_mode)
         # result == 0 表示取消，不需要处理
     
     def hide_batch_import_panel(self):
@@ -478,10 +511,9 @@ class MainWindow(QMainWindow):
             self.batch_import_panel.deleteLater()
             delattr(self, 'batch_import_panel')
     
-    def import_from_export_mods(self):
+    def import_from_export_mods(self, import_mode="copy"):
         """从导出mods批量导入"""
-        import shutil
-        import xml.etree.ElementTree as ET
+        from utils.batch_import import scan_export_mods
         
         # 打开文件夹选择对话框，选择导出目录
         export_dir = QFileDialog.getExistingDirectory(
@@ -500,190 +532,12 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, "警告", f"在选择的目录中未找到mods文件夹：\n{mods_export_dir}")
             return
         
-        # 获取项目根目录和mods目录
-        project_root = self.get_project_root()
-        mods_dir = os.path.join(project_root, "mods")
-        os.makedirs(mods_dir, exist_ok=True)
-        
-        # 遍历导出目录中的所有mod文件夹
-        imported_count = 0
-        skipped_count = 0
-        failed_mods = []
-        
-        for item in os.listdir(mods_export_dir):
-            item_path = os.path.join(mods_export_dir, item)
-            
-            # 只处理文件夹
-            if not os.path.isdir(item_path):
-                continue
-            
-            # 跳过modinfo文件夹
-            if item == "modinfo":
-                continue
-            
-            try:
-                # 检查目标文件夹是否已存在
-                target_path = os.path.join(mods_dir, item)
-                if os.path.exists(target_path):
-                    # 如果已存在，询问是否覆盖
-                    from PySide6.QtWidgets import QMessageBox
-                    reply = QMessageBox.question(
-                        self,
-                        "确认覆盖",
-                        f"Mod '{item}' 已存在，是否覆盖？",
-                        QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
-                        QMessageBox.StandardButton.No
-                    )
-                    if reply == QMessageBox.StandardButton.No:
-                        skipped_count += 1
-                        continue
-                    # 删除旧文件夹
-                    shutil.rmtree(target_path)
-                
-                # 复制mod文件夹
-                shutil.copytree(item_path, target_path)
-                
-                # 检查是否有modinfo.xml，如果没有则创建
-                modinfo_dir = os.path.join(target_path, "modinfo")
-                xml_file_path = os.path.join(modinfo_dir, "modinfo.xml")
-                
-                if not os.path.exists(xml_file_path):
-                    # 读取mod文件夹名作为mod名称
-                    mod_name = item.replace("_", " ")
-                    
-                    # 创建modinfo文件夹
-                    os.makedirs(modinfo_dir, exist_ok=True)
-                    
-                    # 生成XML文件
-                    xml_root = ET.Element("mod")
-                    
-                    name_elem = ET.SubElement(xml_root, "name")
-                    name_elem.text = mod_name
-                    
-                    # 记录完整的文件结构
-                    file_structure_elem = ET.SubElement(xml_root, "file_structure")
-                    file_list = self.get_folder_files(target_path)
-                    for file_path in file_list:
-                        file_elem = ET.SubElement(file_structure_elem, "file")
-                        file_elem.text = file_path
-                        # 如果是文件（不是目录），记录文件大小和修改时间
-                        if not file_path.endswith('/'):
-                            # 将统一的分隔符转换为当前系统的分隔符，确保跨平台兼容
-                            normalized_path = file_path.replace('/', os.sep).replace('\\', os.sep)
-                            full_path = os.path.join(target_path, normalized_path)
-                            if os.path.exists(full_path):
-                                file_elem.set("size", str(os.path.getsize(full_path)))
-                                file_elem.set("mtime", str(os.path.getmtime(full_path)))
-                    
-                    # 保存XML文件
-                    tree = ET.ElementTree(xml_root)
-                    tree.write(xml_file_path, encoding='utf-8', xml_declaration=True)
-                else:
-                    # 如果已有XML，读取mod名称等信息
-                    try:
-                        tree = ET.parse(xml_file_path)
-                        root = tree.getroot()
-                        name_elem = root.find('.//name')
-                        if name_elem is not None and name_elem.text:
-                            mod_name = name_elem.text
-                        else:
-                            mod_name = item.replace("_", " ")
-                    except:
-                        mod_name = item.replace("_", " ")
-                
-                # 读取分类和作者信息
-                category = ""
-                author = ""
-                try:
-                    tree = ET.parse(xml_file_path)
-                    root = tree.getroot()
-                    category_elem = root.find('.//category')
-                    if category_elem is not None and category_elem.text:
-                        category = category_elem.text
-                    author_elem = root.find('.//author')
-                    if author_elem is not None and author_elem.text:
-                        author = author_elem.text
-                except:
-                    pass
-                
-                # 检查并处理未知的分类和作者
-                original_category = category
-                original_author = author
-                category, author = self.check_and_handle_unknown_category_author(category, author)
-                
-                # 如果分类或作者被忽略（置空），需要更新XML文件
-                if category != original_category or author != original_author:
-                    try:
-                        tree = ET.parse(xml_file_path)
-                        root = tree.getroot()
-                        
-                        # 更新或删除category
-                        category_elem = root.find('.//category')
-                        if category:
-                            if category_elem is not None:
-                                category_elem.text = category
-                            else:
-                                category_elem = ET.SubElement(root, "category")
-                                category_elem.text = category
-                        else:
-                            if category_elem is not None:
-                                root.remove(category_elem)
-                        
-                        # 更新或删除author
-                        author_elem = root.find('.//author')
-                        if author:
-                            if author_elem is not None:
-                                author_elem.text = author
-                            else:
-                                author_elem = ET.SubElement(root, "author")
-                                author_elem.text = author
-                        else:
-                            if author_elem is not None:
-                                root.remove(author_elem)
-                        
-                        # 保存更新后的XML
-                        tree.write(xml_file_path, encoding='utf-8', xml_declaration=True)
-                    except Exception as e:
-                        print(f"[警告] 更新XML文件失败: {e}")
-                
-                # 添加到表格（不再检查未知项，因为已经在上面检查过了）
-                self.add_mod_to_table(mod_name, category, author, check_unknown=False)
-                # 批量导入时也记录导入时间
-                import time
-                try:
-                    mod_states = self.load_mod_states()
-                    mod_state = mod_states.get(mod_name, {})
-                    if isinstance(mod_state, bool):
-                        mod_state = {"enabled": mod_state, "favorite": False, "ignored": False}
-                    if "import_time" not in mod_state:
-                        mod_state["import_time"] = time.time()
-                        mod_states[mod_name] = mod_state
-                        self._save_mod_states_direct(mod_states)
-                except:
-                    pass
-                imported_count += 1
-                
-            except Exception as e:
-                failed_mods.append(f"{item}: {str(e)}")
-                print(f"[失败] 导入mod失败 {item}: {str(e)}")
-        
-        # 显示结果
-        result_message = f"批量导入完成！\n\n成功导入: {imported_count} 个\n跳过: {skipped_count} 个"
-        if failed_mods:
-            result_message += f"\n失败: {len(failed_mods)} 个"
-            result_message += "\n\n失败的mod:\n" + "\n".join(failed_mods[:10])  # 最多显示10个
-            if len(failed_mods) > 10:
-                result_message += f"\n... 还有 {len(failed_mods) - 10} 个失败"
-        
-        QMessageBox.information(self, "批量导入结果", result_message)
-        
-        # 刷新mod列表
-        self.refresh_mod_list()
+        jobs, skipped_details = scan_export_mods(mods_export_dir)
+        self._start_batch_import(jobs, skipped_details, import_mode, empty_message=f"未找到任何可导入的mod！\n\n选择的目录: {mods_export_dir}")
     
-    def import_from_hunt_box(self):
+    def import_from_hunt_box(self, import_mode="copy"):
         """从狩技盒子批量导入"""
-        import shutil
-        import xml.etree.ElementTree as ET
+        from utils.batch_import import scan_hunt_box
         
         # 打开文件夹选择对话框，选择狩技盒子的模组文件夹
         hunt_box_dir = QFileDialog.getExistingDirectory(
@@ -696,213 +550,306 @@ class MainWindow(QMainWindow):
         if not hunt_box_dir:
             return
         
-        # 获取项目根目录和mods目录
-        project_root = self.get_project_root()
-        mods_dir = os.path.join(project_root, "mods")
+        jobs, skipped_details = scan_hunt_box(hunt_box_dir)
+        self._start_batch_import(
+            jobs, skipped_details, import_mode,
+            empty_message=f"未找到任何可导入的mod！\n\n选择的目录: {hunt_box_dir}\n\n请确认：\n1. 目录中包含序号文件夹（如1001、1002等）\n2. 每个序号文件夹中包含files文件夹和info.xml文件"
+        )
+    
+    def _start_batch_import(self, jobs, skipped_details, import_mode, empty_message, on_finished=None):
+        """开始后台批量导入
+        
+        import_mode为导入方式（复制、移动、硬链接或引用，见utils.batch_import）。
+        先询问未知的分类和作者（每个值只问一次），然后并行导入没有冲突的mod；
+        已存在的mod在导入结束后统一确认覆盖、跳过或改名，最后一次性写入导入时间并刷新列表。
+        on_finished(成功的任务列表)在全部结束后调用。
+        
+        Returns:
+            bool: 是否开始了导入
+        """
+        from PySide6.QtWidgets import QProgressDialog
+        from utils.batch_import import split_conflicts
+        
+        if getattr(self, '_batch_import', None) is not None:
+            QMessageBox.information(self, "提示", "已有批量导入正在进行")
+            return False
+        if not jobs:
+            message = empty_message
+            if skipped_details:
+                message += f"\n\n跳过的文件夹 ({len(skipped_details)} 个):\n" + "\n".join(skipped_details[:10])
+            QMessageBox.information(self, "批量导入结果", message)
+            return False
+        
+        mods_dir = os.path.join(self.get_project_root(), "mods")
         os.makedirs(mods_dir, exist_ok=True)
         
-        # 遍历目录中的所有序号文件夹
-        imported_count = 0
-        skipped_count = 0
-        failed_mods = []
-        skipped_details = []  # 记录跳过的详细信息
+        self._resolve_batch_unknown_items(jobs)
+        clean_jobs, conflicts = split_conflicts(jobs, mods_dir)
+        self._batch_import = {
+            "mods_dir": mods_dir,
+            "import_mode": import_mode,
+            "on_finished": on_finished,
+            "conflicts": conflicts,
+            "skipped_details": skipped_details,
+            "succeeded": [],
+            "failed": [],
+            "skipped_count": 0,
+            "cancelled": False,
+        }
         
-        # 先列出所有找到的文件夹
-        found_folders = []
-        for item in os.listdir(hunt_box_dir):
-            item_path = os.path.join(hunt_box_dir, item)
-            if os.path.isdir(item_path):
-                found_folders.append(item)
+        progress_dialog = QProgressDialog("正在导入...", "取消", 0, max(1, len(clean_jobs)), self)
+        progress_dialog.setWindowTitle("批量导入")
+        progress_dialog.setWindowModality(Qt.WindowModality.WindowModal)
+        progress_dialog.setMinimumDuration(0)
+        progress_dialog.setAutoClose(False)
+        progress_dialog.setAutoReset(False)
+        progress_dialog.canceled.connect(self._cancel_batch_import)
+        self._batch_import["progress_dialog"] = progress_dialog
+        
+        # 导入期间暂停目录监视通知，导入结束后会统一刷新列表
+        self.pause_mods_watcher()
+        self._run_batch_import_pass(clean_jobs, overwrite=False)
+        return True
+    
+    def _resolve_batch_unknown_items(self, jobs):
+        """批量导入前检查未知的分类和作者，相同的值只询问一次"""
+        resolved_categories = {}
+        resolved_authors = {}
+        for job in jobs:
+            if job.category not in resolved_categories:
+                resolved_categories[job.category] = self.check_and_handle_unknown_category_author(job.category, "")[0]
+            if job.author not in resolved_authors:
+                resolved_authors[job.author] = self.check_and_handle_unknown_category_author("", job.author)[1]
+            category = resolved_categories[job.category]
+            author = resolved_authors[job.author]
+            if category != job.category or author != job.author:
+                job.category = category
+                job.author = author
+                job.info_changed = True
+    
+    def _run_batch_import_pass(self, jobs, overwrite):
+        """在后台线程池中执行一组导入任务"""
+        from utils.batch_import import BatchImportThread
+        
+        state = self._batch_import
+        if not jobs:
+            self._on_batch_import_pass_finished([], [])
+            return
+        progress_dialog = state["progress_dialog"]
+        progress_dialog.setMaximum(len(jobs))
+        progress_dialog.setValue(0)
+        progress_dialog.setLabelText("正在覆盖导入..." if overwrite else "正在导入...")
+        progress_dialog.show()
+        
+        thread = BatchImportThread(jobs, state["mods_dir"], overwrite=overwrite, import_mode=state["import_mode"], parent=self)
+        thread.progress.connect(self._on_batch_import_progress)
+        thread.import_finished.connect(self._on_batch_import_pass_finished)
+        thread.finished.connect(thread.deleteLater)
+        state["thread"] = thread
+        thread.start()
+    
+    def _on_batch_import_progress(self, done, total, mod_name):
+        state = getattr(self, '_batch_import', None)
+        if state is None:
+            return
+        progress_dialog = state["progress_dialog"]
+        progress_dialog.setValue(done)
+        progress_dialog.setLabelText(f"正在导入 ({done}/{total})：{mod_name}")
+    
+    def _cancel_batch_import(self):
+        """取消批量导入：不再开始新的mod，已导入的mod保留"""
+        state = getattr(self, '_batch_import', None)
+        if state is None:
+            return
+        state["cancelled"] = True
+        thread = state.get("thread")
+        if thread is not None:
+            thread.cancel()
+            print("[导入取消] 批量导入将在当前mod完成后停止")
+    
+    def _on_batch_import_pass_finished(self, succeeded, failed):
+        """一组导入任务完成：第一组结束后统一处理冲突，全部结束后提交结果"""
+        from utils.batch_import import resolve_conflicts
+        
+        state = self._batch_import
+        state["thread"] = None
+        state["succeeded"].extend(succeeded)
+        state["failed"].extend(failed)
+        
+        conflicts = state.pop("conflicts", None)
+        if not conflicts:
+            self._finish_batch_import()
+            return
+        if state["cancelled"]:
+            state["skipped_count"] += len(conflicts)
+            self._finish_batch_import()
+            return
         
-        for item in os.listdir(hunt_box_dir):
-            item_path = os.path.join(hunt_box_dir, item)
-            
-            # 只处理文件夹
-            if not os.path.isdir(item_path):
-                continue
-            
-            # 只处理数字文件夹（序号文件夹）
-            if not item.isdigit():
-                skipped_details.append(f"{item} (不是数字文件夹)")
-                continue
-            
-            try:
-                # 检查是否有 files 文件夹和 info.xml
-                file_folder = os.path.join(item_path, "files")
-                info_xml_path = os.path.join(item_path, "info.xml")
-                
-                if not os.path.exists(file_folder) or not os.path.isdir(file_folder):
-                    # 跳过没有files文件夹的
-                    skipped_details.append(f"{item} (缺少files文件夹)")
-                    print(f"[跳过] {item}: 缺少files文件夹")
-                    continue
-                
-                if not os.path.exists(info_xml_path):
-                    # 跳过没有info.xml的
-                    skipped_details.append(f"{item} (缺少info.xml)")
-                    print(f"[跳过] {item}: 缺少info.xml")
-                    continue
-                
-                # 读取info.xml获取mod信息
-                mod_name = item  # 默认使用序号作为名称
-                category = ""
-                author = ""
-                version = ""
-                
-                try:
-                    tree = ET.parse(info_xml_path)
-                    root = tree.getroot()
-                    
-                    # 查找mod名称（优先使用moduleName，其次使用name）
-                    name_elem = root.find('.//moduleName')
-                    if name_elem is not None and name_elem.text:
-                        mod_name = name_elem.text.strip()
-                    else:
-                        name_elem = root.find('.//name')
-                        if name_elem is not None and name_elem.text:
-                            mod_name = name_elem.text.strip()
-                    
-                    # 查找作者
-                    author_elem = root.find('.//author')
-                    if author_elem is not None and author_elem.text:
-                        author = author_elem.text.strip()
-                    
-                    # 查找mod类型（作为分类）
-                    mod_type_elem = root.find('.//modType')
-                    if mod_type_elem is not None and mod_type_elem.text:
-                        category = mod_type_elem.text.strip()
-                    
-                    # 查找版本
-                    version_elem = root.find('.//version')
-                    if version_elem is not None and version_elem.text:
-                        version = version_elem.text.strip()
-                except Exception as e:
-                    print(f"[警告] 读取info.xml失败 {item}: {str(e)}")
-                    # 继续使用默认值
-                
-                # 使用mod名称创建目标文件夹名
-                mod_folder_name = mod_name.replace(" ", "_").replace("/", "_").replace("\\", "_")
-                target_path = os.path.join(mods_dir, mod_folder_name)
-                
-                # 检查目标文件夹是否已存在
-                if os.path.exists(target_path):
-                    # 如果已存在，询问是否覆盖
-                    reply = QMessageBox.question(
-                        self,
-                        "确认覆盖",
-                        f"Mod '{mod_name}' 已存在，是否覆盖？",
-                        QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
-                        QMessageBox.StandardButton.No
-                    )
-                    if reply == QMessageBox.StandardButton.No:
-                        skipped_count += 1
-                        continue
-                    # 删除旧文件夹
-                    shutil.rmtree(target_path)
-                
-                # 复制files文件夹的内容到目标路径
-                # 先创建目标文件夹
-                os.makedirs(target_path, exist_ok=True)
-                
-                # 复制files文件夹中的所有内容
-                for file_item in os.listdir(file_folder):
-                    source_item_path = os.path.join(file_folder, file_item)
-                    target_item_path = os.path.join(target_path, file_item)
-                    
-                    if os.path.isdir(source_item_path):
-                        shutil.copytree(source_item_path, target_item_path)
-                    else:
-                        shutil.copy2(source_item_path, target_item_path)
-                
-                # 检查并处理未知的分类和作者
-                original_category = category
-                original_author = author
-                category, author = self.check_and_handle_unknown_category_author(category, author)
-                
-                # 创建modinfo文件夹
-                modinfo_dir = os.path.join(target_path, "modinfo")
-                os.makedirs(modinfo_dir, exist_ok=True)
-                
-                # 生成modinfo.xml文件
-                xml_root = ET.Element("mod")
-                
-                name_elem = ET.SubElement(xml_root, "name")
-                name_elem.text = mod_name
-                
-                if category:
-                    category_elem = ET.SubElement(xml_root, "category")
-                    category_elem.text = category
-                
-                if author:
-                    author_elem = ET.SubElement(xml_root, "author")
-                    author_elem.text = author
-                
-                if version:
-                    version_elem = ET.SubElement(xml_root, "version")
-                    version_elem.text = version
-                
-                # 记录完整的文件结构
-                file_structure_elem = ET.SubElement(xml_root, "file_structure")
-                file_list = self.get_folder_files(target_path)
-                for file_path in file_list:
-                    file_elem = ET.SubElement(file_structure_elem, "file")
-                    file_elem.text = file_path
-                    # 如果是文件（不是目录），记录文件大小和修改时间
-                    if not file_path.endswith('/'):
-                        # 将统一的分隔符转换为当前系统的分隔符，确保跨平台兼容
-                        normalized_path = file_path.replace('/', os.sep).replace('\\', os.sep)
-                        full_path = os.path.join(target_path, normalized_path)
-                        if os.path.exists(full_path):
-                            file_elem.set("size", str(os.path.getsize(full_path)))
-                            file_elem.set("mtime", str(os.path.getmtime(full_path)))
-                
-                # 保存XML文件
-                xml_file_path = os.path.join(modinfo_dir, "modinfo.xml")
-                tree = ET.ElementTree(xml_root)
-                tree.write(xml_file_path, encoding='utf-8', xml_declaration=True)
-                
-                # 添加到表格（不再检查未知项，因为已经在上面检查过了）
-                self.add_mod_to_table(mod_name, category, author, check_unknown=False)
-                # 批量导入时也记录导入时间
-                import time
-                try:
-                    mod_states = self.load_mod_states()
-                    mod_state = mod_states.get(mod_name, {})
-                    if isinstance(mod_state, bool):
-                        mod_state = {"enabled": mod_state, "favorite": False, "ignored": False}
-                    if "import_time" not in mod_state:
-                        mod_state["import_time"] = time.time()
-                        mod_states[mod_name] = mod_state
-                        self._save_mod_states_direct(mod_states)
-                except:
-                    pass
-                imported_count += 1
-                
-            except Exception as e:
-                failed_mods.append(f"{item}: {str(e)}")
-                print(f"[失败] 导入mod失败 {item}: {str(e)}")
+        state["progress_dialog"].hide()
+        choices = self.show_batch_conflict_dialog(conflicts)
+        to_import, skipped = resolve_conflicts(conflicts, choices, state["mods_dir"])
+        state["skipped_count"] += len(skipped)
+        self._run_batch_import_pass(to_import, overwrite=True)
+    
+    def show_batch_conflict_dialog(self, conflicts):
+        """统一确认批量导入中已存在的mod：覆盖、跳过或改名
+        
+        Returns:
+            list: 与conflicts一一对应的处理方式，关闭对话框视为全部跳过
+        """
+        from PySide6.QtWidgets import QTableWidget, QTableWidgetItem, QHeaderView
+        from utils.batch_import import CONFLICT_OVERWRITE, CONFLICT_SKIP, CONFLICT_RENAME
+        
+        options = [("跳过", CONFLICT_SKIP), ("覆盖", CONFLICT_OVERWRITE), ("改名导入", CONFLICT_RENAME)]
+        
+        dialog = QDialog(self)
+        dialog.setWindowTitle("处理已存在的mod")
+        dialog.setMinimumSize(560, 420)
+        dialog.setStyleSheet("""
+            QDialog {
+                background-color: rgba(255, 228, 240, 230);
+                border: 1px solid #8B4513;
+                border-radius: 6px;
+            }
+            QLabel {
+                color: #000000;
+                font-size: 13px;
+            }
+            QTableWidget, QComboBox {
+                background-color: rgba(255, 255, 255, 220);
+                border: 1px solid #8B4513;
+                border-radius: 6px;
+                color: #000000;
+            }
+            QPushButton {
+                background-color: rgba(255, 255, 255, 220);
+                border: 1px solid #8B4513;
+                border-radius: 6px;
+                color: #000000;
+                font-size: 13px;
+                font-weight: bold;
+                padding: 8px 18px;
+            }
+            QPushButton:hover {
+                background-color: rgba(255, 182, 193, 220);
+            }
+        """)
+        layout = QVBoxLayout()
+        layout.setContentsMargins(16, 16, 16, 16)
+        layout.setSpacing(10)
+        dialog.setLayout(layout)
+        
+        layout.addWidget(QLabel(f"以下 {len(conflicts)} 个mod已存在，请选择处理方式："))
+        
+        all_row = QHBoxLayout()
+        all_row.addWidget(QLabel("全部设为："))
+        all_combo = QComboBox()
+        for text, _ in options:
+            all_combo.addItem(text)
+        all_row.addWidget(all_combo)
+        all_row.addStretch()
+        layout.addLayout(all_row)
+        
+        table = QTableWidget(len(conflicts), 3)
+        table.setHorizontalHeaderLabels(["mod名称", "来源", "处理方式"])
+        table.verticalHeader().setVisible(False)
+        table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        row_combos = []
+        for row, job in enumerate(conflicts):
+            table.setItem(row, 0, QTableWidgetItem(job.mod_name))
+            table.setItem(row, 1, QTableWidgetItem(job.label))
+            combo = QComboBox()
+            for text, _ in options:
+                combo.addItem(text)
+            table.setCellWidget(row, 2, combo)
+            row_combos.append(combo)
+        layout.addWidget(table, 1)
+        
+        def on_all_changed(index):
+            for combo in row_combos:
+                combo.setCurrentIndex(index)
+        all_combo.currentIndexChanged.connect(on_all_changed)
+        
+        button_row = QHBoxLayout()
+        button_row.addStretch()
+        btn_ok = QPushButton("确定")
+        btn_ok.clicked.connect(dialog.accept)
+        button_row.addWidget(btn_ok)
+        btn_skip_all = QPushButton("全部跳过")
+        btn_skip_all.clicked.connect(dialog.reject)
+        button_row.addWidget(btn_skip_all)
+        layout.addLayout(button_row)
+        
+        if dialog.exec() != QDialog.DialogCode.Accepted:
+            return [CONFLICT_SKIP] * len(conflicts)
+        return [options[combo.currentIndex()][1] for combo in row_combos]
+    
+    def _finish_batch_import(self):
+        """批量导入结束：一次性写入导入时间，显示结果并刷新列表"""
+        import time
+        
+        state = self._batch_import
+        self._batch_import = None
+        progress_dialog = state["progress_dialog"]
+        progress_dialog.canceled.disconnect(self._cancel_batch_import)
+        progress_dialog.close()
+        progress_dialog.deleteLater()
+        
+        succeeded = state["succeeded"]
+        failed = state["failed"]
+        skipped_details = state["skipped_details"]
+        
+        # 批量导入时也记录导入时间（已有记录的mod保持不变）
+        try:
+            store = self.get_mod_state_store()
+            now = time.time()
+            store.update_many({
+                job.mod_name: {"import_time": now}
+                for job in succeeded if "import_time" not in store.get(job.mod_name)
+            })
+        except Exception as e:
+            print(f"[警告] 记录导入时间失败: {e}")
+        
+        result_message = f"批量导入完成！\n\n成功导入: {len(succeeded)} 个\n跳过: {state['skipped_count']} 个"
+        if state["cancelled"]:
+            result_message = "批量导入已取消！\n\n" + result_message.split("\n\n", 1)[1]
         
-        # 显示结果
-        result_message = f"批量导入完成！\n\n成功导入: {imported_count} 个\n跳过: {skipped_count} 个"
+        # 移动或硬链接不可用时（来源与mods目录不在同一磁盘等）会改为复制
+        fallback_count = sum(1 for job in succeeded if job.import_mode != state["import_mode"])
+        if fallback_count:
+            result_message += f"\n其中 {fallback_count} 个mod无法{'移动' if state['import_mode'] == 'move' else '链接'}，已改为复制"
         
         if skipped_details:
             result_message += f"\n\n跳过的文件夹 ({len(skipped_details)} 个):\n" + "\n".join(skipped_details[:10])
             if len(skipped_details) > 10:
                 result_message += f"\n... 还有 {len(skipped_details) - 10} 个被跳过"
         
-        if failed_mods:
-            result_message += f"\n\n失败: {len(failed_mods)} 个"
-            result_message += "\n失败的mod:\n" + "\n".join(failed_mods[:10])  # 最多显示10个
-            if len(failed_mods) > 10:
-                result_message += f"\n... 还有 {len(failed_mods) - 10} 个失败"
+        if failed:
+            result_message += f"\n\n失败: {len(failed)} 个"
+            result_message += "\n失败的mod:\n" + "\n".join(f"{job.label}: {error}" for job, error in failed[:10])  # 最多显示10个
+            if len(failed) > 10:
+                result_message += f"\n... 还有 {len(failed) - 10} 个失败"
         
-        if imported_count == 0 and skipped_count == 0 and not failed_mods:
-            result_message = f"未找到任何可导入的mod！\n\n选择的目录: {hunt_box_dir}\n\n请确认：\n1. 目录中包含序号文件夹（如1001、1002等）\n2. 每个序号文件夹中包含files文件夹和info.xml文件"
+        print(f"[成功] 批量导入完成: 成功 {len(succeeded)} 个，失败 {len(failed)} 个")
         
-        QMessageBox.information(self, "批量导入结果", result_message)
+        # 覆盖了已启用的mod时，重新部署变化的路径
+        mods_dir = os.path.join(self.get_project_root(), "mods")
+        for job in succeeded:
+            if job.replaced_files is not None:
+                self._redeploy_replaced_mod(os.path.join(mods_dir, job.folder_name), job.replaced_files)
         
-        # 刷新mod列表
+        if state["on_finished"] is not None:
+            state["on_finished"](succeeded)
+        
+        # 刷新mod列表（目录缓存在后台扫描中一次性更新），再恢复目录监视
         self.refresh_mod_list()
+        self.resume_mods_watcher()
+        
+        if succeeded and self.load_advanced_settings().get('content_store', False):
+            self.start_content_dedup([os.path.join(mods_dir, job.folder_name) for job in succeeded], report=False)
+        
+        QMessageBox.information(self, "批量导入结果", result_message)
     
     def start_binary_selection(self):
         """开始二分选择"""
@@ -1069,27 +1016,11 @@ class MainWindow(QMainWindow):
             pass
     
     def _check_enabled_mods_from_json(self):
-        """从JSON文件检查是否有启用的mod"""
-        import os
-        import json
-        project_root = self.get_project_root()
-        mod_states_file = os.path.join(project_root, "json", "mod_states.json")
-        
-        if os.path.exists(mod_states_file):
-            try:
-                with open(mod_states_file, 'r', encoding='utf-8') as f:
-                    mod_states = json.load(f)
-                    # 检查是否有启用的mod
-                    for mod_name, state in mod_states.items():
-                        if isinstance(state, dict):
-                            if state.get('enabled', False):
-                                return True
-                        elif state:  # 旧格式，直接是布尔值
-                            return True
-            except Exception:
-                pass
-        
-        return False
+        """从mod状态检查是否有启用的mod"""
+        try:
+            return self.get_mod_state_store().has_enabled()
+        except Exception:
+            return False
     
     def create_advanced_settings_panel(self):
         """创建高级设置面板 - 完全复制导入模组的create_import_panel方法"""
@@ -1379,6 +1310,71 @@ class MainWindow(QMainWindow):
         
         form_layout.addRow(junction_widget)
         
+        # 模组库维护
+        maintenance_widget = QWidget()
+        maintenance_layout = QHBoxLayout()
+        maintenance_layout.setContentsMargins(0, 0, 0, 0)
+        maintenance_layout.setSpacing(15)
+        maintenance_widget.setLayout(maintenance_layout)
+        
+        maintenance_label = QLabel("模组库维护:")
+        maintenance_label.setStyleSheet(label_style)
+        maintenance_layout.addWidget(maintenance_label)
+        
+        maintenance_button_style = """
+            QPushButton {
+                background-color: rgba(255, 255, 255, 200);
+                border: 1px solid #8B4513;
+                border-radius: 4px;
+                color: #9D00FF;
+                font-size: 13px;
+                font-weight: bold;
+                padding: 8px 15px;
+            }
+            QPushButton:hover {
+                background-color: rgba(255, 182, 193, 200);
+            }
+            QPushButton:disabled {
+                background-color: rgba(200, 200, 200, 150);
+                color: #666666;
+            }
+        """
+        
+        self.btn_verify_library = QPushButton("校验全部Mod")
+        self.btn_verify_library.setStyleSheet(maintenance_button_style)
+        self.btn_verify_library.setToolTip("并行检查所有mod的文件是否与记录一致（缺失、多余、修改）")
+        self.btn_verify_library.clicked.connect(lambda: self.start_library_integrity_scan(False))
+        maintenance_layout.addWidget(self.btn_verify_library)
+        
+        self.btn_verify_library_hash = QPushButton("深度校验（哈希）")
+        self.btn_verify_library_hash.setStyleSheet(maintenance_button_style)
+        self.btn_verify_library_hash.setToolTip("额外比对文件内容哈希，速度较慢")
+        self.btn_verify_library_hash.clicked.connect(lambda: self.start_library_integrity_scan(True))
+        maintenance_layout.addWidget(self.btn_verify_library_hash)
+        
+        self.btn_restore_config = QPushButton("恢复历史配置")
+        self.btn_restore_config.setStyleSheet(maintenance_button_style)
+        self.btn_restore_config.setToolTip("从使用记录中恢复某一时刻的启用列表和优先级（Ctrl+Z 撤销 / Ctrl+Shift+Z 重做）")
+        self.btn_restore_config.clicked.connect(self.show_config_restore_dialog)
+        maintenance_layout.addWidget(self.btn_restore_config)
+        
+        self.btn_content_dedup = QPushButton("文件去重")
+        self.btn_content_dedup.setStyleSheet(maintenance_button_style)
+        self.btn_content_dedup.setToolTip("相同内容的文件只保存一份，各mod通过硬链接共享，并报告节省的空间")
+        self.btn_content_dedup.clicked.connect(lambda: self.start_content_dedup())
+        maintenance_layout.addWidget(self.btn_content_dedup)
+        
+        self.btn_cold_storage = QPushButton("冷存储")
+        self.btn_cold_storage.setStyleSheet(maintenance_button_style)
+        self.btn_cold_storage.setToolTip("把长期未启用的mod打包压缩，启用时自动解压恢复")
+        self.btn_cold_storage.clicked.connect(lambda: self.start_cold_storage())
+        maintenance_layout.addWidget(self.btn_cold_storage)
+        
+        maintenance_layout.addStretch()
+        self.maintenance_layout = maintenance_layout
+        
+        form_layout.addRow(maintenance_widget)
+        
         layout.addWidget(form_widget)
         
         # 按钮区域 - 完全复制导入模组的按钮样式
@@ -1477,13 +1473,14 @@ class MainWindow(QMainWindow):
             old_virtual_mapping = current_settings.get('virtual_mapping', False)
             new_virtual_mapping = self.virtual_mapping_checkbox.isChecked()
             
-            # 准备新的设置（先不立即保存，视后续操作结果而定）
+            # 准备新的设置（先不立即保存，视后续操作结果而定），面板之外的设置项保持不变
             game_path = self.path_input.text()
-            settings = {
+            settings = dict(current_settings)
+            settings.update({
                 'game_path': game_path,
                 'sandbox_mode': self.sandbox_checkbox.isChecked(),
                 'virtual_mapping': new_virtual_mapping
-            }
+            })
             
             # 检测虚拟映射状态变化
             if not old_virtual_mapping and new_virtual_mapping:
@@ -2362,12 +2359,16 @@ class MainWindow(QMainWindow):
             return
         
         # 获取文件列表
+        from utils.archive import is_archive, open_archive
         file_list = []
+        archive_info = getattr(self, 'import_archive_info', None)
         try:
-            if mod_file_path.endswith('.zip'):
-                import zipfile
-                with zipfile.ZipFile(mod_file_path, 'r') as zip_file:
-                    file_list = zip_file.namelist()
+            if archive_info and mod_file_path == getattr(self, 'pending_import_archive', None):
+                # 尚未解压的导入：使用打开面板时读取的压缩包目录
+                file_list = archive_info["file_list"]
+            elif is_archive(mod_file_path):
+                with open_archive(mod_file_path) as archive:
+                    file_list = archive.namelist()
             elif os.path.isdir(mod_file_path):
                 file_list = self.get_folder_files(mod_file_path)
         except Exception as e:
@@ -2976,42 +2977,33 @@ class MainWindow(QMainWindow):
             delattr(self, 'admin_permission_panel')
             self._admin_permission_shown = False
     
+    def get_settings_service(self):
+        """获取设置服务（首次调用时创建）"""
+        if not hasattr(self, 'settings_service') or self.settings_service is None:
+            from utils.settings_service import SettingsService
+            settings_file = os.path.join(self.get_project_root(), "settings.json")
+            self.settings_service = SettingsService(settings_file, parent=self)
+            self.settings_service.settings_changed.connect(self._on_settings_changed)
+        return self.settings_service
+    
+    def _on_settings_changed(self, settings):
+        """设置变化后刷新依赖设置的界面（统计中的占用空间、游戏路径输入框状态）"""
+        if hasattr(self, 'mod_table'):
+            self.update_statistics()
+        if hasattr(self, 'path_input'):
+            self.update_game_path_input_state()
+    
+    def get_hidden_game_path(self):
+        """junction映射后游戏目录的实际路径（由设置服务缓存，设置变化时重新计算）"""
+        return self.get_settings_service().hidden_game_path
+    
     def load_advanced_settings(self):
-        """加载高级设置"""
-        import os
-        project_root = self.get_project_root()
-        settings_file = os.path.join(project_root, "settings.json")
-        
-        default_settings = {
-            'game_path': '',
-            'sandbox_mode': False,
-            'virtual_mapping': False
-        }
-        
-        if os.path.exists(settings_file):
-            try:
-                import json
-                with open(settings_file, 'r', encoding='utf-8') as f:
-                    settings = json.load(f)
-                    return {**default_settings, **settings}
-            except Exception as e:
-                print(f"[失败] 加载设置失败")
-        
-        return default_settings
+        """加载高级设置（返回缓存的只读快照，修改请通过save_advanced_settings）"""
+        return self.get_settings_service().snapshot()
     
     def save_advanced_settings(self, settings):
         """保存高级设置"""
-        import os
-        import json
-        project_root = self.get_project_root()
-        settings_file = os.path.join(project_root, "settings.json")
-        
-        try:
-            with open(settings_file, 'w', encoding='utf-8') as f:
-                json.dump(settings, f, ensure_ascii=False, indent=2)
-            # 设置已保存，不打印详细信息
-        except Exception as e:
-            print(f"[失败] 保存设置失败")
+        self.get_settings_service().save(settings)
     
     def create_right_search_area(self):
         """创建右侧搜索设置区：筛选按钮 + 搜索框 + 设置按钮"""
@@ -3031,8 +3023,9 @@ class MainWindow(QMainWindow):
         # 筛选类型下拉框
         self.filter_type_combo = QComboBox()
         self.filter_type_combo.addItems(["无条件", "收藏", "忽略", "标签", "作者"])
+        self.populate_saved_query_items()
         self.filter_type_combo.setMinimumWidth(80)
-        self.filter_type_combo.setMaximumWidth(100)
+        self.filter_type_combo.setMaximumWidth(160)
         self.filter_type_combo.setCurrentIndex(0)  # 默认选择"无条件"
         self.filter_type_combo.setStyleSheet(f"""
             QComboBox {{
@@ -3082,6 +3075,7 @@ class MainWindow(QMainWindow):
         # 搜索输入框
         self.search_input = QLineEdit()
         self.search_input.setPlaceholderText("搜索Mod...")
+        self.search_input.setToolTip("支持名称、分类、作者、描述、拼音首字母\n输入 path:路径 查找包含该文件的mod，如 path:nativePC/wp/two/*")
         self.search_input.setMinimumWidth(200)  # 设置最小宽度，允许拉伸
         self.search_input.setMaximumWidth(350)  # 设置最大宽度，避免过度拉伸
         # 设置搜索框CSS样式：卡片设计，内阴影，聚焦效果
@@ -3099,8 +3093,12 @@ class MainWindow(QMainWindow):
                 background-color: rgba(255, 255, 255, 240);
             }}
         """)
-        # 连接搜索框文本变化事件
-        self.search_input.textChanged.connect(self.filter_mods_by_search)
+        # 连接搜索框文本变化事件（去抖后再查询，连续输入只查询一次）
+        self._search_debounce_timer = QTimer(self)
+        self._search_debounce_timer.setSingleShot(True)
+        self._search_debounce_timer.setInterval(150)
+        self._search_debounce_timer.timeout.connect(self.apply_filter)
+        self.search_input.textChanged.connect(self._search_debounce_timer.start)
         # 添加焦点离开事件，当搜索框失去焦点且为空时，重新应用忽略规则
         self.search_input.editingFinished.connect(self.on_search_focus_out)
         search_area_layout.addWidget(self.search_input)
@@ -3138,12 +3136,46 @@ class MainWindow(QMainWindow):
         
         return search_area_widget
     
+    def populate_saved_query_items(self):
+        """在筛选类型下拉框的内置条件之后列出保存的查询（项数据为查询名称），最后是管理入口"""
+        combo = self.filter_type_combo
+        current_data = combo.currentData()
+        combo.blockSignals(True)
+        try:
+            while combo.count() > SAVED_QUERY_COMBO_OFFSET:
+                combo.removeItem(combo.count() - 1)
+            for name in self.get_saved_queries().names():
+                combo.addItem(f"★ {name}", name)
+                combo.setItemData(combo.count() - 1, self.get_saved_queries().get_text(name), Qt.ToolTipRole)
+            combo.addItem("管理查询...", SAVED_QUERY_MANAGE)
+            index = combo.findData(current_data) if current_data else -1
+            if index >= 0:
+                combo.setCurrentIndex(index)
+        finally:
+            combo.blockSignals(False)
+        # 正在使用的查询被删除时回到无条件
+        if current_data and current_data != SAVED_QUERY_MANAGE and combo.findData(current_data) < 0:
+            combo.setCurrentIndex(0)
+    
     def on_filter_type_changed(self, filter_type):
         """筛选类型改变时的处理"""
+        query_name = self.filter_type_combo.currentData()
+        if query_name == SAVED_QUERY_MANAGE:
+            # 管理入口不是筛选条件，恢复之前的选择后打开管理窗口
+            self.filter_type_combo.blockSignals(True)
+            previous = self.filter_type_combo.findData(self.current_filter_value) if self.current_filter_type == "查询" else -1
+            if previous < 0:
+                previous = self.filter_type_combo.findText(self.current_filter_type)
+            self.filter_type_combo.setCurrentIndex(max(previous, 0))
+            self.filter_type_combo.blockSignals(False)
+            self.show_saved_queries_dialog()
+            return
+        if query_name:
+            filter_type = "查询"
         self.current_filter_type = filter_type
         
         # 清空筛选值
-        self.current_filter_value = None
+        self.current_filter_value = query_name
         self.filter_value_combo.clear()
         
         if filter_type == "无条件":
@@ -3726,6 +3758,45 @@ class MainWindow(QMainWindow):
         """)
         cancel_btn.clicked.connect(self.hide_import_panel)
         
+        # 重复检测结果（与已有mod相同或可能是其新版本时显示）
+        self.import_duplicate_label = QLabel()
+        self.import_duplicate_label.setStyleSheet("""
+            QLabel {
+                background-color: rgba(255, 255, 255, 200);
+                border: 1px solid #8B4513;
+                border-radius: 4px;
+                color: #8B4513;
+                font-size: 12px;
+                font-weight: bold;
+                padding: 2px 8px;
+            }
+        """)
+        self.import_duplicate_label.hide()
+        
+        # 解压进度（后台解压时显示，取消按钮会中止解压并删除已解压的内容）
+        from PySide6.QtWidgets import QProgressBar
+        self.import_progress_bar = QProgressBar()
+        self.import_progress_bar.setRange(0, 1000)
+        self.import_progress_bar.setTextVisible(True)
+        self.import_progress_bar.setFixedHeight(18)
+        self.import_progress_bar.setStyleSheet("""
+            QProgressBar {
+                background-color: rgba(255, 255, 255, 200);
+                border: 1px solid #8B4513;
+                border-radius: 4px;
+                color: #000000;
+                font-size: 11px;
+                text-align: center;
+            }
+            QProgressBar::chunk {
+                background-color: rgba(255, 182, 193, 220);
+                border-radius: 3px;
+            }
+        """)
+        self.import_progress_bar.hide()
+        
+        button_layout.addWidget(self.import_duplicate_label)
+        button_layout.addWidget(self.import_progress_bar, stretch=1)
         button_layout.addStretch()
         button_layout.addWidget(save_btn)
         button_layout.addWidget(cancel_btn)
@@ -3763,8 +3834,8 @@ class MainWindow(QMainWindow):
         # 设置文件过滤器，只允许选择zip和7z文件
         file_filter = "压缩文件 (*.zip *.7z);;Zip文件 (*.zip);;7z文件 (*.7z)"
         
-        # 打开文件对话框
-        file_path, _ = QFileDialog.getOpenFileName(
+        # 打开文件对话框（可以多选，多个文件加入导入队列）
+        file_paths, _ = QFileDialog.getOpenFileNames(
             self,
             "选择Mod文件",
             "",  # 默认路径
@@ -3772,17 +3843,20 @@ class MainWindow(QMainWindow):
             "Zip文件 (*.zip)"  # 默认选择的过滤器
         )
         
-        # 如果用户选择了文件，显示导入面板
-        if file_path:
-            self.selected_file_path = file_path  # 保存选择的文件路径
-            self.show_import_panel_with_file(file_path)
+        # 如果用户选择了文件，显示导入面板或导入队列
+        if file_paths:
+            self.import_archives(file_paths)
     
     def show_import_panel_with_file(self, file_path):
-        """显示导入面板并检查modinfo文件夹，同时立即解压压缩包"""
-        import zipfile
+        """显示导入面板并检查modinfo文件夹
+        
+        文件树、modinfo.xml和缩略图从一次打开的压缩包目录中读取，面板立即显示。
+        此时不写入任何文件：点击保存后才在后台直接解压到最终的mod文件夹，
+        进度显示在面板底部；保存前取消导入不产生任何磁盘写入。
+        """
         import xml.etree.ElementTree as ET
         import os
-        import shutil
+        from utils.archive_extract import read_import_info
         
         # 确保导入面板已创建
         if not hasattr(self, 'import_panel') or not self.import_panel:
@@ -3804,101 +3878,339 @@ class MainWindow(QMainWindow):
         # 保存选中的文件路径
         self.selected_file_path = file_path
         
-        # 立即解压压缩包到mods目录
-        project_root = self.get_project_root()
-        mods_dir = os.path.join(project_root, "mods")
-        os.makedirs(mods_dir, exist_ok=True)
-        
-        # 使用模组名称作为文件夹名
-        mod_folder_name = mod_name.replace(" ", "_").replace("/", "_").replace("\\", "_")
-        mod_folder_path = os.path.join(mods_dir, mod_folder_name)
-        
-        # 如果文件夹已存在，先删除
-        if os.path.exists(mod_folder_path):
-            shutil.rmtree(mod_folder_path)
-        
-        # 解压压缩包
-        try:
-            with zipfile.ZipFile(file_path, 'r') as zip_file:
-                zip_file.extractall(mod_folder_path)
-            
-            # 保存解压的文件夹路径，用于取消时删除
-            self.extracted_mod_folder_path = mod_folder_path
-        except Exception as e:
-            # 解压失败，保持现状
-            self.extracted_mod_folder_path = None
-        
         # 清空文件树
         self.file_tree.clear()
         
         try:
-            # 检查zip文件中是否有modinfo文件夹
-            with zipfile.ZipFile(file_path, 'r') as zip_file:
-                file_list = zip_file.namelist()
-                
-                # 显示文件树
-                self.display_file_tree(file_list)
-                
-                # 查找modinfo文件夹
-                modinfo_files = [f for f in file_list if f.startswith('modinfo/') and len(f) > len('modinfo/')]
-                
-                if modinfo_files:
-                    # 有modinfo文件夹，尝试读取XML和PNG
-                    xml_files = [f for f in modinfo_files if f.endswith('.xml')]
-                    png_files = [f for f in modinfo_files if f.endswith('.png')]
+            # 一次读取压缩包目录：文件列表、modinfo中的XML和PNG
+            import_info = read_import_info(file_path)
+        except Exception as e:
+            import_info = None
+            print(f"[警告] 读取压缩包失败: {e}")
+        
+        # 字典解析等直接使用压缩包目录，保存前不解压
+        self.current_mod_file_path = file_path
+        self.import_archive_info = import_info
+        self.pending_import_archive = file_path
+        self.extracted_mod_folder_path = None
+        
+        # 后台检测是否与已有mod重复（先按压缩包目录立即给出结果，再用内容哈希确认）
+        self.import_archive_hash = None
+        self.import_duplicate_report = None
+        self.import_duplicate_label.hide()
+        if import_info is not None:
+            self._start_duplicate_check(file_path, import_info["members"])
+        
+        if import_info is not None:
+            # 显示文件树
+            self.display_file_tree(import_info["file_list"])
+            
+            # 读取XML文件获取模组信息
+            if import_info["xml"]:
+                try:
+                    root = ET.fromstring(import_info["xml"])
                     
-                    # 读取XML文件获取模组信息
-                    if xml_files:
-                        try:
-                            xml_content = zip_file.read(xml_files[0])
-                            root = ET.fromstring(xml_content)
-                            
-                            # 解析XML信息
-                            name_elem = root.find('.//name')
-                            author_elem = root.find('.//author')
-                            description_elem = root.find('.//description')
-                            category_elem = root.find('.//category')
-                            
-                            if name_elem is not None:
-                                self.mod_name_input.setText(name_elem.text or mod_name)
-                            if author_elem is not None:
-                                # 如果XML中有作者信息，设置到下拉框
-                                author_text = author_elem.text or ""
-                                if author_text:
-                                    index = self.author_combo.findText(author_text)
-                                    if index >= 0:
-                                        self.author_combo.setCurrentIndex(index)
-                            if description_elem is not None:
-                                self.description_input.setText(description_elem.text or "")
-                            if category_elem is not None:
-                                category_text = category_elem.text or ""
-                                if category_text:
-                                    # 支持多分类（分号分隔），直接设置到输入框
-                                    self.category_input.setText(category_text.strip())
-                        except Exception as e:
-                            pass  # 解析XML失败，不打印详细信息
+                    # 解析XML信息
+                    name_elem = root.find('.//name')
+                    author_elem = root.find('.//author')
+                    description_elem = root.find('.//description')
+                    category_elem = root.find('.//category')
                     
-                    # 读取PNG缩略图
-                    if png_files:
-                        try:
-                            from PySide6.QtGui import QPixmap
-                            png_data = zip_file.read(png_files[0])
-                            pixmap = QPixmap()
-                            pixmap.loadFromData(png_data)
-                            if not pixmap.isNull():
-                                scaled_pixmap = pixmap.scaled(240, 240, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-                                self.thumbnail_preview.setPixmap(scaled_pixmap)
-                        except Exception as e:
-                            pass  # 加载缩略图失败，不打印详细信息
-                else:
-                    # 没有modinfo文件夹，用户需要手动填写
-                    pass
-        except Exception as e:
-            pass  # 读取zip文件失败，不打印详细信息
+                    if name_elem is not None:
+                        self.mod_name_input.setText(name_elem.text or mod_name)
+                    if author_elem is not None:
+                        # 如果XML中有作者信息，设置到下拉框
+                        author_text = author_elem.text or ""
+                        if author_text:
+                            index = self.author_combo.findText(author_text)
+                            if index >= 0:
+                                self.author_combo.setCurrentIndex(index)
+                    if description_elem is not None:
+                        self.description_input.setText(description_elem.text or "")
+                    if category_elem is not None:
+                        category_text = category_elem.text or ""
+                        if category_text:
+                            # 支持多分类（分号分隔），直接设置到输入框
+                            self.category_input.setText(category_text.strip())
+                except Exception as e:
+                    pass  # 解析XML失败，不打印详细信息
+            
+            # 读取PNG缩略图
+            if import_info["thumbnail"]:
+                try:
+                    from PySide6.QtGui import QPixmap
+                    pixmap = QPixmap()
+                    pixmap.loadFromData(import_info["thumbnail"])
+                    if not pixmap.isNull():
+                        scaled_pixmap = pixmap.scaled(240, 240, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+                        self.thumbnail_preview.setPixmap(scaled_pixmap)
+                except Exception as e:
+                    pass  # 加载缩略图失败，不打印详细信息
         
         # 使用动画显示导入面板
         self._show_import_panel_with_animation()
     
+    def _start_import_extraction(self, file_path, mod_folder_path):
+        """启动后台解压线程"""
+        from utils.archive_extract import ExtractThread
+        self.import_progress_bar.setValue(0)
+        self.import_progress_bar.setFormat("正在解压... %p%")
+        self.import_progress_bar.show()
+        thread = ExtractThread(file_path, mod_folder_path, parent=self)
+        thread.progress.connect(self._on_import_extract_progress)
+        thread.extract_finished.connect(lambda completed, error, t=thread: self._on_import_extract_finished(t, completed, error))
+        thread.finished.connect(thread.deleteLater)
+        self._import_extract_thread = thread
+        thread.start()
+    
+    def _on_import_extract_progress(self, done, total, member):
+        progress_bar = getattr(self, 'import_progress_bar', None)
+        if progress_bar is None or getattr(self, 'import_panel', None) is None:
+            return
+        progress_bar.setValue(int(done * 1000 / total) if total else 1000)
+        if member:
+            progress_bar.setToolTip(member)
+    
+    def _on_import_extract_finished(self, thread, completed, error):
+        import shutil
+        if getattr(self, '_import_extract_thread', None) is not thread:
+            # 已取消的导入：解压在最后一次检查取消之后才完成时，解压线程不会删除，在这里删除
+            if completed:
+                shutil.rmtree(thread.dest_dir, ignore_errors=True)
+                print(f"[导入取消] 已删除解压的文件夹: {thread.dest_dir}")
+            return
+        self._import_extract_thread = None
+        form = getattr(self, '_pending_import_form', None)
+        self._pending_import_form = None
+        replace_target = getattr(self, '_import_replace_target', None)
+        self._import_replace_target = None
+        if not completed:
+            if replace_target and self.extracted_mod_folder_path:
+                shutil.rmtree(self.extracted_mod_folder_path, ignore_errors=True)
+            self.extracted_mod_folder_path = None
+            if error:
+                print(f"[失败] 解压失败: {error}")
+                QMessageBox.warning(self, "错误", f"解压失败：{error}")
+            if getattr(self, 'import_panel', None) is not None:
+                self.import_progress_bar.setFormat("解压失败")
+            return
+        self.pending_import_archive = None
+        if getattr(self, 'import_panel', None) is not None:
+            self.import_progress_bar.hide()
+        # 替换和写入modinfo期间的文件变化由导入流程处理
+        self.pause_mods_watcher()
+        try:
+            if replace_target:
+                if not self._replace_mod_folder(replace_target, self.extracted_mod_folder_path):
+                    self.extracted_mod_folder_path = None
+                    return
+                self.extracted_mod_folder_path = replace_target
+            if form is not None:
+                self._finish_mod_import(self.extracted_mod_folder_path, *form, member_hashes=thread.member_hashes)
+        finally:
+            self.resume_mods_watcher()
+    
+    def _replace_mod_folder(self, mod_folder_path, new_folder_path):
+        """覆盖导入：用解压完成的暂存文件夹替换已有的mod文件夹
+        
+        旧文件夹先移到一旁，新文件夹移入后再删除旧文件夹；旧mod已启用时按新的文件重新部署变化的路径。
+        
+        Returns:
+            bool: 是否替换成功（失败时旧mod保持不变，暂存文件夹被删除）
+        """
+        import shutil
+        from utils.mod_update import replace_mod_folder
+        try:
+            old_paths = replace_mod_folder(mod_folder_path, new_folder_path)
+        except OSError as e:
+            shutil.rmtree(new_folder_path, ignore_errors=True)
+            print(f"[失败] 替换mod文件夹失败: {e}")
+            QMessageBox.warning(self, "错误", f"替换mod文件夹失败：{e}")
+            return False
+        self._redeploy_replaced_mod(mod_folder_path, old_paths)
+        print(f"[信息] 已替换mod文件夹: {os.path.basename(mod_folder_path)}")
+        return True
+    
+    def _redeploy_replaced_mod(self, mod_folder_path, old_paths):
+        """mod文件夹被整体替换后（覆盖导入），旧mod已启用时只重新部署变化的路径
+        
+        链接和文件栈记录仍属于旧mod名称（目录缓存尚未刷新），按旧名称处理。
+        """
+        folder_name = os.path.basename(mod_folder_path)
+        self.get_integrity_cache().invalidate(mod_folder_path)
+        catalog_row = self.get_mod_catalog().get(folder_name)
+        old_name = catalog_row["name"] if catalog_row is not None else folder_name
+        if not self.get_mod_state_store().is_enabled(old_name):
+            return
+        new_paths = self.get_mod_file_paths(old_name, mod_folder_path)
+        if self.load_advanced_settings().get('virtual_mapping', False):
+            self.relink_mod_virtual_files(old_name, mod_folder_path, old_paths=old_paths, current_paths=new_paths)
+        else:
+            self.update_file_stack_paths(
+                old_name, mod_folder_path,
+                sorted(new_paths - old_paths), sorted(new_paths & old_paths), sorted(old_paths - new_paths)
+            )
+    
+    def _cancel_import_extraction(self):
+        """中止正在进行的解压，已解压的内容由解压线程（或已经解压完成时由完成处理）删除"""
+        thread = getattr(self, '_import_extract_thread', None)
+        if thread is None:
+            return False
+        thread.cancel()
+        self._import_extract_thread = None
+        self._pending_import_form = None
+        print("[导入取消] 已中止解压")
+        return True
+    
+    def get_archive_hash_index(self):
+        """获取导入过的压缩包的哈希索引（首次调用时创建）"""
+        if not hasattr(self, 'archive_hash_index') or self.archive_hash_index is None:
+            from utils.content_index import ArchiveHashIndex
+            self.archive_hash_index = ArchiveHashIndex(os.path.join(self.get_project_root(), "json", "archive_hashes.json"))
+        return self.archive_hash_index
+    
+    def get_duplicate_checker(self):
+        """获取导入时的重复检测（使用搜索索引的全库路径列表和压缩包哈希索引）"""
+        if not hasattr(self, 'duplicate_checker') or self.duplicate_checker is None:
+            from utils.content_index import DuplicateChecker
+            self.duplicate_checker = DuplicateChecker(
+                os.path.join(self.get_project_root(), "mods"), self.get_search_index(),
+                self.get_mod_catalog(), self.get_archive_hash_index()
+            )
+        return self.duplicate_checker
+    
+    def _start_duplicate_check(self, file_path, members):
+        """启动后台重复检测线程"""
+        from utils.content_index import DuplicateCheckThread
+        thread = DuplicateCheckThread(file_path, members, self.get_duplicate_checker(), parent=self)
+        thread.checked.connect(lambda report, t=thread: self._on_duplicate_checked(t, report))
+        thread.finished.connect(lambda t=thread: self._on_duplicate_check_finished(t))
+        self._duplicate_check_thread = thread
+        thread.start()
+    
+    def _on_duplicate_checked(self, thread, report):
+        """在导入面板上显示重复检测结果"""
+        from utils.content_index import MATCH_NEW
+        if getattr(self, '_duplicate_check_thread', None) is not thread or getattr(self, 'import_panel', None) is None:
+            return
+        self.import_duplicate_report = report
+        self.import_duplicate_label.setText(report.message())
+        self.import_duplicate_label.setVisible(report.kind != MATCH_NEW)
+    
+    def _on_duplicate_check_finished(self, thread):
+        """保存压缩包哈希；导入在哈希算完之前已完成时，此时才记录到哈希索引"""
+        if getattr(self, '_duplicate_check_thread', None) is thread:
+            self._duplicate_check_thread = None
+            self.import_archive_hash = thread.digest
+        if thread.digest and thread.imported_folder:
+            self.get_archive_hash_index().add(thread.digest, thread.imported_folder)
+        thread.deleteLater()
+    
+    def _record_import_archive_hash(self, folder_name):
+        """把导入面板中压缩包的哈希记录为folder（仍在计算时由检测线程算完后记录）
+        
+        folder原有的记录先移除：覆盖或更新后，旧版压缩包已与它的内容不同。
+        """
+        index = self.get_archive_hash_index()
+        index.remove_folder(folder_name)
+        check_thread = getattr(self, '_duplicate_check_thread', None)
+        if getattr(self, 'import_archive_hash', None):
+            index.add(self.import_archive_hash, folder_name)
+        elif check_thread is not None:
+            check_thread.imported_folder = folder_name
+    
+    def ask_update_or_import(self, message, import_text):
+        """询问压缩包是增量更新已有的mod、按import_text导入，还是取消
+        
+        Returns:
+            str: 'update'、'import' 或 'cancel'
+        """
+        box = QMessageBox(self)
+        box.setIcon(QMessageBox.Question)
+        box.setWindowTitle("更新mod")
+        box.setText(message)
+        box.setInformativeText("更新：只写入有变化的文件并删除新版中已不存在的文件，保留mod信息和启用状态")
+        update_btn = box.addButton("更新", QMessageBox.AcceptRole)
+        import_btn = box.addButton(import_text, QMessageBox.DestructiveRole)
+        box.addButton("取消", QMessageBox.RejectRole)
+        box.setDefaultButton(update_btn)
+        box.exec()
+        clicked = box.clickedButton()
+        if clicked is update_btn:
+            return 'update'
+        if clicked is import_btn:
+            return 'import'
+        return 'cancel'
+    
+    def _start_mod_update(self, archive_path, mod_folder_path):
+        """启动后台增量更新，进度显示在导入面板底部（取消导入会中止更新，mod文件夹保持不变）"""
+        import uuid
+        from utils.mod_update import ModUpdateThread
+        if not self.ensure_mods_hot([mod_folder_path]):
+            return
+        staging_dir = os.path.join(self.get_project_root(), "update_staging", uuid.uuid4().hex)
+        self.import_progress_bar.setValue(0)
+        self.import_progress_bar.setFormat("正在更新... %p%")
+        self.import_progress_bar.show()
+        # 更新期间的文件变化由完成后的处理统一刷新
+        self.pause_mods_watcher()
+        thread = ModUpdateThread(archive_path, mod_folder_path, staging_dir, parent=self)
+        thread.progress.connect(self._on_import_extract_progress)
+        thread.update_finished.connect(lambda plan, error, t=thread: self._on_mod_update_finished(t, plan, error))
+        thread.finished.connect(thread.deleteLater)
+        self._import_extract_thread = thread
+        thread.start()
+    
+    def _on_mod_update_finished(self, thread, plan, error):
+        """增量更新完成：刷新目录缓存，已启用的mod只重新部署变化的路径"""
+        cancelled = getattr(self, '_import_extract_thread', None) is not thread
+        if not cancelled:
+            self._import_extract_thread = None
+        try:
+            if plan is None:
+                if error:
+                    # 替换文件的中途失败时mod可能已部分更新：清单已按现状重写，完整性记录和目录缓存也要刷新
+                    self.get_integrity_cache().invalidate(thread.mod_folder_path)
+                    self.get_integrity_cache().save()
+                    self.get_mod_catalog().refresh_folder(os.path.basename(thread.mod_folder_path))
+                    print(f"[失败] 更新mod失败: {error}")
+                    QMessageBox.warning(self, "错误", f"更新mod失败：{error}")
+                    if not cancelled and getattr(self, 'import_panel', None) is not None:
+                        self.import_progress_bar.setFormat("更新失败")
+                return
+            
+            mod_folder_path = thread.mod_folder_path
+            folder_name = os.path.basename(mod_folder_path)
+            self.get_integrity_cache().invalidate(mod_folder_path)
+            self.get_integrity_cache().save()
+            catalog_row = self.get_mod_catalog().refresh_folder(folder_name)
+            mod_name = catalog_row["name"] if catalog_row is not None else folder_name
+            if self.get_mod_state_store().is_enabled(mod_name):
+                self.apply_mod_file_changes(mod_name, mod_folder_path, plan)
+            self._record_import_archive_hash(folder_name)
+            print(f"[成功] 已更新mod: {mod_name}（{plan.summary()}）")
+            if self.load_advanced_settings().get('content_store', False):
+                # 新写入的文件加入存储，只属于旧版本的对象在去重结束时清理
+                self.start_content_dedup([mod_folder_path], report=False)
+            
+            if not cancelled:
+                self.pending_import_archive = None
+                self.hide_import_panel()
+        finally:
+            self.resume_mods_watcher()
+    
+    def apply_mod_file_changes(self, mod_name, mod_folder_path, plan):
+        """已启用的mod更新后，只重新部署变化的路径
+        
+        虚拟映射模式下新增、修改和删除的路径都按优先级重新确定来源（删除的文件回退到其他mod或游戏原文件）；
+        文件栈模式下按文件栈增量处理新增、修改和删除的文件。
+        """
+        if self.load_advanced_settings().get('virtual_mapping', False):
+            self.relink_mod_virtual_files(mod_name, mod_folder_path, old_paths=plan.removed,
+                                          current_paths=plan.added + plan.changed)
+        else:
+            self.update_file_stack_paths(mod_name, mod_folder_path, plan.added, plan.changed, plan.removed)
+    
     def _show_import_panel_with_animation(self):
         """使用动画显示导入面板"""
         # 使用快速的动画接口显示面板 - 覆盖主窗口
@@ -4142,6 +4454,286 @@ class MainWindow(QMainWindow):
                     self.show_import_panel_with_file(file_path)
                     break
     
+    def dragEnterEvent(self, event):
+        """拖入压缩包：接受任意数量的zip/7z文件"""
+        if self._dropped_archive_paths(event):
+            event.acceptProposedAction()
+        else:
+            event.ignore()
+    
+    def dropEvent(self, event):
+        """放下压缩包：一个直接打开导入面板，多个加入导入队列"""
+        archive_paths = self._dropped_archive_paths(event)
+        if not archive_paths:
+            event.ignore()
+            return
+        event.acceptProposedAction()
+        self.import_archives(archive_paths)
+    
+    def _dropped_archive_paths(self, event):
+        from utils.archive import is_archive
+        if not event.mimeData().hasUrls():
+            return []
+        return [url.toLocalFile() for url in event.mimeData().urls() if is_archive(url.toLocalFile())]
+    
+    def import_archives(self, archive_paths):
+        """导入一个或多个压缩包"""
+        if len(archive_paths) == 1 and getattr(self, 'import_queue_dialog', None) is None:
+            self.selected_file_path = archive_paths[0]
+            self.show_import_panel_with_file(archive_paths[0])
+            return
+        self.get_import_queue().add(archive_paths)
+        self.show_import_queue_dialog()
+    
+    def get_import_queue(self):
+        """获取导入队列（延迟创建，暂存文件夹位于项目根目录，与mods目录在同一磁盘）"""
+        if getattr(self, 'import_queue', None) is None:
+            from utils.import_queue import ImportQueue, DEFAULT_IO_BUDGET
+            staging_root = os.path.join(self.get_project_root(), "import_staging")
+            io_budget = self.load_advanced_settings().get('import_io_budget', DEFAULT_IO_BUDGET)
+            self.import_queue = ImportQueue(
+                staging_root, io_budget=io_budget, duplicate_checker=self.get_duplicate_checker(), parent=self
+            )
+            self.import_queue.item_changed.connect(self._on_import_queue_item_changed)
+        return self.import_queue
+    
+    def show_import_queue_dialog(self):
+        """显示导入队列：压缩包在后台读取和解压，在列表中确认或修改信息后统一导入"""
+        from PySide6.QtWidgets import QTableWidget, QHeaderView, QSpinBox
+        from utils.import_queue import MAX_IO_BUDGET
+        
+        dialog = getattr(self, 'import_queue_dialog', None)
+        if dialog is not None:
+            self._refresh_import_queue_table()
+            dialog.raise_()
+            dialog.activateWindow()
+            return
+        
+        queue = self.get_import_queue()
+        dialog = QDialog(self)
+        dialog.setWindowTitle("导入队列")
+        dialog.setMinimumSize(760, 460)
+        dialog.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
+        dialog.setStyleSheet("""
+            QDialog {
+                background-color: rgba(255, 228, 240, 230);
+                border: 1px solid #8B4513;
+                border-radius: 6px;
+            }
+            QLabel {
+                color: #000000;
+                font-size: 13px;
+            }
+            QTableWidget, QSpinBox {
+                background-color: rgba(255, 255, 255, 220);
+                border: 1px solid #8B4513;
+                border-radius: 6px;
+                color: #000000;
+            }
+            QPushButton {
+                background-color: rgba(255, 255, 255, 220);
+                border: 1px solid #8B4513;
+                border-radius: 6px;
+                color: #000000;
+                font-size: 13px;
+                font-weight: bold;
+                padding: 8px 18px;
+            }
+            QPushButton:hover {
+                background-color: rgba(255, 182, 193, 220);
+            }
+        """)
+        layout = QVBoxLayout()
+        layout.setContentsMargins(16, 16, 16, 16)
+        layout.setSpacing(10)
+        dialog.setLayout(layout)
+        
+        top_row = QHBoxLayout()
+        top_row.addWidget(QLabel("拖入更多压缩包可继续加入队列；名称、分类、作者可直接在列表中修改"))
+        top_row.addStretch()
+        top_row.addWidget(QLabel("同时解压："))
+        budget_spin = QSpinBox()
+        budget_spin.setRange(1, MAX_IO_BUDGET)
+        budget_spin.setValue(queue.io_budget)
+        budget_spin.setToolTip("同时解压的压缩包数量（I/O预算），机械硬盘建议设为1")
+        budget_spin.valueChanged.connect(self._on_import_io_budget_changed)
+        top_row.addWidget(budget_spin)
+        layout.addLayout(top_row)
+        
+        table = QTableWidget(0, 5)
+        table.setHorizontalHeaderLabels(["压缩包", "mod名称", "分类", "作者", "状态"])
+        table.verticalHeader().setVisible(False)
+        table.horizontalHeader().setSectionResizeMode(1, QHeaderView.ResizeMode.Stretch)
+        table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        table.itemChanged.connect(self._on_import_queue_cell_edited)
+        layout.addWidget(table, 1)
+        
+        button_row = QHBoxLayout()
+        btn_add = QPushButton("添加压缩包...")
+        btn_add.clicked.connect(self._add_archives_to_import_queue)
+        button_row.addWidget(btn_add)
+        btn_remove = QPushButton("移除所选")
+        btn_remove.clicked.connect(self._remove_selected_queue_items)
+        button_row.addWidget(btn_remove)
+        button_row.addStretch()
+        btn_import = QPushButton("全部导入")
+        btn_import.clicked.connect(self.commit_import_queue)
+        button_row.addWidget(btn_import)
+        btn_close = QPushButton("关闭")
+        btn_close.clicked.connect(dialog.close)
+        button_row.addWidget(btn_close)
+        layout.addLayout(button_row)
+        
+        dialog.setAcceptDrops(True)
+        dialog.dragEnterEvent = self.dragEnterEvent
+        dialog.dropEvent = self.dropEvent
+        dialog.closeEvent = self._on_import_queue_dialog_close
+        dialog.destroyed.connect(lambda: setattr(self, 'import_queue_dialog', None))
+        
+        self.import_queue_dialog = dialog
+        self.import_queue_table = table
+        self._refresh_import_queue_table()
+        dialog.show()
+    
+    def _refresh_import_queue_table(self):
+        """按队列内容重建列表"""
+        from PySide6.QtWidgets import QTableWidgetItem
+        table = getattr(self, 'import_queue_table', None)
+        if table is None:
+            return
+        queue = self.get_import_queue()
+        table.blockSignals(True)
+        table.setRowCount(len(queue.items))
+        for row, item in enumerate(queue.items):
+            for column, text in enumerate((item.file_name, item.mod_name, item.category, item.author, item.status_text())):
+                cell = QTableWidgetItem(text)
+                if column not in (1, 2, 3):
+                    cell.setFlags(cell.flags() & ~Qt.ItemFlag.ItemIsEditable)
+                table.setItem(row, column, cell)
+            table.item(row, 0).setToolTip(item.archive_path)
+            table.item(row, 4).setToolTip(item.duplicate.message() if item.duplicate is not None else "")
+        table.blockSignals(False)
+    
+    def _on_import_queue_item_changed(self, item):
+        """队列条目变化：更新对应的行（读取modinfo后同时更新预填的信息）"""
+        table = getattr(self, 'import_queue_table', None)
+        if table is None:
+            return
+        queue = self.get_import_queue()
+        if item not in queue.items:
+            return
+        row = queue.items.index(item)
+        if row >= table.rowCount():
+            self._refresh_import_queue_table()
+            return
+        table.blockSignals(True)
+        table.item(row, 4).setText(item.status_text())
+        table.item(row, 4).setToolTip(item.duplicate.message() if item.duplicate is not None else "")
+        # 用modinfo中的信息刷新可编辑的列（用户修改过的列保持不变）
+        for column, attr in ((1, "mod_name"), (2, "category"), (3, "author")):
+            if attr not in item.edited:
+                table.item(row, column).setText(getattr(item, attr))
+        table.blockSignals(False)
+    
+    def _on_import_queue_cell_edited(self, cell):
+        queue = self.get_import_queue()
+        row = cell.row()
+        if row >= len(queue.items):
+            return
+        item = queue.items[row]
+        attr = {1: "mod_name", 2: "category", 3: "author"}.get(cell.column())
+        if attr is None:
+            return
+        setattr(item, attr, cell.text().strip())
+        item.edited.add(attr)
+    
+    def _on_import_io_budget_changed(self, value):
+        """修改I/O预算并保存到设置"""
+        self.get_import_queue().set_io_budget(value)
+        settings = dict(self.load_advanced_settings())
+        settings['import_io_budget'] = value
+        self.save_advanced_settings(settings)
+    
+    def _add_archives_to_import_queue(self):
+        file_paths, _ = QFileDialog.getOpenFileNames(
+            self.import_queue_dialog, "选择Mod文件", "", "压缩文件 (*.zip *.7z);;Zip文件 (*.zip);;7z文件 (*.7z)"
+        )
+        if file_paths:
+            self.get_import_queue().add(file_paths)
+            self._refresh_import_queue_table()
+    
+    def _remove_selected_queue_items(self):
+        queue = self.get_import_queue()
+        rows = sorted({index.row() for index in self.import_queue_table.selectedIndexes()})
+        for item in [queue.items[row] for row in rows if row < len(queue.items)]:
+            queue.remove(item)
+        self._refresh_import_queue_table()
+    
+    def _on_import_queue_dialog_close(self, event):
+        """关闭队列窗口时放弃未导入的压缩包"""
+        from utils.import_queue import STATUS_IMPORTING
+        queue = self.get_import_queue()
+        if any(item.status == STATUS_IMPORTING for item in queue.items):
+            QMessageBox.information(self.import_queue_dialog, "提示", "正在导入，请等待导入完成")
+            event.ignore()
+            return
+        if queue.items:
+            reply = QMessageBox.question(
+                self.import_queue_dialog, "关闭导入队列",
+                f"队列中还有 {len(queue.items)} 个压缩包未导入，关闭后将放弃它们。是否关闭？",
+                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+                QMessageBox.StandardButton.No
+            )
+            if reply != QMessageBox.StandardButton.Yes:
+                event.ignore()
+                return
+            queue.clear()
+        self.import_queue_table = None
+        QDialog.closeEvent(self.import_queue_dialog, event)
+    
+    def commit_import_queue(self):
+        """统一导入队列中已解压完成的压缩包：冲突统一确认，状态和列表一次性更新"""
+        from utils.batch_import import ImportJob
+        from utils.import_queue import STATUS_IMPORTING, STATUS_READY
+        from utils.manifest import IMPORT_MODE_MOVE
+        
+        queue = self.get_import_queue()
+        ready_items = queue.ready_items()
+        if not ready_items:
+            QMessageBox.information(self.import_queue_dialog, "提示", "没有已解压完成的压缩包，请等待解压完成")
+            return
+        if any(not item.mod_name for item in ready_items):
+            QMessageBox.warning(self.import_queue_dialog, "警告", "请填写所有mod的名称")
+            return
+        
+        jobs = []
+        items_by_source = {}
+        for item in ready_items:
+            jobs.append(ImportJob(
+                item.file_name, item.staging_dir, item.mod_name, category=item.category, author=item.author,
+                version=item.version, description=item.description, archive=item.archive_path,
+                member_hashes=item.member_hashes
+            ))
+            items_by_source[item.staging_dir] = item
+        
+        def on_finished(succeeded):
+            for job in succeeded:
+                archive_hash = items_by_source[job.source].archive_hash
+                if archive_hash:
+                    self.get_archive_hash_index().add(archive_hash, job.folder_name)
+            queue.discard_imported([items_by_source[job.source] for job in succeeded])
+            # 跳过或失败的条目留在队列中，可以改名后再次导入
+            for item in items_by_source.values():
+                if item.status == STATUS_IMPORTING and item in queue.items:
+                    item.status = STATUS_READY
+            self._refresh_import_queue_table()
+        
+        # 暂存文件夹与mods目录在同一磁盘，直接移动
+        if self._start_batch_import(jobs, [], IMPORT_MODE_MOVE, empty_message="", on_finished=on_finished):
+            for item in ready_items:
+                item.status = STATUS_IMPORTING
+                self._on_import_queue_item_changed(item)
+    
     def on_thumbnail_drag_enter(self, event):
         """缩略图拖拽进入事件"""
         if event.mimeData().hasUrls():
@@ -4166,39 +4758,103 @@ class MainWindow(QMainWindow):
                     break
     
     def save_mod_info(self):
-        """保存模组信息并编辑XML（压缩包已在导入时解压）"""
-        import xml.etree.ElementTree as ET
+        """保存模组信息并编辑XML
+        
+        新导入的压缩包此时才在后台解压到以模组名称命名的文件夹，解压完成后写入modinfo；
+        解压期间表单内容已确定，取消导入会中止解压并删除已解压的内容。
+        """
         import os
+        import shutil
+        
+        if getattr(self, '_import_extract_thread', None) is not None:
+            return  # 已在解压，完成后自动保存
         
-        if not hasattr(self, 'extracted_mod_folder_path') or not self.extracted_mod_folder_path:
+        archive_path = getattr(self, 'pending_import_archive', None)
+        if not archive_path:
+            if not getattr(self, 'extracted_mod_folder_path', None) or not os.path.exists(self.extracted_mod_folder_path):
+                return
+        
+        # 获取表单数据
+        mod_name = self.mod_name_input.text().strip() or "未命名模组"
+        category = self.category_input.text().strip()  # 从输入框获取，支持多分类（分号分隔）
+        author = self.author_combo.currentText().strip()
+        description = self.description_input.text().strip()
+        
+        # 在保存XML之前，先检查并处理未知的分类和作者
+        # 对于多分类，需要分别检查每个分类
+        if category:
+            categories_list = [cat.strip() for cat in category.split(';') if cat.strip()]
+            processed_categories = []
+            for cat in categories_list:
+                processed_cat, _ = self.check_and_handle_unknown_category_author(cat, "")
+                if processed_cat:
+                    processed_categories.append(processed_cat)
+            category = '; '.join(processed_categories) if processed_categories else ""
+        
+        category, author = self.check_and_handle_unknown_category_author(category, author)
+        form = (mod_name, category, author, description)
+        
+        # 内容哈希确认与已有mod完全相同时，再次确认是否导入
+        from utils.content_index import MATCH_IDENTICAL, MATCH_NEW
+        report = getattr(self, 'import_duplicate_report', None)
+        if archive_path and report is not None and report.kind == MATCH_IDENTICAL and report.verified:
+            reply = QMessageBox.question(
+                self, "重复的mod", f"{report.message()}。\n是否仍要导入？",
+                QMessageBox.Yes | QMessageBox.No, QMessageBox.No
+            )
+            if reply != QMessageBox.Yes:
+                return
+        
+        if not archive_path:
+            self._finish_mod_import(self.extracted_mod_folder_path, *form)
             return
         
-        if not os.path.exists(self.extracted_mod_folder_path):
+        # 直接解压到最终的mod文件夹（使用模组名称作为文件夹名）
+        mods_dir = os.path.join(self.get_project_root(), "mods")
+        os.makedirs(mods_dir, exist_ok=True)
+        mod_folder_name = mod_name.replace(" ", "_").replace("/", "_").replace("\\", "_")
+        mod_folder_path = os.path.join(mods_dir, mod_folder_name)
+        extract_path = mod_folder_path
+        self._import_replace_target = None
+        if os.path.exists(mod_folder_path):
+            choice = self.ask_update_or_import(f"已存在同名的mod文件夹：{mod_folder_name}", "覆盖")
+            if choice == 'cancel':
+                return
+            if choice == 'update':
+                self._start_mod_update(archive_path, mod_folder_path)
+                return
+            # 先解压到暂存文件夹，完成后再替换旧的mod文件夹（解压失败或取消时旧mod保持不变）
+            import uuid
+            extract_path = os.path.join(self.get_project_root(), "update_staging", uuid.uuid4().hex)
+            self._import_replace_target = mod_folder_path
+        elif report is not None and report.kind != MATCH_NEW and report.folder:
+            # 名称不同，但文件大量重合：可能是已有mod的新版本
+            existing_folder_path = os.path.join(mods_dir, report.folder)
+            if os.path.isdir(existing_folder_path):
+                choice = self.ask_update_or_import(report.message(), "作为新mod导入")
+                if choice == 'cancel':
+                    return
+                if choice == 'update':
+                    self._start_mod_update(archive_path, existing_folder_path)
+                    return
+        
+        # 保存解压的文件夹路径，用于取消时删除
+        self.extracted_mod_folder_path = extract_path
+        self._pending_import_form = form
+        self._start_import_extraction(archive_path, extract_path)
+    
+    def _finish_mod_import(self, mod_folder_path, mod_name, category, author, description, member_hashes=None):
+        """解压完成后写入modinfo、清单和缩略图，并加入主表格
+        
+        清单记录每个文件的内容哈希（解压时已算出的直接使用），并把压缩包哈希记录到哈希索引，用于之后导入时的重复检测。
+        """
+        import xml.etree.ElementTree as ET
+        import os
+        
+        if not mod_folder_path or not os.path.exists(mod_folder_path):
             return
         
         try:
-            # 获取表单数据
-            mod_name = self.mod_name_input.text().strip() or "未命名模组"
-            category = self.category_input.text().strip()  # 从输入框获取，支持多分类（分号分隔）
-            author = self.author_combo.currentText().strip()
-            description = self.description_input.text().strip()
-            
-            # 在保存XML之前，先检查并处理未知的分类和作者
-            # 对于多分类，需要分别检查每个分类
-            if category:
-                categories_list = [cat.strip() for cat in category.split(';') if cat.strip()]
-                processed_categories = []
-                for cat in categories_list:
-                    processed_cat, _ = self.check_and_handle_unknown_category_author(cat, "")
-                    if processed_cat:
-                        processed_categories.append(processed_cat)
-                category = '; '.join(processed_categories) if processed_categories else ""
-            
-            category, author = self.check_and_handle_unknown_category_author(category, author)
-            
-            # 使用已解压的文件夹路径
-            mod_folder_path = self.extracted_mod_folder_path
-            
             # 创建modinfo文件夹
             modinfo_dir = os.path.join(mod_folder_path, "modinfo")
             os.makedirs(modinfo_dir, exist_ok=True)
@@ -4221,32 +4877,30 @@ class MainWindow(QMainWindow):
                 description_elem = ET.SubElement(xml_root, "description")
                 description_elem.text = description
             
-            # 记录完整的文件结构
-            file_structure_elem = ET.SubElement(xml_root, "file_structure")
-            file_list = self.get_folder_files(mod_folder_path)
-            for file_path in file_list:
-                file_elem = ET.SubElement(file_structure_elem, "file")
-                file_elem.text = file_path
-                # 如果是文件（不是目录），记录文件大小和修改时间
-                if not file_path.endswith('/'):
-                    # 将统一的分隔符转换为当前系统的分隔符，确保跨平台兼容
-                    normalized_path = file_path.replace('/', os.sep).replace('\\', os.sep)
-                    full_path = os.path.join(mod_folder_path, normalized_path)
-                    if os.path.exists(full_path):
-                        file_elem.set("size", str(os.path.getsize(full_path)))
-                        file_elem.set("mtime", str(os.path.getmtime(full_path)))
-            
             # 保存XML文件
             xml_file_path = os.path.join(modinfo_dir, "modinfo.xml")
             tree = ET.ElementTree(xml_root)
             tree.write(xml_file_path, encoding='utf-8', xml_declaration=True)
             
+            # 记录完整的文件结构（二进制清单）和文件内容哈希
+            from utils.manifest import write_mod_manifest, IMPORT_MODE_COPY
+            write_mod_manifest(mod_folder_path, with_hash=True, import_mode=IMPORT_MODE_COPY, known_hashes=member_hashes)
+            
+            # 记录压缩包哈希
+            self._record_import_archive_hash(os.path.basename(mod_folder_path))
+            
+            if self.load_advanced_settings().get('content_store', False):
+                self.start_content_dedup([mod_folder_path], report=False)
+            
             # 保存PNG文件（如果有缩略图）
             if hasattr(self, 'thumbnail_pixmap') and not self.thumbnail_pixmap.isNull():
                 png_file_path = os.path.join(modinfo_dir, "thumbnail.png")
                 # 保存裁剪后的正方形图片（保持原始裁剪尺寸，不缩放）
                 self.thumbnail_pixmap.save(png_file_path, "PNG")
             
+            # 收录到模组目录缓存
+            self.refresh_catalog_entry(mod_name)
+            
             # 添加到主表格（不再检查未知项，因为已经在上面检查过了）
             self.add_mod_to_table(mod_name, category, author, check_unknown=False)
             
@@ -4305,8 +4959,12 @@ class MainWindow(QMainWindow):
         result = panel.exec()
         return result
     
-    def add_mod_to_table(self, mod_name, category, author, check_unknown=True):
-        """添加模组到主表格"""
+    def add_mod_to_table(self, mod_name, category, author, check_unknown=True, mod_states=None):
+        """添加模组到主表格
+        
+        Args:
+            mod_states: 已加载的mod状态，批量添加时传入以避免重复读取
+        """
         # 检查并处理未知的标签和作者（仅在导入新mod时检查）
         if check_unknown:
             category, author = self.check_and_handle_unknown_category_author(category, author)
@@ -4314,10 +4972,11 @@ class MainWindow(QMainWindow):
         # 获取表格
         if hasattr(self, 'mod_table'):
             # 从配置文件加载状态（添加异常处理）
-            try:
-                mod_states = self.load_mod_states()
-            except:
-                mod_states = {}
+            if mod_states is None:
+                try:
+                    mod_states = self.load_mod_states()
+                except:
+                    mod_states = {}
             mod_state = mod_states.get(mod_name, {})
             
             # 如果是新导入的mod，记录导入时间
@@ -4330,7 +4989,7 @@ class MainWindow(QMainWindow):
                     mod_states[mod_name] = mod_state
                     # 保存更新后的状态
                     try:
-                        self._save_mod_states_direct(mod_states)
+                        self.get_mod_state_store().update(mod_name, import_time=mod_state["import_time"])
                     except:
                         pass
             
@@ -4454,6 +5113,14 @@ class MainWindow(QMainWindow):
         # 清空文件树
         self.file_tree.clear()
         
+        # 冷存储的mod使用清单中的文件列表
+        from utils.cold_storage import is_cold, cold_file_list
+        mod_folder_path = os.path.join(self.get_project_root(), "mods", self.mod_name_to_folder_name(mod_name))
+        if is_cold(mod_folder_path):
+            self.current_mod_file_path = mod_folder_path
+            self.display_file_tree(cold_file_list(mod_folder_path))
+            return
+        
         # 获取模组文件路径
         mod_file_path = self.get_mod_file_path(mod_name)
         # 记录当前用于构建文件树的物理路径，供字典解析复用
@@ -4461,12 +5128,12 @@ class MainWindow(QMainWindow):
         
         if mod_file_path and os.path.exists(mod_file_path):
             try:
-                if mod_file_path.endswith('.zip'):
-                    # 如果是zip文件，读取内部结构
-                    import zipfile
-                    with zipfile.ZipFile(mod_file_path, 'r') as zip_file:
-                        file_list = zip_file.namelist()
-                        self.display_file_tree(file_list)
+                from utils.archive import is_archive, open_archive
+                if is_archive(mod_file_path):
+                    # 如果是压缩包，读取内部结构
+                    with open_archive(mod_file_path) as archive:
+                        file_list = archive.namelist()
+                    self.display_file_tree(file_list)
                 elif os.path.isdir(mod_file_path):
                     # 如果是文件夹，读取文件夹结构
                     file_list = self.get_folder_files(mod_file_path)
@@ -4523,26 +5190,12 @@ class MainWindow(QMainWindow):
         return None
     
     def get_folder_files(self, folder_path):
-        """获取文件夹中的所有文件路径"""
-        file_list = []
-        for root, dirs, files in os.walk(folder_path):
-            # 跳过modinfo文件夹
-            if 'modinfo' in dirs:
-                dirs.remove('modinfo')
-            rel_path = os.path.relpath(root, folder_path)
-            if rel_path.startswith('modinfo') or os.path.basename(root) == 'modinfo':
-                continue
-            
-            for file in files:
-                # 获取相对路径
-                rel_path = os.path.relpath(os.path.join(root, file), folder_path)
-                file_list.append(rel_path.replace('\\', '/'))
-            for dir in dirs:
-                # 添加文件夹路径
-                rel_path = os.path.relpath(os.path.join(root, dir), folder_path)
-                file_list.append(rel_path.replace('\\', '/') + '/')
-        
-        return sorted(file_list)
+        """获取文件夹中的所有文件路径（跳过modinfo文件夹，文件夹路径以'/'结尾；冷存储的mod取自清单）"""
+        from utils.manifest import scan_folder
+        from utils.cold_storage import is_cold, cold_file_list
+        if is_cold(folder_path):
+            return sorted(cold_file_list(folder_path))
+        return sorted(rel_path for rel_path, _entry, _is_dir in scan_folder(folder_path))
     
     def load_mod_xml_info(self, mod_name):
         """加载模组XML信息到表单"""
@@ -4665,6 +5318,9 @@ class MainWindow(QMainWindow):
                 
                 # 保存XML
                 tree.write(xml_file_path, encoding='utf-8', xml_declaration=True)
+                
+                # 同步模组目录缓存
+                self.refresh_catalog_entry(mod_name)
     
     def show_import_panel(self):
         """显示导入面板"""
@@ -4735,92 +5391,356 @@ class MainWindow(QMainWindow):
             callback=on_hide_complete
         )
     
+    def get_mod_catalog(self):
+        """获取模组目录缓存（首次调用时创建）"""
+        if not hasattr(self, 'mod_catalog') or self.mod_catalog is None:
+            from utils.mod_catalog import ModCatalog
+            project_root = self.get_project_root()
+            db_path = os.path.join(project_root, "json", "mod_catalog.db")
+            mods_dir = os.path.join(project_root, "mods")
+            self.mod_catalog = ModCatalog(db_path, mods_dir)
+        return self.mod_catalog
+    
+    def refresh_catalog_entry(self, mod_name):
+        """导入、编辑或更新文件结构后，重新收录单个mod到目录缓存"""
+        try:
+            folder_name = mod_name.replace(" ", "_").replace("/", "_").replace("\\", "_")
+            self.get_mod_catalog().refresh_folder(folder_name)
+        except Exception as e:
+            print(f"[警告] 更新模组目录缓存失败: {e}")
+    
     def load_existing_mods(self):
-        """加载已存在的模组，按导入顺序排列"""
-        import xml.etree.ElementTree as ET
-        import time
+        """加载已存在的模组，按导入顺序排列
         
+        在后台线程中同步模组目录（变化的文件夹并行解析），扫描结果分批加入表格，
+        扫描结束后再按导入时间统一排序。
+        """
         project_root = self.get_project_root()
         mods_dir = os.path.join(project_root, "mods")
         
         if not os.path.exists(mods_dir):
             return
         
+        # 已有扫描在进行，等待其结束后重新扫描
+        if getattr(self, '_library_scan_thread', None) is not None:
+            self._library_rescan_pending = True
+            return
+        
         # 加载mod状态以获取导入时间
         try:
-            mod_states = self.load_mod_states()
+            self._library_scan_states = self.load_mod_states()
         except:
-            mod_states = {}
+            self._library_scan_states = {}
+        self._library_scan_mods = []
+        self._library_rescan_pending = False
+        
+        from utils.library_scanner import LibraryScanThread
+        thread = LibraryScanThread(self.get_mod_catalog(), parent=self)
+        thread.mods_scanned.connect(self._on_library_mods_scanned)
+        thread.scan_finished.connect(self._on_library_scan_finished)
+        thread.finished.connect(thread.deleteLater)
+        self._library_scan_thread = thread
+        thread.start()
+    
+    def _catalog_row_to_mod_info(self, row, mod_states):
+        """将目录缓存数据转换为表格需要的mod信息"""
+        mod_name = row["name"]
         
-        # 收集所有mod信息
-        mods_list = []
+        # 获取导入时间（如果没有则使用目录缓存中记录的默认值）
+        mod_state = mod_states.get(mod_name, {})
+        if isinstance(mod_state, bool):
+            import_time = row["import_time"]
+        else:
+            import_time = mod_state.get("import_time", row["import_time"])
         
-        # 遍历mods目录下的所有文件夹
-        for mod_folder_name in os.listdir(mods_dir):
-            mod_folder_path = os.path.join(mods_dir, mod_folder_name)
-            if os.path.isdir(mod_folder_path):
-                # 检查是否有modinfo.xml文件
-                modinfo_dir = os.path.join(mod_folder_path, "modinfo")
-                xml_file_path = os.path.join(modinfo_dir, "modinfo.xml")
-                
-                mod_name = mod_folder_name.replace("_", " ")
-                category = "未分类"
-                author = "未知"
-                
-                if os.path.exists(xml_file_path):
-                    try:
-                        # 解析XML文件
-                        tree = ET.parse(xml_file_path)
-                        root = tree.getroot()
-                        
-                        name_elem = root.find('name')
-                        if name_elem is not None and name_elem.text:
-                            mod_name = name_elem.text
-                        
-                        category_elem = root.find('category')
-                        if category_elem is not None and category_elem.text:
-                            category = category_elem.text
-                        
-                        author_elem = root.find('author')
-                        if author_elem is not None and author_elem.text:
-                            author = author_elem.text
-                    except Exception as e:
-                        pass  # 解析模组XML失败，不打印详细信息
-                
-                # 获取导入时间（如果没有则使用文件夹修改时间作为默认值）
-                mod_state = mod_states.get(mod_name, {})
-                if isinstance(mod_state, bool):
-                    import_time = os.path.getmtime(mod_folder_path)  # 使用文件夹修改时间
-                else:
-                    import_time = mod_state.get("import_time", os.path.getmtime(mod_folder_path))
-                
-                mods_list.append({
-                    "name": mod_name,
-                    "category": category,
-                    "author": author,
-                    "import_time": import_time
-                })
-        
-        # 按导入时间排序（早导入的在前）
-        mods_list.sort(key=lambda x: x["import_time"])
+        return {
+            "name": mod_name,
+            "category": row["category"] or "未分类",
+            "author": row["author"] or "未知",
+            "import_time": import_time
+        }
+    
+    def _add_mods_to_table_batch(self, mods_list, mod_states):
+        """批量添加mod到表格（期间暂停表格刷新和统计信号）"""
+        self.mod_table.setUpdatesEnabled(False)
+        self.mod_table.blockSignals(True)
+        try:
+            for mod_info in mods_list:
+                self.add_mod_to_table(mod_info["name"], mod_info["category"], mod_info["author"],
+                                      check_unknown=False, mod_states=mod_states)
+        finally:
+            self.mod_table.blockSignals(False)
+            self.mod_table.setUpdatesEnabled(True)
+    
+    def _on_library_mods_scanned(self, rows):
+        """扫描线程送来一批mod，立即加入表格"""
+        mods_list = [self._catalog_row_to_mod_info(row, self._library_scan_states) for row in rows]
+        self._library_scan_mods.extend(mods_list)
+        self._add_mods_to_table_batch(mods_list, self._library_scan_states)
+    
+    def _on_library_scan_finished(self, rows):
+        """扫描结束：按导入时间排序并刷新界面"""
+        self._library_scan_thread = None
+        
+        if getattr(self, '_library_rescan_pending', False):
+            # 扫描期间有新的刷新请求，重新扫描
+            self._clear_mod_table()
+            self.load_existing_mods()
+            return
         
-        # 按顺序添加到表格
-        for mod_info in mods_list:
-            self.add_mod_to_table(mod_info["name"], mod_info["category"], mod_info["author"], check_unknown=False)
+        # 按导入时间排序（早导入的在前），流式添加的顺序不一致时重建表格
+        mods_list = self._library_scan_mods
+        sorted_mods = sorted(mods_list, key=lambda x: x["import_time"])
+        if [m["name"] for m in sorted_mods] != [m["name"] for m in mods_list]:
+            self._clear_mod_table()
+            self._add_mods_to_table_batch(sorted_mods, self._library_scan_states)
+        self._library_scan_mods = []
         
         # 加载完成后，应用忽略规则（隐藏被忽略的mod）
         self.apply_ignore_rules()
+        
+        # 保留当前的搜索和筛选
+        if hasattr(self, 'search_input') and (self.search_input.text().strip() or getattr(self, 'current_filter_type', "无条件") != "无条件"):
+            self.filter_mods_by_search(self.search_input.text())
+        
+        # 更新统计信息
+        self.update_statistics()
+        
+        # 首次加载完成后开始监视mods目录
+        self.start_mods_watcher()
+        
+        # 每次启动检查一次长期未启用的mod
+        if not getattr(self, '_cold_storage_checked', False):
+            self._cold_storage_checked = True
+            if self.load_advanced_settings().get('cold_storage', False):
+                self.start_cold_storage(report=False)
     
-    def refresh_mod_list(self):
-        """刷新mod列表，重新加载所有mod"""
-        from PySide6.QtCore import QPropertyAnimation, QEasingCurve
+    def start_mods_watcher(self):
+        """开始监视mods目录，外部修改后只刷新受影响的mod"""
+        if getattr(self, 'mods_watcher', None) is not None:
+            return
+        mods_dir = os.path.join(self.get_project_root(), "mods")
+        if not os.path.exists(mods_dir):
+            return
+        try:
+            from utils.mods_watcher import ModsWatcher
+            self.mods_watcher = ModsWatcher(mods_dir, parent=self)
+            self.mods_watcher.mods_changed.connect(self._on_mods_changed)
+            self.mods_watcher.start()
+        except Exception as e:
+            self.mods_watcher = None
+            print(f"[警告] 无法监视mods目录: {e}")
+    
+    def pause_mods_watcher(self):
+        """暂停目录监视通知（程序自身批量修改mods目录时使用）"""
+        if getattr(self, 'mods_watcher', None) is not None:
+            self.mods_watcher.pause()
+    
+    def resume_mods_watcher(self):
+        """恢复目录监视通知"""
+        if getattr(self, 'mods_watcher', None) is not None:
+            self.mods_watcher.resume()
+    
+    def _on_mods_changed(self, folder_names):
+        """mods目录中的部分mod发生变化：只刷新这些mod的清单缓存、目录缓存、表格行和虚拟链接"""
+        # 全量扫描进行中，扫描结果已包含这些变化
+        if getattr(self, '_library_scan_thread', None) is not None:
+            return
         
-        # 清空当前表格
+        from utils.manifest import load_mod_manifest, forget_mod_manifest
+        
+        mods_dir = os.path.join(self.get_project_root(), "mods")
+        catalog = self.get_mod_catalog()
+        integrity_cache = self.get_integrity_cache()
+        pending_folder = getattr(self, 'extracted_mod_folder_path', None)
+        enabled_mods = set(self.mod_table.get_enabled_mods())
+        use_virtual_mapping = self.load_advanced_settings().get('virtual_mapping', False)
+        table_changed = False
+        missing_enabled = []
+        
+        for folder_name in folder_names:
+            mod_folder_path = os.path.join(mods_dir, folder_name)
+            
+            # 正在导入（尚未保存）的mod由导入流程处理
+            if pending_folder and os.path.normcase(os.path.abspath(pending_folder)) == os.path.normcase(os.path.abspath(mod_folder_path)):
+                continue
+            
+            old_row = catalog.get(folder_name)
+            old_manifest = load_mod_manifest(mod_folder_path, migrate=False) if os.path.isdir(mod_folder_path) else None
+            forget_mod_manifest(mod_folder_path)
+            integrity_cache.invalidate(mod_folder_path)
+            
+            if not os.path.isdir(mod_folder_path):
+                # mod文件夹被外部删除：已启用的先移除部署并标记为禁用，再移除表格行
+                catalog.remove_folder(folder_name)
+                if old_row is not None:
+                    if old_row["name"] in enabled_mods:
+                        missing_enabled.append((old_row["name"], mod_folder_path))
+                    row = self.find_mod_row(old_row["name"])
+                    if row >= 0:
+                        self.mod_table.removeRow(row)
+                        table_changed = True
+                    print(f"[提示] mod文件夹已被移除: {old_row['name']}")
+                continue
+            
+            new_row = catalog.refresh_folder(folder_name)
+            if new_row is None:
+                continue
+            mod_name = new_row["name"]
+            row = self.find_mod_row(mod_name)
+            if row < 0:
+                # 外部添加的mod（没有modinfo的文件夹可能仍在复制中，等待下次变化）
+                if os.path.exists(os.path.join(mod_folder_path, "modinfo", "modinfo.xml")):
+                    self.add_mod_to_table(mod_name, new_row["category"] or "未分类", new_row["author"] or "未知", check_unknown=False)
+                    table_changed = True
+                    print(f"[提示] 检测到新的mod: {mod_name}")
+                continue
+            
+            # 更新表格中的分类和作者
+            category_item = self.mod_table.item(row, 2)
+            author_item = self.mod_table.item(row, 3)
+            if category_item is not None:
+                category_item.setText(new_row["category"] or "未分类")
+            if author_item is not None:
+                author_item.setText(new_row["author"] or "未知")
+            
+            # 已启用的mod在虚拟映射模式下只重新链接受影响的文件
+            if use_virtual_mapping and mod_name in enabled_mods:
+                old_paths = old_manifest.file_paths() if old_manifest is not None else []
+                self.relink_mod_virtual_files(mod_name, mod_folder_path, old_paths)
+        
+        if missing_enabled:
+            self._undeploy_missing_mods(missing_enabled)
+        
+        integrity_cache.save()
+        if table_changed:
+            self.apply_ignore_rules()
+            if hasattr(self, 'search_input'):
+                self.filter_mods_by_search(self.search_input.text())
+        self.update_statistics()
+    
+    def _undeploy_missing_mods(self, missing):
+        """已启用的mod文件夹被外部删除：移除它在游戏目录中的部署，并标记为禁用
+        
+        虚拟映射模式下指向被删除文件夹的链接按优先级改由其他mod或游戏原文件提供；
+        文件栈模式下这些mod从文件栈中出栈，恢复下一个mod的文件。
+        
+        Args:
+            missing: [(mod名称, 已被删除的mod文件夹路径)]
+        """
+        settings = self.load_advanced_settings()
+        game_path = settings.get('game_path', '')
+        mod_names = [mod_name for mod_name, _ in missing]
+        if game_path and os.path.exists(game_path):
+            if settings.get('virtual_mapping', False):
+                virtual_folder = self.get_virtual_folder_path(game_path)
+                prefixes = tuple(os.path.normcase(os.path.abspath(path)) + os.sep for _, path in missing)
+                orphaned = set()
+                for root, _dirs, files in os.walk(virtual_folder):
+                    for file_name in files:
+                        target_file = os.path.join(root, file_name)
+                        try:
+                            if not os.path.islink(target_file):
+                                continue
+                            link_target = os.path.normcase(os.path.abspath(os.readlink(target_file)))
+                        except OSError:
+                            continue
+                        if link_target.startswith(prefixes):
+                            orphaned.add(self.normalize_file_path(os.path.relpath(target_file, virtual_folder)))
+                if orphaned:
+                    mods_dir = os.path.join(self.get_project_root(), "mods")
+                    enabled_mods = [m for m in self.mod_table.get_enabled_mods() if m not in mod_names]
+                    mod_files = self._enabled_mod_files(orphaned, enabled_mods, mods_dir)
+                    updated, removed, failed = self._resolve_virtual_paths(orphaned, enabled_mods, mod_files, game_path, mods_dir)
+                    self.sync_virtual_to_game_root(game_path)
+                    print(f"[信息] 已移除被删除mod的链接：重新链接 {updated} 个，删除 {removed} 个" + (f"，失败 {failed} 个" if failed else ""))
+            else:
+                stack = self.load_file_ownership_stack()
+                for mod_name, mod_folder_path in missing:
+                    stack_paths = self.get_mod_files_from_stack(mod_name, stack)
+                    if stack_paths:
+                        self.update_file_stack_paths(mod_name, mod_folder_path, [], [], sorted(stack_paths))
+                        stack = self.load_file_ownership_stack()
+        
+        store = self.get_mod_state_store()
+        try:
+            self._log_config_events(
+                [{'action': 'disabled', 'mod_name': m, 'was_enabled': True} for m in mod_names],
+                source='missing', undoable=False
+            )
+        except Exception as e:
+            print(f"[失败] 记录使用日志失败: {e}")
+        store.update_many({m: {'enabled': False} for m in mod_names})
+        print(f"[警告] 已启用的mod文件夹被删除，已禁用: {', '.join(mod_names)}")
+    
+    def _enabled_mod_files(self, paths, enabled_mods, mods_dir):
+        """已启用的mod中各自提供了paths中的哪些路径（优先使用缓存的清单，没有清单时按磁盘上的现状判断）
+        
+        Returns:
+            dict: mod名称 -> 路径集合
+        """
+        from utils.manifest import load_mod_manifest
+        mod_files = {}
+        for mod_name in enabled_mods:
+            mod_folder_path = os.path.join(mods_dir, self.mod_name_to_folder_name(mod_name))
+            manifest = load_mod_manifest(mod_folder_path, migrate=False)
+            if manifest is not None:
+                mod_files[mod_name] = {p for p in paths if p in manifest}
+            else:
+                mod_files[mod_name] = {p for p in paths if os.path.isfile(os.path.join(mod_folder_path, p))}
+        return mod_files
+    
+    def relink_mod_virtual_files(self, mod_name, mod_folder_path, old_paths=(), current_paths=None):
+        """mod文件变化后，只重新确定与该mod相关的路径在virtual文件夹中的来源
+        
+        与批量部署使用相同的规则（_resolve_virtual_paths）：按优先级在已启用的mod中选出来源，
+        没有mod提供时回退到游戏原文件。
+        
+        Args:
+            mod_name: mod名称
+            mod_folder_path: mod文件夹路径
+            old_paths: 变化前记录的文件路径（已删除的文件改由其他mod或游戏原文件提供）
+            current_paths: 需要重新确定来源的现有文件路径，默认扫描mod文件夹（增量更新时只传入新增和修改的文件）
+        """
+        settings = self.load_advanced_settings()
+        game_path = settings.get('game_path', '')
+        if not game_path or not os.path.exists(game_path):
+            return
+        if not os.path.exists(self.get_virtual_folder_path(game_path)):
+            return
+        
+        if current_paths is None:
+            current_paths = self.get_mod_file_paths(mod_name, mod_folder_path)
+        touched = set(old_paths) | set(current_paths)
+        if not touched:
+            return
+        
+        # 只需要知道每个已启用的mod提供了哪些受影响的路径：其他mod使用清单，该mod按磁盘上的现状
+        mods_dir = os.path.dirname(os.path.normpath(mod_folder_path))
+        enabled_mods = self.mod_table.get_enabled_mods()
+        mod_files = self._enabled_mod_files(touched, [m for m in enabled_mods if m != mod_name], mods_dir)
+        if mod_name in enabled_mods:
+            mod_files[mod_name] = {p for p in touched if os.path.isfile(os.path.join(mod_folder_path, p))}
+        
+        updated, removed, failed = self._resolve_virtual_paths(touched, enabled_mods, mod_files, game_path, mods_dir)
+        if updated or removed:
+            print(f"[成功] 已更新mod链接: {mod_name} (更新 {updated} 个，移除 {removed} 个)" + (f"，失败 {failed} 个" if failed else ""))
+            self.sync_virtual_to_game_root(game_path)
+    
+    def _clear_mod_table(self):
+        """清空mod表格"""
         self.mod_table.setRowCount(0)
         self.mod_table.checkbox_widgets.clear()
         # 清空收藏行集合
         if hasattr(self.mod_table, 'favorite_rows'):
             self.mod_table.favorite_rows.clear()
+    
+    def refresh_mod_list(self):
+        """刷新mod列表，重新加载所有mod"""
+        from PySide6.QtCore import QPropertyAnimation, QEasingCurve
+        
+        # 清空当前表格
+        self._clear_mod_table()
         
         # 创建闪烁动画
         animation = QPropertyAnimation(self.btn_refresh, b"styleSheet")
@@ -4856,15 +5776,9 @@ class MainWindow(QMainWindow):
         # 启动动画
         animation.start()
         
-        # 重新加载所有mod
+        # 重新加载所有mod（后台扫描，结束后自动应用忽略规则并更新统计信息）
         self.load_existing_mods()
         
-        # 应用忽略规则（隐藏被忽略的mod）
-        self.apply_ignore_rules()
-        
-        # 更新统计信息
-        self.update_statistics()
-        
         print(f"[成功] mod列表已刷新")
     
     def show_category_selection_dialog(self):
@@ -5107,6 +6021,12 @@ class MainWindow(QMainWindow):
         if not hasattr(self, 'import_panel') or not self.import_panel:
             return
         
+        # 解压尚未完成时中止解压，已解压的内容由解压线程删除
+        if self._cancel_import_extraction():
+            self.extracted_mod_folder_path = None
+        self.pending_import_archive = None
+        self.import_archive_info = None
+        
         # 如果存在解压的文件夹路径（说明用户取消了，未保存），删除它
         if hasattr(self, 'extracted_mod_folder_path') and self.extracted_mod_folder_path:
             if os.path.exists(self.extracted_mod_folder_path):
@@ -5356,23 +6276,16 @@ class MainWindow(QMainWindow):
                 size_str = "--"
             else:
                 total_size = 0
-                project_root = self.get_project_root()
-                mods_dir = os.path.join(project_root, "mods")
+                catalog = self.get_mod_catalog()
                 
                 for mod_name in enabled_mods:
                     mod_folder_name = mod_name.replace(" ", "_").replace("/", "_").replace("\\", "_")
-                    mod_folder_path = os.path.join(mods_dir, mod_folder_name)
-                    
-                    if os.path.exists(mod_folder_path):
-                        # 计算文件夹大小（排除modinfo文件夹）
-                        for root, dirs, files in os.walk(mod_folder_path):
-                            # 跳过modinfo文件夹
-                            if 'modinfo' in dirs:
-                                dirs.remove('modinfo')
-                            for file in files:
-                                file_path = os.path.join(root, file)
-                                if os.path.exists(file_path):
-                                    total_size += os.path.getsize(file_path)
+                    # 使用目录缓存中记录的大小（排除modinfo文件夹），缺失时重新收录
+                    row = catalog.get(mod_folder_name)
+                    if row is None:
+                        row = catalog.refresh_folder(mod_folder_name)
+                    if row is not None:
+                        total_size += row["size"]
                 
                 # 转换为MB
                 size_mb = total_size / (1024 * 1024)
@@ -5638,79 +6551,157 @@ class MainWindow(QMainWindow):
                 else:
                     self.mod_table.showRow(row)
     
+    def _get_catalog_field(self, row, mod_name, catalog_by_name, field, column):
+        """优先从目录缓存读取mod字段，未收录时回退到表格单元格"""
+        catalog_row = catalog_by_name.get(mod_name)
+        if catalog_row is not None and catalog_row[field]:
+            return catalog_row[field]
+        item = self.mod_table.item(row, column)
+        return item.text() if item else ""
+    
+    def get_search_index(self):
+        """获取模组搜索索引（首次调用时创建，在搜索线程中按目录缓存增量建立）"""
+        if not hasattr(self, 'search_index') or self.search_index is None:
+            from utils.search_index import SearchIndex
+            self.search_index = SearchIndex(os.path.join(self.get_project_root(), "mods"))
+        return self.search_index
+    
     def filter_mods_by_search(self, search_text):
-        """根据搜索文本和筛选条件过滤mod列表，适配忽略规则"""
-        search_text = search_text.strip().lower()
-        is_searching = bool(search_text)  # 是否正在搜索
+        """根据搜索文本和筛选条件过滤mod列表，适配忽略规则
+        
+        搜索在后台线程中查询索引，结果返回后再更新表格；同一查询在目录缓存未变化时直接使用上次结果。
+        """
+        search_text = search_text.strip()
+        if not search_text:
+            self._apply_mod_visibility(None)
+            return
+        
+        cached = getattr(self, '_search_result_cache', None)
+        if cached is not None and cached[0] == search_text and cached[1] == self.get_mod_catalog().generation:
+            self._apply_mod_visibility(cached[2])
+            return
+        self._start_search(search_text)
+    
+    def _start_search(self, search_text):
+        """在后台线程中执行搜索，已有查询进行中时只保留最新的查询"""
+        if getattr(self, '_search_thread', None) is not None:
+            self._pending_search_text = search_text
+            return
+        from utils.library_scanner import SearchThread
+        self._search_request_id = getattr(self, '_search_request_id', 0) + 1
+        self._pending_search_text = None
+        self._search_thread = SearchThread(
+            self._search_request_id, search_text,
+            self.get_search_index(), self.get_mod_catalog(), parent=self
+        )
+        self._search_thread.search_finished.connect(self._on_search_finished)
+        self._search_thread.finished.connect(self._search_thread.deleteLater)
+        self._search_thread.start()
+    
+    def _on_search_finished(self, request_id, search_text, matches, generation):
+        self._search_thread = None
+        self._search_result_cache = (search_text, generation, matches)
+        
+        pending = self._pending_search_text
+        if pending is not None and pending != search_text:
+            self._start_search(pending)
+            return
+        self._pending_search_text = None
+        # 只应用与搜索框当前内容一致的结果
+        if hasattr(self, 'search_input') and self.search_input.text().strip() == search_text:
+            self._apply_mod_visibility(matches)
+            self._scroll_to_best_match(matches)
+    
+    def _scroll_to_best_match(self, matches):
+        """滚动到得分最高的命中行（同分时取靠前的行），表格保持原有排序"""
+        if not matches:
+            return
+        best_item = None
+        best_score = None
+        for row in range(self.mod_table.rowCount()):
+            if self.mod_table.isRowHidden(row):
+                continue
+            name_item = self.mod_table.item(row, 1)
+            if not name_item:
+                continue
+            score = matches.get(name_item.text())
+            if score is not None and (best_score is None or score > best_score):
+                best_item, best_score = name_item, score
+        if best_item is not None:
+            from PySide6.QtWidgets import QAbstractItemView
+            self.mod_table.scrollToItem(best_item, QAbstractItemView.PositionAtTop)
+    
+    def _apply_mod_visibility(self, search_matches):
+        """按筛选条件和搜索结果更新行的显示状态，只修改显示状态发生变化的行
+        
+        Args:
+            search_matches: 搜索命中的mod名称及得分，None表示没有搜索
+        """
+        is_searching = search_matches is not None
         
         # 获取当前筛选条件
         filter_type = getattr(self, 'current_filter_type', "无条件")
         filter_value = getattr(self, 'current_filter_value', None)
-        has_filter = filter_type and filter_type != "无条件" and (filter_type in ["收藏", "忽略"] or (filter_type in ["标签", "作者"] and filter_value))
+        has_filter = filter_type and filter_type != "无条件" and (filter_type in ["收藏", "忽略"] or (filter_type in ["标签", "作者", "查询"] and filter_value))
+        
+        # 保存的查询使用缓存的结果集
+        query_matches = set()
+        if has_filter and filter_type == "查询":
+            try:
+                query_matches = self.get_saved_queries().evaluate(filter_value, self.get_query_context())
+            except Exception as e:
+                print(f"[警告] 执行查询失败: {e}")
+        
+        # 标签和作者从目录缓存读取
+        catalog_by_name = {}
+        if has_filter and filter_type in ["标签", "作者"]:
+            try:
+                catalog_by_name = {row["name"]: row for row in self.get_mod_catalog().get_all()}
+            except Exception as e:
+                print(f"[警告] 读取模组目录缓存失败: {e}")
         
-        # 遍历所有行
+        store = self.get_mod_state_store()
+        changed_rows = []
         for row in range(self.mod_table.rowCount()):
-            # 获取mod名称
             name_item = self.mod_table.item(row, 1)
             if not name_item:
                 continue
-            
             mod_name = name_item.text()
             
-            # 检查mod是否被忽略
-            is_ignored = self.is_mod_ignored(mod_name)
-            is_favorite = self.is_mod_favorite(mod_name)
-            
             # 应用筛选条件
             should_show = True
-            
             if has_filter:
                 if filter_type == "收藏":
-                    should_show = is_favorite
+                    should_show = store.is_favorite(mod_name)
                 elif filter_type == "忽略":
-                    should_show = is_ignored
+                    should_show = store.is_ignored(mod_name)
                 elif filter_type == "标签" and filter_value:
-                    category_item = self.mod_table.item(row, 2)
-                    if category_item:
-                        categories = [cat.strip() for cat in category_item.text().split(';') if cat.strip()]
-                        should_show = filter_value in categories
-                    else:
-                        should_show = False
+                    categories = [cat.strip() for cat in self._get_catalog_field(row, mod_name, catalog_by_name, "category", 2).split(';') if cat.strip()]
+                    should_show = filter_value in categories
                 elif filter_type == "作者" and filter_value:
-                    author_item = self.mod_table.item(row, 3)
-                    if author_item:
-                        should_show = author_item.text() == filter_value
-                    else:
-                        should_show = False
-            
-            # 如果筛选条件不匹配，隐藏该行
-            if has_filter and not should_show:
-                self.mod_table.setRowHidden(row, True)
-                continue
-            
-            # 应用搜索条件
-            if not search_text:
-                # 如果搜索为空，应用忽略规则（隐藏被忽略的mod）
-                if not has_filter and is_ignored:
-                    self.mod_table.setRowHidden(row, True)
-                else:
-                    self.mod_table.setRowHidden(row, False)
-                continue
-            
-            # 如果正在搜索，检查是否匹配
-            category_item = self.mod_table.item(row, 2)
-            author_item = self.mod_table.item(row, 3)
-            
-            # 检查是否匹配（不区分大小写）
-            name = mod_name.lower()
-            category = category_item.text().lower() if category_item else ""
-            author = author_item.text().lower() if author_item else ""
-            
-            # 如果任何字段包含搜索文本，显示该行（即使被忽略）
-            if search_text in name or search_text in category or search_text in author:
-                self.mod_table.setRowHidden(row, False)
-            else:
-                self.mod_table.setRowHidden(row, True)
+                    should_show = self._get_catalog_field(row, mod_name, catalog_by_name, "author", 3) == filter_value
+                elif filter_type == "查询":
+                    should_show = mod_name in query_matches
+            
+            if should_show:
+                if is_searching:
+                    # 搜索时显示所有命中的mod（即使被忽略）
+                    should_show = mod_name in search_matches
+                elif not has_filter:
+                    # 没有搜索和筛选时，隐藏被忽略的mod
+                    should_show = not store.is_ignored(mod_name)
+            
+            if self.mod_table.isRowHidden(row) == should_show:
+                changed_rows.append((row, not should_show))
+        
+        if not changed_rows:
+            return
+        self.mod_table.setUpdatesEnabled(False)
+        try:
+            for row, hidden in changed_rows:
+                self.mod_table.setRowHidden(row, hidden)
+        finally:
+            self.mod_table.setUpdatesEnabled(True)
     
     def apply_mod_to_game(self, mod_name, enabled):
         """应用或移除单个mod到游戏根目录"""
@@ -5738,6 +6729,10 @@ class MainWindow(QMainWindow):
         import shutil
         
         if enabled:
+            # 冷存储中的mod先解压恢复
+            if not self.ensure_mods_hot([mod_folder_path]):
+                return False
+            
             # 启用前先检查文件完整性
             integrity_check = self.check_mod_file_integrity(mod_name, mod_folder_path)
             if not integrity_check['is_complete']:
@@ -5916,6 +6911,10 @@ class MainWindow(QMainWindow):
                 
                 virtual_folder = self.get_virtual_folder_path(game_path)
                 
+                # 原游戏文件所在的隐藏目录（循环外只计算一次）
+                hidden_game_path = self.get_hidden_game_path()
+                hidden_game_path_norm = self.normalize_file_path(os.path.abspath(hidden_game_path)).lower() if hidden_game_path else ''
+                
                 # 遍历该mod的所有文件
                 mod_files = {}
                 for root, dirs, files in os.walk(mod_folder_path):
@@ -5961,15 +6960,7 @@ class MainWindow(QMainWindow):
                                     current_target_mod = mod_name
                                 else:
                                     # 检查是否指向原游戏文件（隐藏目录）
-                                    settings = self.load_advanced_settings()
-                                    game_path_setting = settings.get('game_path', '')
-                                    if game_path_setting:
-                                        parent_dir = os.path.dirname(game_path_setting)
-                                        game_dir_name = os.path.basename(game_path_setting)
-                                        hidden_dir_name = game_dir_name.replace(' ', '\u00A0')
-                                        hidden_game_path = os.path.join(parent_dir, hidden_dir_name)
-                                        hidden_game_path_norm = self.normalize_file_path(os.path.abspath(hidden_game_path)).lower()
-                                        
+                                    if hidden_game_path:
                                         if current_target_norm.startswith(hidden_game_path_norm):
                                             is_game_file = True
                                         else:
@@ -6017,13 +7008,7 @@ class MainWindow(QMainWindow):
                                 updated_symlink_count += 1
                             else:
                                 # 下一个优先级mod没有这个文件，检查是否有原游戏文件
-                                settings = self.load_advanced_settings()
-                                game_path_setting = settings.get('game_path', '')
-                                if game_path_setting:
-                                    parent_dir = os.path.dirname(game_path_setting)
-                                    game_dir_name = os.path.basename(game_path_setting)
-                                    hidden_dir_name = game_dir_name.replace(' ', '\u00A0')
-                                    hidden_game_path = os.path.join(parent_dir, hidden_dir_name)
+                                if hidden_game_path:
                                     game_source_file = os.path.join(hidden_game_path, file_rel_path)
                                     
                                     if os.path.exists(game_source_file):
@@ -6049,13 +7034,7 @@ class MainWindow(QMainWindow):
                                         deleted_symlink_count += 1
                         else:
                             # 没有其他优先级更高的启用mod，检查是否有原游戏文件
-                            settings = self.load_advanced_settings()
-                            game_path_setting = settings.get('game_path', '')
-                            if game_path_setting:
-                                parent_dir = os.path.dirname(game_path_setting)
-                                game_dir_name = os.path.basename(game_path_setting)
-                                hidden_dir_name = game_dir_name.replace(' ', '\u00A0')
-                                hidden_game_path = os.path.join(parent_dir, hidden_dir_name)
+                            if hidden_game_path:
                                 game_source_file = os.path.join(hidden_game_path, file_rel_path)
                                 
                                 if os.path.exists(game_source_file):
@@ -6133,73 +7112,470 @@ class MainWindow(QMainWindow):
                 success = self.update_file_stack_for_mod(mod_name, mod_folder_path, False)
                 return success
     
+    def get_integrity_cache(self):
+        """获取文件完整性检查缓存（首次调用时创建）"""
+        if not hasattr(self, 'integrity_cache') or self.integrity_cache is None:
+            from utils.integrity import IntegrityCache
+            cache_file = os.path.join(self.get_project_root(), "json", "integrity_cache.json")
+            self.integrity_cache = IntegrityCache(cache_file)
+        return self.integrity_cache
+    
     def check_mod_file_integrity(self, mod_name, mod_folder_path):
-        """检查mod文件完整性"""
-        result = {
-            'is_complete': True,
-            'missing_files': [],
-            'extra_files': []
-        }
+        """检查mod文件完整性（文件结构未变化时直接使用缓存结果）"""
+        try:
+            from utils.integrity import check_mod_integrity
+            cache = self.get_integrity_cache()
+            result = check_mod_integrity(mod_folder_path, cache=cache)
+            cache.save()
+            # 注意：不因文件大小和修改时间变化判定为不完整，以支持重新安装
+            return result
+        except Exception as e:
+            print(f"[失败] 检查文件完整性失败: {str(e)}")
+            # 检查失败时，认为文件完整，允许启用（避免误报）
+            return {
+                'is_complete': True,
+                'missing_files': [],
+                'extra_files': [],
+                'modified_files': []
+            }
+    
+    def start_library_integrity_scan(self, verify_hash=False):
+        """在后台并行检查整个模组库的文件完整性
         
-        # 读取XML中的文件结构
-        modinfo_dir = os.path.join(mod_folder_path, "modinfo")
-        xml_file_path = os.path.join(modinfo_dir, "modinfo.xml")
+        Args:
+            verify_hash: 是否校验内容哈希（较慢，仅对记录了哈希的文件有效）
+        """
+        if getattr(self, '_integrity_scan_thread', None) is not None:
+            QMessageBox.information(self, "提示", "正在检查模组库，请稍候")
+            return
         
-        if not os.path.exists(xml_file_path):
-            # 如果没有XML文件，认为文件完整（可能是旧版本导入的mod，没有文件结构记录）
-            return result
+        mods_dir = os.path.join(self.get_project_root(), "mods")
+        if not os.path.exists(mods_dir):
+            QMessageBox.information(self, "提示", "模组库为空")
+            return
+        
+        # 冷存储的mod文件在压缩包中，不参与检查
+        from utils.cold_storage import is_cold
+        with os.scandir(mods_dir) as entries:
+            mod_folder_paths = [entry.path for entry in entries if entry.is_dir() and not is_cold(entry.path)]
+        if not mod_folder_paths:
+            QMessageBox.information(self, "提示", "模组库为空")
+            return
+        
+        from utils.library_scanner import IntegrityScanThread
+        thread = IntegrityScanThread(mod_folder_paths, verify_hash=verify_hash,
+                                     cache=self.get_integrity_cache(), parent=self)
+        thread.progress.connect(self._on_library_integrity_progress)
+        thread.scan_finished.connect(self._on_library_integrity_finished)
+        thread.finished.connect(thread.deleteLater)
+        self._integrity_scan_thread = thread
+        
+        for btn_name in ('btn_verify_library', 'btn_verify_library_hash'):
+            btn = getattr(self, btn_name, None)
+            if btn is not None:
+                btn.setEnabled(False)
+        thread.start()
+    
+    def _on_library_integrity_progress(self, done, total, mod_folder_path):
+        """更新模组库检查进度"""
+        btn = getattr(self, 'btn_verify_library', None)
+        if btn is not None:
+            try:
+                btn.setText(f"检查中 {done}/{total}")
+            except RuntimeError:
+                pass  # 面板已被销毁
+    
+    def _on_library_integrity_finished(self, results):
+        """模组库检查完成，汇总报告"""
+        self._integrity_scan_thread = None
+        for btn_name, text in (('btn_verify_library', "校验全部Mod"), ('btn_verify_library_hash', "深度校验（哈希）")):
+            btn = getattr(self, btn_name, None)
+            if btn is not None:
+                try:
+                    btn.setText(text)
+                    btn.setEnabled(True)
+                except RuntimeError:
+                    pass  # 面板已被销毁
+        
+        problem_lines = []
+        for mod_folder_path in sorted(results):
+            result = results[mod_folder_path]
+            missing = result.get('missing_files', [])
+            extra = result.get('extra_files', [])
+            modified = result.get('modified_files', [])
+            if not (missing or extra or modified):
+                continue
+            problem_lines.append(f"【{os.path.basename(mod_folder_path)}】")
+            for file_path in missing:
+                problem_lines.append(f"  缺失: {file_path}")
+            for file_path in extra:
+                problem_lines.append(f"  多余: {file_path}")
+            for file_path in modified:
+                problem_lines.append(f"  已修改: {file_path}")
+        
+        problem_count = sum(
+            1 for r in results.values()
+            if r.get('missing_files') or r.get('extra_files') or r.get('modified_files')
+        )
+        
+        msg_box = QMessageBox(self)
+        msg_box.setWindowTitle("模组库校验")
+        if problem_count:
+            msg_box.setIcon(QMessageBox.Icon.Warning)
+            msg_box.setText(f"已检查 {len(results)} 个mod，其中 {problem_count} 个的文件与记录不一致。")
+            msg_box.setDetailedText("\n".join(problem_lines))
+        else:
+            msg_box.setIcon(QMessageBox.Icon.Information)
+            msg_box.setText(f"已检查 {len(results)} 个mod，文件均完整。")
+        msg_box.exec()
+    
+    def get_content_store(self):
+        """获取内容寻址存储（位于程序根目录的store文件夹）"""
+        if not hasattr(self, 'content_store') or self.content_store is None:
+            from utils.content_store import ContentStore
+            self.content_store = ContentStore(os.path.join(self.get_project_root(), "store"))
+        return self.content_store
+    
+    def start_content_dedup(self, mod_folder_paths=None, report=True):
+        """在后台把mod链接到内容寻址存储（相同内容的文件只保存一份）
         
+        Args:
+            mod_folder_paths: 要处理的mod文件夹，为None时处理整个模组库（首次使用时确认并启用存储）
+            report: 完成后是否显示节省空间的报告（导入后自动去重时不显示）
+        """
+        if mod_folder_paths is None:
+            if not self.load_advanced_settings().get('content_store', False):
+                reply = QMessageBox.question(
+                    self, "文件去重",
+                    "将在程序目录下建立内容存储：相同内容的文件只保存一份，各mod通过硬链接共享。\n\n"
+                    "启用后新导入和更新的mod也会自动去重，卸载时释放不再使用的文件。\n"
+                    "共享的文件请不要在mods目录中直接修改，否则会同时改变其他mod中的相同文件。\n\n"
+                    "是否启用并开始去重？",
+                    QMessageBox.Yes | QMessageBox.No, QMessageBox.Yes
+                )
+                if reply != QMessageBox.Yes:
+                    return
+                settings = dict(self.load_advanced_settings())
+                settings['content_store'] = True
+                self.save_advanced_settings(settings)
+            
+            mods_dir = os.path.join(self.get_project_root(), "mods")
+            mod_folder_paths = []
+            if os.path.exists(mods_dir):
+                with os.scandir(mods_dir) as entries:
+                    mod_folder_paths = [entry.path for entry in entries if entry.is_dir()]
+            if not mod_folder_paths:
+                QMessageBox.information(self, "提示", "模组库为空")
+                return
+        
+        if getattr(self, '_content_dedup_thread', None) is not None:
+            # 正在去重：结束后接着处理
+            if mod_folder_paths:
+                pending_paths, pending_report = getattr(self, '_pending_content_dedup', None) or ([], False)
+                self._pending_content_dedup = (pending_paths + list(mod_folder_paths), pending_report or report)
+            return
+        
+        from utils.content_store import DedupThread
+        thread = DedupThread(self.get_content_store(), mod_folder_paths, parent=self)
+        thread.progress.connect(self._on_content_dedup_progress)
+        thread.dedup_finished.connect(lambda result, r=report: self._on_content_dedup_finished(result, r))
+        thread.finished.connect(thread.deleteLater)
+        self._content_dedup_thread = thread
+        # 去重期间mod文件被替换为硬链接，由完成后的处理统一刷新
+        self.pause_mods_watcher()
+        btn = getattr(self, 'btn_content_dedup', None)
+        if btn is not None:
+            try:
+                btn.setEnabled(False)
+            except RuntimeError:
+                pass  # 面板已被销毁
+        thread.start()
+    
+    def _on_content_dedup_progress(self, done, total, mod_folder_path):
+        """更新去重进度"""
+        btn = getattr(self, 'btn_content_dedup', None)
+        if btn is not None:
+            try:
+                btn.setText(f"去重中 {done}/{total}")
+            except RuntimeError:
+                pass  # 面板已被销毁
+    
+    def _on_content_dedup_finished(self, result, report):
+        """去重完成：刷新改动过的mod的缓存，需要时显示节省空间的报告"""
+        from utils.content_store import format_size
+        self._content_dedup_thread = None
         try:
-            import xml.etree.ElementTree as ET
-            tree = ET.parse(xml_file_path)
-            root = tree.getroot()
-            
-            # 获取XML中记录的文件结构
-            file_structure_elem = root.find("file_structure")
-            if file_structure_elem is None:
-                # 如果没有文件结构记录，认为文件完整（可能是旧版本导入的mod）
-                return result
-            
-            # 获取XML中记录的文件路径（只取路径，不关心大小和修改时间）
-            xml_file_paths = set()
-            for file_elem in file_structure_elem.findall("file"):
-                file_path = file_elem.text
-                if file_path:
-                    xml_file_paths.add(file_path)
-            
-            # 获取当前实际的文件结构
-            current_files = set(self.get_folder_files(mod_folder_path))
-            
-            # 检查缺失的文件（XML中有但实际不存在）
-            result['missing_files'] = []
-            for file_path in xml_file_paths:
-                if not file_path.endswith('/'):  # 只检查文件，不检查目录
-                    # 将统一的分隔符转换为当前系统的分隔符，确保跨平台兼容
-                    normalized_path = file_path.replace('/', os.sep).replace('\\', os.sep)
-                    full_path = os.path.join(mod_folder_path, normalized_path)
-                    if not os.path.exists(full_path):
-                        result['missing_files'].append(file_path)
-            
-            # 检查额外的文件（实际有但XML中没有）
-            # 排除modinfo文件夹，因为它是元数据，不在文件结构检查范围内
-            result['extra_files'] = []
-            for file_path in current_files:
-                # 跳过modinfo文件夹及其内容
-                if not file_path.startswith('modinfo'):
-                    if file_path not in xml_file_paths:
-                        result['extra_files'].append(file_path)
-            
-            # 如果有缺失或额外的文件，认为不完整
-            # 注意：不检查文件大小和修改时间，以支持重新安装
-            if result['missing_files'] or result['extra_files']:
-                result['is_complete'] = False
-            
+            integrity_cache = self.get_integrity_cache()
+            catalog = self.get_mod_catalog()
+            for mod_folder_path in result.changed_folders:
+                integrity_cache.invalidate(mod_folder_path)
+                catalog.refresh_folder(os.path.basename(mod_folder_path))
+            if result.changed_folders:
+                integrity_cache.save()
         except Exception as e:
-            print(f"[失败] 检查文件完整性失败: {str(e)}")
-            # 检查失败时，认为文件完整，允许启用（避免误报）
-            result['is_complete'] = True
+            print(f"[警告] 更新模组目录缓存失败: {e}")
+        finally:
+            self.resume_mods_watcher()
         
-        return result
+        btn = getattr(self, 'btn_content_dedup', None)
+        if btn is not None:
+            try:
+                btn.setText("文件去重")
+                btn.setEnabled(True)
+            except RuntimeError:
+                pass  # 面板已被销毁
+        
+        print(f"[成功] 文件去重完成: {result.linked_files} 个文件改为硬链接，节省 {format_size(result.saved_bytes)}")
+        
+        pending = getattr(self, '_pending_content_dedup', None)
+        self._pending_content_dedup = None
+        if pending is not None:
+            pending_paths, pending_report = pending
+            self.start_content_dedup(pending_paths, report=report or pending_report)
+            return
+        
+        if not report:
+            return
+        lines = [
+            f"已处理 {result.mod_count} 个mod，本次 {result.linked_files} 个文件改为硬链接，节省 {format_size(result.saved_bytes)}。"
+        ]
+        if result.freed_bytes:
+            lines.append(f"清理不再使用的文件，释放 {format_size(result.freed_bytes)}。")
+        if result.stats is not None:
+            stats = result.stats
+            lines.append(
+                f"\n内容存储共 {stats.objects} 个文件，实际占用 {format_size(stats.stored_bytes)}；"
+                f"各mod引用合计 {format_size(stats.referenced_bytes)}，共节省 {format_size(stats.saved_bytes)}。"
+            )
+        msg_box = QMessageBox(self)
+        msg_box.setWindowTitle("文件去重")
+        if result.failed:
+            msg_box.setIcon(QMessageBox.Icon.Warning)
+            lines.append(f"\n{len(result.failed)} 个mod未能处理。")
+            msg_box.setDetailedText("\n".join(f"{os.path.basename(path)}: {error}" for path, error in result.failed))
+        else:
+            msg_box.setIcon(QMessageBox.Icon.Information)
+        msg_box.setText("\n".join(lines))
+        msg_box.exec()
+    
+    def find_idle_mods(self, days):
+        """超过days天未启用、尚未冷存储的mod文件夹
+        
+        最近一次启用或禁用的时间取自使用日志，从未启用过的mod按导入时间计算。
+        """
+        import time
+        from utils.cold_storage import is_cold
+        cutoff = time.time() - days * 86400
+        last_used = self.get_usage_log().last_event_times(('enabled', 'disabled'))
+        store = self.get_mod_state_store()
+        mods_dir = os.path.join(self.get_project_root(), "mods")
+        mod_folder_paths = []
+        for row in self.get_mod_catalog().get_all():
+            if store.is_enabled(row["name"]):
+                continue
+            if max(last_used.get(row["name"], 0), row["import_time"] or 0) > cutoff:
+                continue
+            mod_folder_path = os.path.join(mods_dir, row["folder"])
+            if os.path.isdir(mod_folder_path) and not is_cold(mod_folder_path):
+                mod_folder_paths.append(mod_folder_path)
+        return mod_folder_paths
+    
+    def start_cold_storage(self, report=True):
+        """在后台把长期未启用的mod打包到冷存储
+        
+        Args:
+            report: 是否先询问天数并在完成后显示报告（启动时的自动检查不询问也不显示）
+        """
+        from utils.cold_storage import ColdStorageThread, DEFAULT_COLD_DAYS
+        if getattr(self, '_cold_storage_thread', None) is not None:
+            if report:
+                QMessageBox.information(self, "提示", "正在打包冷存储，请稍候")
+            return
+        
+        settings = self.load_advanced_settings()
+        days = settings.get('cold_storage_days', DEFAULT_COLD_DAYS)
+        if report:
+            from PySide6.QtWidgets import QInputDialog
+            days, ok = QInputDialog.getInt(
+                self, "冷存储",
+                "把超过多少天未启用的mod打包压缩？\n\n"
+                "打包后mod的信息、搜索和冲突检测不受影响，启用时自动解压恢复。\n"
+                "启用后每次启动程序时也会自动检查。",
+                days, 1, 3650
+            )
+            if not ok:
+                return
+            settings = dict(settings)
+            settings['cold_storage'] = True
+            settings['cold_storage_days'] = days
+            self.save_advanced_settings(settings)
+        
+        mod_folder_paths = self.find_idle_mods(days)
+        if not mod_folder_paths:
+            if report:
+                QMessageBox.information(self, "冷存储", f"没有超过 {days} 天未启用的mod")
+            return
+        
+        # 打包期间被启用的mod不再打包（启用前的 ensure_mods_hot 还会把它从打包线程中排除）
+        store = self.get_mod_state_store()
+        folder_names = {row["folder"]: row["name"] for row in self.get_mod_catalog().get_all()}
+        thread = ColdStorageThread(
+            mod_folder_paths,
+            skip_check=lambda path: store.is_enabled(folder_names.get(os.path.basename(path), "")),
+            parent=self
+        )
+        thread.progress.connect(self._on_cold_storage_progress)
+        thread.freeze_finished.connect(lambda result, r=report: self._on_cold_storage_finished(result, r))
+        thread.finished.connect(thread.deleteLater)
+        self._cold_storage_thread = thread
+        # 打包期间的文件变化由完成后的处理统一刷新
+        self.pause_mods_watcher()
+        btn = getattr(self, 'btn_cold_storage', None)
+        if btn is not None:
+            try:
+                btn.setEnabled(False)
+            except RuntimeError:
+                pass  # 面板已被销毁
+        thread.start()
+    
+    def _on_cold_storage_progress(self, done, total, mod_folder_path):
+        """更新冷存储打包进度"""
+        btn = getattr(self, 'btn_cold_storage', None)
+        if btn is not None:
+            try:
+                btn.setText(f"打包中 {done * 100 // total if total else 100}%")
+            except RuntimeError:
+                pass  # 面板已被销毁
+    
+    def _on_cold_storage_finished(self, result, report):
+        """冷存储打包完成：刷新缓存，释放内容存储中不再使用的文件，需要时显示报告"""
+        from utils.content_store import format_size
+        from utils.manifest import load_mod_manifest
+        self._cold_storage_thread = None
+        enabled_frozen = []
+        try:
+            integrity_cache = self.get_integrity_cache()
+            catalog = self.get_mod_catalog()
+            store = self.get_mod_state_store()
+            use_content_store = self.load_advanced_settings().get('content_store', False)
+            for mod_folder_path in result.frozen:
+                integrity_cache.invalidate(mod_folder_path)
+                row = catalog.refresh_folder(os.path.basename(mod_folder_path))
+                if row is not None and store.is_enabled(row["name"]):
+                    enabled_frozen.append(mod_folder_path)
+                manifest = load_mod_manifest(mod_folder_path, migrate=False)
+                if use_content_store and manifest is not None:
+                    self.get_content_store().release(entry.hash for entry in manifest if entry.hash)
+            if result.frozen:
+                integrity_cache.save()
+        except Exception as e:
+            print(f"[警告] 更新模组目录缓存失败: {e}")
+        finally:
+            self.resume_mods_watcher()
+        
+        if enabled_frozen:
+            # 打包结束后才被启用的mod：立即恢复，已部署的链接重新指向存在的文件
+            print(f"[警告] {len(enabled_frozen)} 个已启用的mod被冷存储，正在恢复")
+            self.ensure_mods_hot(enabled_frozen)
+        
+        btn = getattr(self, 'btn_cold_storage', None)
+        if btn is not None:
+            try:
+                btn.setText("冷存储")
+                btn.setEnabled(True)
+            except RuntimeError:
+                pass  # 面板已被销毁
+        
+        print(f"[成功] 冷存储完成: 打包 {len(result.frozen)} 个mod，节省 {format_size(result.saved_bytes)}")
+        if not report:
+            return
+        msg_box = QMessageBox(self)
+        msg_box.setWindowTitle("冷存储")
+        text = (f"已打包 {len(result.frozen)} 个mod：{format_size(result.original_bytes)} → "
+                f"{format_size(result.archive_bytes)}，节省 {format_size(result.saved_bytes)}。")
+        if result.skipped:
+            msg_box.setIcon(QMessageBox.Icon.Warning)
+            text += f"\n\n{len(result.skipped)} 个mod未打包（文件与记录不一致时请先校验或重新启用）。"
+            msg_box.setDetailedText("\n".join(f"{os.path.basename(path)}: {reason}" for path, reason in result.skipped))
+        else:
+            msg_box.setIcon(QMessageBox.Icon.Information)
+        msg_box.setText(text)
+        msg_box.exec()
+    
+    def ensure_mods_hot(self, mod_folder_paths):
+        """从冷存储恢复其中已打包的mod（启用、更新和导出前调用）
+        
+        多个压缩包依次恢复，每个压缩包由多个线程并行解压；期间显示进度，可以取消。
+        
+        Returns:
+            bool: 全部mod的文件都已就绪时为True
+        """
+        from utils.cold_storage import is_cold
+        cold_thread = getattr(self, '_cold_storage_thread', None)
+        if cold_thread is not None:
+            # 正在后台打包：先把这些mod排除，正在打包的中止或等它打包完成后再恢复
+            cold_thread.exclude(mod_folder_paths)
+        cold_paths = [path for path in mod_folder_paths if is_cold(path)]
+        if not cold_paths:
+            return True
+        
+        import uuid
+        import shutil
+        from PySide6.QtCore import QEventLoop
+        from PySide6.QtWidgets import QProgressDialog
+        from utils.cold_storage import RehydrateThread
+        
+        staging_root = os.path.join(self.get_project_root(), "update_staging", uuid.uuid4().hex)
+        progress_dialog = QProgressDialog(f"正在从冷存储恢复 {len(cold_paths)} 个mod...", "取消", 0, 1000, self)
+        progress_dialog.setWindowTitle("冷存储")
+        progress_dialog.setWindowModality(Qt.WindowModality.WindowModal)
+        progress_dialog.setAutoClose(False)
+        progress_dialog.setMinimumDuration(0)
+        progress_dialog.setValue(0)
+        
+        def on_progress(done, total, mod_folder_path):
+            progress_dialog.setValue(done * 1000 // total if total else 1000)
+            if mod_folder_path:
+                progress_dialog.setLabelText(f"正在从冷存储恢复: {os.path.basename(mod_folder_path)}")
+        
+        outcome = {"restored": [], "error": ""}
+        thread = RehydrateThread(cold_paths, staging_root, parent=self)
+        thread.progress.connect(on_progress)
+        thread.rehydrate_finished.connect(lambda restored, error: outcome.update(restored=restored, error=error))
+        progress_dialog.canceled.connect(thread.cancel)
+        loop = QEventLoop()
+        thread.finished.connect(loop.quit)
+        # 恢复期间的文件变化由下面统一刷新
+        self.pause_mods_watcher()
+        thread.start()
+        loop.exec()
+        
+        thread.deleteLater()
+        progress_dialog.close()
+        progress_dialog.deleteLater()
+        shutil.rmtree(staging_root, ignore_errors=True)
+        restored = outcome["restored"]
+        try:
+            integrity_cache = self.get_integrity_cache()
+            catalog = self.get_mod_catalog()
+            for mod_folder_path in restored:
+                integrity_cache.invalidate(mod_folder_path)
+                catalog.refresh_folder(os.path.basename(mod_folder_path))
+            if restored:
+                integrity_cache.save()
+        except Exception as e:
+            print(f"[警告] 更新模组目录缓存失败: {e}")
+        finally:
+            self.resume_mods_watcher()
+        
+        if restored:
+            print(f"[成功] 已从冷存储恢复 {len(restored)} 个mod")
+            if self.load_advanced_settings().get('content_store', False):
+                self.start_content_dedup(restored, report=False)
+        if outcome["error"]:
+            print(f"[失败] 从冷存储恢复mod失败: {outcome['error']}")
+            QMessageBox.warning(self, "错误", f"从冷存储恢复mod失败：{outcome['error']}")
+        return len(restored) == len(cold_paths)
     
     def find_mod_row(self, mod_name):
         """查找mod在表格中的行号"""
@@ -6213,7 +7589,7 @@ class MainWindow(QMainWindow):
         return -1
     
     def update_mod_file_structure(self, mod_name, mod_folder_path):
-        """更新XML中的文件结构"""
+        """更新mod的文件结构清单"""
         modinfo_dir = os.path.join(mod_folder_path, "modinfo")
         xml_file_path = os.path.join(modinfo_dir, "modinfo.xml")
         
@@ -6222,32 +7598,25 @@ class MainWindow(QMainWindow):
         
         try:
             import xml.etree.ElementTree as ET
+            from utils.manifest import write_mod_manifest
             tree = ET.parse(xml_file_path)
             root = tree.getroot()
             
-            # 删除旧的file_structure
+            # 删除XML中旧版的file_structure（已由清单文件替代）
             old_structure = root.find("file_structure")
             if old_structure is not None:
                 root.remove(old_structure)
+                tree.write(xml_file_path, encoding='utf-8', xml_declaration=True)
             
-            # 创建新的file_structure
-            file_structure_elem = ET.SubElement(root, "file_structure")
-            file_list = self.get_folder_files(mod_folder_path)
-            for file_path in file_list:
-                file_elem = ET.SubElement(file_structure_elem, "file")
-                file_elem.text = file_path
-                # 如果是文件（不是目录），记录文件大小和修改时间
-                if not file_path.endswith('/'):
-                    # 将统一的分隔符转换为当前系统的分隔符，确保跨平台兼容
-                    normalized_path = file_path.replace('/', os.sep).replace('\\', os.sep)
-                    full_path = os.path.join(mod_folder_path, normalized_path)
-                    if os.path.exists(full_path):
-                        file_elem.set("size", str(os.path.getsize(full_path)))
-                        file_elem.set("mtime", str(os.path.getmtime(full_path)))
-            
-            # 保存XML文件
-            tree.write(xml_file_path, encoding='utf-8', xml_declaration=True)
+            # 重新生成文件清单
+            write_mod_manifest(mod_folder_path)
             print(f"[成功] 已更新模组文件结构: {mod_name}")
+            
+            # 同步模组目录缓存（大小、文件数和签名）
+            try:
+                self.get_mod_catalog().refresh_folder(os.path.basename(os.path.normpath(mod_folder_path)))
+            except Exception as e:
+                print(f"[警告] 更新模组目录缓存失败: {e}")
             return True
         except Exception as e:
             print(f"[失败] 更新文件结构失败: {str(e)}")
@@ -6575,123 +7944,119 @@ class MainWindow(QMainWindow):
             except Exception as e:
                 print(f"[失败] 保存作者失败: {e}")
     
+    def get_mod_state_store(self):
+        """获取mod状态存储（首次调用时创建）"""
+        if not hasattr(self, 'mod_state_store') or self.mod_state_store is None:
+            from utils.state_store import ModStateStore
+            json_dir = os.path.join(self.get_project_root(), "json")
+            os.makedirs(json_dir, exist_ok=True)
+            self.mod_state_store = ModStateStore(os.path.join(json_dir, "mod_states.json"), parent=self)
+            self.mod_state_store.state_changed.connect(self._on_mod_state_changed)
+            self.mod_state_store.states_reloaded.connect(self._on_mod_states_reloaded)
+        return self.mod_state_store
+    
+    def _on_mod_state_changed(self, mod_name):
+        """mod状态变化时，增量更新保存的查询结果；如果当前筛选依赖mod状态，重新应用筛选"""
+        filter_type = getattr(self, 'current_filter_type', "无条件")
+        needs_refilter = filter_type in ("收藏", "忽略")
+        if getattr(self, 'saved_queries', None) is not None:
+            try:
+                changed = self.saved_queries.update_mods([mod_name], self.get_query_context())
+                needs_refilter = needs_refilter or (filter_type == "查询" and self.current_filter_value in changed)
+            except Exception as e:
+                print(f"[警告] 更新查询结果失败: {e}")
+        if needs_refilter and hasattr(self, 'search_input'):
+            if not getattr(self, '_mod_state_filter_pending', False):
+                # 同一轮事件中的多次变化只重新筛选一次
+                self._mod_state_filter_pending = True
+                QTimer.singleShot(0, self._reapply_filter_after_state_change)
+    
+    def _reapply_filter_after_state_change(self):
+        self._mod_state_filter_pending = False
+        self.filter_mods_by_search(self.search_input.text())
+    
+    def get_saved_queries(self):
+        """获取保存的筛选查询（首次调用时创建）"""
+        if not hasattr(self, 'saved_queries') or self.saved_queries is None:
+            from utils.saved_queries import SavedQueries
+            self.saved_queries = SavedQueries(os.path.join(self.get_project_root(), "json", "saved_queries.json"))
+        return self.saved_queries
+    
+    def get_query_context(self):
+        """查询求值所需的数据，目录缓存版本不变时复用"""
+        catalog = self.get_mod_catalog()
+        context = getattr(self, '_query_context', None)
+        if context is None or context.generation != catalog.generation:
+            from utils.saved_queries import QueryContext
+            
+            def conflict_partners():
+                # 文件冲突关系来自搜索索引的路径列表，首次用到 conflicts 时才同步索引
+                index = self.get_search_index()
+                index.sync(catalog)
+                return index.conflict_partners()
+            
+            context = QueryContext(catalog.get_all(), self.get_mod_state_store(), conflict_partners, catalog.generation)
+            self._query_context = context
+        return context
+    
+    def _on_mod_states_reloaded(self):
+        """mod状态文件被外部修改后，刷新收藏背景和忽略规则"""
+        if getattr(self, 'saved_queries', None) is not None:
+            self.saved_queries.invalidate()
+        if not hasattr(self, 'mod_table'):
+            return
+        store = self.get_mod_state_store()
+        for row in range(self.mod_table.rowCount()):
+            name_item = self.mod_table.item(row, 1)
+            if not name_item:
+                continue
+            if store.is_favorite(name_item.text()):
+                self.set_mod_favorite_background(row)
+            else:
+                self.clear_mod_favorite_background(row)
+        if hasattr(self, 'search_input'):
+            self.filter_mods_by_search(self.search_input.text())
+        else:
+            self.apply_ignore_rules()
+    
     def load_mod_states(self):
-        """加载mod状态（启用、收藏、忽略）"""
-        import json
+        """加载mod状态（启用、收藏、忽略），返回内存状态的副本"""
         try:
-            project_root = self.get_project_root()
-            json_dir = os.path.join(project_root, "json")
-            os.makedirs(json_dir, exist_ok=True)
-            states_file = os.path.join(json_dir, "mod_states.json")
-            
-            if os.path.exists(states_file):
-                try:
-                    with open(states_file, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                        # 兼容旧格式：如果是简单的 {mod_name: bool}，转换为新格式
-                        if data and len(data) > 0:
-                            first_value = list(data.values())[0]
-                            if isinstance(first_value, bool):
-                                new_data = {}
-                                for mod_name, enabled in data.items():
-                                    new_data[mod_name] = {
-                                        "enabled": enabled,
-                                        "favorite": False,
-                                        "ignored": False
-                                    }
-                                # 保存新格式
-                                try:
-                                    with open(states_file, 'w', encoding='utf-8') as f:
-                                        json.dump(new_data, f, ensure_ascii=False, indent=2)
-                                except:
-                                    pass
-                                return new_data
-                        return data
-                except Exception as e:
-                    print(f"[失败] 加载mod状态失败: {e}")
-                    return {}
+            return self.get_mod_state_store().all()
         except Exception as e:
             print(f"[失败] 加载mod状态失败: {e}")
             return {}
-        
-        return {}
     
     def save_mod_states(self):
-        """保存mod状态（启用、收藏、忽略）"""
-        import json
-        project_root = self.get_project_root()
-        json_dir = os.path.join(project_root, "json")
-        os.makedirs(json_dir, exist_ok=True)
-        states_file = os.path.join(json_dir, "mod_states.json")
-        
-        # 先加载现有状态（保留收藏和忽略状态）
-        existing_states = self.load_mod_states()
-        
-        # 获取所有mod的状态
-        mod_states = {}
+        """保存mod状态：把表格中的启用状态同步到状态存储（延迟写入文件）"""
+        updates = {}
         for row in range(self.mod_table.rowCount()):
             name_item = self.mod_table.item(row, 1)
             if name_item:
-                mod_name = name_item.text()
                 # 获取启用状态
                 is_enabled = False
                 if row in self.mod_table.checkbox_widgets:
                     is_enabled = self.mod_table.checkbox_widgets[row].is_checked()
-                
-                # 保留或创建收藏和忽略状态，以及导入时间
-                existing = existing_states.get(mod_name, {})
-                mod_states[mod_name] = {
-                    "enabled": is_enabled,
-                    "favorite": existing.get("favorite", False) if isinstance(existing, dict) else False,
-                    "ignored": existing.get("ignored", False) if isinstance(existing, dict) else False
-                }
-                # 保留导入时间（如果存在）
-                if isinstance(existing, dict) and "import_time" in existing:
-                    mod_states[mod_name]["import_time"] = existing["import_time"]
-        
-        # 也保留不在表格中的mod的状态（可能被忽略了）
-        for mod_name, state in existing_states.items():
-            if mod_name not in mod_states:
-                mod_states[mod_name] = state
+                updates[name_item.text()] = {"enabled": is_enabled}
         
-        try:
-            with open(states_file, 'w', encoding='utf-8') as f:
-                json.dump(mod_states, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            print(f"保存mod状态失败: {e}")
+        # 不在表格中的mod（可能被忽略了）保持原状态
+        self.get_mod_state_store().update_many(updates)
     
     def is_mod_favorite(self, mod_name):
         """检查mod是否被收藏"""
-        mod_states = self.load_mod_states()
-        mod_state = mod_states.get(mod_name, {})
-        if isinstance(mod_state, bool):
-            return False
-        return mod_state.get("favorite", False)
+        return self.get_mod_state_store().is_favorite(mod_name)
     
     def is_mod_ignored(self, mod_name):
         """检查mod是否被忽略"""
-        mod_states = self.load_mod_states()
-        mod_state = mod_states.get(mod_name, {})
-        if isinstance(mod_state, bool):
-            return False
-        return mod_state.get("ignored", False)
+        return self.get_mod_state_store().is_ignored(mod_name)
     
     def toggle_mod_favorite(self, mod_name, row):
         """切换收藏状态"""
-        mod_states = self.load_mod_states()
-        mod_state = mod_states.get(mod_name, {})
-        
-        # 兼容旧格式
-        if isinstance(mod_state, bool):
-            mod_state = {"enabled": mod_state, "favorite": False, "ignored": False}
-        
-        # 切换收藏状态
-        current_favorite = mod_state.get("favorite", False)
-        mod_state["favorite"] = not current_favorite
-        mod_states[mod_name] = mod_state
+        store = self.get_mod_state_store()
         
-        # 保存状态
-        self._save_mod_states_direct(mod_states)
+        # 切换收藏状态（延迟写入文件）
+        store.update(mod_name, favorite=not store.is_favorite(mod_name))
+        mod_state = store.get(mod_name)
         
         # 更新背景色
         if mod_state["favorite"]:
@@ -6709,20 +8074,11 @@ class MainWindow(QMainWindow):
     
     def toggle_mod_ignore(self, mod_name, row):
         """切换忽略状态"""
-        mod_states = self.load_mod_states()
-        mod_state = mod_states.get(mod_name, {})
-        
-        # 兼容旧格式
-        if isinstance(mod_state, bool):
-            mod_state = {"enabled": mod_state, "favorite": False, "ignored": False}
+        store = self.get_mod_state_store()
         
-        # 切换忽略状态
-        current_ignored = mod_state.get("ignored", False)
-        mod_state["ignored"] = not current_ignored
-        mod_states[mod_name] = mod_state
-        
-        # 保存状态
-        self._save_mod_states_direct(mod_states)
+        # 切换忽略状态（延迟写入文件）
+        store.update(mod_name, ignored=not store.is_ignored(mod_name))
+        mod_state = store.get(mod_name)
         
         # 如果设置为忽略，隐藏该行；如果取消忽略，显示该行
         # 但需要考虑搜索状态：如果正在搜索，被忽略的mod也应该显示
@@ -6752,86 +8108,390 @@ class MainWindow(QMainWindow):
         if row < 0 or row >= self.mod_table.rowCount():
             return
         
-        # 从收藏行集合中移除
-        if hasattr(self.mod_table, 'favorite_rows'):
-            self.mod_table.favorite_rows.discard(row)
+        # 从收藏行集合中移除
+        if hasattr(self.mod_table, 'favorite_rows'):
+            self.mod_table.favorite_rows.discard(row)
+        
+        # 强制刷新视图
+        self.mod_table.viewport().update()
+    
+    def _save_mod_states_direct(self, mod_states):
+        """直接保存mod状态（不重新读取表格）"""
+        try:
+            self.get_mod_state_store().replace_all(mod_states)
+        except Exception as e:
+            print(f"[失败] 保存mod状态失败: {e}")
+    
+    def get_usage_log(self):
+        """获取mod使用日志（首次调用时创建，并一次性迁移旧版usage_log.ini）"""
+        if not hasattr(self, 'usage_log') or self.usage_log is None:
+            from utils.usage_log import UsageLog
+            project_root = self.get_project_root()
+            json_dir = os.path.join(project_root, "json")
+            self.usage_log = UsageLog(
+                os.path.join(json_dir, "usage_log"),
+                os.path.join(json_dir, "usage_log_index.db")
+            )
+            migrated = self.usage_log.migrate_ini(os.path.join(project_root, "usage_log.ini"))
+            if migrated:
+                print(f"[成功] 已迁移旧版使用日志 {migrated} 条")
+        return self.usage_log
+    
+    def log_mod_usage(self, mod_name, enabled):
+        """记录mod使用日志（启用/禁用事件），追加写入，不重写已有记录"""
+        try:
+            self._log_config_events([{
+                'action': 'enabled' if enabled else 'disabled',
+                'mod_name': mod_name,
+                'was_enabled': self.get_mod_state_store().is_enabled(mod_name)
+            }])
+        except Exception as e:
+            print(f"[失败] 记录使用日志失败: {e}")
+        
+        # 同时更新该mod的启用状态（延迟写入mod_states.json）
+        try:
+            self.get_mod_state_store().update(mod_name, enabled=bool(enabled))
+        except Exception as e:
+            print(f"[失败] 保存mod状态失败")
+    
+    def get_config_history(self):
+        """获取模组配置历史（首次调用时以当前配置建立基准检查点）"""
+        if not hasattr(self, 'config_history') or self.config_history is None:
+            from utils.config_history import ConfigHistory
+            usage_log = self.get_usage_log()
+            self.config_history = ConfigHistory(usage_log, os.path.join(usage_log.log_dir, "checkpoints.jsonl"))
+            if not self.config_history.has_baseline:
+                enabled = [name for name, state in self.get_mod_state_store().all().items() if state.get("enabled", False)]
+                self.config_history.set_baseline(enabled, self.load_all_mod_priorities())
+        return self.config_history
+    
+    def _log_config_events(self, events, source=None, undoable=True):
+        """记录影响模组配置的事件，并在需要时加入撤销栈
+        
+        Args:
+            events: 事件字典列表（action、mod_name及附加字段）
+            source: 事件来源（如 undo、redo、restore），记录在日志中
+            undoable: 是否作为一步可撤销的操作
+        """
+        history = self.get_config_history()
+        usage_log = self.get_usage_log()
+        seq_before = usage_log.last_seq
+        if source:
+            events = [dict(event, source=source) for event in events]
+        usage_log.append_many(events)
+        if undoable:
+            self._push_config_undo_step(seq_before)
+        history.maybe_checkpoint()
+    
+    def _push_config_undo_step(self, seq_before):
+        """记录撤销点；同一轮事件循环中的多次修改（如批量操作）合并为一步"""
+        if not hasattr(self, '_config_undo_stack'):
+            self._config_undo_stack = []
+            self._config_redo_stack = []
+        if getattr(self, '_config_undo_group_open', False):
+            return
+        self._config_undo_stack.append(seq_before)
+        del self._config_undo_stack[:-100]
+        self._config_redo_stack.clear()
+        self._config_undo_group_open = True
+        QTimer.singleShot(0, self._close_config_undo_group)
+    
+    def _close_config_undo_group(self):
+        self._config_undo_group_open = False
+    
+    def undo_mod_config(self):
+        """撤销上一步模组配置修改（Ctrl+Z）"""
+        undo_stack = getattr(self, '_config_undo_stack', [])
+        if not undo_stack:
+            print("[提示] 没有可撤销的操作")
+            return
+        target_seq = undo_stack.pop()
+        current_seq = self.get_usage_log().last_seq
+        state = self.get_config_history().state_at(seq=target_seq)
+        if state is None or not self.apply_config_state(state, source='undo', undoable=False):
+            # 没有应用成功：保留这一步，可以再次撤销
+            undo_stack.append(target_seq)
+            print("[失败] 撤销失败，配置未改变")
+            return
+        self._config_redo_stack.append(current_seq)
+    
+    def redo_mod_config(self):
+        """重做被撤销的模组配置修改（Ctrl+Shift+Z）"""
+        redo_stack = getattr(self, '_config_redo_stack', [])
+        if not redo_stack:
+            print("[提示] 没有可重做的操作")
+            return
+        target_seq = redo_stack.pop()
+        current_seq = self.get_usage_log().last_seq
+        state = self.get_config_history().state_at(seq=target_seq)
+        if state is None or not self.apply_config_state(state, source='redo', undoable=False):
+            # 没有应用成功：保留这一步，可以再次重做
+            redo_stack.append(target_seq)
+            print("[失败] 重做失败，配置未改变")
+            return
+        self._config_undo_stack.append(current_seq)
+    
+    def restore_mod_config(self, seq=None, ts=None):
+        """恢复到指定日志位置或时间点的模组配置（可撤销）"""
+        state = self.get_config_history().state_at(seq=seq, ts=ts)
+        if state is None:
+            print("[警告] 没有可用的配置历史")
+            return False
+        return self.apply_config_state(state, source='restore')
+    
+    def apply_config_state(self, state, source=None, undoable=True):
+        """把ConfigState中的启用列表和优先级一次性应用到游戏目录"""
+        current_enabled = set(self.mod_table.get_enabled_mods())
+        enable_mods = sorted(state.enabled - current_enabled)
+        disable_mods = sorted(current_enabled - state.enabled)
+        priorities = state.priorities if state.priorities != self.load_all_mod_priorities() else None
+        if not enable_mods and not disable_mods and priorities is None:
+            print("[提示] 当前配置与目标配置一致，无需恢复")
+            return True
+        return self.apply_mod_batch(enable_mods, disable_mods, priorities=priorities, source=source, undoable=undoable)
+    
+    def show_config_restore_dialog(self):
+        """显示历史配置列表，选择一个时间点恢复当时的启用列表和优先级"""
+        from utils.config_history import CONFIG_ACTIONS
+        dialog = QDialog(self)
+        dialog.setWindowTitle("恢复历史配置")
+        dialog.setMinimumSize(560, 460)
+        dialog.setStyleSheet("""
+            QDialog {
+                background-color: rgba(255, 228, 240, 230);
+                border: 1px solid #8B4513;
+                border-radius: 6px;
+            }
+        """)
+        layout = QVBoxLayout()
+        layout.setContentsMargins(16, 16, 16, 16)
+        layout.setSpacing(12)
+        dialog.setLayout(layout)
+        
+        info_label = QLabel("选择一条记录，恢复到该操作完成后的配置（Ctrl+Z 撤销 / Ctrl+Shift+Z 重做）")
+        info_label.setWordWrap(True)
+        info_label.setStyleSheet("""
+            QLabel {
+                color: #8B4513;
+                font-size: 14px;
+                font-weight: bold;
+            }
+        """)
+        layout.addWidget(info_label)
+        
+        event_list = QListWidget()
+        event_list.setSelectionMode(QListWidget.SingleSelection)
+        event_list.setStyleSheet("""
+            QListWidget {
+                background-color: rgba(255, 255, 255, 220);
+                border: 1px solid #8B4513;
+                border-radius: 6px;
+                color: #000000;
+                padding: 6px;
+            }
+            QListWidget::item {
+                padding: 4px 8px;
+            }
+            QListWidget::item:selected {
+                background-color: rgba(255, 182, 193, 220);
+                color: #000000;
+                border-radius: 4px;
+            }
+        """)
+        layout.addWidget(event_list, 1)
+        
+        action_names = {'enabled': "启用", 'disabled': "禁用", 'priority': "调整优先级", 'priorities': "更新优先级"}
+        source_names = {'undo': "撤销", 'redo': "重做", 'restore': "恢复", 'rename': "重命名", 'uninstall': "卸载"}
+        history = self.get_config_history()
+        for event in self.get_usage_log().query(action=CONFIG_ACTIONS, limit=500, newest_first=True):
+            text = f"{event.get('timestamp', '')}  {action_names.get(event.get('action'), event.get('action'))}"
+            if event.get('mod_name'):
+                text += f" {event['mod_name']}"
+            if event.get('source') in source_names:
+                text += f"（{source_names[event['source']]}）"
+            item = QListWidgetItem(text)
+            item.setData(Qt.UserRole, event['seq'])
+            event_list.addItem(item)
+        
+        preview_label = QLabel("")
+        preview_label.setStyleSheet("QLabel { color: #000000; font-size: 13px; }")
+        layout.addWidget(preview_label)
+        
+        def on_selection_changed():
+            items = event_list.selectedItems()
+            if not items:
+                preview_label.setText("")
+                return
+            state = history.state_at(seq=items[0].data(Qt.UserRole))
+            if state is None:
+                preview_label.setText("")
+                return
+            current_enabled = set(self.mod_table.get_enabled_mods())
+            preview_label.setText(
+                f"启用 {len(state.enabled)} 个mod，相比当前将启用 {len(state.enabled - current_enabled)} 个、"
+                f"禁用 {len(current_enabled - state.enabled)} 个"
+            )
+        event_list.itemSelectionChanged.connect(on_selection_changed)
         
-        # 强制刷新视图
-        self.mod_table.viewport().update()
-    
-    def _save_mod_states_direct(self, mod_states):
-        """直接保存mod状态（不重新读取表格）"""
-        import json
-        project_root = self.get_project_root()
-        json_dir = os.path.join(project_root, "json")
-        os.makedirs(json_dir, exist_ok=True)
-        states_file = os.path.join(json_dir, "mod_states.json")
+        btn_layout = QHBoxLayout()
+        btn_layout.addStretch()
+        restore_btn = QPushButton("恢复")
+        cancel_btn = QPushButton("取消")
+        for btn in (restore_btn, cancel_btn):
+            btn.setFixedHeight(36)
+            btn.setStyleSheet("""
+                QPushButton {
+                    background-color: rgba(255, 255, 255, 220);
+                    border: 1px solid #8B4513;
+                    border-radius: 6px;
+                    color: #000000;
+                    font-size: 13px;
+                    font-weight: bold;
+                    padding: 8px 18px;
+                }
+                QPushButton:hover {
+                    background-color: rgba(255, 182, 193, 220);
+                }
+            """)
+        btn_layout.addWidget(restore_btn)
+        btn_layout.addWidget(cancel_btn)
+        layout.addLayout(btn_layout)
+        restore_btn.clicked.connect(dialog.accept)
+        cancel_btn.clicked.connect(dialog.reject)
         
-        try:
-            with open(states_file, 'w', encoding='utf-8') as f:
-                json.dump(mod_states, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            print(f"[失败] 保存mod状态失败: {e}")
-    
-    def log_mod_usage(self, mod_name, enabled):
-        """记录mod使用日志到ini文件（启用/禁用事件）"""
-        try:
-            import configparser
-            from datetime import datetime
-            import time
-            
-            project_root = self.get_project_root()
-            log_file = os.path.join(project_root, "usage_log.ini")
-            
-            # 创建ConfigParser对象
-            config = configparser.ConfigParser()
-            
-            # 如果日志文件存在，读取现有内容
-            if os.path.exists(log_file):
-                try:
-                    config.read(log_file, encoding='utf-8')
-                except Exception as e:
-                    # 读取日志文件失败，不打印详细信息
-                    config = configparser.ConfigParser()  # 重新创建
-            
-            # 创建新的日志条目，使用微秒确保唯一性
-            now = datetime.now()
-            timestamp = now.strftime("%Y-%m-%d %H:%M:%S")
-            # 使用微秒和当前时间戳确保唯一性
-            unique_id = f"{now.strftime('%Y%m%d_%H%M%S')}_{int(time.time() * 1000000) % 1000000}"
-            section_name = f"Usage_{unique_id}"
-            
-            # 检查section是否已存在（理论上不应该，但为了安全）
-            retry_count = 0
-            while section_name in config.sections() and retry_count < 10:
-                unique_id = f"{now.strftime('%Y%m%d_%H%M%S')}_{int(time.time() * 1000000) % 1000000}_{retry_count}"
-                section_name = f"Usage_{unique_id}"
-                retry_count += 1
-            
-            config.add_section(section_name)
-            config.set(section_name, 'timestamp', timestamp)
-            config.set(section_name, 'mod_name', mod_name)
-            config.set(section_name, 'action', 'enabled' if enabled else 'disabled')
-            
-            # 写入日志文件
+        if dialog.exec() != QDialog.DialogCode.Accepted:
+            return
+        items = event_list.selectedItems()
+        if items:
+            self.restore_mod_config(seq=items[0].data(Qt.UserRole))
+    
+    def show_saved_queries_dialog(self):
+        """管理保存的筛选查询：新增、修改、删除，保存前检查语法并预览命中数量"""
+        from utils.saved_queries import parse_query
+        saved_queries = self.get_saved_queries()
+        dialog = QDialog(self)
+        dialog.setWindowTitle("管理查询")
+        dialog.setMinimumSize(560, 420)
+        dialog.setStyleSheet("""
+            QDialog {
+                background-color: rgba(255, 228, 240, 230);
+                border: 1px solid #8B4513;
+                border-radius: 6px;
+            }
+            QLabel {
+                color: #000000;
+                font-size: 13px;
+            }
+            QLineEdit, QListWidget {
+                background-color: rgba(255, 255, 255, 220);
+                border: 1px solid #8B4513;
+                border-radius: 6px;
+                color: #000000;
+                padding: 6px;
+            }
+            QListWidget::item:selected {
+                background-color: rgba(255, 182, 193, 220);
+                color: #000000;
+            }
+            QPushButton {
+                background-color: rgba(255, 255, 255, 220);
+                border: 1px solid #8B4513;
+                border-radius: 6px;
+                color: #000000;
+                font-size: 13px;
+                font-weight: bold;
+                padding: 8px 18px;
+            }
+            QPushButton:hover {
+                background-color: rgba(255, 182, 193, 220);
+            }
+        """)
+        layout = QVBoxLayout()
+        layout.setContentsMargins(16, 16, 16, 16)
+        layout.setSpacing(10)
+        dialog.setLayout(layout)
+        
+        help_label = QLabel(
+            "条件：tag/author/name:值，enabled/favorite/ignored:true|false，conflicts/size/files 比较（> >= < <= =）\n"
+            "组合：AND / OR / NOT 和括号，例：tag:服装 AND author:QCanon AND enabled:false AND conflicts>0"
+        )
+        help_label.setWordWrap(True)
+        layout.addWidget(help_label)
+        
+        query_list = QListWidget()
+        query_list.addItems(saved_queries.names())
+        layout.addWidget(query_list, 1)
+        
+        name_input = QLineEdit()
+        name_input.setPlaceholderText("查询名称")
+        layout.addWidget(name_input)
+        query_input = QLineEdit()
+        query_input.setPlaceholderText("查询条件")
+        layout.addWidget(query_input)
+        preview_label = QLabel("")
+        layout.addWidget(preview_label)
+        
+        def on_selection_changed():
+            items = query_list.selectedItems()
+            if items:
+                name_input.setText(items[0].text())
+                query_input.setText(saved_queries.get_text(items[0].text()) or "")
+        query_list.itemSelectionChanged.connect(on_selection_changed)
+        
+        def on_query_edited(text):
+            if not text.strip():
+                preview_label.setText("")
+                return
             try:
-                with open(log_file, 'w', encoding='utf-8') as f:
-                    config.write(f)
-            except Exception as e:
-                pass  # 写入日志文件失败，不打印详细信息
+                parsed = parse_query(text)
+            except ValueError as e:
+                preview_label.setText(f"语法错误：{e}")
+                return
+            context = self.get_query_context()
+            count = sum(1 for mod_name in context.rows if parsed.matches(context, mod_name))
+            preview_label.setText(f"命中 {count} 个mod")
+        query_input.textChanged.connect(on_query_edited)
+        
+        def on_save():
+            name = name_input.text().strip()
+            if not name:
+                QMessageBox.warning(dialog, "提示", "请输入查询名称")
                 return
-            
-            # 同时保存状态到mod_states.json
             try:
-                self.save_mod_states()
-            except Exception as e:
-                print(f"[失败] 保存mod状态失败")
-            
-            # 已记录使用日志，不打印详细信息
-        except Exception as e:
-            print(f"[失败] 记录使用日志失败")
-            import traceback
-            traceback.print_exc()
+                saved_queries.set_query(name, query_input.text().strip())
+            except ValueError as e:
+                QMessageBox.warning(dialog, "语法错误", str(e))
+                return
+            if not query_list.findItems(name, Qt.MatchExactly):
+                query_list.addItem(name)
+            self.populate_saved_query_items()
+            if self.current_filter_type == "查询" and self.current_filter_value == name:
+                self.apply_filter()
+        
+        def on_delete():
+            items = query_list.selectedItems()
+            if not items:
+                return
+            saved_queries.remove(items[0].text())
+            query_list.takeItem(query_list.row(items[0]))
+            name_input.clear()
+            query_input.clear()
+            self.populate_saved_query_items()
+        
+        btn_layout = QHBoxLayout()
+        save_btn = QPushButton("保存")
+        delete_btn = QPushButton("删除")
+        close_btn = QPushButton("关闭")
+        btn_layout.addWidget(save_btn)
+        btn_layout.addWidget(delete_btn)
+        btn_layout.addStretch()
+        btn_layout.addWidget(close_btn)
+        layout.addLayout(btn_layout)
+        save_btn.clicked.connect(on_save)
+        delete_btn.clicked.connect(on_delete)
+        close_btn.clicked.connect(dialog.accept)
+        
+        dialog.exec()
     
     def create_status_bar(self):
         """创建底部状态栏 - 渐变背景"""
@@ -6859,6 +8519,10 @@ class MainWindow(QMainWindow):
             QMessageBox.information(self, "提示", "请先选择要导出的mod")
             return
         
+        mods_dir = os.path.join(self.get_project_root(), "mods")
+        if not self.ensure_mods_hot([os.path.join(mods_dir, self.mod_name_to_folder_name(m)) for m in selected_mods]):
+            return
+        
         # 显示导出选择面板
         panel = ExportSelectionPanel(self)
         # 使用动画显示面板
@@ -6970,6 +8634,7 @@ class MainWindow(QMainWindow):
         
         # 复制选中的mod
         import shutil
+        from utils.manifest import write_mod_manifest, IMPORT_MODE_COPY
         success_count = 0
         failed_mods = []
         
@@ -6988,8 +8653,10 @@ class MainWindow(QMainWindow):
                 if os.path.exists(target_path):
                     shutil.rmtree(target_path)
                 
-                # 复制整个mod文件夹
+                # 复制整个mod文件夹（链接导入的mod复制的是来源文件的内容）
                 shutil.copytree(source_path, target_path)
+                # 导出的是普通副本，重新生成清单，不带原mod的导入方式和来源
+                write_mod_manifest(target_path, import_mode=IMPORT_MODE_COPY)
                 success_count += 1
             except Exception as e:
                 failed_mods.append(f"{mod_name} ({str(e)})")
@@ -7106,25 +8773,14 @@ class MainWindow(QMainWindow):
                 desc_elem = ET.SubElement(xml_root, "description")
                 desc_elem.text = description
             
-            # 添加文件结构记录
-            file_structure_elem = ET.SubElement(xml_root, "file_structure")
-            file_list = self.get_folder_files(target_path)
-            for file_path in file_list:
-                file_elem = ET.SubElement(file_structure_elem, "file")
-                file_elem.text = file_path
-                # 如果是文件（不是目录），记录文件大小和修改时间
-                if not file_path.endswith('/'):
-                    # 将统一的分隔符转换为当前系统的分隔符，确保跨平台兼容
-                    normalized_path = file_path.replace('/', os.sep).replace('\\', os.sep)
-                    full_path = os.path.join(target_path, normalized_path)
-                    if os.path.exists(full_path):
-                        file_elem.set("size", str(os.path.getsize(full_path)))
-                        file_elem.set("mtime", str(os.path.getmtime(full_path)))
-            
             xml_file = os.path.join(modinfo_dir, "modinfo.xml")
             tree = ET.ElementTree(xml_root)
             tree.write(xml_file, encoding='utf-8', xml_declaration=True)
             
+            # 添加文件结构记录（二进制清单）
+            from utils.manifest import write_mod_manifest, IMPORT_MODE_COPY
+            write_mod_manifest(target_path, import_mode=IMPORT_MODE_COPY)
+            
             QMessageBox.information(self, "成功", f"合并mod已导出到：{target_path}")
             
             # 清理临时目录
@@ -7158,35 +8814,46 @@ class MainWindow(QMainWindow):
         mod_folder_name = mod_name.replace(" ", "_").replace("/", "_").replace("\\", "_")
         mod_folder_path = os.path.join(mods_dir, mod_folder_name)
         
+        # 引用或硬链接导入的mod只删除mods目录中的链接，来源文件保持不变（rmtree不会跟随符号链接）
+        from utils.manifest import load_mod_manifest, IMPORT_MODE_REFERENCE, IMPORT_MODE_HARDLINK
+        manifest = load_mod_manifest(mod_folder_path, migrate=False)
+        stored_hashes = [entry.hash for entry in manifest if entry.hash] if manifest is not None else []
+        kept_note = ""
+        if manifest is not None and manifest.import_mode in (IMPORT_MODE_REFERENCE, IMPORT_MODE_HARDLINK):
+            kept_note = f"（来源文件已保留: {manifest.source}）"
+        
         # 删除mod文件夹
         if os.path.exists(mod_folder_path):
             try:
                 shutil.rmtree(mod_folder_path)
-                print(f"[成功] 卸载mod: {mod_name}")
+                print(f"[成功] 卸载mod: {mod_name}{kept_note}")
             except Exception as e:
                 QMessageBox.critical(self, "错误", f"无法删除mod文件夹：{str(e)}")
                 return
         
-        # 从mod_states.json中删除
-        import json
-        from collections import OrderedDict
-        
-        json_dir = os.path.join(project_root, "json")
-        os.makedirs(json_dir, exist_ok=True)
-        mod_states_file = os.path.join(json_dir, "mod_states.json")
-        if os.path.exists(mod_states_file):
+        # 释放内容存储中不再被其他mod引用的文件
+        if stored_hashes and self.load_advanced_settings().get('content_store', False):
             try:
-                with open(mod_states_file, 'r', encoding='utf-8') as f:
-                    mod_states = json.load(f, object_pairs_hook=OrderedDict)
-                
-                if mod_name in mod_states:
-                    del mod_states[mod_name]
-                
-                with open(mod_states_file, 'w', encoding='utf-8') as f:
-                    json.dump(mod_states, f, ensure_ascii=False, indent=2)
-                # 已从mod_states.json中删除，不打印详细信息
+                from utils.content_store import format_size
+                freed = self.get_content_store().release(stored_hashes)
+                if freed:
+                    print(f"[信息] 内容存储释放 {format_size(freed)}")
             except Exception as e:
-                print(f"[警告] 更新mod_states.json失败")
+                print(f"[警告] 释放内容存储失败: {e}")
+        
+        # 从mod状态中删除
+        self.get_mod_state_store().remove(mod_name)
+        
+        # 从模组目录缓存中移除
+        try:
+            from utils.manifest import forget_mod_manifest
+            forget_mod_manifest(mod_folder_path)
+            self.get_integrity_cache().invalidate(mod_folder_path)
+            self.get_integrity_cache().save()
+            self.get_mod_catalog().remove_folder(mod_folder_name)
+            self.get_archive_hash_index().remove_folder(mod_folder_name)
+        except Exception as e:
+            print(f"[警告] 更新模组目录缓存失败: {e}")
         
         # 从文件栈中移除该mod
         self.remove_mod_from_file_stack(mod_name)
@@ -7420,6 +9087,29 @@ class MainWindow(QMainWindow):
         
         return 'override'
     
+    def load_all_mod_priorities(self):
+        """读取全部已保存的优先级配置 {key: [mod1, mod2, ...]}"""
+        priority_file = os.path.join(self.get_project_root(), "json", "mod_priorities.json")
+        if not os.path.exists(priority_file):
+            return {}
+        try:
+            with open(priority_file, 'r', encoding='utf-8') as f:
+                priorities = json.load(f)
+            return priorities if isinstance(priorities, dict) else {}
+        except Exception as e:
+            print(f"[警告] 加载优先级失败: {e}")
+            return {}
+    
+    def _save_all_mod_priorities(self, priorities):
+        """整体写入优先级配置（恢复历史配置时使用，不记录日志）"""
+        json_dir = os.path.join(self.get_project_root(), "json")
+        os.makedirs(json_dir, exist_ok=True)
+        try:
+            with open(os.path.join(json_dir, "mod_priorities.json"), 'w', encoding='utf-8') as f:
+                json.dump(priorities, f, ensure_ascii=False, indent=2)
+        except Exception as e:
+            print(f"[警告] 保存优先级失败: {e}")
+    
     def load_mod_priority(self, mod_name, conflicting_mods):
         """加载mod优先级顺序"""
         import json
@@ -7510,11 +9200,18 @@ class MainWindow(QMainWindow):
             
             # 使用冲突mod集合作为key（排序后转为字符串）
             key = ','.join(sorted(priority_order))
+            previous = priorities.get(key)
             priorities[key] = priority_order
             
             # 保存
             with open(priority_file, 'w', encoding='utf-8') as f:
                 json.dump(priorities, f, ensure_ascii=False, indent=2)
+            
+            if previous != priority_order:
+                self._log_config_events([{
+                    'action': 'priority', 'key': key,
+                    'order': list(priority_order), 'previous': previous
+                }])
         except Exception as e:
             print(f"[警告] 保存优先级失败: {e}")
 
@@ -7553,6 +9250,9 @@ class MainWindow(QMainWindow):
             if updated:
                 with open(priority_file, 'w', encoding='utf-8') as f:
                     json.dump(new_priorities, f, ensure_ascii=False, indent=2)
+                self._log_config_events([{
+                    'action': 'priorities', 'priorities': new_priorities, 'previous': priorities
+                }], source='rename', undoable=False)
         except Exception as e:
             print(f"[警告] 更新优先级名称失败: {e}")
     
@@ -7590,6 +9290,9 @@ class MainWindow(QMainWindow):
             if updated:
                 with open(priority_file, 'w', encoding='utf-8') as f:
                     json.dump(new_priorities, f, ensure_ascii=False, indent=2)
+                self._log_config_events([{
+                    'action': 'priorities', 'priorities': new_priorities, 'previous': priorities
+                }], source='uninstall', undoable=False)
         except Exception as e:
             print(f"[警告] 从优先级中移除mod失败: {e}")
 
@@ -8091,6 +9794,288 @@ class MainWindow(QMainWindow):
         
         return cleaned_stack
     
+    def apply_mod_batch(self, enable_mods, disable_mods, priorities=None, source=None, undoable=True):
+        """一次性应用一组启用/禁用变化（恢复历史配置、撤销/重做使用）
+        
+        与逐个勾选不同，受影响的每个文件只计算一次最终归属并只写入一次，
+        文件栈、mod状态和使用日志也都只保存一次。不弹出完整性检查和冲突对话框。
+        
+        Args:
+            enable_mods: 要启用的mod名称列表（按启用顺序，后启用的覆盖先启用的）
+            disable_mods: 要禁用的mod名称列表
+            priorities: 新的优先级配置，None表示不修改
+            source: 记录在使用日志中的来源
+            undoable: 是否作为一步可撤销的操作
+        
+        Returns:
+            bool: 是否成功
+        """
+        from PySide6.QtWidgets import QApplication
+        
+        settings = self.load_advanced_settings()
+        game_path = settings.get('game_path', '')
+        if not game_path or not os.path.exists(game_path):
+            QMessageBox.warning(self, "错误", "请先在高级设置中设置游戏根目录！")
+            return False
+        
+        mods_dir = os.path.join(self.get_project_root(), "mods")
+        rows = {}
+        for row in range(self.mod_table.rowCount()):
+            name_item = self.mod_table.item(row, 1)
+            if name_item:
+                rows[name_item.text()] = row
+        
+        missing_mods = []
+        existing_enable_mods = []
+        for mod_name in enable_mods:
+            mod_folder_path = os.path.join(mods_dir, self.mod_name_to_folder_name(mod_name))
+            if mod_name in rows and os.path.exists(mod_folder_path):
+                existing_enable_mods.append(mod_name)
+            else:
+                missing_mods.append(mod_name)
+        enable_mods = existing_enable_mods
+        disable_mods = [mod_name for mod_name in disable_mods if mod_name in rows]
+        
+        if not self.ensure_mods_hot([os.path.join(mods_dir, self.mod_name_to_folder_name(m)) for m in enable_mods]):
+            return False
+        
+        use_virtual_mapping = settings.get('virtual_mapping', False)
+        if use_virtual_mapping and not self.ensure_virtual_folder(game_path):
+            QMessageBox.warning(self, "错误", "无法创建virtual文件夹，配置未应用！")
+            return False
+        
+        QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
+        self.setEnabled(False)
+        try:
+            previous_priorities = None
+            priority_groups = []
+            if priorities is not None:
+                previous_priorities = self.load_all_mod_priorities()
+                priority_groups = [
+                    priorities.get(key) or previous_priorities.get(key)
+                    for key in set(priorities) | set(previous_priorities)
+                    if priorities.get(key) != previous_priorities.get(key)
+                ]
+                self._save_all_mod_priorities(priorities)
+            
+            if use_virtual_mapping:
+                if not self._deploy_virtual_batch(enable_mods, disable_mods, game_path, mods_dir, priority_groups):
+                    # 没有修改任何链接：还原优先级，不更新状态和日志
+                    if priorities is not None:
+                        self._save_all_mod_priorities(previous_priorities)
+                    QMessageBox.warning(self, "错误", "无法创建virtual文件夹，配置未应用！")
+                    return False
+            else:
+                self._deploy_file_stack_batch(enable_mods, disable_mods, game_path, mods_dir)
+            
+            # 更新复选框（set_checked会屏蔽信号，不会再逐个触发文件操作）
+            for mod_name, enabled in [(m, False) for m in disable_mods] + [(m, True) for m in enable_mods]:
+                row = rows[mod_name]
+                if row in self.mod_table.checkbox_widgets:
+                    self.mod_table.checkbox_widgets[row].set_checked(enabled)
+            
+            # 日志和状态各写入一次
+            store = self.get_mod_state_store()
+            events = [
+                {'action': 'disabled', 'mod_name': m, 'was_enabled': store.is_enabled(m)} for m in disable_mods
+            ] + [
+                {'action': 'enabled', 'mod_name': m, 'was_enabled': store.is_enabled(m)} for m in enable_mods
+            ]
+            if priorities is not None:
+                events.append({'action': 'priorities', 'priorities': priorities, 'previous': previous_priorities})
+            try:
+                self._log_config_events(events, source=source, undoable=undoable)
+            except Exception as e:
+                print(f"[失败] 记录使用日志失败: {e}")
+            store.update_many(
+                {**{m: {'enabled': False} for m in disable_mods}, **{m: {'enabled': True} for m in enable_mods}}
+            )
+        except Exception as e:
+            print(f"[失败] 批量应用mod失败: {e}")
+            import traceback
+            traceback.print_exc()
+            return False
+        finally:
+            self.setEnabled(True)
+            QApplication.restoreOverrideCursor()
+        
+        self.mod_table.statistics_changed.emit()
+        QTimer.singleShot(0, self.mod_table.restore_all_green)
+        print(f"[成功] 批量应用完成：启用 {len(enable_mods)} 个，禁用 {len(disable_mods)} 个mod")
+        if missing_mods:
+            print(f"[警告] 以下mod已不存在，已跳过: {', '.join(missing_mods)}")
+        return True
+    
+    def _deploy_file_stack_batch(self, enable_mods, disable_mods, game_path, mods_dir):
+        """非虚拟映射模式的批量部署：先整体更新文件栈，再按最终栈顶复制或删除受影响的文件"""
+        import shutil
+        stack = self.cleanup_invalid_stack_entries(self.load_file_ownership_stack())
+        affected = set()
+        
+        for mod_name in disable_mods:
+            for file_path in self.get_mod_files_from_stack(mod_name, stack):
+                stack[file_path].remove(mod_name)
+                if not stack[file_path]:
+                    del stack[file_path]
+                affected.add(file_path)
+        
+        for mod_name in enable_mods:
+            mod_folder_path = os.path.join(mods_dir, self.mod_name_to_folder_name(mod_name))
+            for file_path in self.get_mod_file_paths(mod_name, mod_folder_path):
+                mod_stack = stack.setdefault(file_path, [])
+                if mod_name in mod_stack:
+                    mod_stack.remove(mod_name)
+                mod_stack.append(mod_name)
+                affected.add(file_path)
+        
+        copied = deleted = failed = 0
+        for file_path in sorted(affected):
+            target_file = os.path.join(game_path, file_path)
+            try:
+                if file_path in stack:
+                    top_mod = stack[file_path][-1]
+                    source_file = os.path.join(mods_dir, self.mod_name_to_folder_name(top_mod), file_path)
+                    target_dir = os.path.dirname(target_file)
+                    if target_dir and target_dir != game_path:
+                        os.makedirs(target_dir, exist_ok=True)
+                    shutil.copy2(source_file, target_file)
+                    copied += 1
+                elif os.path.exists(target_file):
+                    os.remove(target_file)
+                    deleted += 1
+            except Exception as e:
+                print(f"[失败] 文件操作失败: {file_path} ({str(e)})")
+                failed += 1
+        
+        self.save_file_ownership_stack(stack)
+        print(f"[信息] 文件栈批量更新：复制 {copied} 个文件，删除 {deleted} 个文件" + (f"，失败 {failed} 个" if failed else ""))
+    
+    def _deploy_virtual_batch(self, enable_mods, disable_mods, game_path, mods_dir, priority_groups=()):
+        """虚拟映射模式的批量部署：按优先级计算受影响文件的最终来源，只更新需要变化的符号链接
+        
+        Args:
+            priority_groups: 优先级发生变化的mod集合列表，集合中已启用的mod之间共有的路径也重新确定来源
+        
+        Returns:
+            bool: virtual文件夹不可用时返回False，不做任何修改
+        """
+        if not self.ensure_virtual_folder(game_path):
+            print(f"[失败] 无法创建virtual文件夹")
+            return False
+        
+        # 最终启用的mod（保持表格中的顺序，新启用的排在后面）
+        disable_set = set(disable_mods)
+        final_enabled = [m for m in self.mod_table.get_enabled_mods() if m not in disable_set and m not in enable_mods]
+        final_enabled += list(enable_mods)
+        enabled_set = set(final_enabled)
+        
+        mod_files = {}
+        for mod_name in enabled_set | disable_set:
+            mod_folder_path = os.path.join(mods_dir, self.mod_name_to_folder_name(mod_name))
+            mod_files[mod_name] = self.get_mod_file_paths(mod_name, mod_folder_path)
+        
+        affected = set()
+        for mod_name in list(enable_mods) + list(disable_mods):
+            affected |= mod_files.get(mod_name, set())
+        for group in priority_groups:
+            seen = set()
+            for mod_name in group:
+                if mod_name in enabled_set:
+                    affected |= mod_files[mod_name] & seen
+                    seen |= mod_files[mod_name]
+        
+        updated, removed, failed = self._resolve_virtual_paths(affected, final_enabled, mod_files, game_path, mods_dir)
+        self.sync_virtual_to_game_root(game_path)
+        print(f"[信息] 虚拟映射批量更新：更新 {updated} 个符号链接，删除 {removed} 个" + (f"，失败 {failed} 个" if failed else ""))
+        return True
+    
+    def _priority_winner(self, candidates, priorities):
+        """按已保存的优先级从提供同一路径的mod中选出来源
+        
+        优先使用与候选mod完全相同的优先级配置；否则使用包含候选mod最多（至少两个）的配置，
+        取其中排在最前的候选mod；都没有时与逐个启用相同：后启用的覆盖先启用的。
+        
+        Args:
+            candidates: 提供该路径的已启用mod（按启用顺序）
+            priorities: load_all_mod_priorities() 的结果
+        """
+        candidate_set = set(candidates)
+        best_order = None
+        best_count = 1
+        for order in priorities.values():
+            if not isinstance(order, list):
+                continue
+            if set(order) == candidate_set:
+                return order[0]
+            common_count = len(candidate_set.intersection(order))
+            if common_count > best_count:
+                best_order = order
+                best_count = common_count
+        if best_order:
+            return next(m for m in best_order if m in candidate_set)
+        return candidates[-1]
+    
+    def _resolve_virtual_paths(self, file_paths, enabled_mods, mod_files, game_path, mods_dir):
+        """按优先级重新确定每个路径的来源，并更新virtual文件夹中的符号链接
+        
+        提供该路径的已启用mod中，按保存的优先级选出来源；没有保存的优先级时后启用的覆盖先启用的；
+        没有mod提供时回退到游戏原文件，游戏中也没有时删除链接。
+        
+        Args:
+            file_paths: 需要重新确定来源的路径
+            enabled_mods: 已启用的mod（按启用顺序）
+            mod_files: mod名称 -> 该mod提供的路径集合（至少包含file_paths中的路径）
+        
+        Returns:
+            tuple: (更新的链接数, 删除的链接数, 失败数)
+        """
+        virtual_folder = self.get_virtual_folder_path(game_path)
+        hidden_game_path = self.get_hidden_game_path()
+        priorities = self.load_all_mod_priorities()
+        priority_cache = {}
+        updated = removed = failed = 0
+        for file_path in sorted(file_paths):
+            candidates = [m for m in enabled_mods if file_path in mod_files.get(m, ())]
+            winner = None
+            if len(candidates) == 1:
+                winner = candidates[0]
+            elif candidates:
+                key = tuple(candidates)
+                if key not in priority_cache:
+                    priority_cache[key] = self._priority_winner(candidates, priorities)
+                winner = priority_cache[key]
+            
+            if winner:
+                source_file = os.path.abspath(os.path.join(mods_dir, self.mod_name_to_folder_name(winner), file_path))
+            elif hidden_game_path and os.path.exists(os.path.join(hidden_game_path, file_path)):
+                source_file = os.path.abspath(os.path.join(hidden_game_path, file_path))
+            else:
+                source_file = None
+            
+            target_file = os.path.join(virtual_folder, file_path)
+            try:
+                is_link = os.path.islink(target_file)
+                if source_file and is_link and os.path.abspath(os.readlink(target_file)) == source_file:
+                    continue
+                if not source_file and not is_link and not os.path.isfile(target_file):
+                    continue
+                if is_link or os.path.isfile(target_file):
+                    os.remove(target_file)
+                if source_file:
+                    os.makedirs(os.path.dirname(target_file), exist_ok=True)
+                    os.symlink(source_file, target_file)
+                    updated += 1
+                else:
+                    removed += 1
+            except OSError as e:
+                if hasattr(e, 'winerror') and e.winerror == 1314:
+                    if not getattr(self, '_admin_permission_shown', False):
+                        self._admin_permission_shown = True
+                        self.show_admin_permission_panel()
+                print(f"[失败] 更新符号链接失败: {file_path} ({str(e)})")
+                failed += 1
+        return updated, removed, failed
+    
     def update_file_stack_for_mod(self, mod_name, mod_folder_path, enabled):
         """更新文件栈并复制栈顶文件到游戏目录"""
         import shutil
@@ -8273,6 +10258,70 @@ class MainWindow(QMainWindow):
             self.setEnabled(True)
             QApplication.restoreOverrideCursor()
     
+    def update_file_stack_paths(self, mod_name, mod_folder_path, added, changed, removed):
+        """增量更新已启用mod在文件栈和游戏目录中的部分路径（非虚拟映射模式，mod更新后使用）
+        
+        新增的文件入栈到栈顶并复制；修改的文件在该mod位于栈顶时重新复制；
+        删除的文件出栈，该mod原在栈顶时恢复新栈顶mod的文件，栈为空时删除游戏目录中的文件。
+        
+        Args:
+            added / changed / removed: 相对于mod文件夹的文件路径（'/'分隔）
+        """
+        import shutil
+        
+        settings = self.load_advanced_settings()
+        game_path = settings.get('game_path', '')
+        if not game_path or not os.path.exists(game_path):
+            return False
+        mods_dir = os.path.join(self.get_project_root(), "mods")
+        stack = self.load_file_ownership_stack()
+        copy_jobs = []  # [(file_path, 来源mod文件夹)]
+        delete_paths = []
+        
+        for file_path in added:
+            mod_stack = stack.setdefault(file_path, [])
+            if mod_name in mod_stack:
+                mod_stack.remove(mod_name)
+            mod_stack.append(mod_name)
+            copy_jobs.append((file_path, mod_folder_path))
+        for file_path in changed:
+            mod_stack = stack.get(file_path)
+            if mod_stack and mod_stack[-1] == mod_name:
+                copy_jobs.append((file_path, mod_folder_path))
+        for file_path in removed:
+            mod_stack = stack.get(file_path)
+            if not mod_stack or mod_name not in mod_stack:
+                continue
+            was_top = mod_stack[-1] == mod_name
+            mod_stack.remove(mod_name)
+            if not mod_stack:
+                del stack[file_path]
+                delete_paths.append(file_path)
+            elif was_top:
+                copy_jobs.append((file_path, os.path.join(mods_dir, self.mod_name_to_folder_name(mod_stack[-1]))))
+        
+        failed_count = 0
+        for file_path, source_folder in copy_jobs:
+            target_file = os.path.join(game_path, file_path)
+            try:
+                os.makedirs(os.path.dirname(target_file), exist_ok=True)
+                shutil.copy2(os.path.join(source_folder, file_path), target_file)
+            except OSError as e:
+                failed_count += 1
+                print(f"[失败] 复制文件失败: {file_path} ({str(e)})")
+        for file_path in delete_paths:
+            try:
+                os.remove(os.path.join(game_path, file_path))
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                failed_count += 1
+                print(f"[失败] 删除文件失败: {file_path} ({str(e)})")
+        
+        self.save_file_ownership_stack(stack)
+        print(f"[成功] 已更新{mod_name}在游戏目录中的文件：复制 {len(copy_jobs)} 个，删除 {len(delete_paths)} 个")
+        return failed_count == 0
+    
     def update_file_stack_mod_name(self, old_mod_name, new_mod_name):
         """更新文件栈中的mod名称（重命名时使用）
         
@@ -8334,10 +10383,12 @@ class MainWindow(QMainWindow):
                 super().__init__(parent)
                 self.parent_window = parent
                 self.priority_order = priority_order
+                # 在主线程取得设置快照，线程中只读使用
+                self.settings = parent.load_advanced_settings()
             
             def run(self):
                 try:
-                    settings = self.parent_window.load_advanced_settings()
+                    settings = self.settings
                     game_path = settings.get('game_path', '')
                     if not game_path or not os.path.exists(game_path):
                         self.error.emit("游戏目录未设置或不存在")
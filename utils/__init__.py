@@ -12,6 +12,25 @@ from .animation_config import (
     ANIMATION_COMBINATIONS,
     get_animation_combination
 )
+from .manifest import ModManifest, load_mod_manifest, save_mod_manifest, write_mod_manifest
+from .mod_catalog import ModCatalog, parse_modinfo
+from .integrity import IntegrityCache, check_mod_integrity, scan_library
+from .library_scanner import LibraryScanThread, IntegrityScanThread, SearchThread
+from .mods_watcher import ModsWatcher
+from .state_store import ModStateStore
+from .settings_service import SettingsService
+from .usage_log import UsageLog
+from .config_history import ConfigHistory
+from .search_index import SearchIndex
+from .saved_queries import SavedQueries, parse_query
+from .archive import open_archive, is_archive, has_7z_support
+from .archive_extract import ExtractThread, read_import_info
+from .batch_import import BatchImportThread, scan_hunt_box, scan_export_mods
+from .import_queue import ImportQueue
+from .content_index import ArchiveHashIndex, DuplicateChecker, DuplicateCheckThread
+from .mod_update import ModUpdateThread
+from .content_store import ContentStore, DedupThread
+from .cold_storage import ColdStorageThread, RehydrateThread
 
 __all__ = [
     'WindowAnimator', 
@@ -23,7 +42,44 @@ __all__ = [
     'get_animation_preset',
     'get_duration',
     'ANIMATION_COMBINATIONS',
-    'get_animation_combination'
+    'get_animation_combination',
+    'ModManifest',
+    'load_mod_manifest',
+    'save_mod_manifest',
+    'write_mod_manifest',
+    'ModCatalog',
+    'parse_modinfo',
+    'IntegrityCache',
+    'check_mod_integrity',
+    'scan_library',
+    'LibraryScanThread',
+    'IntegrityScanThread',
+    'SearchThread',
+    'ModsWatcher',
+    'ModStateStore',
+    'SettingsService',
+    'UsageLog',
+    'ConfigHistory',
+    'SearchIndex',
+    'SavedQueries',
+    'parse_query',
+    'ExtractThread',
+    'read_import_info',
+    'open_archive',
+    'is_archive',
+    'has_7z_support',
+    'BatchImportThread',
+    'scan_hunt_box',
+    'scan_export_mods',
+    'ImportQueue',
+    'ArchiveHashIndex',
+    'DuplicateChecker',
+    'DuplicateCheckThread',
+    'ModUpdateThread',
+    'ContentStore',
+    'DedupThread',
+    'ColdStorageThread',
+    'RehydrateThread'
 ]
 
 
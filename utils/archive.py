@@ -0,0 +1,506 @@
+"""
+压缩包后端 - 统一的压缩包接口（列出成员、读取成员、流式解压），支持zip和7z
+
+zip使用标准库，较大的压缩包按成员多线程并行解压；
+7z需要安装py7zr，固实压缩块在一次顺序解压中完成，不会为每个文件重新定位和解压。
+"""
+import os
+import time
+import hashlib
+import shutil
+import zipfile
+import tempfile
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+try:
+    import py7zr
+    from py7zr.callbacks import ExtractCallback
+except ImportError:
+    py7zr = None
+    ExtractCallback = object
+try:
+    # py7zr 0.20起可以解压到自定义的写入对象，用于不写出文件地计算哈希
+    from py7zr.io import Py7zIO, WriterFactory
+except ImportError:
+    Py7zIO = WriterFactory = object
+
+from .manifest import HASH_SIZE, hash_file
+
+
+# 支持的压缩包扩展名
+ARCHIVE_SUFFIXES = ('.zip', '.7z')
+
+_ZIP_MAGIC = b"PK\x03\x04"
+_7Z_MAGIC = b"7z\xbc\xaf\x27\x1c"
+
+ArchiveMember = namedtuple("ArchiveMember", ["name", "size", "is_dir"])
+
+# 流式解压的读写块大小
+CHUNK_SIZE = 1024 * 1024
+# 进度通知的最小间隔（秒），避免成员很多时信号过多
+PROGRESS_INTERVAL = 0.05
+# 压缩包小于此大小或只有一个文件时顺序解压，并行的开销不划算
+PARALLEL_MIN_BYTES = 16 * 1024 * 1024
+
+
+def member_rel_path(member_name):
+    """成员解压后相对于目标目录的路径（'/'分隔，与清单路径一致），不安全的成员返回None"""
+    parts = [part for part in member_name.replace("\\", "/").split("/") if part not in ("", ".")]
+    if not parts or ".." in parts or ":" in parts[0]:
+        return None
+    return "/".join(parts)
+
+
+def safe_member_path(dest_dir, member_name):
+    """成员解压后的路径，拒绝绝对路径和 .. 等跳出目标目录的成员"""
+    rel_path = member_rel_path(member_name)
+    if rel_path is None:
+        return None
+    return os.path.join(dest_dir, *rel_path.split("/"))
+
+
+class _Progress:
+    """多个解压线程共享的进度计数，按时间间隔节流回调"""
+
+    def __init__(self, total, callback):
+        self.total = total
+        self.done = 0
+        self._callback = callback
+        self._last_report = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, size, member):
+        if self._callback is None:
+            return
+        with self._lock:
+            self.done += size
+            now = time.monotonic()
+            if now - self._last_report < PROGRESS_INTERVAL:
+                return
+            self._last_report = now
+            done = self.done
+        self._callback(done, self.total, member)
+
+
+def _extract_member(zip_file, info, target, progress, is_cancelled, hashes=None):
+    """解压单个文件成员：先按解压后大小预分配，再顺序写入
+
+    hashes不为None时在写入的同时计算内容哈希，按相对路径存入hashes（不需要再读一遍文件）。
+    """
+    digest = hashlib.blake2b(digest_size=HASH_SIZE) if hashes is not None else None
+    with zip_file.open(info) as src, open(target, 'wb') as dst:
+        if info.file_size:
+            dst.truncate(info.file_size)
+        while True:
+            chunk = src.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            dst.write(chunk)
+            if digest is not None:
+                digest.update(chunk)
+            progress.add(len(chunk), info.filename)
+            if is_cancelled and is_cancelled():
+                raise InterruptedError
+    if digest is not None:
+        hashes[member_rel_path(info.filename)] = digest.digest()
+
+
+def extract_zip(archive_path, dest_dir, progress=None, is_cancelled=None, max_workers=None, hashes=None, names=None):
+    """按成员流式解压zip，较大的压缩包由多个线程并行解压
+
+    每个线程使用独立的ZipFile句柄（zlib解压时释放GIL），较大的成员优先调度，
+    避免最后只剩一个大文件在单线程解压。
+
+    Args:
+        archive_path: 压缩包路径
+        dest_dir: 目标文件夹（调用方保证解压前不存在或为空）
+        progress: 进度回调 progress(已解压字节, 总字节, 当前成员)，可能在工作线程中调用
+        is_cancelled: 返回True时中止解压
+        max_workers: 并行线程数，默认为CPU核心数（最多8个）
+        hashes: 传入dict时，解压的同时计算每个文件的内容哈希（相对路径 -> blake2b摘要）
+        names: 只解压这些成员（成员名称集合），默认解压全部
+
+    Returns:
+        bool: 是否完成；取消时已写出的内容会被删除并返回False
+    """
+    try:
+        with zipfile.ZipFile(archive_path, 'r') as zip_file:
+            infos = zip_file.infolist()
+            os.makedirs(dest_dir, exist_ok=True)
+
+            # 先顺序创建目录，文件成员按大小从大到小排列
+            members = []
+            for info in infos:
+                if names is not None and info.filename not in names:
+                    continue
+                target = safe_member_path(dest_dir, info.filename)
+                if target is None:
+                    print(f"[警告] 跳过不安全的压缩包成员: {info.filename}")
+                    continue
+                if info.is_dir():
+                    os.makedirs(target, exist_ok=True)
+                else:
+                    os.makedirs(os.path.dirname(target), exist_ok=True)
+                    members.append((info, target))
+            members.sort(key=lambda item: item[0].file_size, reverse=True)
+
+            total = sum(info.file_size for info, _ in members)
+            tracker = _Progress(total, progress)
+            workers = max_workers or min(8, os.cpu_count() or 1)
+            if workers <= 1 or len(members) <= 1 or total < PARALLEL_MIN_BYTES:
+                for info, target in members:
+                    if is_cancelled and is_cancelled():
+                        raise InterruptedError
+                    _extract_member(zip_file, info, target, tracker, is_cancelled, hashes)
+            else:
+                _extract_parallel(archive_path, members, tracker, is_cancelled, workers, hashes)
+            if progress:
+                progress(total, total, "")
+        return True
+    except InterruptedError:
+        shutil.rmtree(dest_dir, ignore_errors=True)
+        return False
+    except Exception:
+        shutil.rmtree(dest_dir, ignore_errors=True)
+        raise
+
+
+def _extract_parallel(archive_path, members, tracker, is_cancelled, workers, hashes=None):
+    """多线程解压文件成员，每个线程打开自己的ZipFile句柄"""
+    local = threading.local()
+    handles = []
+    handles_lock = threading.Lock()
+    failed = threading.Event()
+
+    def cancelled():
+        return failed.is_set() or (is_cancelled is not None and is_cancelled())
+
+    def work(info, target):
+        if cancelled():
+            raise InterruptedError
+        zip_file = getattr(local, "zip_file", None)
+        if zip_file is None:
+            zip_file = local.zip_file = zipfile.ZipFile(archive_path, 'r')
+            with handles_lock:
+                handles.append(zip_file)
+        _extract_member(zip_file, info, target, tracker, cancelled, hashes)
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(work, info, target) for info, target in members]
+            try:
+                for future in as_completed(futures):
+                    future.result()
+            except BaseException:
+                # 一个成员失败或取消后，让其他线程尽快停止
+                failed.set()
+                for future in futures:
+                    future.cancel()
+                raise
+    finally:
+        for zip_file in handles:
+            zip_file.close()
+
+
+def has_7z_support():
+    """是否能读取7z压缩包（需要py7zr）"""
+    return py7zr is not None
+
+
+def is_archive(path):
+    """按扩展名判断是否为支持的压缩包"""
+    return bool(path) and path.lower().endswith(ARCHIVE_SUFFIXES)
+
+
+class ArchiveBackend:
+    """压缩包后端接口
+
+    成员名称使用'/'分隔，目录以'/'结尾（与zipfile.namelist一致）。
+    实例可作为上下文管理器使用，退出时关闭压缩包。
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        pass
+
+    def members(self):
+        """所有成员（ArchiveMember列表）"""
+        raise NotImplementedError
+
+    def namelist(self):
+        return [member.name for member in self.members()]
+
+    def read(self, name):
+        """读取单个成员的内容"""
+        return self.read_many([name])[name]
+
+    def read_many(self, names):
+        """读取多个成员的内容，返回 {名称: bytes}"""
+        raise NotImplementedError
+
+    def extract(self, dest_dir, progress=None, is_cancelled=None, max_workers=None, hashes=None, names=None):
+        """解压全部（或names中的）成员到dest_dir，参数和返回值同 extract_zip
+
+        不能在解压时计算哈希的后端可以不填写hashes，由写入清单时补算。
+        """
+        raise NotImplementedError
+
+    def hash_members(self, max_workers=None, names=None):
+        """计算每个文件成员（或names中的成员）的内容哈希（相对路径 -> blake2b摘要）
+
+        默认实现先解压到系统临时文件夹再并行读取计算（会写出文件），能流式计算的后端应覆盖此方法。
+        """
+        with tempfile.TemporaryDirectory() as temp_dir:
+            self.extract(temp_dir, names=names)
+            rel_paths = [
+                member_rel_path(member.name) for member in self.members()
+                if not member.is_dir and (names is None or member.name in names)
+            ]
+            rel_paths = [rel_path for rel_path in rel_paths if rel_path]
+            with ThreadPoolExecutor(max_workers=max_workers or min(4, os.cpu_count() or 1)) as executor:
+                digests = executor.map(lambda rel_path: hash_file(os.path.join(temp_dir, *rel_path.split("/"))), rel_paths)
+                return dict(zip(rel_paths, digests))
+
+
+class ZipBackend(ArchiveBackend):
+    """zip压缩包（标准库zipfile）"""
+
+    def __init__(self, path):
+        super().__init__(path)
+        self._zip = zipfile.ZipFile(path, 'r')
+
+    def close(self):
+        self._zip.close()
+
+    def members(self):
+        return [ArchiveMember(info.filename, info.file_size, info.is_dir()) for info in self._zip.infolist()]
+
+    def read_many(self, names):
+        return {name: self._zip.read(name) for name in names}
+
+    def extract(self, dest_dir, progress=None, is_cancelled=None, max_workers=None, hashes=None, names=None):
+        return extract_zip(self.path, dest_dir, progress, is_cancelled, max_workers, hashes, names)
+
+    def hash_members(self, max_workers=None, names=None):
+        """流式解压计算哈希，每个线程使用独立的ZipFile句柄"""
+        local = threading.local()
+        handles = []
+        handles_lock = threading.Lock()
+
+        def work(info):
+            zip_file = getattr(local, "zip_file", None)
+            if zip_file is None:
+                zip_file = local.zip_file = zipfile.ZipFile(self.path, 'r')
+                with handles_lock:
+                    handles.append(zip_file)
+            digest = hashlib.blake2b(digest_size=HASH_SIZE)
+            with zip_file.open(info) as src:
+                while True:
+                    chunk = src.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    digest.update(chunk)
+            return digest.digest()
+
+        infos = [
+            info for info in self._zip.infolist()
+            if not info.is_dir() and member_rel_path(info.filename) and (names is None or info.filename in names)
+        ]
+        try:
+            with ThreadPoolExecutor(max_workers=max_workers or min(8, os.cpu_count() or 1)) as executor:
+                digests = executor.map(work, infos)
+                return {member_rel_path(info.filename): digest for info, digest in zip(infos, digests)}
+        finally:
+            for zip_file in handles:
+                zip_file.close()
+
+
+class _SevenZipProgress(ExtractCallback):
+    """把py7zr的解压回调转换为进度回调
+
+    回调在py7zr的报告线程中执行，抛出的异常不会中止解压，因此取消只能在解压结束后生效。
+    """
+
+    def __init__(self, tracker):
+        self.tracker = tracker
+
+    def report_start_preparation(self):
+        pass
+
+    def report_start(self, processing_file_path, processing_bytes):
+        pass
+
+    def report_update(self, decompressed_bytes):
+        pass
+
+    def report_end(self, processing_file_path, wrote_bytes):
+        self.tracker.add(int(wrote_bytes or 0), str(processing_file_path))
+
+    def report_warning(self, message):
+        print(f"[警告] 7z解压: {message}")
+
+    def report_postprocess(self):
+        pass
+
+
+class _HashWriter(Py7zIO):
+    """py7zr的写入对象：只计算内容哈希，不保存数据"""
+
+    def __init__(self):
+        self.digest = hashlib.blake2b(digest_size=HASH_SIZE)
+        self._size = 0
+
+    def write(self, s):
+        self.digest.update(s)
+        self._size += len(s)
+        return len(s)
+
+    def read(self, size=None):
+        return b""
+
+    def seek(self, offset, whence=0):
+        return 0
+
+    def flush(self):
+        pass
+
+    def size(self):
+        return self._size
+
+
+class _HashWriterFactory(WriterFactory):
+    """为每个成员创建 _HashWriter（文件名 -> 写入对象）"""
+
+    def __init__(self):
+        self.writers = {}
+
+    def create(self, filename):
+        writer = self.writers[filename] = _HashWriter()
+        return writer
+
+
+class SevenZipBackend(ArchiveBackend):
+    """7z压缩包（py7zr）
+
+    py7zr的读取和解压会推进内部位置，每次操作都重新打开压缩包；
+    读取多个成员和解压全部成员都只顺序解压一遍固实块。
+    """
+
+    def __init__(self, path):
+        if py7zr is None:
+            raise RuntimeError("读取7z压缩包需要安装py7zr（pip install py7zr）")
+        super().__init__(path)
+        self._members = None
+
+    def _open(self):
+        return py7zr.SevenZipFile(self.path, 'r')
+
+    def members(self):
+        if self._members is None:
+            with self._open() as archive:
+                self._members = [
+                    ArchiveMember(
+                        info.filename.replace("\\", "/") + ("/" if info.is_directory else ""),
+                        0 if info.is_directory else int(info.uncompressed or 0),
+                        info.is_directory
+                    )
+                    for info in archive.list()
+                ]
+        return self._members
+
+    def read_many(self, names):
+        if not names:
+            return {}
+        with self._open() as archive:
+            if hasattr(archive, "read"):
+                data = archive.read(targets=list(names))
+                return {name: data[name].read() for name in names if name in data}
+        # 新版py7zr移除了read()，解压到临时目录后读取
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with self._open() as archive:
+                archive.extract(path=temp_dir, targets=list(names))
+            result = {}
+            for name in names:
+                target = safe_member_path(temp_dir, name)
+                if target and os.path.isfile(target):
+                    with open(target, 'rb') as f:
+                        result[name] = f.read()
+            return result
+
+    def hash_members(self, max_workers=None, names=None):
+        """流式解压到只计算哈希的写入对象，不写出文件（py7zr不支持自定义写入对象时使用默认实现）"""
+        if WriterFactory is object:
+            return super().hash_members(max_workers, names)
+        rel_paths = {
+            member_rel_path(member.name) for member in self.members()
+            if not member.is_dir and (names is None or member.name in names)
+        }
+        rel_paths.discard("")
+        factory = _HashWriterFactory()
+        with self._open() as archive:
+            if names is None:
+                archive.extractall(factory=factory)
+            else:
+                archive.extract(targets=list(names), factory=factory)
+        digests = {member_rel_path(name): writer.digest.digest() for name, writer in factory.writers.items()}
+        # 空文件可能不会创建写入对象
+        empty_digest = hashlib.blake2b(digest_size=HASH_SIZE).digest()
+        return {rel_path: digests.get(rel_path, empty_digest) for rel_path in rel_paths}
+
+    def extract(self, dest_dir, progress=None, is_cancelled=None, max_workers=None, hashes=None, names=None):
+        # py7zr直接写出文件，hashes不填写，由写入清单时补算
+        members = self.members()
+        if names is not None:
+            members = [member for member in members if member.name in names]
+        unsafe = [member.name for member in members if safe_member_path(dest_dir, member.name) is None]
+        if unsafe:
+            raise RuntimeError(f"压缩包包含不安全的路径: {unsafe[0]}")
+        total = sum(member.size for member in members)
+        tracker = _Progress(total, progress)
+        try:
+            os.makedirs(dest_dir, exist_ok=True)
+            with self._open() as archive:
+                if names is None:
+                    archive.extractall(path=dest_dir, callback=_SevenZipProgress(tracker))
+                else:
+                    archive.extract(path=dest_dir, targets=[member.name for member in members],
+                                    callback=_SevenZipProgress(tracker))
+            if is_cancelled and is_cancelled():
+                raise InterruptedError
+            if progress:
+                progress(total, total, "")
+            return True
+        except InterruptedError:
+            shutil.rmtree(dest_dir, ignore_errors=True)
+            return False
+        except Exception:
+            shutil.rmtree(dest_dir, ignore_errors=True)
+            raise
+
+
+def open_archive(path):
+    """按文件头（无法识别时按扩展名）选择后端打开压缩包
+
+    Raises:
+        RuntimeError: 不支持的格式或缺少7z支持
+    """
+    with open(path, 'rb') as f:
+        head = f.read(len(_7Z_MAGIC))
+    suffix = os.path.splitext(path)[1].lower()
+    if head.startswith(_7Z_MAGIC):
+        return SevenZipBackend(path)
+    if head.startswith(_ZIP_MAGIC) or suffix == '.zip':
+        return ZipBackend(path)
+    if suffix == '.7z':
+        return SevenZipBackend(path)
+    raise RuntimeError(f"不支持的压缩包格式: {os.path.basename(path)}")
@@ -0,0 +1,64 @@
+"""
+压缩包解压 - 一次读取压缩包目录得到文件列表和modinfo，后台线程流式解压，报告进度并支持取消
+"""
+from PySide6.QtCore import QThread, Signal
+
+from .archive import open_archive
+
+
+def read_import_info(archive_path):
+    """打开一次压缩包，读取导入面板需要的全部信息
+
+    Returns:
+        dict: file_list（成员名称列表）、members（ArchiveMember列表，用于重复检测）、xml（modinfo中XML的内容或None）、
+              thumbnail（modinfo中PNG的内容或None）、total_size（解压后总大小）
+    """
+    with open_archive(archive_path) as archive:
+        members = archive.members()
+        file_list = [member.name for member in members]
+        modinfo_files = [f for f in file_list if f.startswith('modinfo/') and len(f) > len('modinfo/')]
+        xml_files = [f for f in modinfo_files if f.endswith('.xml')]
+        png_files = [f for f in modinfo_files if f.endswith('.png')]
+        # XML和缩略图一次读取（7z固实压缩包只解压一遍）
+        wanted = xml_files[:1] + png_files[:1]
+        contents = archive.read_many(wanted)
+        return {
+            "file_list": file_list,
+            "members": members,
+            "xml": contents.get(xml_files[0]) if xml_files else None,
+            "thumbnail": contents.get(png_files[0]) if png_files else None,
+            "total_size": sum(member.size for member in members),
+        }
+
+
+class ExtractThread(QThread):
+    """后台解压线程，取消或失败时删除已解压的内容
+
+    解压的同时计算文件内容哈希（member_hashes，相对路径 -> 哈希），写入清单时直接使用。
+    """
+    progress = Signal(object, object, str)   # 已解压字节, 总字节, 当前成员
+    extract_finished = Signal(bool, str)     # 是否完成, 错误信息（取消时为空）
+
+    def __init__(self, archive_path, dest_dir, parent=None):
+        super().__init__(parent)
+        self.archive_path = archive_path
+        self.dest_dir = dest_dir
+        self._cancelled = False
+        self.member_hashes = {}
+
+    def cancel(self):
+        self._cancelled = True
+
+    def is_cancelled(self):
+        return self._cancelled
+
+    def run(self):
+        try:
+            with open_archive(self.archive_path) as archive:
+                completed = archive.extract(
+                    self.dest_dir, progress=self.progress.emit, is_cancelled=self.is_cancelled,
+                    hashes=self.member_hashes
+                )
+            self.extract_finished.emit(completed, "")
+        except Exception as e:
+            self.extract_finished.emit(False, str(e))
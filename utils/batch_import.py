@@ -0,0 +1,386 @@
+"""
+批量导入 - 扫描狩技盒子或导出的mods目录生成导入任务，在线程池中并行导入文件并写入modinfo和文件清单
+
+导入方式（记录在文件清单中）：
+    复制      复制来源文件夹
+    移动      来源与mods目录在同一磁盘时直接移动（重命名），否则改为复制
+    硬链接    来源与mods目录在同一磁盘时为每个文件创建硬链接，否则改为复制
+    引用      mod文件夹中只有指向来源文件的符号链接，不复制任何文件；卸载时只删除链接
+链接方式下modinfo文件夹始终复制，修改modinfo.xml不会影响来源。
+
+扫描和执行都不弹出任何对话框：已存在的mod作为冲突收集起来，由调用方在导入结束后统一处理；
+mod状态和目录缓存也由调用方在全部完成后一次性写入。
+"""
+import os
+import shutil
+import threading
+import uuid
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from PySide6.QtCore import QThread, Signal
+
+from .manifest import (
+    write_mod_manifest, IMPORT_MODE_COPY, IMPORT_MODE_MOVE, IMPORT_MODE_HARDLINK, IMPORT_MODE_REFERENCE
+)
+from .mod_update import replace_mod_folder
+
+
+# 冲突的处理方式
+CONFLICT_OVERWRITE = "overwrite"
+CONFLICT_SKIP = "skip"
+CONFLICT_RENAME = "rename"
+
+
+def mod_folder_name(mod_name):
+    """mod名称对应的文件夹名（与主窗口的命名规则一致）"""
+    return mod_name.replace(" ", "_").replace("/", "_").replace("\\", "_")
+
+
+class ImportJob:
+    """单个mod的导入任务"""
+
+    __slots__ = ("label", "source", "mod_name", "folder_name", "category", "author", "version",
+                 "description", "archive", "write_info", "info_changed", "import_mode", "member_hashes",
+                 "replaced_files")
+
+    def __init__(self, label, source, mod_name, folder_name=None, category="", author="",
+                 version="", description="", archive=None, write_info=True, member_hashes=None):
+        """
+        Args:
+            label: 来源的显示名称（序号文件夹名或导出的文件夹名）
+            source: 来源文件夹，其中的内容复制为mod文件夹（狩技盒子为序号文件夹下的files）
+            mod_name: mod名称
+            folder_name: 目标文件夹名，默认按mod名称生成
+            archive: 来源是压缩包解压出的暂存文件夹时为压缩包路径（清单按普通复制记录）
+            write_info: 是否需要生成modinfo.xml（来源中没有时）
+            member_hashes: 解压时已算出的文件哈希（相对路径 -> 哈希），写入清单时不再读取这些文件
+        """
+        self.label = label
+        self.source = source
+        self.mod_name = mod_name
+        self.folder_name = folder_name or mod_folder_name(mod_name)
+        self.category = category
+        self.author = author
+        self.version = version
+        self.description = description
+        self.archive = archive
+        self.write_info = write_info
+        self.info_changed = False   # 分类或作者在导入前被修改（需要更新已有的modinfo.xml）
+        self.import_mode = None     # 实际使用的导入方式（导入完成后设置）
+        self.member_hashes = member_hashes
+        self.replaced_files = None  # 覆盖导入时旧mod的文件路径（导入完成后设置）
+
+
+def _xml_text(root, *tags):
+    for tag in tags:
+        elem = root.find(f'.//{tag}')
+        if elem is not None and elem.text and elem.text.strip():
+            return elem.text.strip()
+    return ""
+
+
+def scan_hunt_box(hunt_box_dir):
+    """扫描狩技盒子的模组文件夹（序号文件夹，包含files文件夹和info.xml）
+
+    Returns:
+        tuple: (导入任务列表, 跳过的说明列表)
+    """
+    jobs = []
+    skipped = []
+    for entry in sorted(os.scandir(hunt_box_dir), key=lambda e: e.name):
+        if not entry.is_dir():
+            continue
+        if not entry.name.isdigit():
+            skipped.append(f"{entry.name} (不是数字文件夹)")
+            continue
+        file_folder = os.path.join(entry.path, "files")
+        info_xml_path = os.path.join(entry.path, "info.xml")
+        if not os.path.isdir(file_folder):
+            skipped.append(f"{entry.name} (缺少files文件夹)")
+            continue
+        if not os.path.exists(info_xml_path):
+            skipped.append(f"{entry.name} (缺少info.xml)")
+            continue
+
+        mod_name, category, author, version = entry.name, "", "", ""
+        try:
+            root = ET.parse(info_xml_path).getroot()
+            # mod名称优先使用moduleName，其次使用name；modType作为分类
+            mod_name = _xml_text(root, 'moduleName', 'name') or entry.name
+            author = _xml_text(root, 'author')
+            category = _xml_text(root, 'modType')
+            version = _xml_text(root, 'version')
+        except Exception as e:
+            print(f"[警告] 读取info.xml失败 {entry.name}: {e}")
+        jobs.append(ImportJob(entry.name, file_folder, mod_name, category=category, author=author,
+                              version=version))
+    return jobs, skipped
+
+
+def scan_export_mods(mods_export_dir):
+    """扫描导出的mods文件夹（每个子文件夹是一个mod，可能带有modinfo.xml）
+
+    Returns:
+        tuple: (导入任务列表, 跳过的说明列表)
+    """
+    jobs = []
+    for entry in sorted(os.scandir(mods_export_dir), key=lambda e: e.name):
+        if not entry.is_dir() or entry.name == "modinfo":
+            continue
+        mod_name = entry.name.replace("_", " ")
+        category = author = ""
+        xml_file_path = os.path.join(entry.path, "modinfo", "modinfo.xml")
+        has_info = os.path.exists(xml_file_path)
+        if has_info:
+            try:
+                root = ET.parse(xml_file_path).getroot()
+                name_elem = root.find('.//name')
+                if name_elem is not None and name_elem.text:
+                    mod_name = name_elem.text
+                category = _xml_text(root, 'category')
+                author = _xml_text(root, 'author')
+            except Exception:
+                pass
+        jobs.append(ImportJob(entry.name, entry.path, mod_name, folder_name=entry.name,
+                              category=category, author=author, write_info=not has_info))
+    return jobs, []
+
+
+def split_conflicts(jobs, mods_dir):
+    """把任务分为无冲突和有冲突两组（目标文件夹已存在，或与本批中前面的任务同名）"""
+    clean = []
+    conflicts = []
+    taken = set()
+    for job in jobs:
+        key = job.folder_name.lower()
+        if key in taken or os.path.exists(os.path.join(mods_dir, job.folder_name)):
+            conflicts.append(job)
+        else:
+            clean.append(job)
+        taken.add(key)
+    return clean, conflicts
+
+
+def rename_job(job, mods_dir, taken=()):
+    """为冲突的任务选择不冲突的新名称：名称后加 (2)、(3)…"""
+    taken = {name.lower() for name in taken}
+    base_name = job.mod_name
+    index = 2
+    while True:
+        mod_name = f"{base_name} ({index})"
+        folder_name = mod_folder_name(mod_name)
+        if folder_name.lower() not in taken and not os.path.exists(os.path.join(mods_dir, folder_name)):
+            job.mod_name = mod_name
+            job.folder_name = folder_name
+            job.info_changed = True
+            return job
+        index += 1
+
+
+def resolve_conflicts(conflicts, choices, mods_dir):
+    """按选择的处理方式整理冲突的任务
+
+    Args:
+        conflicts: 有冲突的任务列表
+        choices: 与conflicts一一对应的处理方式（CONFLICT_*）
+
+    Returns:
+        tuple: (需要覆盖导入的任务列表, 跳过的任务列表)；改名的任务已换成新名称，不会再冲突
+    """
+    to_import = []
+    skipped = []
+    taken = set()
+    renamed = []
+    for job, choice in zip(conflicts, choices):
+        if choice == CONFLICT_OVERWRITE:
+            # 本批中多个任务覆盖同一个文件夹时只保留第一个
+            if job.folder_name.lower() in taken:
+                skipped.append(job)
+                continue
+            taken.add(job.folder_name.lower())
+            to_import.append(job)
+        elif choice == CONFLICT_RENAME:
+            renamed.append(job)
+        else:
+            skipped.append(job)
+    for job in renamed:
+        rename_job(job, mods_dir, taken)
+        taken.add(job.folder_name.lower())
+        to_import.append(job)
+    return to_import, skipped
+
+
+def _write_modinfo(target_path, job):
+    """生成或更新modinfo.xml"""
+    modinfo_dir = os.path.join(target_path, "modinfo")
+    xml_file_path = os.path.join(modinfo_dir, "modinfo.xml")
+    if job.write_info or not os.path.exists(xml_file_path):
+        os.makedirs(modinfo_dir, exist_ok=True)
+        root = ET.Element("mod")
+        ET.SubElement(root, "name").text = job.mod_name
+        for tag, value in (("category", job.category), ("author", job.author),
+                           ("version", job.version), ("description", job.description)):
+            if value:
+                ET.SubElement(root, tag).text = value
+        ET.ElementTree(root).write(xml_file_path, encoding='utf-8', xml_declaration=True)
+        return
+    if not job.info_changed:
+        return
+    tree = ET.parse(xml_file_path)
+    root = tree.getroot()
+    for tag, value in (("name", job.mod_name), ("category", job.category), ("author", job.author)):
+        elem = root.find(f'.//{tag}')
+        if value:
+            if elem is None:
+                elem = ET.SubElement(root, tag)
+            elem.text = value
+        elif elem is not None:
+            root.remove(elem)
+    tree.write(xml_file_path, encoding='utf-8', xml_declaration=True)
+
+
+def same_volume(path_a, path_b):
+    """两个路径是否在同一磁盘（卷）上"""
+    try:
+        return os.stat(path_a).st_dev == os.stat(path_b).st_dev
+    except OSError:
+        return False
+
+
+def _symlink_file(src, dst):
+    os.symlink(os.path.abspath(src), dst)
+
+
+def _link_tree(source, target, link_function):
+    """按来源的目录结构创建文件夹，文件用link_function链接；顶层的modinfo文件夹单独复制"""
+    source_root = os.path.normcase(os.path.abspath(source))
+
+    def ignore_modinfo(directory, names):
+        if "modinfo" in names and os.path.normcase(os.path.abspath(directory)) == source_root:
+            return ["modinfo"]
+        return []
+
+    shutil.copytree(source, target, copy_function=link_function, ignore=ignore_modinfo)
+    modinfo_source = os.path.join(source, "modinfo")
+    if os.path.isdir(modinfo_source):
+        shutil.copytree(modinfo_source, os.path.join(target, "modinfo"))
+
+
+def transfer_tree(source, target, import_mode=IMPORT_MODE_COPY):
+    """按导入方式把来源文件夹放到目标位置（目标不能已存在）
+
+    Returns:
+        str: 实际使用的导入方式（移动和硬链接不可用时改为复制）
+    """
+    if import_mode in (IMPORT_MODE_MOVE, IMPORT_MODE_HARDLINK):
+        if not same_volume(source, os.path.dirname(target)):
+            print(f"[提示] 来源与mods目录不在同一磁盘，改为复制: {source}")
+            import_mode = IMPORT_MODE_COPY
+    if import_mode == IMPORT_MODE_MOVE:
+        os.rename(source, target)
+        return import_mode
+    if import_mode == IMPORT_MODE_HARDLINK:
+        try:
+            _link_tree(source, target, os.link)
+            return import_mode
+        except Exception as e:
+            # 文件系统不支持硬链接（如FAT32）时改为复制
+            print(f"[提示] 无法创建硬链接，改为复制: {e}")
+            shutil.rmtree(target, ignore_errors=True)
+            import_mode = IMPORT_MODE_COPY
+    if import_mode == IMPORT_MODE_REFERENCE:
+        try:
+            _link_tree(source, target, _symlink_file)
+        except Exception as e:
+            raise OSError(f"无法创建符号链接（Windows需要开启开发者模式或以管理员身份运行）: {e}") from e
+        return import_mode
+    shutil.copytree(source, target)
+    return IMPORT_MODE_COPY
+
+
+def run_import_job(job, mods_dir, overwrite=False, import_mode=IMPORT_MODE_COPY):
+    """执行单个导入任务，返回目标文件夹路径
+
+    覆盖已有的mod时先导入到mods目录旁的暂存文件夹，全部完成后再替换旧的mod文件夹，失败时旧mod保持不变；
+    旧mod的文件路径记录在 job.replaced_files 中，由调用方重新部署已启用的mod。
+    """
+    target_path = os.path.join(mods_dir, job.folder_name)
+    build_path = target_path
+    if os.path.exists(target_path):
+        if not overwrite:
+            raise FileExistsError(f"目标文件夹已存在: {job.folder_name}")
+        staging_root = os.path.join(os.path.dirname(os.path.abspath(mods_dir)), "update_staging")
+        os.makedirs(staging_root, exist_ok=True)
+        build_path = os.path.join(staging_root, uuid.uuid4().hex)
+    transferred = False
+    try:
+        job.import_mode = transfer_tree(job.source, build_path, import_mode)
+        transferred = True
+        _write_modinfo(build_path, job)
+        # 记录完整的文件结构（二进制清单），包括导入方式和来源；
+        # 暂存文件夹只是压缩包解压的中转，按普通复制记录；同时记录文件内容哈希，用于重复检测
+        if job.archive is not None or job.import_mode == IMPORT_MODE_COPY:
+            write_mod_manifest(build_path, with_hash=True, import_mode=IMPORT_MODE_COPY, known_hashes=job.member_hashes)
+        else:
+            write_mod_manifest(
+                build_path, with_hash=True, import_mode=job.import_mode, source=os.path.abspath(job.source),
+                known_hashes=job.member_hashes
+            )
+        if build_path != target_path:
+            job.replaced_files = replace_mod_folder(target_path, build_path)
+    except Exception:
+        if transferred and job.import_mode == IMPORT_MODE_MOVE:
+            # 已移动的文件不能删除，移回来源位置
+            try:
+                os.rename(build_path, job.source)
+            except OSError as e:
+                print(f"[警告] 无法移回来源位置，文件保留在: {build_path} ({e})")
+        else:
+            shutil.rmtree(build_path, ignore_errors=True)
+        raise
+    return target_path
+
+
+class BatchImportThread(QThread):
+    """在线程池中并行执行导入任务"""
+    progress = Signal(int, int, str)          # 已完成数量, 总数, 当前mod名称
+    import_finished = Signal(object, object)  # 成功的任务列表, [(任务, 错误信息)]
+
+    def __init__(self, jobs, mods_dir, overwrite=False, import_mode=IMPORT_MODE_COPY, max_workers=None, parent=None):
+        super().__init__(parent)
+        self.jobs = list(jobs)
+        self.mods_dir = mods_dir
+        self.overwrite = overwrite
+        self.import_mode = import_mode
+        # 复制以磁盘I/O为主，线程数不宜过多
+        self.max_workers = max_workers or min(8, (os.cpu_count() or 1) + 2)
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        """不再开始新的任务（进行中的任务会完成）"""
+        self._cancelled.set()
+
+    def _run_job(self, job):
+        if self._cancelled.is_set():
+            return None
+        run_import_job(job, self.mods_dir, overwrite=self.overwrite, import_mode=self.import_mode)
+        return job
+
+    def run(self):
+        succeeded = []
+        failed = []
+        done = 0
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {executor.submit(self._run_job, job): job for job in self.jobs}
+            for future in as_completed(futures):
+                job = futures[future]
+                try:
+                    if future.result() is not None:
+                        succeeded.append(job)
+                except Exception as e:
+                    failed.append((job, str(e)))
+                    print(f"[失败] 导入mod失败 {job.label}: {e}")
+                done += 1
+                self.progress.emit(done, len(self.jobs), job.mod_name)
+        self.import_finished.emit(succeeded, failed)
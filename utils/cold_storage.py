@@ -0,0 +1,305 @@
+"""
+冷存储 - 长期未启用的mod把文件打包压缩到modinfo文件夹中的压缩包，释放mods目录的空间
+
+冷存储的mod只保留modinfo文件夹（modinfo.xml、缩略图和文件清单），目录缓存、搜索、冲突检测和字典解析
+都只依赖清单，不受影响。启用前先解压恢复：成员由多个线程并行解压到暂存文件夹，再移动回mod文件夹，
+并按清单恢复文件的修改时间，清单和完整性记录保持有效。
+
+压缩包使用zip格式：Python 3.14起标准库zipfile支持zstd，可用时使用zstd，否则使用deflate。
+只处理以复制或移动方式导入的mod；文件与清单不一致的mod不会被打包（避免丢失未记录的修改）。
+"""
+import os
+import shutil
+import threading
+import zipfile
+
+from PySide6.QtCore import QThread, Signal
+
+from .archive import extract_zip, CHUNK_SIZE, _Progress
+from .manifest import load_mod_manifest, scan_folder, IMPORT_MODE_COPY, IMPORT_MODE_MOVE
+
+
+# 冷存储压缩包的文件名（位于mod的modinfo文件夹中）
+COLD_ARCHIVE_NAME = "cold_storage.zip"
+# 压缩方式：标准库支持时使用zstd
+COLD_COMPRESSION = getattr(zipfile, "ZIP_ZSTANDARD", zipfile.ZIP_DEFLATED)
+# 默认未启用多少天后冷存储
+DEFAULT_COLD_DAYS = 30
+
+
+def cold_archive_path(mod_folder_path):
+    return os.path.join(mod_folder_path, "modinfo", COLD_ARCHIVE_NAME)
+
+
+def is_cold(mod_folder_path):
+    """mod是否处于冷存储状态"""
+    return os.path.isfile(cold_archive_path(mod_folder_path))
+
+
+def cold_file_list(mod_folder_path):
+    """冷存储mod的文件列表（取自清单，格式同 scan_folder：目录以'/'结尾）"""
+    manifest = load_mod_manifest(mod_folder_path, migrate=False)
+    return list(manifest.paths) if manifest is not None else []
+
+
+def _check_files(mod_folder_path, manifest):
+    """确认mod文件夹与清单完全一致（路径、大小和修改时间），否则抛出RuntimeError"""
+    on_disk = set()
+    for rel_path, entry, is_dir in scan_folder(mod_folder_path):
+        if entry.is_symlink():
+            raise RuntimeError("包含符号链接")
+        on_disk.add(rel_path)
+        if is_dir:
+            continue
+        recorded = manifest.get(rel_path)
+        st = entry.stat()
+        if recorded is None or recorded.size != st.st_size or recorded.mtime != st.st_mtime:
+            raise RuntimeError("文件与记录不一致")
+    if on_disk != set(manifest.paths):
+        raise RuntimeError("文件与记录不一致")
+
+
+def _remove_files(mod_folder_path, manifest):
+    """删除清单中的文件，再从深到浅删除变空的文件夹"""
+    for rel_path in manifest.file_paths():
+        os.remove(os.path.join(mod_folder_path, *rel_path.split("/")))
+    dir_paths = [path for path in manifest.paths if path.endswith("/")]
+    for rel_path in sorted(dir_paths, key=lambda path: path.count("/"), reverse=True):
+        try:
+            os.rmdir(os.path.join(mod_folder_path, *rel_path.rstrip("/").split("/")))
+        except OSError:
+            pass
+
+
+def freeze_mod(mod_folder_path, progress=None, is_cancelled=None):
+    """把mod的文件打包到冷存储压缩包，成功后删除原文件
+
+    Args:
+        progress: 进度回调 progress(已压缩字节, 总字节, 当前文件)
+        is_cancelled: 返回True时中止，mod文件夹保持不变
+
+    Returns:
+        tuple | None: (原始大小, 压缩包大小)；取消时返回None
+
+    Raises:
+        RuntimeError: mod不能冷存储（没有清单、导入方式不支持或文件与清单不一致）
+    """
+    manifest = load_mod_manifest(mod_folder_path, migrate=False)
+    if manifest is None:
+        raise RuntimeError("没有文件清单")
+    if manifest.import_mode not in (IMPORT_MODE_COPY, IMPORT_MODE_MOVE):
+        raise RuntimeError("文件来自外部文件夹")
+    _check_files(mod_folder_path, manifest)
+
+    archive_path = cold_archive_path(mod_folder_path)
+    tmp_path = archive_path + ".tmp"
+    tracker = _Progress(manifest.total_size, progress)
+    try:
+        with zipfile.ZipFile(tmp_path, 'w', compression=COLD_COMPRESSION, allowZip64=True) as zip_file:
+            for entry in manifest:
+                path = os.path.join(mod_folder_path, *entry.path.rstrip("/").split("/"))
+                if entry.is_dir:
+                    zip_file.write(path, entry.path)
+                    continue
+                info = zipfile.ZipInfo.from_file(path, entry.path)
+                info.compress_type = COLD_COMPRESSION
+                with open(path, 'rb') as src, \
+                        zip_file.open(info, 'w', force_zip64=info.file_size > zipfile.ZIP64_LIMIT) as dst:
+                    while True:
+                        if is_cancelled and is_cancelled():
+                            raise InterruptedError
+                        chunk = src.read(CHUNK_SIZE)
+                        if not chunk:
+                            break
+                        dst.write(chunk)
+                        tracker.add(len(chunk), entry.path)
+        os.replace(tmp_path, archive_path)
+    except InterruptedError:
+        os.remove(tmp_path)
+        return None
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    _remove_files(mod_folder_path, manifest)
+    return manifest.total_size, os.path.getsize(archive_path)
+
+
+def rehydrate_mod(mod_folder_path, staging_dir, progress=None, is_cancelled=None, max_workers=None):
+    """从冷存储压缩包恢复mod的文件
+
+    先并行解压到暂存文件夹（与mods目录位于同一磁盘），完成后逐个移动到mod文件夹，
+    按清单恢复修改时间，最后删除压缩包。中途取消或失败时mod仍处于冷存储状态。
+
+    Returns:
+        bool: 是否完成
+    """
+    if not extract_zip(cold_archive_path(mod_folder_path), staging_dir, progress, is_cancelled, max_workers):
+        return False
+    try:
+        for dir_path, _dirs, files in os.walk(staging_dir):
+            target_dir = os.path.join(mod_folder_path, os.path.relpath(dir_path, staging_dir))
+            os.makedirs(target_dir, exist_ok=True)
+            for file_name in files:
+                os.replace(os.path.join(dir_path, file_name), os.path.join(target_dir, file_name))
+    finally:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+
+    manifest = load_mod_manifest(mod_folder_path, migrate=False)
+    if manifest is not None:
+        for entry in manifest:
+            if not entry.is_dir:
+                os.utime(os.path.join(mod_folder_path, *entry.path.split("/")), (entry.mtime, entry.mtime))
+    os.remove(cold_archive_path(mod_folder_path))
+    return True
+
+
+class ColdStorageResult:
+    """冷存储打包的结果"""
+
+    def __init__(self):
+        self.frozen = []            # 已打包的mod文件夹
+        self.original_bytes = 0
+        self.archive_bytes = 0
+        self.skipped = []           # (mod文件夹, 原因)
+        self.cancelled = False
+
+    @property
+    def saved_bytes(self):
+        return max(0, self.original_bytes - self.archive_bytes)
+
+
+def _path_key(path):
+    return os.path.normcase(os.path.abspath(path))
+
+
+class ColdStorageThread(QThread):
+    """后台把一组mod打包到冷存储
+
+    打包期间mod可能被启用：每个mod打包前再用 skip_check 确认，
+    即将启用的mod由 exclude() 排除（正在打包时中止并等待它结束）。
+    """
+    progress = Signal(object, object, str)      # 已压缩字节, 总字节, 当前mod文件夹
+    freeze_finished = Signal(object)            # ColdStorageResult
+
+    def __init__(self, mod_folder_paths, skip_check=None, parent=None):
+        """
+        Args:
+            skip_check: skip_check(mod文件夹) 返回True时不再打包该mod（如已被启用）
+        """
+        super().__init__(parent)
+        self.mod_folder_paths = list(mod_folder_paths)
+        self.skip_check = skip_check
+        self._cancelled = False
+        self._excluded = set()
+        self._current = None
+        self._condition = threading.Condition()
+
+    def cancel(self):
+        self._cancelled = True
+
+    def is_cancelled(self):
+        return self._cancelled
+
+    def exclude(self, mod_folder_paths):
+        """不再打包这些mod；其中之一正在打包时中止它，并等待打包线程离开该mod
+
+        返回后这些mod要么保持原样，要么已完整打包（is_cold为True，可以正常恢复）。
+        """
+        keys = {_path_key(path) for path in mod_folder_paths}
+        with self._condition:
+            self._excluded |= keys
+            self._condition.wait_for(lambda: self._current not in keys)
+
+    def run(self):
+        result = ColdStorageResult()
+        sizes = {}
+        for mod_folder_path in self.mod_folder_paths:
+            manifest = load_mod_manifest(mod_folder_path, migrate=False)
+            sizes[mod_folder_path] = manifest.total_size if manifest is not None else 0
+        total = sum(sizes.values())
+        offset = 0
+        for mod_folder_path in self.mod_folder_paths:
+            if self._cancelled:
+                result.cancelled = True
+                break
+            base = offset
+            offset += sizes[mod_folder_path]
+            key = _path_key(mod_folder_path)
+            with self._condition:
+                if key in self._excluded or (self.skip_check is not None and self.skip_check(mod_folder_path)):
+                    result.skipped.append((mod_folder_path, "已启用"))
+                    continue
+                self._current = key
+            try:
+                frozen_sizes = freeze_mod(
+                    mod_folder_path,
+                    progress=lambda done, _total, _member, base=base, path=mod_folder_path:
+                        self.progress.emit(base + done, total, path),
+                    is_cancelled=lambda key=key: self._cancelled or key in self._excluded
+                )
+            except Exception as e:
+                result.skipped.append((mod_folder_path, str(e)))
+                continue
+            finally:
+                with self._condition:
+                    self._current = None
+                    self._condition.notify_all()
+            if frozen_sizes is None:
+                if key in self._excluded:
+                    result.skipped.append((mod_folder_path, "已启用"))
+                    continue
+                result.cancelled = True
+                break
+            result.frozen.append(mod_folder_path)
+            result.original_bytes += frozen_sizes[0]
+            result.archive_bytes += frozen_sizes[1]
+        self.progress.emit(total, total, "")
+        self.freeze_finished.emit(result)
+
+
+class RehydrateThread(QThread):
+    """后台从冷存储恢复一组mod（每个压缩包由多个线程并行解压）"""
+    progress = Signal(object, object, str)      # 已解压字节, 总字节, 当前mod文件夹
+    rehydrate_finished = Signal(object, str)    # 已恢复的mod文件夹列表, 错误信息（取消时为空）
+
+    def __init__(self, mod_folder_paths, staging_root, max_workers=None, parent=None):
+        super().__init__(parent)
+        self.mod_folder_paths = list(mod_folder_paths)
+        self.staging_root = staging_root
+        self.max_workers = max_workers
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def is_cancelled(self):
+        return self._cancelled
+
+    def run(self):
+        restored = []
+        sizes = {}
+        for mod_folder_path in self.mod_folder_paths:
+            manifest = load_mod_manifest(mod_folder_path, migrate=False)
+            sizes[mod_folder_path] = manifest.total_size if manifest is not None else 0
+        total = sum(sizes.values())
+        offset = 0
+        try:
+            for mod_folder_path in self.mod_folder_paths:
+                base = offset
+                staging_dir = os.path.join(self.staging_root, os.path.basename(mod_folder_path))
+                completed = rehydrate_mod(
+                    mod_folder_path, staging_dir,
+                    progress=lambda done, _total, _member, base=base, path=mod_folder_path:
+                        self.progress.emit(base + done, total, path),
+                    is_cancelled=self.is_cancelled, max_workers=self.max_workers
+                )
+                if not completed:
+                    self.rehydrate_finished.emit(restored, "")
+                    return
+                restored.append(mod_folder_path)
+                offset += sizes[mod_folder_path]
+            self.rehydrate_finished.emit(restored, "")
+        except Exception as e:
+            self.rehydrate_finished.emit(restored, f"{os.path.basename(mod_folder_path)}: {e}")
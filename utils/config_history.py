@@ -0,0 +1,178 @@
+"""
+模组配置历史 - 基于使用日志重建任意时间点的启用列表和优先级，定期保存检查点以加快重建
+"""
+import os
+import json
+import threading
+
+
+# 影响模组配置的日志动作
+CONFIG_ACTIONS = ("enabled", "disabled", "priority", "priorities")
+
+
+class ConfigState:
+    """某一时刻的模组配置：启用的mod集合和冲突优先级"""
+
+    __slots__ = ("seq", "enabled", "priorities")
+
+    def __init__(self, seq, enabled, priorities):
+        self.seq = seq
+        self.enabled = set(enabled)
+        self.priorities = {key: list(order) for key, order in priorities.items()}
+
+    def copy(self):
+        return ConfigState(self.seq, self.enabled, self.priorities)
+
+    def to_dict(self):
+        return {"seq": self.seq, "enabled": sorted(self.enabled), "priorities": self.priorities}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data.get("seq", 0), data.get("enabled", []), data.get("priorities", {}))
+
+
+def _apply_forward(state, event):
+    """把事件应用到配置上（按时间顺序重放）"""
+    action = event.get("action")
+    if action == "enabled":
+        state.enabled.add(event.get("mod_name"))
+    elif action == "disabled":
+        state.enabled.discard(event.get("mod_name"))
+    elif action == "priority":
+        state.priorities[event["key"]] = list(event.get("order", []))
+    elif action == "priorities":
+        state.priorities = {key: list(order) for key, order in event.get("priorities", {}).items()}
+    state.seq = event.get("seq", state.seq)
+
+
+def _apply_backward(state, event):
+    """撤销事件对配置的影响（逆序重放）
+
+    新版日志记录了事件之前的状态（was_enabled、previous）；迁移自旧版ini的记录没有，
+    只能按启用/禁用互为相反动作处理。
+    """
+    action = event.get("action")
+    mod_name = event.get("mod_name")
+    if action in ("enabled", "disabled"):
+        was_enabled = event.get("was_enabled", action == "disabled")
+        if was_enabled:
+            state.enabled.add(mod_name)
+        else:
+            state.enabled.discard(mod_name)
+    elif action == "priority":
+        previous = event.get("previous")
+        if previous:
+            state.priorities[event["key"]] = list(previous)
+        else:
+            state.priorities.pop(event["key"], None)
+    elif action == "priorities" and "previous" in event:
+        state.priorities = {key: list(order) for key, order in event["previous"].items()}
+    state.seq = event.get("seq", state.seq) - 1
+
+
+class ConfigHistory:
+    """模组配置历史
+
+    检查点保存在JSONL文件中，每隔 checkpoint_interval 条日志写入一个。
+    重建时从目标之前最近的检查点开始向后重放日志；目标早于第一个检查点时，
+    从第一个检查点开始逆序撤销日志。
+    """
+
+    def __init__(self, usage_log, checkpoint_file, checkpoint_interval=200):
+        """
+        Args:
+            usage_log: UsageLog实例
+            checkpoint_file: 检查点文件路径
+            checkpoint_interval: 两个检查点之间的日志条数
+        """
+        self.usage_log = usage_log
+        self.checkpoint_file = checkpoint_file
+        self.checkpoint_interval = checkpoint_interval
+        self._lock = threading.Lock()
+        self._checkpoints = []   # 按seq升序的ConfigState
+        self._load_checkpoints()
+
+    def _load_checkpoints(self):
+        if not os.path.exists(self.checkpoint_file):
+            return
+        try:
+            with open(self.checkpoint_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        self._checkpoints.append(ConfigState.from_dict(json.loads(line)))
+                    except ValueError:
+                        pass  # 未写完的行
+        except Exception as e:
+            print(f"[警告] 加载配置检查点失败: {e}")
+        # 日志被清空或分段被删除后，超出日志范围的检查点无效
+        last_seq = self.usage_log.last_seq
+        self._checkpoints = sorted(
+            (cp for cp in self._checkpoints if cp.seq <= last_seq),
+            key=lambda cp: cp.seq
+        )
+
+    def _write_checkpoint(self, state):
+        os.makedirs(os.path.dirname(self.checkpoint_file), exist_ok=True)
+        with open(self.checkpoint_file, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(state.to_dict(), ensure_ascii=False) + "\n")
+        self._checkpoints.append(state.copy())
+
+    @property
+    def has_baseline(self):
+        """是否已有检查点（没有时需要先用当前配置建立基准）"""
+        return bool(self._checkpoints)
+
+    def set_baseline(self, enabled, priorities):
+        """以当前配置作为最新日志位置的检查点（首次使用时调用）"""
+        with self._lock:
+            self._write_checkpoint(ConfigState(self.usage_log.last_seq, enabled, priorities))
+
+    def maybe_checkpoint(self):
+        """距上一个检查点的日志足够多时写入新的检查点"""
+        with self._lock:
+            last_seq = self.usage_log.last_seq
+            if self._checkpoints and last_seq - self._checkpoints[-1].seq < self.checkpoint_interval:
+                return
+        state = self.state_at(seq=last_seq)
+        if state is not None:
+            with self._lock:
+                self._write_checkpoint(state)
+
+    def state_at(self, seq=None, ts=None):
+        """重建指定日志位置或时间点的配置
+
+        Args:
+            seq: 日志序号（包含该条事件的影响）
+            ts: 时间戳，与seq二选一
+
+        Returns:
+            ConfigState，没有任何检查点时返回None
+        """
+        if seq is None:
+            seq = self.usage_log.seq_at(ts) if ts is not None else self.usage_log.last_seq
+        with self._lock:
+            if not self._checkpoints:
+                return None
+            base = None
+            for checkpoint in self._checkpoints:
+                if checkpoint.seq <= seq:
+                    base = checkpoint
+                else:
+                    break
+            if base is None:
+                base = self._checkpoints[0]
+            state = base.copy()
+
+        if base.seq <= seq:
+            events = self.usage_log.query(action=CONFIG_ACTIONS, after_seq=base.seq, until_seq=seq)
+            for event in events:
+                _apply_forward(state, event)
+        else:
+            events = self.usage_log.query(action=CONFIG_ACTIONS, after_seq=seq, until_seq=base.seq, newest_first=True)
+            for event in events:
+                _apply_backward(state, event)
+        state.seq = seq
+        return state
@@ -0,0 +1,269 @@
+"""
+内容哈希索引 - 记录导入过的压缩包的整体哈希（blake2b），导入时判断压缩包与已有mod的关系：
+完全相同、某个mod的新版本（文件大量重合），或新mod
+
+判断分两步：
+    1. 只用压缩包目录（路径和大小）和搜索索引的全库路径列表，立即得出结果；
+    2. 后台流式计算压缩包的整体哈希，必要时计算成员的内容哈希，与清单中记录的文件哈希比较，确认结果。
+"""
+import os
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from PySide6.QtCore import QThread, Signal
+
+from .archive import open_archive, member_rel_path
+from .manifest import hash_file, load_mod_manifest
+from .search_index import normalize_path
+
+
+MATCH_IDENTICAL = "identical"
+MATCH_NEWER = "newer"
+MATCH_NEW = "new"
+
+# 与已有mod重合的文件比例达到此值时视为其新版本
+OVERLAP_THRESHOLD = 0.6
+# 按重合文件数取前几个候选mod读取清单比较
+MAX_CANDIDATES = 5
+
+
+def archive_hash(archive_path):
+    """压缩包整体的内容哈希（流式读取，十六进制字符串）"""
+    return hash_file(archive_path).hex()
+
+
+def mod_member_files(members):
+    """压缩包中属于mod内容的文件成员（不含目录和modinfo文件夹，与清单记录的范围一致）
+
+    Returns:
+        dict: 相对路径（与清单路径格式一致） -> ArchiveMember
+    """
+    files = {}
+    for member in members:
+        rel_path = member_rel_path(member.name)
+        if member.is_dir or rel_path is None or "modinfo" in rel_path.split("/")[:-1]:
+            continue
+        files[rel_path] = member
+    return files
+
+
+def archive_files(members, hashes=None):
+    """压缩包中的文件，用于重复检测
+
+    Args:
+        members: ArchiveMember列表
+        hashes: 已知的成员内容哈希（相对路径 -> 哈希）
+
+    Returns:
+        dict: 规范化的路径 -> (大小, 哈希或None)
+    """
+    return {
+        normalize_path(rel_path): (member.size, hashes.get(rel_path) if hashes else None)
+        for rel_path, member in mod_member_files(members).items()
+    }
+
+
+class DuplicateReport:
+    """压缩包与已有mod的比较结果"""
+
+    def __init__(self, kind, folder=None, shared=0, total=0, verified=True):
+        """
+        Args:
+            kind: MATCH_*
+            folder: 相同或更旧的已有mod文件夹名
+            shared: 重合的文件数
+            total: 两者中较多的文件数
+            verified: 完全相同的结论是否已由内容哈希确认（否则只是路径和大小一致）
+        """
+        self.kind = kind
+        self.folder = folder
+        self.shared = shared
+        self.total = total
+        self.verified = verified
+
+    @property
+    def ratio(self):
+        return self.shared / self.total if self.total else 0.0
+
+    def message(self):
+        """显示给用户的说明"""
+        if self.kind == MATCH_IDENTICAL:
+            if self.verified:
+                return f"与已有mod「{self.folder}」完全相同"
+            return f"与已有mod「{self.folder}」的文件和大小一致，正在校验内容..."
+        if self.kind == MATCH_NEWER:
+            return f"与已有mod「{self.folder}」有 {self.ratio:.0%} 的文件重合，可能是它的新版本"
+        return "新mod"
+
+    def short_text(self):
+        """导入队列状态列中的简短说明"""
+        if self.kind == MATCH_IDENTICAL:
+            return f"与「{self.folder}」相同" if self.verified else f"可能与「{self.folder}」相同"
+        if self.kind == MATCH_NEWER:
+            return f"「{self.folder}」的新版本？"
+        return ""
+
+
+class ArchiveHashIndex:
+    """压缩包哈希 -> mod文件夹名 的持久索引（JSON文件）"""
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self._lock = threading.Lock()
+        self._folders = {}
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.file_path):
+            return
+        try:
+            with open(self.file_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception as e:
+            print(f"[失败] 加载压缩包哈希索引失败: {e}")
+            return
+        if isinstance(data, dict):
+            self._folders = {str(k): str(v) for k, v in data.items()}
+
+    def _save(self):
+        with self._lock:
+            data = dict(self._folders)
+        try:
+            os.makedirs(os.path.dirname(self.file_path), exist_ok=True)
+            tmp_path = self.file_path + ".tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.file_path)
+        except Exception as e:
+            print(f"[失败] 保存压缩包哈希索引失败: {e}")
+
+    def get(self, digest):
+        with self._lock:
+            return self._folders.get(digest)
+
+    def add(self, digest, folder):
+        """记录压缩包导入为folder"""
+        with self._lock:
+            self._folders[digest] = folder
+        self._save()
+
+    def remove_folder(self, folder):
+        """mod卸载后移除指向它的记录"""
+        with self._lock:
+            stale = [digest for digest, name in self._folders.items() if name == folder]
+            for digest in stale:
+                del self._folders[digest]
+        if stale:
+            self._save()
+
+
+def _installed_hashes(mod_folder_path, manifest, paths):
+    """已有mod中指定文件的内容哈希：优先使用清单记录的，没有记录的并行读取计算
+
+    Returns:
+        dict: 规范化的路径 -> 哈希
+    """
+    result = {}
+    missing = []
+    for entry in manifest:
+        key = normalize_path(entry.path)
+        if entry.is_dir or key not in paths:
+            continue
+        if entry.hash:
+            result[key] = entry.hash
+        else:
+            missing.append((key, os.path.join(mod_folder_path, *entry.path.split("/"))))
+    if missing:
+        with ThreadPoolExecutor(max_workers=min(4, os.cpu_count() or 1)) as executor:
+            for (key, _), digest in zip(missing, executor.map(lambda item: hash_file(item[1]), missing)):
+                result[key] = digest
+    return result
+
+
+def classify_archive(files, search_index, mods_dir, digest=None, hash_index=None, verify=False):
+    """判断压缩包与已有mod的关系
+
+    Args:
+        files: archive_files 的结果
+        search_index: 已同步的搜索索引（提供全库路径列表）
+        digest: 压缩包整体哈希，已知时先查哈希索引
+        verify: 路径和大小完全一致时，是否用内容哈希确认（files中需要有成员哈希）
+
+    Returns:
+        DuplicateReport
+    """
+    if digest and hash_index is not None:
+        folder = hash_index.get(digest)
+        if folder and os.path.isdir(os.path.join(mods_dir, folder)):
+            return DuplicateReport(MATCH_IDENTICAL, folder, len(files), len(files))
+
+    shared_counts = search_index.shared_files(files)
+    best = None
+    candidates = sorted(shared_counts.items(), key=lambda item: item[1], reverse=True)[:MAX_CANDIDATES]
+    for folder, shared in candidates:
+        mod_folder_path = os.path.join(mods_dir, folder)
+        manifest = load_mod_manifest(mod_folder_path, migrate=False)
+        if manifest is None:
+            continue
+        installed = {normalize_path(entry.path): entry.size for entry in manifest if not entry.is_dir}
+        report = DuplicateReport(MATCH_NEWER, folder, shared, max(len(files), len(installed)))
+        if shared == len(files) == len(installed) and all(installed[path] == size for path, (size, _) in files.items()):
+            # 路径和大小完全一致：成员哈希已知时逐个比较内容，否则先按可能相同报告
+            if not verify or any(file_hash is None for _, file_hash in files.values()):
+                return DuplicateReport(MATCH_IDENTICAL, folder, shared, shared, verified=False)
+            installed_hashes = _installed_hashes(mod_folder_path, manifest, files)
+            if all(installed_hashes.get(path) == file_hash for path, (_, file_hash) in files.items()):
+                return DuplicateReport(MATCH_IDENTICAL, folder, shared, shared)
+        if best is None or report.ratio > best.ratio:
+            best = report
+    if best is not None and best.ratio >= OVERLAP_THRESHOLD:
+        return best
+    return DuplicateReport(MATCH_NEW)
+
+
+class DuplicateChecker:
+    """导入时的重复检测（可在工作线程中调用）"""
+
+    def __init__(self, mods_dir, search_index, catalog, hash_index):
+        self.mods_dir = mods_dir
+        self.search_index = search_index
+        self.catalog = catalog
+        self.hash_index = hash_index
+
+    def check(self, files, digest=None, verify=False):
+        self.search_index.sync(self.catalog)
+        return classify_archive(files, self.search_index, self.mods_dir, digest, self.hash_index, verify)
+
+
+class DuplicateCheckThread(QThread):
+    """导入面板打开时在后台检测压缩包是否重复
+
+    先用压缩包目录立即给出结果，再流式计算压缩包哈希确认；
+    只有路径和大小与已有mod完全一致时才解压计算成员的内容哈希。
+    """
+    checked = Signal(object)    # DuplicateReport，可能发出两次（初步结果和确认后的结果）
+
+    def __init__(self, archive_path, members, checker, parent=None):
+        super().__init__(parent)
+        self.archive_path = archive_path
+        self.members = members
+        self.checker = checker
+        self.digest = None
+        self.imported_folder = None     # 哈希算完之前已导入时，由界面设置为导入的文件夹名
+
+    def run(self):
+        try:
+            files = archive_files(self.members)
+            report = self.checker.check(files)
+            self.checked.emit(report)
+            self.digest = archive_hash(self.archive_path)
+            confirmed = self.checker.check(files, self.digest)
+            if confirmed.kind == MATCH_IDENTICAL and not confirmed.verified:
+                with open_archive(self.archive_path) as archive:
+                    files = archive_files(self.members, archive.hash_members())
+                confirmed = self.checker.check(files, self.digest, verify=True)
+            if confirmed.kind != report.kind or confirmed.folder != report.folder or not report.verified:
+                self.checked.emit(confirmed)
+        except Exception as e:
+            print(f"[警告] 重复检测失败: {e}")
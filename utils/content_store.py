@@ -0,0 +1,233 @@
+"""
+内容寻址存储 - 相同内容的文件只保存一份：store/objects 中按内容哈希保存文件，mods中的文件是它的硬链接
+
+对象的引用计数就是文件系统的硬链接数：对象本身占一个链接，每个引用它的mod文件再占一个；
+卸载或更新mod后，硬链接数降为1的对象不再被任何mod使用，随即删除。
+只处理以复制或移动方式导入的mod（引用和硬链接方式导入的mod文件属于外部来源），modinfo文件夹不参与。
+存储与mods目录必须位于同一磁盘（硬链接不能跨卷）。
+
+共享的文件是同一个文件：直接改写mods中的文件会影响所有共享它的mod。
+程序自身的更新都是替换文件（os.replace），不会改写共享的内容。
+"""
+import os
+import stat
+from concurrent.futures import ThreadPoolExecutor
+
+from PySide6.QtCore import QThread, Signal
+
+from .manifest import hash_file, load_mod_manifest, write_mod_manifest, IMPORT_MODE_COPY, IMPORT_MODE_MOVE
+
+
+def format_size(num_bytes):
+    """字节数的可读形式"""
+    size = float(num_bytes)
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+class StoreStats:
+    """存储的统计：对象数、实际占用和按引用展开后的大小"""
+
+    def __init__(self, objects=0, stored_bytes=0, referenced_bytes=0):
+        self.objects = objects
+        self.stored_bytes = stored_bytes
+        self.referenced_bytes = referenced_bytes
+
+    @property
+    def saved_bytes(self):
+        return max(0, self.referenced_bytes - self.stored_bytes)
+
+
+class ContentStore:
+    """内容寻址存储（对象路径为 objects/哈希前2位/其余部分）"""
+
+    def __init__(self, root):
+        self.root = root
+        self.objects_dir = os.path.join(root, "objects")
+
+    def object_path(self, digest):
+        hex_digest = digest.hex()
+        return os.path.join(self.objects_dir, hex_digest[:2], hex_digest[2:])
+
+    def same_volume(self, path):
+        """path是否与存储位于同一磁盘（可以建立硬链接）"""
+        os.makedirs(self.objects_dir, exist_ok=True)
+        try:
+            return os.stat(self.objects_dir).st_dev == os.stat(path).st_dev
+        except OSError:
+            return False
+
+    def _mod_files(self, mod_folder_path, manifest):
+        """mod中的普通文件 (相对路径, 完整路径, stat, 已知哈希)
+
+        清单中大小和修改时间都与磁盘一致的文件使用记录的哈希，其余的需要重新计算。
+        """
+        files = []
+        for entry in manifest:
+            if entry.is_dir:
+                continue
+            path = os.path.join(mod_folder_path, *entry.path.split("/"))
+            try:
+                st = os.lstat(path)
+            except OSError:
+                continue
+            if not stat.S_ISREG(st.st_mode):
+                continue
+            known = entry.hash if entry.hash and entry.size == st.st_size and entry.mtime == st.st_mtime else None
+            files.append((entry.path, path, st, known))
+        return files
+
+    def ingest(self, mod_folder_path, executor):
+        """把mod的文件链接到存储
+
+        存储中还没有的内容直接把该文件作为对象（建立硬链接，不复制）；已有的内容把mod中的文件替换为对象的硬链接。
+
+        Args:
+            executor: 计算哈希用的线程池（哈希在遍历时并行计算）
+
+        Returns:
+            tuple: (改为硬链接的文件数, 节省的字节数)
+        """
+        manifest = load_mod_manifest(mod_folder_path)
+        if manifest is None:
+            manifest = write_mod_manifest(mod_folder_path, with_hash=True)
+        if manifest.import_mode not in (IMPORT_MODE_COPY, IMPORT_MODE_MOVE):
+            return 0, 0
+        files = self._mod_files(mod_folder_path, manifest)
+        digests = executor.map(lambda item: item[3] or hash_file(item[1]), files)
+
+        linked_count = 0
+        saved_bytes = 0
+        hashes = {}
+        for (rel_path, path, st, _), digest in zip(files, digests):
+            hashes[rel_path] = digest
+            object_path = self.object_path(digest)
+            try:
+                object_st = os.stat(object_path)
+            except FileNotFoundError:
+                os.makedirs(os.path.dirname(object_path), exist_ok=True)
+                os.link(path, object_path)
+                continue
+            if (object_st.st_dev, object_st.st_ino) == (st.st_dev, st.st_ino):
+                continue
+            if object_st.st_size != st.st_size:
+                print(f"[警告] 存储对象大小不一致，跳过: {rel_path}")
+                continue
+            tmp_path = path + ".dedup"
+            os.link(object_path, tmp_path)
+            os.replace(tmp_path, path)
+            linked_count += 1
+            if st.st_nlink <= 1:
+                saved_bytes += st.st_size
+
+        if linked_count:
+            # 硬链接后文件的修改时间变为对象的修改时间，重写清单
+            write_mod_manifest(mod_folder_path, with_hash=True, known_hashes=hashes)
+        return linked_count, saved_bytes
+
+    def release(self, digests):
+        """mod卸载后释放它引用的对象：硬链接数降为1（只剩对象本身）的删除
+
+        Returns:
+            int: 释放的字节数
+        """
+        freed = 0
+        for digest in set(digests):
+            object_path = self.object_path(digest)
+            try:
+                st = os.stat(object_path)
+                if st.st_nlink <= 1:
+                    os.remove(object_path)
+                    freed += st.st_size
+            except OSError:
+                continue
+        return freed
+
+    def _iter_objects(self):
+        if not os.path.isdir(self.objects_dir):
+            return
+        with os.scandir(self.objects_dir) as prefixes:
+            prefix_dirs = [entry.path for entry in prefixes if entry.is_dir()]
+        for prefix_dir in prefix_dirs:
+            with os.scandir(prefix_dir) as entries:
+                for entry in entries:
+                    try:
+                        # Windows上DirEntry.stat不包含硬链接数，使用os.stat
+                        yield entry.path, os.stat(entry.path)
+                    except OSError:
+                        continue
+
+    def collect_garbage(self):
+        """删除不再被任何mod引用的对象，返回释放的字节数"""
+        freed = 0
+        for object_path, st in list(self._iter_objects()):
+            if st.st_nlink <= 1:
+                try:
+                    os.remove(object_path)
+                    freed += st.st_size
+                except OSError:
+                    continue
+        return freed
+
+    def stats(self):
+        stats = StoreStats()
+        for _, st in self._iter_objects():
+            stats.objects += 1
+            stats.stored_bytes += st.st_size
+            stats.referenced_bytes += st.st_size * max(0, st.st_nlink - 1)
+        return stats
+
+
+class DedupResult:
+    """去重扫描的结果"""
+
+    def __init__(self):
+        self.mod_count = 0
+        self.changed_folders = []   # 文件被改为硬链接的mod文件夹
+        self.linked_files = 0
+        self.saved_bytes = 0
+        self.freed_bytes = 0        # 清理无引用对象释放的空间
+        self.failed = []            # (mod文件夹, 错误信息)
+        self.stats = None
+
+
+class DedupThread(QThread):
+    """后台把一组mod链接到内容寻址存储，结束时清理无引用的对象并统计"""
+    progress = Signal(int, int, str)        # 已处理数, 总数, 当前mod文件夹
+    dedup_finished = Signal(object)         # DedupResult
+
+    def __init__(self, store, mod_folder_paths, max_workers=None, parent=None):
+        super().__init__(parent)
+        self.store = store
+        self.mod_folder_paths = list(mod_folder_paths)
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+
+    def run(self):
+        result = DedupResult()
+        total = len(self.mod_folder_paths)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for index, mod_folder_path in enumerate(self.mod_folder_paths):
+                self.progress.emit(index, total, mod_folder_path)
+                if not self.store.same_volume(mod_folder_path):
+                    result.failed.append((mod_folder_path, "与存储不在同一磁盘"))
+                    continue
+                try:
+                    linked_count, saved_bytes = self.store.ingest(mod_folder_path, executor)
+                except Exception as e:
+                    print(f"[失败] 文件去重失败 {os.path.basename(mod_folder_path)}: {e}")
+                    result.failed.append((mod_folder_path, str(e)))
+                    continue
+                result.mod_count += 1
+                if linked_count:
+                    result.changed_folders.append(mod_folder_path)
+                    result.linked_files += linked_count
+                    result.saved_bytes += saved_bytes
+        self.progress.emit(total, total, "")
+        try:
+            result.freed_bytes = self.store.collect_garbage()
+            result.stats = self.store.stats()
+        except Exception as e:
+            print(f"[警告] 统计内容存储失败: {e}")
+        self.dedup_finished.emit(result)
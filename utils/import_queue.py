@@ -0,0 +1,208 @@
+"""
+导入队列 - 一次加入多个压缩包，后台并行读取modinfo并解压到暂存文件夹，确认信息后统一导入
+
+同时处理的压缩包数量受I/O预算限制：每个压缩包用一个线程顺序解压，预算即解压线程的总数。
+暂存文件夹与mods目录位于同一磁盘，导入时直接移动，不需要再复制一遍。
+解压的同时计算文件内容哈希，解压完成后计算压缩包整体哈希并检测是否与已有mod重复。
+"""
+import os
+import uuid
+import shutil
+import threading
+import xml.etree.ElementTree as ET
+
+from PySide6.QtCore import QObject, Signal
+
+from .archive import open_archive
+from .archive_extract import read_import_info
+from .content_index import archive_hash, archive_files, MATCH_NEW
+
+
+# 默认的I/O预算（同时解压的压缩包数量）
+DEFAULT_IO_BUDGET = 2
+MAX_IO_BUDGET = 8
+
+STATUS_WAITING = "等待中"
+STATUS_INDEXING = "读取中"
+STATUS_EXTRACTING = "解压中"
+STATUS_READY = "就绪"
+STATUS_IMPORTING = "导入中"
+STATUS_FAILED = "失败"
+
+
+class QueueItem:
+    """队列中的一个压缩包"""
+
+    def __init__(self, archive_path, staging_dir):
+        self.archive_path = archive_path
+        self.staging_dir = staging_dir
+        self.mod_name = os.path.splitext(os.path.basename(archive_path))[0]
+        self.category = ""
+        self.author = ""
+        self.description = ""
+        self.version = ""
+        self.total_size = 0
+        self.done = 0
+        self.status = STATUS_WAITING
+        self.error = ""
+        self.cancelled = False
+        self.edited = set()     # 用户已在列表中修改过的字段（不再用modinfo覆盖）
+        self.member_hashes = {}     # 解压时算出的文件哈希
+        self.archive_hash = None
+        self.duplicate = None       # DuplicateReport
+
+    @property
+    def file_name(self):
+        return os.path.basename(self.archive_path)
+
+    def status_text(self):
+        """状态列显示的文字"""
+        if self.status == STATUS_EXTRACTING and self.total_size:
+            return f"{STATUS_EXTRACTING} {self.done * 100 // self.total_size}%"
+        if self.status == STATUS_FAILED and self.error:
+            return f"{STATUS_FAILED}: {self.error}"
+        if self.status == STATUS_READY and self.duplicate is not None and self.duplicate.kind != MATCH_NEW:
+            return f"{STATUS_READY}（{self.duplicate.short_text()}）"
+        return self.status
+
+
+def _apply_modinfo(item, xml_bytes):
+    """用压缩包中modinfo.xml的内容预填mod信息（跳过用户已修改的字段）"""
+    try:
+        root = ET.fromstring(xml_bytes)
+    except ET.ParseError as e:
+        print(f"[警告] 解析modinfo.xml失败 {item.file_name}: {e}")
+        return
+    for attr in ("name", "category", "author", "description", "version"):
+        field = "mod_name" if attr == "name" else attr
+        if field in item.edited:
+            continue
+        elem = root.find(f'.//{attr}')
+        if elem is not None and elem.text and elem.text.strip():
+            setattr(item, field, elem.text.strip())
+
+
+class ImportQueue(QObject):
+    """导入队列
+
+    条目按加入顺序处理：读取压缩包目录和modinfo（预填名称、分类、作者等），然后解压到暂存文件夹。
+    工作线程只修改自己的条目，并通过 item_changed 通知界面；队列本身只在主线程中修改。
+    """
+    item_changed = Signal(object)   # 条目的状态、信息或进度发生变化
+    _job_done = Signal(object)      # 工作线程结束（内部使用，回到主线程继续调度）
+
+    def __init__(self, staging_root, io_budget=DEFAULT_IO_BUDGET, duplicate_checker=None, parent=None):
+        super().__init__(parent)
+        self.staging_root = staging_root
+        self.duplicate_checker = duplicate_checker
+        self.io_budget = max(1, min(MAX_IO_BUDGET, int(io_budget)))
+        self.items = []
+        self._running = 0
+        self._job_done.connect(self._on_job_done)
+        # 清理上次运行遗留的暂存文件夹
+        shutil.rmtree(staging_root, ignore_errors=True)
+
+    def set_io_budget(self, io_budget):
+        """修改I/O预算，增大时立即开始等待中的压缩包"""
+        self.io_budget = max(1, min(MAX_IO_BUDGET, int(io_budget)))
+        self._pump()
+
+    def add(self, archive_paths):
+        """加入压缩包（已在队列中的忽略）
+
+        Returns:
+            list[QueueItem]: 新加入的条目
+        """
+        existing = {os.path.normcase(os.path.abspath(item.archive_path)) for item in self.items}
+        added = []
+        for archive_path in archive_paths:
+            key = os.path.normcase(os.path.abspath(archive_path))
+            if key in existing:
+                continue
+            existing.add(key)
+            item = QueueItem(archive_path, os.path.join(self.staging_root, uuid.uuid4().hex))
+            self.items.append(item)
+            added.append(item)
+        self._pump()
+        return added
+
+    def remove(self, item):
+        """移出队列并删除暂存文件（正在解压的由工作线程在中止后删除）"""
+        if item not in self.items or item.status == STATUS_IMPORTING:
+            return
+        self.items.remove(item)
+        item.cancelled = True
+        if item.status not in (STATUS_INDEXING, STATUS_EXTRACTING):
+            shutil.rmtree(item.staging_dir, ignore_errors=True)
+
+    def clear(self):
+        """放弃队列中的所有条目"""
+        for item in list(self.items):
+            self.remove(item)
+
+    def discard_imported(self, items):
+        """移除已导入的条目（暂存文件夹已被移动到mods目录）"""
+        for item in items:
+            if item in self.items:
+                self.items.remove(item)
+            shutil.rmtree(item.staging_dir, ignore_errors=True)
+
+    def ready_items(self):
+        return [item for item in self.items if item.status == STATUS_READY]
+
+    def _pump(self):
+        """在I/O预算内开始等待中的条目"""
+        for item in self.items:
+            if self._running >= self.io_budget:
+                break
+            if item.status != STATUS_WAITING:
+                continue
+            item.status = STATUS_INDEXING
+            self._running += 1
+            threading.Thread(target=self._work, args=(item,), daemon=True).start()
+            self.item_changed.emit(item)
+
+    def _on_job_done(self, item):
+        self._running -= 1
+        if item.cancelled:
+            shutil.rmtree(item.staging_dir, ignore_errors=True)
+        self._pump()
+
+    def _work(self, item):
+        """工作线程：读取目录和modinfo，然后解压到暂存文件夹"""
+        try:
+            info = read_import_info(item.archive_path)
+            item.total_size = info["total_size"]
+            if info["xml"]:
+                _apply_modinfo(item, info["xml"])
+            item.status = STATUS_EXTRACTING
+            self.item_changed.emit(item)
+
+            def on_progress(done, total, member):
+                item.done = done
+                self.item_changed.emit(item)
+
+            with open_archive(item.archive_path) as archive:
+                # 每个压缩包只用一个线程解压，并行度由I/O预算控制
+                completed = archive.extract(
+                    item.staging_dir, progress=on_progress,
+                    is_cancelled=lambda: item.cancelled, max_workers=1, hashes=item.member_hashes
+                )
+            if completed:
+                item.done = item.total_size
+                # 压缩包刚读过一遍，整体哈希多从系统文件缓存读取，几乎不增加耗时
+                item.archive_hash = archive_hash(item.archive_path)
+                if self.duplicate_checker is not None:
+                    files = archive_files(info["members"], item.member_hashes)
+                    item.duplicate = self.duplicate_checker.check(files, item.archive_hash, verify=True)
+                item.status = STATUS_READY
+            else:
+                item.status = STATUS_FAILED
+                item.error = "已取消"
+        except Exception as e:
+            print(f"[失败] 处理压缩包失败 {item.file_name}: {e}")
+            shutil.rmtree(item.staging_dir, ignore_errors=True)
+            item.status = STATUS_FAILED
+            item.error = str(e)
+        self.item_changed.emit(item)
+        self._job_done.emit(item)
@@ -0,0 +1,218 @@
+"""
+模组文件完整性检查 - 对比文件清单与磁盘上的实际文件，支持并行扫描整个模组库和结果缓存
+"""
+import os
+import json
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from .manifest import load_mod_manifest, hash_file, scan_folder
+
+
+# 修改时间比较的容差（秒），避免浮点误差造成误报
+MTIME_TOLERANCE = 1e-3
+
+
+def _collect_files(mod_folder_path):
+    """遍历mod文件夹（与清单使用同一遍历规则），返回(文件字典, 目录集合, 指纹)
+
+    文件字典为 相对路径 -> os.stat_result，复用DirEntry的stat结果避免重复系统调用。
+    指纹由每个文件的路径、大小和修改时间（纳秒）计算：原地修改文件不会改变所在目录的修改时间，
+    因此必须逐个文件比较，不能只看目录。
+    """
+    files = {}
+    dirs = set()
+    fingerprint = hashlib.blake2b(digest_size=16)
+    for rel_path, entry, is_dir in scan_folder(mod_folder_path):
+        if is_dir:
+            dirs.add(rel_path)
+            fingerprint.update(f"{rel_path}\0".encode('utf-8'))
+            continue
+        try:
+            st = entry.stat()
+        except OSError:
+            continue
+        files[rel_path] = st
+        fingerprint.update(f"{rel_path}\0{st.st_size}\0{st.st_mtime_ns}\0".encode('utf-8'))
+    return files, dirs, fingerprint.hexdigest()
+
+
+def _check(mod_folder_path, manifest, files, dirs, verify_hash):
+    """对比清单和 _collect_files 得到的实际文件，返回检查结果"""
+
+    missing_files = []
+    modified_files = []
+    manifest_paths = set(manifest.paths)
+    for entry in manifest:
+        if entry.is_dir:
+            continue
+        st = files.get(entry.path)
+        if st is None:
+            missing_files.append(entry.path)
+            continue
+        # 旧版清单没有记录大小和修改时间时不判断修改
+        if entry.mtime and (st.st_size != entry.size or abs(st.st_mtime - entry.mtime) > MTIME_TOLERANCE):
+            if verify_hash and entry.hash:
+                # 哈希模式下以内容为准，只是时间戳变化的文件不算修改
+                try:
+                    if hash_file(os.path.join(mod_folder_path, entry.path)) == entry.hash:
+                        continue
+                except OSError:
+                    pass
+            modified_files.append(entry.path)
+        elif verify_hash and entry.hash:
+            try:
+                if hash_file(os.path.join(mod_folder_path, entry.path)) != entry.hash:
+                    modified_files.append(entry.path)
+            except OSError:
+                modified_files.append(entry.path)
+
+    extra_files = sorted(p for p in list(files) + list(dirs) if p not in manifest_paths)
+
+    result = {
+        'is_complete': not missing_files and not extra_files,
+        'missing_files': sorted(missing_files),
+        'extra_files': extra_files,
+        'modified_files': sorted(modified_files),
+    }
+    if verify_hash and modified_files:
+        result['is_complete'] = False
+    return result
+
+
+class IntegrityCache:
+    """完整性检查结果缓存
+
+    以清单签名和所有文件的路径、大小、修改时间作为指纹，指纹未变化时直接复用上次的检查结果。
+    """
+
+    def __init__(self, cache_file):
+        self.cache_file = cache_file
+        self._lock = threading.Lock()
+        self._entries = None
+        self._dirty = False
+
+    def _load(self):
+        if self._entries is None:
+            self._entries = {}
+            if os.path.exists(self.cache_file):
+                try:
+                    with open(self.cache_file, 'r', encoding='utf-8') as f:
+                        self._entries = json.load(f)
+                except Exception:
+                    self._entries = {}
+        return self._entries
+
+    def lookup(self, mod_folder_path, manifest_sig, fingerprint):
+        """查找缓存结果，指纹失效时返回None"""
+        key = os.path.basename(os.path.normpath(mod_folder_path))
+        with self._lock:
+            cached = self._load().get(key)
+        if not cached or cached.get('sig') != manifest_sig or cached.get('files') != fingerprint:
+            return None
+        return cached.get('result')
+
+    def store(self, mod_folder_path, manifest_sig, fingerprint, result):
+        """记录检查结果"""
+        key = os.path.basename(os.path.normpath(mod_folder_path))
+        with self._lock:
+            self._load()[key] = {'sig': manifest_sig, 'files': fingerprint, 'result': result}
+            self._dirty = True
+
+    def invalidate(self, mod_folder_path):
+        """移除某个mod的缓存（更新文件结构或卸载时调用）"""
+        key = os.path.basename(os.path.normpath(mod_folder_path))
+        with self._lock:
+            if self._load().pop(key, None) is not None:
+                self._dirty = True
+
+    def save(self):
+        """写回缓存文件（先写临时文件再替换）"""
+        with self._lock:
+            if not self._dirty:
+                return
+            os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+            tmp_path = self.cache_file + ".tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._entries, f, ensure_ascii=False)
+            os.replace(tmp_path, self.cache_file)
+            self._dirty = False
+
+
+def check_mod_integrity(mod_folder_path, verify_hash=False, cache=None):
+    """检查单个mod的文件完整性
+
+    Args:
+        mod_folder_path: mod文件夹路径
+        verify_hash: 是否校验内容哈希（仅对清单中记录了哈希的文件有效）
+        cache: IntegrityCache实例，为None时不使用缓存
+
+    Returns:
+        dict: is_complete, missing_files, extra_files, modified_files
+    """
+    manifest = load_mod_manifest(mod_folder_path)
+    if manifest is None:
+        # 没有文件结构记录，认为文件完整（可能是旧版本导入的mod）
+        return {'is_complete': True, 'missing_files': [], 'extra_files': [], 'modified_files': []}
+
+    files, dirs, fingerprint = _collect_files(mod_folder_path)
+    manifest_sig = None
+    if cache is not None and not verify_hash:
+        manifest_sig = manifest.signature()
+        cached = cache.lookup(mod_folder_path, manifest_sig, fingerprint)
+        if cached is not None:
+            return cached
+
+    result = _check(mod_folder_path, manifest, files, dirs, verify_hash)
+
+    if cache is not None and not verify_hash:
+        cache.store(mod_folder_path, manifest_sig, fingerprint, result)
+    return result
+
+
+def scan_library(mod_folder_paths, verify_hash=False, cache=None, max_workers=None, progress=None, should_stop=None):
+    """并行检查多个mod的完整性
+
+    Args:
+        mod_folder_paths: mod文件夹路径列表
+        verify_hash: 是否校验内容哈希
+        cache: IntegrityCache实例
+        max_workers: 线程数，默认按CPU数量决定
+        progress: 进度回调 progress(已完成数, 总数, mod文件夹路径)
+        should_stop: 返回True时停止提交剩余任务
+
+    Returns:
+        dict: mod文件夹路径 -> 检查结果
+    """
+    results = {}
+    total = len(mod_folder_paths)
+    if max_workers is None:
+        max_workers = min(32, (os.cpu_count() or 1) + 4)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(check_mod_integrity, path, verify_hash, cache): path
+            for path in mod_folder_paths
+        }
+        done = 0
+        for future in as_completed(futures):
+            path = futures[future]
+            done += 1
+            try:
+                results[path] = future.result()
+            except Exception as e:
+                print(f"[警告] 检查文件完整性失败: {os.path.basename(path)} {e}")
+            if progress is not None:
+                progress(done, total, path)
+            if should_stop is not None and should_stop():
+                for pending in futures:
+                    pending.cancel()
+                break
+
+    if cache is not None:
+        try:
+            cache.save()
+        except Exception as e:
+            print(f"[警告] 保存完整性缓存失败: {e}")
+    return results
@@ -0,0 +1,118 @@
+"""
+模组库扫描线程 - 在后台并行同步模组目录、检查文件完整性，并把结果推送给主界面
+"""
+import time
+
+from PySide6.QtCore import QThread, Signal
+
+
+class LibraryScanThread(QThread):
+    """后台扫描mods目录的线程
+
+    扫描过程中通过 mods_scanned 分批发送目录数据，主界面可以边扫描边显示；
+    扫描结束后通过 scan_finished 发送按导入时间排序的完整结果。
+    """
+    mods_scanned = Signal(list)   # 一批目录数据（dict列表）
+    scan_finished = Signal(list)  # 全部目录数据（按导入时间排序）
+
+    def __init__(self, catalog, batch_size=64, batch_interval=0.1, parent=None):
+        """
+        Args:
+            catalog: ModCatalog实例
+            batch_size: 每批最多发送的行数
+            batch_interval: 两批之间的最长间隔（秒），保证界面及时刷新
+        """
+        super().__init__(parent)
+        self.catalog = catalog
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval
+
+    def run(self):
+        pending = []
+        last_emit = time.monotonic()
+
+        def on_row(row):
+            nonlocal last_emit
+            pending.append(row)
+            now = time.monotonic()
+            if len(pending) >= self.batch_size or now - last_emit >= self.batch_interval:
+                self.mods_scanned.emit(list(pending))
+                pending.clear()
+                last_emit = now
+
+        try:
+            rows = self.catalog.sync(on_row=on_row)
+        except Exception as e:
+            print(f"[失败] 扫描模组库失败: {e}")
+            rows = []
+
+        if pending:
+            self.mods_scanned.emit(list(pending))
+        self.scan_finished.emit(rows)
+
+
+class IntegrityScanThread(QThread):
+    """后台并行检查整个模组库文件完整性的线程"""
+    progress = Signal(int, int, str)  # 已完成数, 总数, mod文件夹路径
+    scan_finished = Signal(dict)      # mod文件夹路径 -> 检查结果
+
+    def __init__(self, mod_folder_paths, verify_hash=False, cache=None, parent=None):
+        """
+        Args:
+            mod_folder_paths: 要检查的mod文件夹路径列表
+            verify_hash: 是否校验内容哈希
+            cache: IntegrityCache实例，未变化的mod直接使用缓存结果
+        """
+        super().__init__(parent)
+        self.mod_folder_paths = list(mod_folder_paths)
+        self.verify_hash = verify_hash
+        self.cache = cache
+        self._stop_requested = False
+
+    def stop(self):
+        """请求停止扫描（已提交的任务会继续完成）"""
+        self._stop_requested = True
+
+    def run(self):
+        from .integrity import scan_library
+        try:
+            results = scan_library(
+                self.mod_folder_paths,
+                verify_hash=self.verify_hash,
+                cache=self.cache,
+                progress=self.progress.emit,
+                should_stop=lambda: self._stop_requested
+            )
+        except Exception as e:
+            print(f"[失败] 检查模组库完整性失败: {e}")
+            results = {}
+        self.scan_finished.emit(results)
+
+
+class SearchThread(QThread):
+    """在后台同步搜索索引并执行查询的线程"""
+    search_finished = Signal(int, str, object, int)  # 请求编号, 查询文本, 命中的mod名称及得分, 目录缓存版本
+
+    def __init__(self, request_id, query, index, catalog, parent=None):
+        """
+        Args:
+            request_id: 请求编号，用于丢弃过期的结果
+            query: 查询文本
+            index: SearchIndex实例
+            catalog: ModCatalog实例，索引据此增量同步
+        """
+        super().__init__(parent)
+        self.request_id = request_id
+        self.query = query
+        self.index = index
+        self.catalog = catalog
+
+    def run(self):
+        generation = self.catalog.generation
+        try:
+            self.index.sync(self.catalog)
+            result = self.index.search(self.query)
+        except Exception as e:
+            print(f"[警告] 搜索失败: {e}")
+            result = set()
+        self.search_finished.emit(self.request_id, self.query, result, generation)
@@ -0,0 +1,451 @@
+"""
+模组文件清单 - 以紧凑的二进制格式保存mod的文件结构（替代modinfo.xml中的file_structure）
+
+文件格式（modinfo/manifest.bin，小端序）：
+    头部    magic(4s) version(H) mode(H) count(I) paths_len(I)
+    路径区  按路径排序，每条为 共享前缀长度(varint) 后缀长度(varint) 后缀(UTF-8)
+    对齐    补零到8字节边界
+    列数据  size(Q)*count  mtime(d)*count  hash(16s)*count  flags(B)*count
+    来源    source_len(I) source(UTF-8)，可选，记录非复制方式导入时的来源文件夹
+
+mode为导入方式在 IMPORT_MODES 中的序号（旧版文件中为保留字段，值为0即复制）。
+"""
+import os
+import mmap
+import struct
+import hashlib
+import threading
+from array import array
+from bisect import bisect_left
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+
+MANIFEST_FILENAME = "manifest.bin"
+MANIFEST_MAGIC = b"MMMF"
+MANIFEST_VERSION = 1
+
+HASH_SIZE = 16          # blake2b摘要长度（字节）
+EMPTY_HASH = b"\x00" * HASH_SIZE
+
+FLAG_DIR = 0x01         # 目录条目（路径以'/'结尾）
+FLAG_HASH = 0x02        # 记录了内容哈希
+
+# 导入方式：复制、移动、硬链接、引用（mod文件夹中只有指向来源文件的符号链接）
+IMPORT_MODE_COPY = "copy"
+IMPORT_MODE_MOVE = "move"
+IMPORT_MODE_HARDLINK = "hardlink"
+IMPORT_MODE_REFERENCE = "reference"
+IMPORT_MODES = (IMPORT_MODE_COPY, IMPORT_MODE_MOVE, IMPORT_MODE_HARDLINK, IMPORT_MODE_REFERENCE)
+
+_HEADER = struct.Struct("<4sHHII")
+_SOURCE_LEN = struct.Struct("<I")
+
+ManifestEntry = namedtuple("ManifestEntry", ["path", "size", "mtime", "hash", "is_dir"])
+
+
+def _encode_varint(value, out):
+    """写入无符号变长整数"""
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _decode_varint(buf, pos):
+    """读取无符号变长整数，返回(值, 新位置)"""
+    result = 0
+    shift = 0
+    while True:
+        byte = buf[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+def hash_file(file_path, chunk_size=1024 * 1024):
+    """计算文件内容哈希（blake2b，16字节）"""
+    digest = hashlib.blake2b(digest_size=HASH_SIZE)
+    with open(file_path, "rb") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            digest.update(chunk)
+    return digest.digest()
+
+
+class ModManifest:
+    """mod文件清单
+
+    条目按路径排序保存，目录条目以'/'结尾（与get_folder_files的格式一致）。
+    路径使用'/'作为分隔符，相对于mod文件夹，不包含modinfo文件夹。
+    同时记录mod的导入方式和来源文件夹，卸载等操作据此决定如何处理文件。
+    """
+
+    def __init__(self, entries=(), import_mode=IMPORT_MODE_COPY, source=None):
+        """
+        Args:
+            entries: 可迭代的 (path, size, mtime, hash) 元组，hash可以为None
+            import_mode: 导入方式（IMPORT_MODE_*）
+            source: 非复制方式导入时的来源文件夹
+        """
+        items = sorted(entries, key=lambda e: e[0])
+        self.paths = [e[0] for e in items]
+        self.sizes = array("Q", (int(e[1] or 0) for e in items))
+        self.mtimes = array("d", (float(e[2] or 0.0) for e in items))
+        self.hashes = [e[3] if len(e) > 3 and e[3] else None for e in items]
+        self.import_mode = import_mode
+        self.source = source
+        self._signature = None
+
+    def __len__(self):
+        return len(self.paths)
+
+    def __iter__(self):
+        for i in range(len(self.paths)):
+            yield self.entry(i)
+
+    def __contains__(self, path):
+        return self.index(path) >= 0
+
+    def entry(self, i):
+        """按序号获取条目"""
+        path = self.paths[i]
+        return ManifestEntry(path, self.sizes[i], self.mtimes[i], self.hashes[i], path.endswith('/'))
+
+    def index(self, path):
+        """二分查找路径，不存在时返回-1"""
+        i = bisect_left(self.paths, path)
+        if i < len(self.paths) and self.paths[i] == path:
+            return i
+        return -1
+
+    def get(self, path):
+        """获取路径对应的条目，不存在时返回None"""
+        i = self.index(path)
+        return self.entry(i) if i >= 0 else None
+
+    def file_paths(self):
+        """所有文件路径（不含目录）"""
+        return [p for p in self.paths if not p.endswith('/')]
+
+    @property
+    def file_count(self):
+        return sum(1 for p in self.paths if not p.endswith('/'))
+
+    @property
+    def total_size(self):
+        return sum(self.sizes)
+
+    def signature(self):
+        """清单签名（路径、大小、修改时间和哈希的摘要），用于判断清单是否变化"""
+        # 清单加载后视为只读，签名只计算一次
+        if self._signature is None:
+            self._signature = hashlib.blake2b(self.to_bytes(), digest_size=16).hexdigest()
+        return self._signature
+
+    def to_bytes(self):
+        """序列化为二进制格式"""
+        path_blob = bytearray()
+        prev = b""
+        for path in self.paths:
+            encoded = path.encode("utf-8")
+            common = 0
+            limit = min(len(prev), len(encoded))
+            while common < limit and prev[common] == encoded[common]:
+                common += 1
+            _encode_varint(common, path_blob)
+            _encode_varint(len(encoded) - common, path_blob)
+            path_blob += encoded[common:]
+            prev = encoded
+
+        mode = IMPORT_MODES.index(self.import_mode)
+        out = bytearray(_HEADER.pack(MANIFEST_MAGIC, MANIFEST_VERSION, mode, len(self.paths), len(path_blob)))
+        out += path_blob
+        out += b"\x00" * (-len(out) % 8)
+        out += self.sizes.tobytes()
+        out += self.mtimes.tobytes()
+        flags = bytearray(len(self.paths))
+        for i, (path, file_hash) in enumerate(zip(self.paths, self.hashes)):
+            out += file_hash if file_hash else EMPTY_HASH
+            flags[i] = (FLAG_DIR if path.endswith('/') else 0) | (FLAG_HASH if file_hash else 0)
+        out += flags
+        if self.source:
+            encoded = self.source.encode("utf-8")
+            out += _SOURCE_LEN.pack(len(encoded))
+            out += encoded
+        return bytes(out)
+
+    @classmethod
+    def from_bytes(cls, buf):
+        """从二进制数据（bytes或mmap）解析清单"""
+        magic, version, mode, count, paths_len = _HEADER.unpack_from(buf, 0)
+        if magic != MANIFEST_MAGIC:
+            raise ValueError("不是有效的清单文件")
+        if version != MANIFEST_VERSION:
+            raise ValueError(f"不支持的清单版本: {version}")
+
+        manifest = cls(import_mode=IMPORT_MODES[mode] if mode < len(IMPORT_MODES) else IMPORT_MODE_COPY)
+        pos = _HEADER.size
+        end = pos + paths_len
+        paths = []
+        prev = b""
+        while pos < end:
+            common, pos = _decode_varint(buf, pos)
+            length, pos = _decode_varint(buf, pos)
+            encoded = prev[:common] + bytes(buf[pos:pos + length])
+            pos += length
+            paths.append(encoded.decode("utf-8"))
+            prev = encoded
+        if len(paths) != count:
+            raise ValueError("清单文件已损坏")
+
+        pos = end + (-end % 8)
+        manifest.paths = paths
+        manifest.sizes = array("Q")
+        manifest.sizes.frombytes(buf[pos:pos + 8 * count])
+        pos += 8 * count
+        manifest.mtimes = array("d")
+        manifest.mtimes.frombytes(buf[pos:pos + 8 * count])
+        pos += 8 * count
+        hash_blob = bytes(buf[pos:pos + HASH_SIZE * count])
+        pos += HASH_SIZE * count
+        flags = bytes(buf[pos:pos + count])
+        pos += count
+        if len(buf) >= pos + _SOURCE_LEN.size:
+            (source_len,) = _SOURCE_LEN.unpack_from(buf, pos)
+            pos += _SOURCE_LEN.size
+            manifest.source = bytes(buf[pos:pos + source_len]).decode("utf-8")
+        manifest.hashes = [
+            hash_blob[i * HASH_SIZE:(i + 1) * HASH_SIZE] if flags[i] & FLAG_HASH else None
+            for i in range(count)
+        ]
+        return manifest
+
+    @classmethod
+    def load(cls, file_path):
+        """通过内存映射读取清单文件"""
+        with open(file_path, "rb") as f:
+            if os.fstat(f.fileno()).st_size < _HEADER.size:
+                raise ValueError("清单文件已损坏")
+            # 解析后立即关闭映射，避免在Windows上锁住文件导致无法删除mod
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                return cls.from_bytes(mapped)
+
+    def save(self, file_path):
+        """原子写入清单文件（先写临时文件再替换）"""
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        tmp_path = file_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(self.to_bytes())
+        os.replace(tmp_path, file_path)
+
+    @classmethod
+    def from_xml_element(cls, file_structure_elem):
+        """从旧版modinfo.xml的file_structure节点转换"""
+        entries = []
+        for file_elem in file_structure_elem.findall("file"):
+            file_path = file_elem.text
+            if not file_path:
+                continue
+            try:
+                size = int(file_elem.get("size", 0))
+            except ValueError:
+                size = 0
+            try:
+                mtime = float(file_elem.get("mtime", 0))
+            except ValueError:
+                mtime = 0.0
+            entries.append((file_path, size, mtime, None))
+        return cls(entries)
+
+    @classmethod
+    def from_folder(cls, folder_path, with_hash=False, import_mode=IMPORT_MODE_COPY, source=None, hash_workers=None,
+                    known_hashes=None):
+        """扫描mod文件夹生成清单（跳过modinfo文件夹）
+
+        只遍历一遍目录，文件大小和修改时间直接取自DirEntry的stat；
+        需要哈希时，文件在遍历的同时交给线程池计算，遍历和读取文件内容互相重叠。
+        known_hashes（相对路径 -> 哈希，如解压时已算出的哈希）中有的文件直接使用，不再读取。
+        """
+        entries = []
+        hash_jobs = []
+        executor = None
+        if with_hash:
+            executor = ThreadPoolExecutor(max_workers=hash_workers or min(4, os.cpu_count() or 1))
+        try:
+            for rel_path, entry, is_dir in scan_folder(folder_path):
+                if is_dir:
+                    entries.append((rel_path, 0, 0.0, None))
+                    continue
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                if known_hashes and rel_path in known_hashes:
+                    entries.append((rel_path, st.st_size, st.st_mtime, known_hashes[rel_path]))
+                    continue
+                if executor is not None:
+                    hash_jobs.append((len(entries), executor.submit(hash_file, entry.path)))
+                entries.append((rel_path, st.st_size, st.st_mtime, None))
+            for index, future in hash_jobs:
+                try:
+                    file_hash = future.result()
+                except OSError as e:
+                    print(f"[警告] 计算文件哈希失败: {entries[index][0]} ({e})")
+                    continue
+                entries[index] = entries[index][:3] + (file_hash,)
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True)
+        return cls(entries, import_mode=import_mode, source=source)
+
+
+def scan_folder(folder_path):
+    """单次遍历mod文件夹（os.scandir），跳过所有名为modinfo的文件夹
+
+    Yields:
+        tuple: (相对路径, DirEntry, 是否目录)；路径使用'/'分隔，目录以'/'结尾。
+        指向目录的符号链接作为目录列出但不进入（与os.walk的默认行为一致）。
+    """
+    stack = [(folder_path, "")]
+    while stack:
+        dir_path, prefix = stack.pop()
+        try:
+            with os.scandir(dir_path) as it:
+                dir_entries = list(it)
+        except OSError:
+            continue
+        for entry in dir_entries:
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                continue
+            if not is_dir:
+                yield prefix + entry.name, entry, False
+                continue
+            if entry.name == 'modinfo':
+                continue
+            rel_path = prefix + entry.name + '/'
+            yield rel_path, entry, True
+            if not entry.is_symlink():
+                stack.append((entry.path, rel_path))
+
+
+# 已加载清单的缓存：mod文件夹路径 -> (文件mtime_ns, 文件大小, 清单)
+_manifest_cache = {}
+_manifest_cache_lock = threading.Lock()
+
+
+def get_manifest_path(mod_folder_path):
+    """获取mod的清单文件路径"""
+    return os.path.join(mod_folder_path, "modinfo", MANIFEST_FILENAME)
+
+
+def migrate_xml_file_structure(mod_folder_path):
+    """将modinfo.xml中的file_structure迁移到二进制清单，并从XML中移除
+
+    Returns:
+        ModManifest | None: 迁移得到的清单，XML中没有文件结构时返回None
+    """
+    import xml.etree.ElementTree as ET
+
+    xml_file_path = os.path.join(mod_folder_path, "modinfo", "modinfo.xml")
+    if not os.path.exists(xml_file_path):
+        return None
+
+    tree = ET.parse(xml_file_path)
+    root = tree.getroot()
+    file_structure_elem = root.find("file_structure")
+    if file_structure_elem is None:
+        return None
+
+    manifest = ModManifest.from_xml_element(file_structure_elem)
+    save_mod_manifest(mod_folder_path, manifest)
+    root.remove(file_structure_elem)
+    tree.write(xml_file_path, encoding='utf-8', xml_declaration=True)
+    print(f"[信息] 已将文件结构迁移到清单文件: {os.path.basename(mod_folder_path)}")
+    return manifest
+
+
+def load_mod_manifest(mod_folder_path, migrate=True):
+    """读取mod的文件清单（带缓存）
+
+    清单文件不存在时，如果modinfo.xml中有旧版file_structure则自动迁移。
+
+    Args:
+        mod_folder_path: mod文件夹路径
+        migrate: 是否自动迁移旧版XML文件结构
+
+    Returns:
+        ModManifest | None: 文件清单，没有任何文件结构记录时返回None
+    """
+    key = os.path.normcase(os.path.abspath(mod_folder_path))
+    file_path = get_manifest_path(mod_folder_path)
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        st = None
+
+    if st is not None:
+        with _manifest_cache_lock:
+            cached = _manifest_cache.get(key)
+        if cached is not None and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+            return cached[2]
+        try:
+            manifest = ModManifest.load(file_path)
+        except Exception as e:
+            print(f"[警告] 读取清单文件失败: {e}")
+            return None
+        with _manifest_cache_lock:
+            _manifest_cache[key] = (st.st_mtime_ns, st.st_size, manifest)
+        return manifest
+
+    if migrate:
+        try:
+            return migrate_xml_file_structure(mod_folder_path)
+        except Exception as e:
+            print(f"[警告] 迁移文件结构失败: {e}")
+    return None
+
+
+def save_mod_manifest(mod_folder_path, manifest):
+    """保存mod的文件清单并更新缓存"""
+    file_path = get_manifest_path(mod_folder_path)
+    manifest.save(file_path)
+    st = os.stat(file_path)
+    key = os.path.normcase(os.path.abspath(mod_folder_path))
+    with _manifest_cache_lock:
+        _manifest_cache[key] = (st.st_mtime_ns, st.st_size, manifest)
+
+
+def write_mod_manifest(mod_folder_path, with_hash=False, import_mode=None, source=None, known_hashes=None):
+    """扫描mod文件夹并写入清单（导入、导出和更新文件结构时调用）
+
+    Args:
+        with_hash: 是否记录每个文件的内容哈希（用于导入时的重复检测）
+        import_mode: 导入方式，为None时沿用已有清单中记录的方式和来源
+        known_hashes: 已知的文件哈希（相对路径 -> 哈希），这些文件不再读取
+
+    Returns:
+        ModManifest: 新的文件清单
+    """
+    if import_mode is None:
+        old_manifest = load_mod_manifest(mod_folder_path, migrate=False)
+        import_mode = old_manifest.import_mode if old_manifest is not None else IMPORT_MODE_COPY
+        source = old_manifest.source if old_manifest is not None else None
+    manifest = ModManifest.from_folder(
+        mod_folder_path, with_hash=with_hash, import_mode=import_mode, source=source, known_hashes=known_hashes
+    )
+    save_mod_manifest(mod_folder_path, manifest)
+    return manifest
+
+
+def forget_mod_manifest(mod_folder_path):
+    """从缓存中移除mod的清单（卸载时调用）"""
+    key = os.path.normcase(os.path.abspath(mod_folder_path))
+    with _manifest_cache_lock:
+        _manifest_cache.pop(key, None)
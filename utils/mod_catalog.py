@@ -0,0 +1,319 @@
+"""
+模组目录缓存 - 使用SQLite保存每个模组的元数据，启动时无需逐个解析modinfo.xml
+"""
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import xml.etree.ElementTree as ET
+
+from .manifest import load_mod_manifest, get_manifest_path
+
+
+# 目录缓存结构版本，结构变化时自动重建
+CATALOG_SCHEMA_VERSION = 2
+
+# 目录缓存中保存的字段（顺序与建表语句一致）
+CATALOG_COLUMNS = (
+    "folder", "name", "category", "author", "description", "version",
+    "import_time", "size", "file_count", "manifest_sig",
+    "dir_mtime", "info_mtime"
+)
+
+
+def _stat_mtime_ns(path):
+    """获取路径的修改时间（纳秒），不存在时返回0"""
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return 0
+
+
+def parse_modinfo(mod_folder_path):
+    """解析单个mod文件夹的modinfo.xml，返回目录缓存需要的字段
+
+    Args:
+        mod_folder_path: mod文件夹路径
+
+    Returns:
+        dict: 不包含folder和import_time的元数据字段
+    """
+    folder_name = os.path.basename(mod_folder_path)
+    xml_file_path = os.path.join(mod_folder_path, "modinfo", "modinfo.xml")
+
+    info = {
+        "name": folder_name.replace("_", " "),
+        "category": "",
+        "author": "",
+        "description": "",
+        "version": "",
+        "size": 0,
+        "file_count": 0,
+        "manifest_sig": "",
+    }
+
+    if os.path.exists(xml_file_path):
+        try:
+            root = ET.parse(xml_file_path).getroot()
+            for tag in ("name", "category", "author", "description", "version"):
+                elem = root.find(tag)
+                if elem is not None and elem.text:
+                    info[tag] = elem.text.strip() if tag != "name" else elem.text
+        except Exception:
+            pass  # 解析模组XML失败，使用默认值
+
+    # 从文件清单中统计大小、文件数和签名（旧版XML文件结构会自动迁移）
+    manifest = load_mod_manifest(mod_folder_path)
+    if manifest is not None:
+        info["size"] = manifest.total_size
+        info["file_count"] = manifest.file_count
+        info["manifest_sig"] = manifest.signature()
+    else:
+        # 旧版本导入的mod没有文件结构记录，遍历一次目录统计（结果会被缓存）
+        total_size = 0
+        file_count = 0
+        for root_dir, dirs, files in os.walk(mod_folder_path):
+            if 'modinfo' in dirs:
+                dirs.remove('modinfo')
+            for file in files:
+                try:
+                    total_size += os.path.getsize(os.path.join(root_dir, file))
+                    file_count += 1
+                except OSError:
+                    pass
+        info["size"] = total_size
+        info["file_count"] = file_count
+
+    return info
+
+
+class ModCatalog:
+    """模组元数据目录（SQLite）
+
+    以mod文件夹名为主键，记录名称、分类、作者、导入时间、大小、文件数和文件结构签名。
+    首次运行时从modinfo.xml填充，之后只重新解析修改时间发生变化的文件夹。
+    """
+
+    def __init__(self, db_path, mods_dir):
+        self.db_path = db_path
+        self.mods_dir = mods_dir
+        self._lock = threading.RLock()
+        # 每次写入后递增，依赖目录数据的缓存（如搜索索引）据此判断是否需要同步
+        self.generation = 0
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._init_schema()
+
+    def _init_schema(self):
+        """创建表结构，版本不一致时重建"""
+        with self._lock:
+            cursor = self._conn.cursor()
+            cursor.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            row = cursor.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+            if row is None or row[0] != str(CATALOG_SCHEMA_VERSION):
+                cursor.execute("DROP TABLE IF EXISTS mods")
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS mods (
+                    folder TEXT PRIMARY KEY,
+                    name TEXT NOT NULL,
+                    category TEXT NOT NULL DEFAULT '',
+                    author TEXT NOT NULL DEFAULT '',
+                    description TEXT NOT NULL DEFAULT '',
+                    version TEXT NOT NULL DEFAULT '',
+                    import_time REAL NOT NULL DEFAULT 0,
+                    size INTEGER NOT NULL DEFAULT 0,
+                    file_count INTEGER NOT NULL DEFAULT 0,
+                    manifest_sig TEXT NOT NULL DEFAULT '',
+                    dir_mtime INTEGER NOT NULL DEFAULT 0,
+                    info_mtime INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_mods_name ON mods(name)")
+            cursor.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('schema_version', ?)",
+                (str(CATALOG_SCHEMA_VERSION),)
+            )
+            self._conn.commit()
+
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            try:
+                self._conn.close()
+            except Exception:
+                pass
+
+    def _folder_signature(self, mod_folder_path, dir_mtime=None):
+        """获取mod文件夹的修改时间签名：(文件夹mtime, modinfo.xml和清单文件中较新的mtime)
+
+        Args:
+            dir_mtime: 已知的文件夹mtime（遍历目录时取自DirEntry.stat()），不再重复读取
+        """
+        xml_file_path = os.path.join(mod_folder_path, "modinfo", "modinfo.xml")
+        info_mtime = max(_stat_mtime_ns(xml_file_path), _stat_mtime_ns(get_manifest_path(mod_folder_path)))
+        if dir_mtime is None:
+            dir_mtime = _stat_mtime_ns(mod_folder_path)
+        return dir_mtime, info_mtime
+
+    def _build_row(self, folder_name, existing=None):
+        """解析文件夹并生成一行目录数据"""
+        mod_folder_path = os.path.join(self.mods_dir, folder_name)
+        info = parse_modinfo(mod_folder_path)
+        # 解析可能会迁移旧版文件结构，因此在解析之后再记录修改时间
+        dir_mtime, info_mtime = self._folder_signature(mod_folder_path)
+        if existing is not None and existing["import_time"]:
+            import_time = existing["import_time"]
+        else:
+            # 首次收录时使用文件夹修改时间作为导入时间的默认值
+            try:
+                import_time = os.path.getmtime(mod_folder_path)
+            except OSError:
+                import_time = time.time()
+        row = {"folder": folder_name, "import_time": import_time,
+               "dir_mtime": dir_mtime, "info_mtime": info_mtime}
+        row.update(info)
+        return row
+
+    def _upsert_rows(self, rows):
+        """批量写入目录数据"""
+        if not rows:
+            return
+        placeholders = ", ".join("?" for _ in CATALOG_COLUMNS)
+        sql = f"INSERT OR REPLACE INTO mods ({', '.join(CATALOG_COLUMNS)}) VALUES ({placeholders})"
+        with self._lock:
+            self._conn.executemany(sql, [tuple(row[col] for col in CATALOG_COLUMNS) for row in rows])
+            self._conn.commit()
+            self.generation += 1
+
+    def sync(self, on_row=None, max_workers=None):
+        """同步mods目录，只重新解析修改时间变化的文件夹
+
+        未变化的文件夹直接使用缓存，变化的文件夹交给线程池并行解析。
+
+        Args:
+            on_row: 每得到一行数据时的回调（在调用sync的线程中执行），用于流式显示
+            max_workers: 并行解析的线程数，默认按CPU数量决定
+
+        Returns:
+            list[dict]: 同步后的所有目录数据（按导入时间排序）
+        """
+        if not os.path.exists(self.mods_dir):
+            return []
+
+        existing = {row["folder"]: row for row in self.get_all()}
+        current_folders = set()
+        pending_folders = []
+        rows = []
+
+        with os.scandir(self.mods_dir) as entries:
+            for entry in entries:
+                if not entry.is_dir():
+                    continue
+                current_folders.add(entry.name)
+                old_row = existing.get(entry.name)
+                if old_row is not None:
+                    try:
+                        # Windows上DirEntry.stat()使用遍历目录时已取得的信息，不需要再次访问文件夹
+                        entry_mtime = entry.stat().st_mtime_ns
+                    except OSError:
+                        entry_mtime = 0
+                    dir_mtime, info_mtime = self._folder_signature(entry.path, entry_mtime)
+                    if old_row["dir_mtime"] == dir_mtime and old_row["info_mtime"] == info_mtime:
+                        rows.append(old_row)
+                        if on_row is not None:
+                            on_row(old_row)
+                        continue
+                pending_folders.append(entry.name)
+
+        changed_rows = []
+        if pending_folders:
+            if max_workers is None:
+                max_workers = min(32, (os.cpu_count() or 1) + 4)
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = [
+                    executor.submit(self._build_row, folder, existing.get(folder))
+                    for folder in pending_folders
+                ]
+                for future in as_completed(futures):
+                    try:
+                        row = future.result()
+                    except Exception as e:
+                        print(f"[警告] 解析模组信息失败: {e}")
+                        continue
+                    changed_rows.append(row)
+                    rows.append(row)
+                    if on_row is not None:
+                        on_row(row)
+
+        removed_folders = [folder for folder in existing if folder not in current_folders]
+
+        self._upsert_rows(changed_rows)
+        if removed_folders:
+            with self._lock:
+                self._conn.executemany("DELETE FROM mods WHERE folder = ?", [(f,) for f in removed_folders])
+                self._conn.commit()
+                self.generation += 1
+
+        if changed_rows or removed_folders:
+            print(f"[目录] 已同步模组目录: 更新 {len(changed_rows)} 个，移除 {len(removed_folders)} 个")
+
+        rows.sort(key=lambda row: row["import_time"])
+        return rows
+
+    def refresh_folder(self, folder_name):
+        """强制重新解析单个mod文件夹（导入或编辑后调用）
+
+        Returns:
+            dict | None: 更新后的目录数据，文件夹不存在时返回None
+        """
+        mod_folder_path = os.path.join(self.mods_dir, folder_name)
+        if not os.path.isdir(mod_folder_path):
+            self.remove_folder(folder_name)
+            return None
+        row = self._build_row(folder_name, self.get(folder_name))
+        self._upsert_rows([row])
+        return row
+
+    def remove_folder(self, folder_name):
+        """从目录中移除mod（卸载时调用）"""
+        with self._lock:
+            self._conn.execute("DELETE FROM mods WHERE folder = ?", (folder_name,))
+            self._conn.commit()
+            self.generation += 1
+
+    def get(self, folder_name):
+        """按文件夹名获取目录数据"""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM mods WHERE folder = ?", (folder_name,)).fetchone()
+        return dict(row) if row is not None else None
+
+    def get_by_name(self, mod_name):
+        """按mod名称获取目录数据"""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM mods WHERE name = ?", (mod_name,)).fetchone()
+        return dict(row) if row is not None else None
+
+    def get_all(self):
+        """获取所有目录数据（按导入时间排序）"""
+        with self._lock:
+            rows = self._conn.execute("SELECT * FROM mods ORDER BY import_time").fetchall()
+        return [dict(row) for row in rows]
+
+    def get_total_size(self, mod_names):
+        """统计指定mod的总大小（字节）"""
+        mod_names = list(mod_names)
+        if not mod_names:
+            return 0
+        total = 0
+        with self._lock:
+            # 分批查询，避免超过SQLite参数数量上限
+            for i in range(0, len(mod_names), 500):
+                batch = mod_names[i:i + 500]
+                placeholders = ", ".join("?" for _ in batch)
+                row = self._conn.execute(
+                    f"SELECT COALESCE(SUM(size), 0) FROM mods WHERE name IN ({placeholders})", batch
+                ).fetchone()
+                total += row[0]
+        return total
@@ -0,0 +1,200 @@
+"""
+mod增量更新 - 用新版压缩包就地更新已安装的mod，只写入新增和变化的文件，删除新版中已不存在的文件
+
+比较压缩包目录和已安装mod的清单：大小不同的文件直接视为变化；大小相同的比较内容哈希
+（压缩包成员流式解压计算，已安装的文件使用清单中记录的哈希）。
+需要写入的文件先解压到暂存文件夹，再逐个替换到mod文件夹中：替换而不是覆盖写入，
+硬链接或引用方式导入的mod不会通过链接改写来源文件；解压期间取消时mod文件夹保持不变。
+modinfo文件夹（mod名称、分类等信息）保持不变。
+"""
+import os
+import shutil
+
+from PySide6.QtCore import QThread, Signal
+
+from .archive import open_archive
+from .content_index import mod_member_files
+from .manifest import hash_file, load_mod_manifest, write_mod_manifest, forget_mod_manifest, scan_folder
+
+
+class UpdatePlan:
+    """新版压缩包与已安装mod的差异（路径相对于mod文件夹，'/'分隔）"""
+
+    def __init__(self):
+        self.added = []
+        self.changed = []
+        self.removed = []
+        self.known_hashes = {}      # 未变化文件的哈希，写入新清单时不再读取
+        self.member_names = {}      # 需要写入的文件 -> 压缩包成员名称
+        self.write_size = 0
+
+    @property
+    def unchanged(self):
+        return len(self.known_hashes)
+
+    def is_empty(self):
+        return not (self.added or self.changed or self.removed)
+
+    def summary(self):
+        return (f"新增 {len(self.added)} 个、修改 {len(self.changed)} 个、删除 {len(self.removed)} 个文件，"
+                f"{self.unchanged} 个文件未变化")
+
+
+def plan_update(archive, mod_folder_path):
+    """比较压缩包与已安装的mod，得出需要写入和删除的文件"""
+    manifest = load_mod_manifest(mod_folder_path)
+    if manifest is None:
+        manifest = write_mod_manifest(mod_folder_path, with_hash=True)
+    installed = {entry.path: entry for entry in manifest if not entry.is_dir}
+    incoming = mod_member_files(archive.members())
+
+    plan = UpdatePlan()
+    same_size = []
+    for rel_path, member in incoming.items():
+        entry = installed.get(rel_path)
+        if entry is None:
+            plan.added.append(rel_path)
+        elif entry.size != member.size:
+            plan.changed.append(rel_path)
+        else:
+            same_size.append(rel_path)
+    plan.removed = sorted(set(installed) - set(incoming))
+
+    if same_size:
+        member_hashes = archive.hash_members(names={incoming[rel_path].name for rel_path in same_size})
+        for rel_path in same_size:
+            installed_hash = installed[rel_path].hash
+            if installed_hash is None:
+                try:
+                    installed_hash = hash_file(os.path.join(mod_folder_path, *rel_path.split("/")))
+                except OSError:
+                    installed_hash = None
+            if installed_hash is not None and member_hashes.get(rel_path) == installed_hash:
+                plan.known_hashes[rel_path] = installed_hash
+            else:
+                plan.changed.append(rel_path)
+
+    plan.added.sort()
+    plan.changed.sort()
+    for rel_path in plan.added + plan.changed:
+        plan.member_names[rel_path] = incoming[rel_path].name
+        plan.write_size += incoming[rel_path].size
+    return plan
+
+
+def _prune_empty_dirs(mod_folder_path, rel_paths):
+    """删除文件后清理变空的上级文件夹（不删除mod文件夹本身）"""
+    root = os.path.abspath(mod_folder_path)
+    for rel_path in rel_paths:
+        dir_path = os.path.dirname(os.path.join(root, *rel_path.split("/")))
+        while dir_path != root and dir_path.startswith(root):
+            try:
+                os.rmdir(dir_path)
+            except OSError:
+                break
+            dir_path = os.path.dirname(dir_path)
+
+
+def apply_update(archive, mod_folder_path, plan, staging_dir, progress=None, is_cancelled=None):
+    """按更新计划修改mod文件夹并重写清单
+
+    替换文件的中途失败时，mod文件夹只更新了一部分：按磁盘上的现状重写清单后再抛出异常。
+
+    Returns:
+        bool: 是否完成；解压期间取消时返回False，mod文件夹不受影响
+    """
+    written_hashes = {}
+    modified = False
+    try:
+        if plan.member_names:
+            completed = archive.extract(
+                staging_dir, progress=progress, is_cancelled=is_cancelled,
+                hashes=written_hashes, names=set(plan.member_names.values())
+            )
+            if not completed:
+                return False
+        # 先删除再写入：不区分大小写的文件系统上，只改了大小写的文件会同时出现在删除和新增中
+        modified = True
+        for rel_path in plan.removed:
+            try:
+                os.remove(os.path.join(mod_folder_path, *rel_path.split("/")))
+            except FileNotFoundError:
+                pass
+        _prune_empty_dirs(mod_folder_path, plan.removed)
+        for rel_path in plan.added + plan.changed:
+            target = os.path.join(mod_folder_path, *rel_path.split("/"))
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            os.replace(os.path.join(staging_dir, *rel_path.split("/")), target)
+    except Exception:
+        if modified:
+            try:
+                write_mod_manifest(mod_folder_path, with_hash=True, known_hashes=plan.known_hashes)
+            except Exception as e:
+                print(f"[警告] 重写清单失败: {e}")
+        raise
+    finally:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+
+    known_hashes = dict(plan.known_hashes)
+    known_hashes.update(written_hashes)
+    write_mod_manifest(mod_folder_path, with_hash=True, known_hashes=known_hashes)
+    return True
+
+
+def replace_mod_folder(mod_folder_path, new_folder_path):
+    """用准备好的文件夹整体替换mod文件夹（覆盖导入）
+
+    旧文件夹先移到一旁，新文件夹移入后再删除旧文件夹；新文件夹与mods目录应位于同一磁盘。
+
+    Returns:
+        set: 旧mod的文件路径（'/'分隔，不含modinfo），用于重新部署已启用的mod
+
+    Raises:
+        OSError: 替换失败，旧mod保持不变（新文件夹由调用方处理）
+    """
+    old_paths = {rel_path for rel_path, _entry, is_dir in scan_folder(mod_folder_path) if not is_dir}
+    backup_path = new_folder_path.rstrip("/\\") + "_old"
+    os.replace(mod_folder_path, backup_path)
+    try:
+        os.replace(new_folder_path, mod_folder_path)
+    except OSError:
+        os.replace(backup_path, mod_folder_path)
+        raise
+    shutil.rmtree(backup_path, ignore_errors=True)
+    forget_mod_manifest(mod_folder_path)
+    return old_paths
+
+
+class ModUpdateThread(QThread):
+    """后台增量更新线程"""
+    progress = Signal(object, object, str)     # 已解压字节, 总字节, 当前成员
+    update_finished = Signal(object, str)      # UpdatePlan（失败或取消时为None）, 错误信息（取消时为空）
+
+    def __init__(self, archive_path, mod_folder_path, staging_dir, parent=None):
+        super().__init__(parent)
+        self.archive_path = archive_path
+        self.mod_folder_path = mod_folder_path
+        self.staging_dir = staging_dir
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def is_cancelled(self):
+        return self._cancelled
+
+    def run(self):
+        try:
+            with open_archive(self.archive_path) as archive:
+                plan = plan_update(archive, self.mod_folder_path)
+                if self._cancelled:
+                    self.update_finished.emit(None, "")
+                    return
+                if not apply_update(archive, self.mod_folder_path, plan, self.staging_dir,
+                                    progress=self.progress.emit, is_cancelled=self.is_cancelled):
+                    self.update_finished.emit(None, "")
+                    return
+            self.update_finished.emit(plan, "")
+        except Exception as e:
+            shutil.rmtree(self.staging_dir, ignore_errors=True)
+            self.update_finished.emit(None, str(e))
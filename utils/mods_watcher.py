@@ -0,0 +1,226 @@
+"""
+模组目录监视器 - 监视mods目录的变化，按mod标记脏数据并去抖后统一通知
+"""
+import os
+
+from PySide6.QtCore import QObject, QTimer, QFileSystemWatcher, Signal
+
+
+class ModsWatcher(QObject):
+    """监视mods目录及各mod子目录的变化
+
+    QFileSystemWatcher只报告被监视目录本身的增删改名，因此会监视每个mod的所有子目录。
+    监视数量达到上限或系统拒绝添加监视时，无法完整监视的mod改为定时比较目录修改时间。
+    """
+    mods_changed = Signal(list)  # 发生变化的mod文件夹名列表（去抖后发送）
+
+    def __init__(self, mods_dir, debounce_ms=800, sweep_interval_ms=30000, max_watches=8000, parent=None):
+        """
+        Args:
+            mods_dir: mods目录路径
+            debounce_ms: 去抖时间（毫秒），期间的多次变化合并为一次通知
+            sweep_interval_ms: 定时检查未被监视的mod的间隔（毫秒）
+            max_watches: 最多监视的目录数量
+        """
+        super().__init__(parent)
+        self.mods_dir = os.path.normpath(mods_dir)
+        self.max_watches = max_watches
+
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.directoryChanged.connect(self._on_directory_changed)
+
+        self._debounce_timer = QTimer(self)
+        self._debounce_timer.setSingleShot(True)
+        self._debounce_timer.setInterval(debounce_ms)
+        self._debounce_timer.timeout.connect(self._flush)
+
+        self._sweep_timer = QTimer(self)
+        self._sweep_timer.setInterval(sweep_interval_ms)
+        self._sweep_timer.timeout.connect(self._sweep)
+
+        self._dirty = set()             # 待通知的mod文件夹名
+        self._rewatch = set()           # 子目录可能变化、需要重新监视的mod文件夹名
+        self._known_folders = set()     # 当前已知的mod文件夹名
+        self._watched = {}              # mod文件夹名 -> 已监视的目录列表
+        self._sweep_fingerprints = {}   # 定时检查的mod文件夹名 -> 目录修改时间指纹
+        self._paused = 0
+        self._root_watched = False
+
+    # ------------------------------------------------------------------
+    # 启动与停止
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """开始监视"""
+        if not os.path.isdir(self.mods_dir):
+            return
+        self._root_watched = self._watcher.addPath(self.mods_dir)
+        if not self._root_watched:
+            self._sweep_timer.start()
+        with os.scandir(self.mods_dir) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    self._known_folders.add(entry.name)
+                    self._watch_mod(entry.name)
+        if self._sweep_fingerprints:
+            print(f"[提示] 目录监视数量已达上限，{len(self._sweep_fingerprints)} 个mod改为定时检查")
+
+    def stop(self):
+        """停止监视"""
+        self._debounce_timer.stop()
+        self._sweep_timer.stop()
+        paths = self._watcher.directories()
+        if paths:
+            self._watcher.removePaths(paths)
+        self._watched.clear()
+        self._sweep_fingerprints.clear()
+        self._known_folders.clear()
+        self._dirty.clear()
+        self._rewatch.clear()
+
+    def pause(self):
+        """暂停通知（程序自身批量修改mods目录时使用），变化仍会被记录"""
+        self._paused += 1
+
+    def resume(self):
+        """恢复通知，暂停期间积累的变化会在去抖后统一发送"""
+        self._paused = max(0, self._paused - 1)
+        if not self._paused and self._dirty:
+            self._debounce_timer.start()
+
+    def mark_dirty(self, folder_name):
+        """手动标记某个mod需要刷新"""
+        self._dirty.add(folder_name)
+        if not self._paused:
+            self._debounce_timer.start()
+
+    # ------------------------------------------------------------------
+    # 监视管理
+    # ------------------------------------------------------------------
+
+    def _mod_dirs(self, folder_name):
+        """列出mod的所有目录（跳过modinfo内部，modinfo本身需要监视以感知清单变化）"""
+        root_path = os.path.join(self.mods_dir, folder_name)
+        result = [root_path]
+        for root, dirs, files in os.walk(root_path):
+            if os.path.basename(root) == 'modinfo':
+                dirs[:] = []
+                continue
+            for dir in dirs:
+                result.append(os.path.join(root, dir))
+        return result
+
+    def _watch_mod(self, folder_name):
+        """为mod添加目录监视，超出上限时改为定时检查"""
+        dirs = self._mod_dirs(folder_name)
+        watched_count = len(self._watcher.directories())
+        failed = []
+        if watched_count + len(dirs) <= self.max_watches:
+            failed = self._watcher.addPaths(dirs)
+        else:
+            failed = dirs
+
+        if failed:
+            # 无法完整监视，撤销已添加的部分，改为定时检查
+            added = [d for d in dirs if d not in failed]
+            if added:
+                self._watcher.removePaths(added)
+            self._watched.pop(folder_name, None)
+            self._sweep_fingerprints[folder_name] = self._fingerprint(folder_name)
+            if not self._sweep_timer.isActive():
+                self._sweep_timer.start()
+        else:
+            self._watched[folder_name] = dirs
+            self._sweep_fingerprints.pop(folder_name, None)
+
+    def _unwatch_mod(self, folder_name):
+        """移除mod的目录监视"""
+        dirs = self._watched.pop(folder_name, None)
+        if dirs:
+            existing = set(self._watcher.directories())
+            to_remove = [d for d in dirs if d in existing]
+            if to_remove:
+                self._watcher.removePaths(to_remove)
+        self._sweep_fingerprints.pop(folder_name, None)
+        if not self._sweep_fingerprints and self._root_watched:
+            self._sweep_timer.stop()
+
+    def _fingerprint(self, folder_name):
+        """mod所有目录的修改时间指纹（增删文件会改变所在目录的修改时间）"""
+        fingerprint = {}
+        for dir_path in self._mod_dirs(folder_name):
+            try:
+                fingerprint[dir_path] = os.stat(dir_path).st_mtime_ns
+            except OSError:
+                pass
+        return fingerprint
+
+    # ------------------------------------------------------------------
+    # 事件处理
+    # ------------------------------------------------------------------
+
+    def _folder_of(self, path):
+        """根据被修改的目录路径得到所属mod文件夹名"""
+        rel_path = os.path.relpath(os.path.normpath(path), self.mods_dir)
+        if rel_path == '.' or rel_path.startswith('..'):
+            return None
+        return rel_path.split(os.sep)[0]
+
+    def _on_directory_changed(self, path):
+        if os.path.normpath(path) == self.mods_dir:
+            # mods目录本身变化：有mod被添加、删除或重命名
+            try:
+                with os.scandir(self.mods_dir) as entries:
+                    current = {entry.name for entry in entries if entry.is_dir()}
+            except OSError:
+                current = set()
+            for folder_name in current - self._known_folders:
+                self._watch_mod(folder_name)
+                self._dirty.add(folder_name)
+            for folder_name in self._known_folders - current:
+                self._unwatch_mod(folder_name)
+                self._dirty.add(folder_name)
+            self._known_folders = current
+        else:
+            folder_name = self._folder_of(path)
+            if folder_name is None:
+                return
+            self._dirty.add(folder_name)
+            # 子目录可能有增删，通知前重新建立该mod的监视
+            if folder_name in self._watched:
+                self._rewatch.add(folder_name)
+
+        if not self._paused:
+            self._debounce_timer.start()
+
+    def _sweep(self):
+        """定时检查未被监视的mod"""
+        if not self._root_watched:
+            # mods目录本身无法监视时，同样通过定时检查发现增删的mod
+            self._on_directory_changed(self.mods_dir)
+
+        changed = False
+        for folder_name in list(self._sweep_fingerprints):
+            if not os.path.isdir(os.path.join(self.mods_dir, folder_name)):
+                continue  # 删除由mods目录的监视处理
+            fingerprint = self._fingerprint(folder_name)
+            if fingerprint != self._sweep_fingerprints[folder_name]:
+                self._sweep_fingerprints[folder_name] = fingerprint
+                self._dirty.add(folder_name)
+                changed = True
+        if changed and not self._paused:
+            self._debounce_timer.start()
+
+    def _flush(self):
+        """发送积累的变化"""
+        if self._paused or not self._dirty:
+            return
+        for folder_name in self._rewatch:
+            if folder_name in self._watched and os.path.isdir(os.path.join(self.mods_dir, folder_name)):
+                self._unwatch_mod(folder_name)
+                self._watch_mod(folder_name)
+        self._rewatch.clear()
+
+        folders = sorted(self._dirty)
+        self._dirty.clear()
+        self.mods_changed.emit(folders)
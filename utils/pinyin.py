@@ -0,0 +1,105 @@
+"""
+汉字拼音 - 计算mod名称的全拼和首字母，用于拼音搜索
+
+安装了pypinyin时使用它得到完整拼音；否则按GB2312一级汉字的拼音排序推算首字母（不支持全拼）。
+"""
+try:
+    from pypinyin import lazy_pinyin, Style
+except ImportError:
+    lazy_pinyin = None
+    Style = None
+
+
+# GB2312一级汉字按拼音排序，每个首字母的起始编码（没有以i、u、v开头的拼音）
+_GB2312_INITIALS = (
+    (0xB0A1, 'a'), (0xB0C5, 'b'), (0xB2C1, 'c'), (0xB4EE, 'd'), (0xB6EA, 'e'),
+    (0xB7A2, 'f'), (0xB8C1, 'g'), (0xB9FE, 'h'), (0xBBF7, 'j'), (0xBFA6, 'k'),
+    (0xC0AC, 'l'), (0xC2E8, 'm'), (0xC4C3, 'n'), (0xC5B6, 'o'), (0xC5BE, 'p'),
+    (0xC6DA, 'q'), (0xC8BB, 'r'), (0xC8F6, 's'), (0xCBFA, 't'), (0xCDDA, 'w'),
+    (0xCEF4, 'x'), (0xD1B9, 'y'), (0xD4D1, 'z'),
+)
+_GB2312_LEVEL1_END = 0xD7F9
+
+
+def has_full_pinyin():
+    """是否能计算完整拼音（需要pypinyin）"""
+    return lazy_pinyin is not None
+
+
+def _is_hanzi(char):
+    return '\u4e00' <= char <= '\u9fff' or '\u3400' <= char <= '\u4dbf'
+
+
+def _gb2312_initial(char):
+    """按GB2312编码推算汉字的拼音首字母，二级汉字等无法推算时返回None"""
+    try:
+        encoded = char.encode('gb2312')
+    except UnicodeEncodeError:
+        return None
+    if len(encoded) != 2:
+        return None
+    code = (encoded[0] << 8) | encoded[1]
+    if code < _GB2312_INITIALS[0][0] or code > _GB2312_LEVEL1_END:
+        return None
+    initial = None
+    for start, letter in _GB2312_INITIALS:
+        if code < start:
+            break
+        initial = letter
+    return initial
+
+
+def pinyin_syllables(text):
+    """把文本转换为音节列表：汉字转为拼音，连续的字母数字保持为一个音节，其他字符忽略
+
+    Returns:
+        list[str]: 小写音节；没有pypinyin时汉字音节只有首字母
+    """
+    syllables = []
+    word = []
+
+    def flush_word():
+        if word:
+            syllables.append(''.join(word))
+            word.clear()
+
+    hanzi = []
+
+    def flush_hanzi():
+        if not hanzi:
+            return
+        if lazy_pinyin is not None:
+            syllables.extend(p.lower() for p in lazy_pinyin(''.join(hanzi), style=Style.NORMAL, errors='ignore'))
+        else:
+            for char in hanzi:
+                initial = _gb2312_initial(char)
+                if initial:
+                    syllables.append(initial)
+        hanzi.clear()
+
+    for char in text:
+        if _is_hanzi(char):
+            flush_word()
+            hanzi.append(char)
+        elif char.isascii() and char.isalnum():
+            flush_hanzi()
+            word.append(char.lower())
+        else:
+            flush_hanzi()
+            flush_word()
+    flush_hanzi()
+    flush_word()
+    return syllables
+
+
+def pinyin_keys(text):
+    """计算文本的拼音检索键
+
+    Returns:
+        tuple: (全拼音节列表, 首字母串)；文本不含汉字时返回 ([], "")
+    """
+    if not any(_is_hanzi(char) for char in text):
+        return [], ""
+    syllables = pinyin_syllables(text)
+    initials = ''.join(s[0] for s in syllables if s)
+    return syllables, initials
@@ -0,0 +1,396 @@
+"""
+保存的筛选查询 - 解析简单的查询语言，在模组目录缓存上求值，并缓存每个查询的结果
+
+查询语法：
+    条件    字段:值，数值字段还可以使用 > >= < <= =（如 conflicts>0、size>=100MB）
+    组合    AND / OR / NOT 和括号，相邻的条件之间默认为 AND
+    值      含空格或括号时用双引号括起，如 author:"Some One"
+
+字段：
+    tag(category)   分类标签包含该值
+    author          作者等于该值
+    name            名称包含该值
+    enabled / favorite / ignored    true 或 false
+    conflicts       与已启用的mod存在文件冲突的mod数量
+    size            占用空间（支持 KB/MB/GB 后缀）
+    files           文件数量
+
+例：tag:服装 AND author:QCanon AND enabled:false AND conflicts>0
+"""
+import os
+import re
+import json
+import threading
+
+
+# 布尔字段对应的状态读取方法
+_BOOL_FIELDS = {"enabled": "is_enabled", "favorite": "is_favorite", "ignored": "is_ignored"}
+_NUMBER_FIELDS = ("conflicts", "size", "files")
+_TEXT_FIELDS = ("tag", "author", "name")
+_FIELD_ALIASES = {"category": "tag", "标签": "tag", "作者": "author", "名称": "name"}
+
+# 依赖mod状态的字段：状态变化时需要重新求值
+STATE_FIELDS = frozenset(_BOOL_FIELDS) | {"conflicts"}
+
+_TRUE_VALUES = ("true", "yes", "1", "是")
+_FALSE_VALUES = ("false", "no", "0", "否")
+_SIZE_UNITS = {"": 1, "b": 1, "kb": 1024, "mb": 1024 ** 2, "gb": 1024 ** 3}
+
+_TOKEN_RE = re.compile(r'''
+    \s*(?:
+        (?P<cond>[^\s()"<>=:!]+)\s*(?P<op>>=|<=|:|=|>|<)\s*(?P<value>"(?:[^"\\]|\\.)*"|[^\s()"]+)
+      | (?P<paren>[()])
+      | (?P<word>[^\s()"]+)
+    )''', re.VERBOSE)
+
+
+def _parse_bool(text):
+    lowered = text.lower()
+    if lowered in _TRUE_VALUES:
+        return True
+    if lowered in _FALSE_VALUES:
+        return False
+    raise ValueError(f"无法识别的布尔值: {text}")
+
+
+def _parse_number(text, field):
+    match = re.fullmatch(r"(\d+(?:\.\d+)?)\s*([a-zA-Z]*)", text)
+    if not match:
+        raise ValueError(f"{field} 需要数值: {text}")
+    unit = match.group(2).lower()
+    if unit and (field != "size" or unit not in _SIZE_UNITS):
+        raise ValueError(f"无法识别的单位: {text}")
+    return float(match.group(1)) * _SIZE_UNITS[unit]
+
+
+class _Condition:
+    __slots__ = ("field", "op", "value")
+
+    def __init__(self, field, op, raw_value):
+        field = field.lower()
+        field = _FIELD_ALIASES.get(field, field)
+        if field in _BOOL_FIELDS:
+            if op not in (":", "="):
+                raise ValueError(f"{field} 只能使用 : 比较")
+            value = _parse_bool(raw_value)
+        elif field in _NUMBER_FIELDS:
+            value = _parse_number(raw_value, field)
+        elif field in _TEXT_FIELDS:
+            if op not in (":", "="):
+                raise ValueError(f"{field} 只能使用 : 比较")
+            value = raw_value.casefold()
+        else:
+            raise ValueError(f"未知的字段: {field}")
+        self.field = field
+        self.op = "=" if op == ":" else op
+        self.value = value
+
+    def fields(self):
+        return {self.field}
+
+    def matches(self, context, name):
+        field = self.field
+        if field in _BOOL_FIELDS:
+            return getattr(context.store, _BOOL_FIELDS[field])(name) == self.value
+        row = context.rows.get(name)
+        if row is None:
+            return False
+        if field == "tag":
+            return self.value in context.categories(name)
+        if field == "author":
+            return (row.get("author") or "").strip().casefold() == self.value
+        if field == "name":
+            return self.value in name.casefold()
+
+        if field == "conflicts":
+            actual = context.conflicts(name)
+        elif field == "size":
+            actual = row.get("size") or 0
+        else:
+            actual = row.get("file_count") or 0
+        op = self.op
+        if op == "=":
+            return actual == self.value
+        if op == ">":
+            return actual > self.value
+        if op == ">=":
+            return actual >= self.value
+        if op == "<":
+            return actual < self.value
+        return actual <= self.value
+
+
+class _And:
+    __slots__ = ("items",)
+
+    def __init__(self, items):
+        self.items = items
+
+    def fields(self):
+        return set().union(*(item.fields() for item in self.items))
+
+    def matches(self, context, name):
+        return all(item.matches(context, name) for item in self.items)
+
+
+class _Or(_And):
+    __slots__ = ()
+
+    def matches(self, context, name):
+        return any(item.matches(context, name) for item in self.items)
+
+
+class _Not:
+    __slots__ = ("item",)
+
+    def __init__(self, item):
+        self.item = item
+
+    def fields(self):
+        return self.item.fields()
+
+    def matches(self, context, name):
+        return not self.item.matches(context, name)
+
+
+def _tokenize(text):
+    tokens = []
+    pos = 0
+    text = text.strip()
+    while pos < len(text):
+        match = _TOKEN_RE.match(text, pos)
+        if not match or match.end() == pos:
+            raise ValueError(f"无法解析: {text[pos:]}")
+        pos = match.end()
+        if match.group("cond"):
+            value = match.group("value")
+            if value.startswith('"'):
+                value = re.sub(r'\\(.)', r'\1', value[1:-1])
+            tokens.append(("cond", _Condition(match.group("cond"), match.group("op"), value)))
+        elif match.group("paren"):
+            tokens.append((match.group("paren"), None))
+        else:
+            word = match.group("word").upper()
+            if word not in ("AND", "OR", "NOT"):
+                raise ValueError(f"无法识别的条件: {match.group('word')}（应为 字段:值）")
+            tokens.append((word, None))
+    return tokens
+
+
+class _Parser:
+    """递归下降解析：or := and (OR and)*；and := not ([AND] not)*；not := NOT not | 条件 | (or)"""
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.pos = 0
+
+    def peek(self):
+        return self.tokens[self.pos][0] if self.pos < len(self.tokens) else None
+
+    def take(self):
+        token = self.tokens[self.pos]
+        self.pos += 1
+        return token
+
+    def parse(self):
+        if not self.tokens:
+            raise ValueError("查询为空")
+        node = self.parse_or()
+        if self.pos < len(self.tokens):
+            raise ValueError("括号不匹配")
+        return node
+
+    def parse_or(self):
+        items = [self.parse_and()]
+        while self.peek() == "OR":
+            self.take()
+            items.append(self.parse_and())
+        return items[0] if len(items) == 1 else _Or(items)
+
+    def parse_and(self):
+        items = [self.parse_not()]
+        while self.peek() in ("AND", "NOT", "cond", "("):
+            if self.peek() == "AND":
+                self.take()
+            items.append(self.parse_not())
+        return items[0] if len(items) == 1 else _And(items)
+
+    def parse_not(self):
+        kind = self.peek()
+        if kind == "NOT":
+            self.take()
+            return _Not(self.parse_not())
+        if kind == "cond":
+            return self.take()[1]
+        if kind == "(":
+            self.take()
+            node = self.parse_or()
+            if self.peek() != ")":
+                raise ValueError("括号不匹配")
+            self.take()
+            return node
+        raise ValueError("查询不完整")
+
+
+def parse_query(text):
+    """解析查询文本，语法错误时抛出ValueError"""
+    return _Parser(_tokenize(text)).parse()
+
+
+class QueryContext:
+    """查询求值所需的数据：目录缓存的行（按mod名称）、mod状态和文件冲突关系"""
+
+    def __init__(self, rows, store, conflict_partners=None, generation=None):
+        """
+        Args:
+            rows: 目录缓存的所有行
+            store: ModStateStore，求值时读取实时状态
+            conflict_partners: 返回 {mod名称: 共享文件的其他mod名称集合} 的函数，首次用到时才调用
+            generation: 目录缓存版本，变化后查询结果需要全部重新计算
+        """
+        self.rows = {row["name"]: row for row in rows}
+        self.store = store
+        self.generation = generation
+        self._conflict_partners = conflict_partners
+        self._partners = None
+        self._categories = {}
+
+    def categories(self, name):
+        cached = self._categories.get(name)
+        if cached is None:
+            row = self.rows.get(name) or {}
+            cached = frozenset(
+                cat.strip().casefold() for cat in (row.get("category") or "").split(';') if cat.strip()
+            )
+            self._categories[name] = cached
+        return cached
+
+    def partners(self, name):
+        if self._partners is None:
+            self._partners = self._conflict_partners() if self._conflict_partners else {}
+        return self._partners.get(name, ())
+
+    def conflicts(self, name):
+        store = self.store
+        return sum(1 for other in self.partners(name) if store.is_enabled(other))
+
+
+class SavedQueries:
+    """保存的查询及其结果缓存
+
+    查询保存在JSON文件中（[{"name": ..., "query": ...}]），顺序即显示顺序。
+    每个查询的结果（mod名称集合）在目录缓存版本不变时一直有效；mod状态变化时只对受影响的mod重新求值
+    （查询用到 conflicts 时，还包括与其共享文件的mod）。
+    """
+
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self._lock = threading.Lock()
+        self._queries = {}      # 名称 -> 查询文本（保持插入顺序）
+        self._parsed = {}       # 名称 -> 语法树
+        self._results = {}      # 名称 -> mod名称集合
+        self._generation = None
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.file_path):
+            return
+        try:
+            with open(self.file_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except Exception as e:
+            print(f"[失败] 加载保存的查询失败: {e}")
+            return
+        for item in data if isinstance(data, list) else []:
+            name = item.get("name") if isinstance(item, dict) else None
+            if not name:
+                continue
+            try:
+                self._parsed[name] = parse_query(item.get("query", ""))
+                self._queries[name] = item.get("query", "")
+            except ValueError as e:
+                print(f"[警告] 忽略无效的查询 {name}: {e}")
+
+    def _save(self):
+        data = [{"name": name, "query": text} for name, text in self._queries.items()]
+        try:
+            os.makedirs(os.path.dirname(self.file_path), exist_ok=True)
+            tmp_path = self.file_path + ".tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.file_path)
+        except Exception as e:
+            print(f"[失败] 保存查询失败: {e}")
+
+    def names(self):
+        return list(self._queries)
+
+    def get_text(self, name):
+        return self._queries.get(name)
+
+    def set_query(self, name, text):
+        """新增或修改查询，语法错误时抛出ValueError"""
+        parsed = parse_query(text)
+        with self._lock:
+            self._queries[name] = text
+            self._parsed[name] = parsed
+            self._results.pop(name, None)
+        self._save()
+
+    def remove(self, name):
+        with self._lock:
+            self._queries.pop(name, None)
+            self._parsed.pop(name, None)
+            self._results.pop(name, None)
+        self._save()
+
+    def invalidate(self):
+        """丢弃所有缓存的结果（如mod状态被整体重新加载）"""
+        with self._lock:
+            self._results.clear()
+
+    def _check_generation(self, context):
+        if context.generation != self._generation:
+            self._results.clear()
+            self._generation = context.generation
+
+    def evaluate(self, name, context):
+        """查询结果（mod名称集合），有缓存时直接返回"""
+        with self._lock:
+            self._check_generation(context)
+            result = self._results.get(name)
+            if result is None:
+                parsed = self._parsed.get(name)
+                if parsed is None:
+                    return set()
+                result = {mod_name for mod_name in context.rows if parsed.matches(context, mod_name)}
+                self._results[name] = result
+            return result
+
+    def update_mods(self, mod_names, context):
+        """mod状态变化后增量更新已缓存的结果
+
+        Returns:
+            set: 结果发生变化的查询名称
+        """
+        changed = set()
+        with self._lock:
+            self._check_generation(context)
+            for name, result in self._results.items():
+                parsed = self._parsed[name]
+                fields = parsed.fields()
+                if not fields & STATE_FIELDS:
+                    continue
+                affected = set(mod_names)
+                if "conflicts" in fields:
+                    for mod_name in mod_names:
+                        affected.update(context.partners(mod_name))
+                for mod_name in affected:
+                    matched = mod_name in context.rows and parsed.matches(context, mod_name)
+                    if matched != (mod_name in result):
+                        if matched:
+                            result.add(mod_name)
+                        else:
+                            result.discard(mod_name)
+                        changed.add(name)
+        return changed
@@ -0,0 +1,475 @@
+"""
+模组搜索索引 - 从模组目录缓存建立倒排索引：中日韩文字使用单字和双字n-gram，其他文字使用词前缀，
+mod名称额外支持拼音全拼/首字母和容错匹配；另有全库文件路径索引，支持 path: 查询
+"""
+import os
+import re
+import bisect
+import fnmatch
+import threading
+import unicodedata
+
+from .manifest import load_mod_manifest
+from .pinyin import pinyin_keys
+
+
+# 中日韩文字（假名、汉字、兼容汉字、韩文）
+_CJK_CLASS = "\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uac00-\ud7af"
+_TOKEN_RE = re.compile(f"([{_CJK_CLASS}]+)|([^\\W_{_CJK_CLASS}]+)")
+_CJK_RE = re.compile(f"[{_CJK_CLASS}]")
+
+# 参与索引的目录字段
+INDEXED_FIELDS = ("name", "category", "author", "description")
+
+# 各类命中的得分：精确命中 > 拼音命中 > 容错命中（容错命中按编辑距离在此基础上打折）
+SCORE_EXACT = 1.0
+SCORE_PINYIN = 0.9
+SCORE_FUZZY = 0.8
+
+# 路径查询的前缀，如 path:nativePC/wp/two/*
+PATH_QUERY_PREFIX = "path:"
+_GLOB_CHARS = "*?["
+
+
+def normalize_text(text):
+    """统一全角/半角并转为小写"""
+    return unicodedata.normalize("NFKC", text or "").lower()
+
+
+def tokenize(text):
+    """把文本拆分为 (中日韩文字串列表, 其他文字词列表)"""
+    cjk_runs = []
+    words = []
+    for match in _TOKEN_RE.finditer(normalize_text(text)):
+        if match.group(1):
+            cjk_runs.append(match.group(1))
+        else:
+            words.append(match.group(2))
+    return cjk_runs, words
+
+
+def _cjk_grams(run):
+    """中日韩文字串的单字和双字n-gram"""
+    grams = set(run)
+    grams.update(run[i:i + 2] for i in range(len(run) - 1))
+    return grams
+
+
+def normalize_path(path):
+    """统一路径格式：'/'分隔、去掉开头的'/'、小写（Windows路径不区分大小写）"""
+    return path.replace("\\", "/").lstrip("/").lower()
+
+
+def _bigrams(text):
+    return {text[i:i + 2] for i in range(len(text) - 1)}
+
+
+def _compact(text):
+    """去掉空白和标点，用于名称的容错匹配"""
+    return ''.join(char for char in normalize_text(text) if char.isalnum())
+
+
+def fuzzy_distance(pattern, text, max_dist):
+    """pattern与text中任意子串的最小编辑距离（允许相邻字符交换），超过max_dist时返回None"""
+    width = len(text) + 1
+    prev_prev = None
+    prev = [0] * width   # 匹配可以从text的任意位置开始
+    for i in range(1, len(pattern) + 1):
+        cur = [i] + [0] * len(text)
+        pc = pattern[i - 1]
+        for j in range(1, width):
+            tc = text[j - 1]
+            value = min(prev[j - 1] + (pc != tc), prev[j] + 1, cur[j - 1] + 1)
+            if prev_prev is not None and j > 1 and pc == text[j - 2] and pattern[i - 2] == tc:
+                value = min(value, prev_prev[j - 2] + 1)
+            cur[j] = value
+        if min(cur) > max_dist:
+            return None
+        prev_prev, prev = prev, cur
+    distance = min(prev)
+    return distance if distance <= max_dist else None
+
+
+class _Document:
+    __slots__ = ("name", "signature", "terms", "cjk_text", "paths", "compact_name", "pinyin_keys")
+
+    def __init__(self, name, signature, terms, cjk_text, paths):
+        self.name = name
+        self.signature = signature
+        self.terms = terms          # 该文档贡献的所有索引词
+        self.cjk_text = cjk_text    # 所有中日韩文字串，用于确认n-gram命中的是连续文字
+        self.paths = paths          # 文件清单中的路径（已统一格式）
+        self.compact_name = _compact(name)  # 容错匹配使用的名称
+        self.pinyin_keys = _name_pinyin_keys(name)
+
+
+def _name_pinyin_keys(name):
+    """名称的拼音检索键：首字母串和全拼从每个音节开始的后缀，查询词是其中某个键的前缀即命中"""
+    syllables, initials = pinyin_keys(name)
+    keys = set()
+    for i in range(len(initials)):
+        keys.add(initials[i:])
+    for i in range(len(syllables)):
+        keys.add(''.join(syllables[i:]))
+    return keys
+
+
+class SearchIndex:
+    """模组搜索索引
+
+    以mod文件夹名为文档编号，索引名称、分类、作者、描述和文件路径。
+    索引在后台线程中按目录缓存的版本号增量同步，查询和同步由同一把锁保护。
+
+    查询按空白分词，每个词都必须命中（与）：
+    中日韩文字通过双字n-gram求交后再确认是连续出现；其他文字按词前缀匹配；
+    字母数字组成的词还会匹配名称的拼音全拼和首字母（预先计算并排序，二分查找）；
+    以上都没有命中时，按名称的双字n-gram筛选候选，再计算编辑距离进行容错匹配。
+
+    以 path: 开头的词查询全库路径索引（所有mod文件清单路径的有序列表，包括未启用的mod）：
+    不含通配符时匹配该文件或文件夹，含通配符时按glob匹配，通配符之前的部分先二分查找缩小范围。
+    """
+
+    def __init__(self, mods_dir):
+        self.mods_dir = mods_dir
+        self._lock = threading.RLock()
+        self._docs = {}            # folder -> _Document
+        self._postings = {}        # 索引词 -> set(folder)
+        self._words = []           # 其他文字词的有序列表（用于前缀查找），None表示需要重建
+        self._name_grams = {}      # 名称的双字n-gram -> set(folder)，用于容错匹配的候选
+        self._pinyin = []          # (拼音键, folder) 的有序列表，None表示需要重建
+        self._paths = []           # (路径, folder) 的有序列表，None表示需要重建
+        self._conflicts = None     # mod名称 -> 与其共享文件的其他mod名称集合，None表示需要重建
+        self._catalog_generation = None
+
+    # ------------------------------------------------------------------
+    # 建立索引
+    # ------------------------------------------------------------------
+
+    def _row_signature(self, row):
+        return tuple(row.get(field) for field in INDEXED_FIELDS) + (
+            row.get("manifest_sig"), row.get("dir_mtime"), row.get("info_mtime")
+        )
+
+    def _document_terms(self, row):
+        """计算文档的索引词、中日韩文字串和文件路径"""
+        texts = [row.get(field) or "" for field in INDEXED_FIELDS]
+        manifest = load_mod_manifest(os.path.join(self.mods_dir, row["folder"]), migrate=False)
+        paths = ()
+        if manifest is not None:
+            texts.extend(manifest.paths)
+            paths = tuple(normalize_path(path) for path in manifest.paths)
+
+        terms = set()
+        cjk_runs = []
+        for text in texts:
+            runs, words = tokenize(text)
+            for run in runs:
+                terms.update(_cjk_grams(run))
+                cjk_runs.append(run)
+            terms.update(words)
+        return terms, "\x00".join(cjk_runs), paths
+
+    def _add_document(self, row):
+        folder = row["folder"]
+        self._remove_document(folder)
+        terms, cjk_text, paths = self._document_terms(row)
+        doc = _Document(row["name"], self._row_signature(row), terms, cjk_text, paths)
+        self._docs[folder] = doc
+        for term in terms:
+            postings = self._postings.get(term)
+            if postings is None:
+                self._postings[term] = {folder}
+                self._words = None
+            else:
+                postings.add(folder)
+        for gram in _bigrams(doc.compact_name):
+            self._name_grams.setdefault(gram, set()).add(folder)
+        if doc.pinyin_keys:
+            self._pinyin = None
+        if doc.paths:
+            self._paths = None
+
+    def _remove_document(self, folder):
+        doc = self._docs.pop(folder, None)
+        if doc is None:
+            return
+        for term in doc.terms:
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            postings.discard(folder)
+            if not postings:
+                del self._postings[term]
+                self._words = None
+        for gram in _bigrams(doc.compact_name):
+            postings = self._name_grams.get(gram)
+            if postings is not None:
+                postings.discard(folder)
+                if not postings:
+                    del self._name_grams[gram]
+        if doc.pinyin_keys:
+            self._pinyin = None
+        if doc.paths:
+            self._paths = None
+
+    def sync(self, catalog):
+        """按目录缓存同步索引，只重新索引发生变化的mod
+
+        Returns:
+            bool: 索引是否发生变化
+        """
+        with self._lock:
+            generation = catalog.generation
+            if generation == self._catalog_generation:
+                return False
+            rows = catalog.get_all()
+            current = set()
+            changed = False
+            for row in rows:
+                folder = row["folder"]
+                current.add(folder)
+                doc = self._docs.get(folder)
+                if doc is not None and doc.signature == self._row_signature(row):
+                    continue
+                try:
+                    self._add_document(row)
+                    changed = True
+                except Exception as e:
+                    print(f"[警告] 建立搜索索引失败: {folder} {e}")
+            for folder in [f for f in self._docs if f not in current]:
+                self._remove_document(folder)
+                changed = True
+            self._catalog_generation = generation
+            # 预先排好拼音键和路径，查询时只需二分查找
+            self._pinyin_list()
+            self._path_list()
+            return changed
+
+    # ------------------------------------------------------------------
+    # 查询
+    # ------------------------------------------------------------------
+
+    def _word_list(self):
+        """非中日韩索引词的有序列表（索引变化后重建）"""
+        if self._words is None:
+            self._words = sorted(term for term in self._postings if not _CJK_RE.match(term))
+        return self._words
+
+    def _match_prefix(self, prefix):
+        """以prefix开头的词所在的文档"""
+        words = self._word_list()
+        result = set()
+        i = bisect.bisect_left(words, prefix)
+        while i < len(words) and words[i].startswith(prefix):
+            result |= self._postings[words[i]]
+            i += 1
+        return result
+
+    def _match_cjk(self, run):
+        """包含连续中日韩文字串run的文档"""
+        grams = [run] if len(run) == 1 else [run[i:i + 2] for i in range(len(run) - 1)]
+        candidates = None
+        for gram in sorted(set(grams), key=lambda g: len(self._postings.get(g, ()))):
+            postings = self._postings.get(gram)
+            if not postings:
+                return set()
+            candidates = set(postings) if candidates is None else candidates & postings
+            if not candidates:
+                return set()
+        if len(run) <= 2:
+            return candidates
+        return {folder for folder in candidates if run in self._docs[folder].cjk_text}
+
+    def _pinyin_list(self):
+        """所有名称拼音键的有序列表（索引变化后重建）"""
+        if self._pinyin is None:
+            self._pinyin = sorted(
+                (key, folder) for folder, doc in self._docs.items() for key in doc.pinyin_keys
+            )
+        return self._pinyin
+
+    def _match_pinyin(self, term):
+        """名称的拼音全拼或首字母以term开头（可从任意音节开始）的文档"""
+        keys = self._pinyin_list()
+        result = set()
+        i = bisect.bisect_left(keys, (term,))
+        while i < len(keys) and keys[i][0].startswith(term):
+            result.add(keys[i][1])
+            i += 1
+        return result
+
+    def _path_list(self):
+        """全库文件路径的有序列表（索引变化后重建）"""
+        if self._paths is None:
+            self._paths = sorted(
+                (path, folder) for folder, doc in self._docs.items() for path in doc.paths
+            )
+            self._conflicts = None
+        return self._paths
+
+    def conflict_partners(self):
+        """共享同一文件的mod关系（不论是否启用），返回 {mod名称: 其他mod名称集合}"""
+        with self._lock:
+            paths = self._path_list()
+            if self._conflicts is None:
+                partners = {}
+                i = 0
+                while i < len(paths):
+                    j = i + 1
+                    while j < len(paths) and paths[j][0] == paths[i][0]:
+                        j += 1
+                    # 路径有序，相同路径相邻；目录条目不算冲突
+                    if j - i > 1 and not paths[i][0].endswith("/"):
+                        names = {self._docs[folder].name for _, folder in paths[i:j]}
+                        for name in names:
+                            partners.setdefault(name, set()).update(names - {name})
+                    i = j
+                self._conflicts = partners
+            return self._conflicts
+
+    def shared_files(self, paths):
+        """与给定文件路径重合的mod
+
+        Args:
+            paths: 规范化（normalize_path）后的文件路径
+
+        Returns:
+            dict: folder -> 重合的文件数
+        """
+        result = {}
+        with self._lock:
+            all_paths = self._path_list()
+            for path in paths:
+                i = bisect.bisect_left(all_paths, (path,))
+                while i < len(all_paths) and all_paths[i][0] == path:
+                    folder = all_paths[i][1]
+                    result[folder] = result.get(folder, 0) + 1
+                    i += 1
+        return result
+
+    def _scan_paths(self, prefix):
+        """以prefix开头的 (路径, folder)"""
+        paths = self._path_list()
+        i = bisect.bisect_left(paths, (prefix,))
+        while i < len(paths) and paths[i][0].startswith(prefix):
+            yield paths[i]
+            i += 1
+
+    def match_path(self, pattern):
+        """包含指定路径的mod
+
+        Args:
+            pattern: 相对于游戏根目录的路径；不含通配符时匹配该文件或文件夹（及其中的文件），
+                     含 * ? [] 时按glob匹配（* 可以跨越多级目录）
+
+        Returns:
+            dict: folder -> 命中的路径列表
+        """
+        pattern = normalize_path(pattern)
+        result = {}
+        with self._lock:
+            if not any(char in pattern for char in _GLOB_CHARS):
+                pattern = pattern.rstrip("/")
+                if not pattern:
+                    return result
+                for path, folder in self._scan_paths(pattern):
+                    if len(path) == len(pattern) or path[len(pattern)] == "/":
+                        result.setdefault(folder, []).append(path)
+                return result
+
+            first = min(pattern.find(char) for char in _GLOB_CHARS if char in pattern)
+            literal = pattern[:first]
+            # 只有末尾一个 * 时就是前缀查询，不需要逐条glob匹配
+            prefix_only = pattern.endswith("*") and first == len(pattern) - 1
+            for path, folder in self._scan_paths(literal):
+                if prefix_only or fnmatch.fnmatchcase(path, pattern):
+                    result.setdefault(folder, []).append(path)
+        return result
+
+    def _match_fuzzy(self, term):
+        """名称与term近似（允许少量错字、漏字、多字或相邻字交换）的文档及得分"""
+        pattern = _compact(term)
+        if len(pattern) < 3:
+            return {}
+        max_dist = 1 if len(pattern) <= 5 else 2
+        grams = _bigrams(pattern)
+        # q-gram引理：编辑距离不超过k的字符串至少共享 len-1-3k 个双字n-gram
+        min_shared = max(1, len(pattern) - 1 - 3 * max_dist)
+        counts = {}
+        for gram in grams:
+            for folder in self._name_grams.get(gram, ()):
+                counts[folder] = counts.get(folder, 0) + 1
+        result = {}
+        for folder, count in counts.items():
+            if count < min_shared:
+                continue
+            distance = fuzzy_distance(pattern, self._docs[folder].compact_name, max_dist)
+            if distance is not None:
+                result[folder] = SCORE_FUZZY * (1 - distance / len(pattern))
+        return result
+
+    def _match_exact(self, term):
+        """单个查询词精确命中的文档，没有可索引的字符时返回None"""
+        runs, words = tokenize(term)
+        if not runs and not words:
+            return None
+        result = None
+        for run in runs:
+            matched = self._match_cjk(run)
+            result = matched if result is None else result & matched
+            if not result:
+                return set()
+        for word in words:
+            matched = self._match_prefix(word)
+            result = matched if result is None else result & matched
+            if not result:
+                return set()
+        return result
+
+    def _match_term(self, term):
+        """单个查询词命中的文档及得分 {folder: score}，没有可索引的字符时返回None"""
+        if term[:len(PATH_QUERY_PREFIX)].lower() == PATH_QUERY_PREFIX:
+            pattern = term[len(PATH_QUERY_PREFIX):]
+            if not pattern:
+                return None
+            return dict.fromkeys(self.match_path(pattern), SCORE_EXACT)
+
+        exact = self._match_exact(term)
+        if exact is None:
+            return None
+        scores = dict.fromkeys(exact, SCORE_EXACT)
+
+        normalized = normalize_text(term)
+        if normalized.isascii() and normalized.isalnum():
+            for folder in self._match_pinyin(normalized):
+                scores.setdefault(folder, SCORE_PINYIN)
+
+        if not scores:
+            # 没有精确或拼音命中时才进行容错匹配，避免干扰正常的搜索结果
+            scores = self._match_fuzzy(term)
+        return scores
+
+    def search(self, query):
+        """查询，返回命中的mod名称及得分
+
+        Args:
+            query: 查询文本，空白分隔的多个词需全部命中；path: 开头的词按文件路径查询
+
+        Returns:
+            dict: mod名称 -> 得分（多个词时取最低分），得分越高越相关
+        """
+        with self._lock:
+            result = None
+            for term in query.split():
+                matched = self._match_term(term)
+                if matched is None:
+                    continue
+                if result is None:
+                    result = matched
+                else:
+                    result = {folder: min(score, matched[folder]) for folder, score in result.items() if folder in matched}
+                if not result:
+                    return {}
+            if result is None:
+                return {}
+            return {self._docs[folder].name: score for folder, score in result.items()}
@@ -0,0 +1,153 @@
+"""
+设置服务 - 缓存settings.json，提供只读快照，保存或文件被外部修改时统一通知
+"""
+import os
+import json
+from types import MappingProxyType
+
+from PySide6.QtCore import QObject, QFileSystemWatcher, Signal
+
+
+# 高级设置的默认值
+DEFAULT_SETTINGS = {
+    'game_path': '',
+    'sandbox_mode': False,
+    'virtual_mapping': False,
+    'batch_import_mode': 'copy',
+    'import_io_budget': 2,
+    'content_store': False,
+    'cold_storage': False,
+    'cold_storage_days': 30
+}
+
+
+def get_hidden_game_path(game_path):
+    """junction映射时游戏目录被重命名后的路径（普通空格替换为不间断空格 U+00A0）"""
+    if not game_path:
+        return ''
+    parent_dir = os.path.dirname(game_path)
+    hidden_dir_name = os.path.basename(game_path).replace(' ', '\u00A0')
+    return os.path.join(parent_dir, hidden_dir_name)
+
+
+class SettingsService(QObject):
+    """高级设置的缓存服务
+
+    settings.json只在首次访问、保存后或被外部修改时读取一次，其余时间直接返回缓存的快照。
+    快照是只读的 MappingProxyType，可以安全地交给后台线程使用；修改设置需通过 save()。
+    设置变化时发出 settings_changed 信号，依赖设置的派生值（如隐藏游戏目录）只需重新计算一次。
+    """
+    settings_changed = Signal(object)  # 新的设置快照
+
+    def __init__(self, settings_file, parent=None):
+        """
+        Args:
+            settings_file: settings.json路径
+        """
+        super().__init__(parent)
+        self.settings_file = settings_file
+        self._snapshot = None
+        self._hidden_game_path = ''
+        self._disk_signature = None   # 最近一次读取或写入后文件的 (mtime_ns, size)
+
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.fileChanged.connect(self._on_file_changed)
+
+    # ------------------------------------------------------------------
+    # 文件读写
+    # ------------------------------------------------------------------
+
+    def _file_signature(self):
+        try:
+            st = os.stat(self.settings_file)
+            return st.st_mtime_ns, st.st_size
+        except OSError:
+            return None
+
+    def _ensure_watch(self):
+        """原子替换会使文件监视失效，每次写入或变化后重新添加"""
+        if os.path.exists(self.settings_file) and self.settings_file not in self._watcher.files():
+            self._watcher.addPath(self.settings_file)
+
+    def _read_file(self):
+        settings = dict(DEFAULT_SETTINGS)
+        if os.path.exists(self.settings_file):
+            try:
+                with open(self.settings_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if isinstance(data, dict):
+                    settings.update(data)
+            except Exception as e:
+                print(f"[失败] 加载设置失败: {e}")
+        return settings
+
+    def _set_snapshot(self, settings):
+        """更新快照和派生值，返回设置是否发生变化"""
+        old_snapshot = self._snapshot
+        self._snapshot = MappingProxyType(dict(settings))
+        self._hidden_game_path = get_hidden_game_path(self._snapshot.get('game_path', ''))
+        return old_snapshot is not None and dict(old_snapshot) != dict(self._snapshot)
+
+    def _load(self):
+        self._disk_signature = self._file_signature()
+        changed = self._set_snapshot(self._read_file())
+        self._ensure_watch()
+        return changed
+
+    def _on_file_changed(self, path):
+        self._ensure_watch()
+        if self._snapshot is None:
+            return  # 尚未读取过，下次访问时自然会读取最新内容
+        signature = self._file_signature()
+        if signature == self._disk_signature:
+            return  # 自身写入触发的通知
+        if self._load():
+            print("[信息] 设置文件已被外部修改，已重新加载")
+            self.settings_changed.emit(self._snapshot)
+
+    def save(self, settings):
+        """保存设置（先写临时文件再替换），成功返回True"""
+        new_settings = {**DEFAULT_SETTINGS, **dict(settings)}
+        try:
+            os.makedirs(os.path.dirname(self.settings_file), exist_ok=True)
+            tmp_path = self.settings_file + ".tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(dict(settings), f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.settings_file)
+        except Exception as e:
+            print(f"[失败] 保存设置失败: {e}")
+            return False
+
+        self._disk_signature = self._file_signature()
+        self._ensure_watch()
+        if self._snapshot is None:
+            self._set_snapshot(new_settings)
+            changed = True
+        else:
+            changed = self._set_snapshot(new_settings)
+        if changed:
+            self.settings_changed.emit(self._snapshot)
+        return True
+
+    # ------------------------------------------------------------------
+    # 读取
+    # ------------------------------------------------------------------
+
+    def snapshot(self):
+        """当前设置的只读快照"""
+        if self._snapshot is None:
+            self._load()
+        return self._snapshot
+
+    def get(self, key, default=None):
+        return self.snapshot().get(key, default)
+
+    @property
+    def game_path(self):
+        return self.snapshot().get('game_path', '')
+
+    @property
+    def hidden_game_path(self):
+        """junction映射后游戏目录的实际路径（未设置游戏目录时为空字符串）"""
+        self.snapshot()
+        return self._hidden_game_path
@@ -0,0 +1,223 @@
+"""
+模组状态存储 - 在内存中维护mod的启用、收藏、忽略状态，延迟合并写入mod_states.json
+"""
+import os
+import json
+
+from PySide6.QtCore import QObject, QTimer, QFileSystemWatcher, QCoreApplication, Signal
+
+
+# 单个mod状态的默认值
+DEFAULT_MOD_STATE = {"enabled": False, "favorite": False, "ignored": False}
+
+
+def _normalize_state(state):
+    """兼容旧格式：{mod_name: bool} 转换为完整的状态字典"""
+    if isinstance(state, bool):
+        return {"enabled": state, "favorite": False, "ignored": False}
+    if isinstance(state, dict):
+        return state
+    return dict(DEFAULT_MOD_STATE)
+
+
+class ModStateStore(QObject):
+    """mod状态的内存存储
+
+    读取直接访问内存；修改后发出 state_changed 信号，并在短暂延迟后原子写入文件
+    （先写临时文件再替换），多次修改只写一次。只有文件被外部修改时才重新读取。
+    """
+    state_changed = Signal(str)   # 状态发生变化的mod名称
+    states_reloaded = Signal()    # 文件被外部修改后重新加载
+
+    def __init__(self, states_file, save_delay_ms=300, parent=None):
+        """
+        Args:
+            states_file: mod_states.json路径
+            save_delay_ms: 延迟写入时间（毫秒）
+        """
+        super().__init__(parent)
+        self.states_file = states_file
+        self._states = {}
+        self._disk_signature = None   # 最近一次读取或写入后文件的 (mtime_ns, size)
+        self._dirty = False
+
+        self._save_timer = QTimer(self)
+        self._save_timer.setSingleShot(True)
+        self._save_timer.setInterval(save_delay_ms)
+        self._save_timer.timeout.connect(self.flush)
+
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.fileChanged.connect(self._on_file_changed)
+
+        self._load_from_disk()
+        self._ensure_watch()
+
+        # 程序退出前写入尚未保存的修改
+        app = QCoreApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self.flush)
+
+    # ------------------------------------------------------------------
+    # 文件读写
+    # ------------------------------------------------------------------
+
+    def _file_signature(self):
+        try:
+            st = os.stat(self.states_file)
+            return st.st_mtime_ns, st.st_size
+        except OSError:
+            return None
+
+    def _load_from_disk(self):
+        """从文件读取状态，兼容旧格式"""
+        states = {}
+        if os.path.exists(self.states_file):
+            try:
+                with open(self.states_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if isinstance(data, dict):
+                    legacy = any(isinstance(v, bool) for v in data.values())
+                    states = {name: _normalize_state(state) for name, state in data.items()}
+                    if legacy:
+                        # 旧格式转换后写回新格式
+                        self._states = states
+                        self._dirty = True
+                        self.flush()
+                        return
+            except Exception as e:
+                print(f"[失败] 加载mod状态失败: {e}")
+        self._states = states
+        self._disk_signature = self._file_signature()
+
+    def _ensure_watch(self):
+        """原子替换会使文件监视失效，每次写入或变化后重新添加"""
+        if os.path.exists(self.states_file) and self.states_file not in self._watcher.files():
+            self._watcher.addPath(self.states_file)
+
+    def _on_file_changed(self, path):
+        self._ensure_watch()
+        signature = self._file_signature()
+        if signature is None or signature == self._disk_signature:
+            return  # 自身写入触发的通知
+        if self._dirty:
+            # 内存中有尚未写入的修改，以内存为准
+            return
+        self._load_from_disk()
+        print("[信息] mod状态文件已被外部修改，已重新加载")
+        self.states_reloaded.emit()
+
+    def flush(self):
+        """立即写入尚未保存的修改"""
+        self._save_timer.stop()
+        if not self._dirty:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.states_file), exist_ok=True)
+            tmp_path = self.states_file + ".tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._states, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.states_file)
+            self._dirty = False
+            self._disk_signature = self._file_signature()
+            self._ensure_watch()
+        except Exception as e:
+            print(f"[失败] 保存mod状态失败: {e}")
+
+    def _schedule_save(self):
+        self._dirty = True
+        self._save_timer.start()
+
+    # ------------------------------------------------------------------
+    # 读取
+    # ------------------------------------------------------------------
+
+    def get(self, mod_name):
+        """获取单个mod状态的副本（不存在时返回默认状态）"""
+        state = self._states.get(mod_name)
+        return dict(state) if state is not None else dict(DEFAULT_MOD_STATE)
+
+    def contains(self, mod_name):
+        return mod_name in self._states
+
+    def all(self):
+        """获取所有状态的副本"""
+        return {name: dict(state) for name, state in self._states.items()}
+
+    def is_enabled(self, mod_name):
+        return self._states.get(mod_name, DEFAULT_MOD_STATE).get("enabled", False)
+
+    def is_favorite(self, mod_name):
+        return self._states.get(mod_name, DEFAULT_MOD_STATE).get("favorite", False)
+
+    def is_ignored(self, mod_name):
+        return self._states.get(mod_name, DEFAULT_MOD_STATE).get("ignored", False)
+
+    def has_enabled(self):
+        """是否有任何mod处于启用状态"""
+        return any(state.get("enabled", False) for state in self._states.values())
+
+    # ------------------------------------------------------------------
+    # 修改
+    # ------------------------------------------------------------------
+
+    def update(self, mod_name, **fields):
+        """修改单个mod的部分字段"""
+        state = self._states.get(mod_name)
+        if state is None:
+            state = dict(DEFAULT_MOD_STATE)
+            self._states[mod_name] = state
+        changed = any(state.get(key) != value for key, value in fields.items())
+        if not changed:
+            return
+        state.update(fields)
+        self._schedule_save()
+        self.state_changed.emit(mod_name)
+
+    def update_many(self, updates):
+        """批量修改多个mod的字段
+
+        Args:
+            updates: {mod_name: {字段: 值}}
+        """
+        changed_names = []
+        for mod_name, fields in updates.items():
+            state = self._states.get(mod_name)
+            if state is None:
+                state = dict(DEFAULT_MOD_STATE)
+                self._states[mod_name] = state
+            if any(state.get(key) != value for key, value in fields.items()):
+                state.update(fields)
+                changed_names.append(mod_name)
+        if changed_names:
+            self._schedule_save()
+            for mod_name in changed_names:
+                self.state_changed.emit(mod_name)
+
+    def replace_all(self, states):
+        """整体替换所有状态（兼容旧的直接保存接口）"""
+        new_states = {name: dict(_normalize_state(state)) for name, state in states.items()}
+        changed_names = [
+            name for name in set(new_states) | set(self._states)
+            if new_states.get(name) != self._states.get(name)
+        ]
+        if not changed_names:
+            return
+        self._states = new_states
+        self._schedule_save()
+        for mod_name in changed_names:
+            self.state_changed.emit(mod_name)
+
+    def remove(self, mod_name):
+        """删除mod状态（卸载时调用）"""
+        if self._states.pop(mod_name, None) is not None:
+            self._schedule_save()
+            self.state_changed.emit(mod_name)
+
+    def rename(self, old_name, new_name):
+        """mod重命名时迁移状态"""
+        if old_name == new_name or old_name not in self._states:
+            return
+        self._states[new_name] = self._states.pop(old_name)
+        self._schedule_save()
+        self.state_changed.emit(old_name)
+        self.state_changed.emit(new_name)
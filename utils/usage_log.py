@@ -0,0 +1,409 @@
+"""
+模组使用日志 - 以追加方式写入JSONL分段文件，按大小滚动，并用SQLite索引支持按mod、时间、动作查询
+"""
+import os
+import re
+import json
+import time
+import sqlite3
+import threading
+from datetime import datetime
+
+
+# 索引结构版本，结构变化时自动重建
+INDEX_SCHEMA_VERSION = 1
+
+# 分段文件名：usage_log_000001.jsonl
+SEGMENT_PATTERN = re.compile(r"^usage_log_(\d{6})\.jsonl$")
+
+# 旧版ini日志中的时间格式
+LEGACY_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def _segment_name(number):
+    return f"usage_log_{number:06d}.jsonl"
+
+
+class UsageLog:
+    """追加写入的mod使用日志
+
+    每条事件是一行JSON，包含 seq（递增序号）、ts（时间戳）、timestamp（可读时间）、
+    action、mod_name 以及附加字段。当前分段超过 max_segment_bytes 后新建分段，
+    已写满的分段不再修改；超过 max_segments 时删除最旧的分段。
+
+    索引只记录事件所在的分段和偏移，查询时按偏移读取对应行。索引可以随时从分段文件重建，
+    启动时会补录索引中缺少的尾部事件（例如上次异常退出时）。
+    """
+
+    def __init__(self, log_dir, index_path, max_segment_bytes=1024 * 1024, max_segments=None):
+        """
+        Args:
+            log_dir: 分段文件所在目录
+            index_path: SQLite索引文件路径
+            max_segment_bytes: 单个分段的最大字节数
+            max_segments: 最多保留的分段数，None表示全部保留
+        """
+        self.log_dir = log_dir
+        self.index_path = index_path
+        self.max_segment_bytes = max_segment_bytes
+        self.max_segments = max_segments
+        self._lock = threading.RLock()
+        os.makedirs(self.log_dir, exist_ok=True)
+        os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+
+        self._conn = sqlite3.connect(self.index_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._ensure_schema()
+
+        self._last_seq = self._conn.execute("SELECT COALESCE(MAX(seq), 0) FROM events").fetchone()[0]
+        self._catch_up()
+
+    # ------------------------------------------------------------------
+    # 索引
+    # ------------------------------------------------------------------
+
+    def _ensure_schema(self):
+        conn = self._conn
+        conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        row = conn.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+        if row is None or row[0] != str(INDEX_SCHEMA_VERSION):
+            conn.execute("DROP TABLE IF EXISTS events")
+            conn.execute("DROP TABLE IF EXISTS segments")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS events ("
+            "seq INTEGER PRIMARY KEY, ts REAL, mod_name TEXT, action TEXT, "
+            "segment INTEGER, offset INTEGER)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_events_mod_ts ON events (mod_name, ts)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_events_ts ON events (ts)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_events_action_ts ON events (action, ts)")
+        # 每个分段已建立索引的字节数
+        conn.execute("CREATE TABLE IF NOT EXISTS segments (segment INTEGER PRIMARY KEY, indexed_bytes INTEGER)")
+        conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('schema_version', ?)",
+            (str(INDEX_SCHEMA_VERSION),)
+        )
+        conn.commit()
+
+    def _list_segments(self):
+        numbers = []
+        for name in os.listdir(self.log_dir):
+            match = SEGMENT_PATTERN.match(name)
+            if match:
+                numbers.append(int(match.group(1)))
+        return sorted(numbers)
+
+    def _segment_path(self, number):
+        return os.path.join(self.log_dir, _segment_name(number))
+
+    def _catch_up(self):
+        """把分段文件中尚未建立索引的事件补录到索引"""
+        with self._lock:
+            segments = self._list_segments()
+            indexed = dict(self._conn.execute("SELECT segment, indexed_bytes FROM segments"))
+
+            # 分段已被删除的索引记录
+            removed = [number for number in indexed if number not in segments]
+            for number in removed:
+                self._conn.execute("DELETE FROM events WHERE segment = ?", (number,))
+                self._conn.execute("DELETE FROM segments WHERE segment = ?", (number,))
+
+            added = 0
+            for number in segments:
+                path = self._segment_path(number)
+                start = indexed.get(number, 0)
+                try:
+                    size = os.path.getsize(path)
+                except OSError:
+                    continue
+                if size < start:
+                    # 分段被截断或替换，重新建立该分段的索引
+                    self._conn.execute("DELETE FROM events WHERE segment = ?", (number,))
+                    start = 0
+                if size == start:
+                    continue
+                rows = []
+                offset = start
+                with open(path, 'rb') as f:
+                    f.seek(start)
+                    for line in f:
+                        if not line.endswith(b"\n"):
+                            break  # 未写完的行
+                        try:
+                            event = json.loads(line)
+                            rows.append((event['seq'], event.get('ts', 0), event.get('mod_name'),
+                                         event.get('action'), number, offset))
+                        except (ValueError, KeyError, TypeError):
+                            pass
+                        offset += len(line)
+                self._conn.executemany("INSERT OR REPLACE INTO events VALUES (?, ?, ?, ?, ?, ?)", rows)
+                self._conn.execute("INSERT OR REPLACE INTO segments VALUES (?, ?)", (number, offset))
+                added += len(rows)
+            self._conn.commit()
+
+            if added or removed:
+                self._last_seq = self._conn.execute("SELECT COALESCE(MAX(seq), 0) FROM events").fetchone()[0]
+            if added:
+                print(f"[信息] 使用日志索引已补录 {added} 条记录")
+
+    # ------------------------------------------------------------------
+    # 写入
+    # ------------------------------------------------------------------
+
+    def _current_segment(self):
+        """返回可写入的分段编号，当前分段写满时新建分段"""
+        segments = self._list_segments()
+        if not segments:
+            return 1
+        number = segments[-1]
+        try:
+            if os.path.getsize(self._segment_path(number)) < self.max_segment_bytes:
+                return number
+        except OSError:
+            return number
+        self._drop_old_segments(segments + [number + 1])
+        return number + 1
+
+    def _drop_old_segments(self, segments):
+        if self.max_segments is None or len(segments) <= self.max_segments:
+            return
+        for number in segments[:len(segments) - self.max_segments]:
+            try:
+                os.remove(self._segment_path(number))
+            except OSError:
+                pass
+            self._conn.execute("DELETE FROM events WHERE segment = ?", (number,))
+            self._conn.execute("DELETE FROM segments WHERE segment = ?", (number,))
+
+    def append(self, action, mod_name=None, ts=None, **data):
+        """追加一条事件
+
+        Args:
+            action: 动作名称，如 "enabled"、"disabled"
+            mod_name: 相关的mod名称
+            ts: 事件时间戳，默认为当前时间
+            **data: 附加字段（需可JSON序列化）
+
+        Returns:
+            dict: 写入的事件
+        """
+        return self.append_many([dict(data, action=action, mod_name=mod_name, ts=ts)])[0]
+
+    def append_many(self, events):
+        """批量追加事件（一次写入、一次提交索引）
+
+        Args:
+            events: 事件字典列表，需包含action，可包含mod_name、ts和附加字段
+
+        Returns:
+            list: 写入的事件（补全了seq、ts和timestamp）
+        """
+        written = []
+        with self._lock:
+            number = self._current_segment()
+            path = self._segment_path(number)
+            try:
+                offset = os.path.getsize(path)
+            except OSError:
+                offset = 0
+
+            lines = []
+            rows = []
+            for event in events:
+                event = dict(event)
+                ts = event.get('ts') or time.time()
+                self._last_seq += 1
+                record = {
+                    'seq': self._last_seq,
+                    'ts': ts,
+                    'timestamp': datetime.fromtimestamp(ts).strftime(LEGACY_TIME_FORMAT),
+                    'action': event.pop('action'),
+                    'mod_name': event.pop('mod_name', None),
+                }
+                event.pop('ts', None)
+                record.update(event)
+                line = (json.dumps(record, ensure_ascii=False) + "\n").encode('utf-8')
+                rows.append((record['seq'], ts, record['mod_name'], record['action'], number, offset))
+                lines.append(line)
+                offset += len(line)
+                written.append(record)
+
+            with open(path, 'ab') as f:
+                f.write(b"".join(lines))
+            self._conn.executemany("INSERT OR REPLACE INTO events VALUES (?, ?, ?, ?, ?, ?)", rows)
+            self._conn.execute("INSERT OR REPLACE INTO segments VALUES (?, ?)", (number, offset))
+            self._conn.commit()
+        return written
+
+    # ------------------------------------------------------------------
+    # 查询
+    # ------------------------------------------------------------------
+
+    @property
+    def last_seq(self):
+        """最新一条事件的序号（没有事件时为0）"""
+        return self._last_seq
+
+    def _read_rows(self, rows):
+        """按(分段, 偏移)读取事件，同一分段只打开一次"""
+        events = {}
+        by_segment = {}
+        for seq, number, offset in rows:
+            by_segment.setdefault(number, []).append((offset, seq))
+        for number, offsets in by_segment.items():
+            try:
+                with open(self._segment_path(number), 'rb') as f:
+                    for offset, seq in sorted(offsets):
+                        f.seek(offset)
+                        try:
+                            events[seq] = json.loads(f.readline())
+                        except ValueError:
+                            pass
+            except OSError:
+                continue
+        return [events[seq] for seq, _, _ in rows if seq in events]
+
+    def query(self, mod_name=None, since=None, until=None, action=None, after_seq=None, until_seq=None,
+              limit=None, newest_first=False):
+        """按条件查询事件
+
+        Args:
+            mod_name: mod名称
+            since: 起始时间戳（包含）
+            until: 结束时间戳（不包含）
+            action: 动作名称，或动作名称的列表
+            after_seq: 只返回序号大于该值的事件
+            until_seq: 只返回序号不大于该值的事件
+            limit: 最多返回的条数
+            newest_first: 是否按时间倒序返回
+
+        Returns:
+            list: 事件字典列表
+        """
+        conditions = []
+        params = []
+        if mod_name is not None:
+            conditions.append("mod_name = ?")
+            params.append(mod_name)
+        if since is not None:
+            conditions.append("ts >= ?")
+            params.append(since)
+        if until is not None:
+            conditions.append("ts < ?")
+            params.append(until)
+        if action is not None:
+            actions = [action] if isinstance(action, str) else list(action)
+            conditions.append(f"action IN ({', '.join('?' * len(actions))})")
+            params.extend(actions)
+        if after_seq is not None:
+            conditions.append("seq > ?")
+            params.append(after_seq)
+        if until_seq is not None:
+            conditions.append("seq <= ?")
+            params.append(until_seq)
+
+        sql = "SELECT seq, segment, offset FROM events"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY seq DESC" if newest_first else " ORDER BY seq"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+            return self._read_rows(rows)
+
+    def count(self, mod_name=None, action=None):
+        """统计事件数量"""
+        conditions = []
+        params = []
+        if mod_name is not None:
+            conditions.append("mod_name = ?")
+            params.append(mod_name)
+        if action is not None:
+            conditions.append("action = ?")
+            params.append(action)
+        sql = "SELECT COUNT(*) FROM events"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        with self._lock:
+            return self._conn.execute(sql, params).fetchone()[0]
+
+    def seq_at(self, ts):
+        """时间点ts时最新一条事件的序号（之前没有事件时为0）"""
+        with self._lock:
+            return self._conn.execute("SELECT COALESCE(MAX(seq), 0) FROM events WHERE ts <= ?", (ts,)).fetchone()[0]
+
+    def last_event(self, mod_name, action=None):
+        """mod最近的一条事件，没有时返回None"""
+        events = self.query(mod_name=mod_name, action=action, limit=1, newest_first=True)
+        return events[0] if events else None
+
+    def last_event_times(self, action=None):
+        """每个mod最近一条事件的时间戳（直接从索引统计，不读取日志内容）
+
+        Args:
+            action: 动作名称，或动作名称的列表
+
+        Returns:
+            dict: mod名称 -> 时间戳
+        """
+        sql = "SELECT mod_name, MAX(ts) FROM events WHERE mod_name IS NOT NULL"
+        params = []
+        if action is not None:
+            actions = [action] if isinstance(action, str) else list(action)
+            sql += f" AND action IN ({', '.join('?' * len(actions))})"
+            params.extend(actions)
+        sql += " GROUP BY mod_name"
+        with self._lock:
+            return dict(self._conn.execute(sql, params).fetchall())
+
+    # ------------------------------------------------------------------
+    # 旧版日志迁移
+    # ------------------------------------------------------------------
+
+    def migrate_ini(self, ini_path):
+        """把旧版usage_log.ini中的记录导入日志（只执行一次，导入后原文件改名为 .migrated）
+
+        Returns:
+            int: 导入的记录数
+        """
+        if not os.path.exists(ini_path):
+            return 0
+        import configparser
+        config = configparser.ConfigParser(interpolation=None)
+        try:
+            config.read(ini_path, encoding='utf-8')
+        except Exception as e:
+            print(f"[警告] 读取旧版使用日志失败: {e}")
+            return 0
+
+        events = []
+        for section in config.sections():
+            timestamp = config.get(section, 'timestamp', fallback='')
+            try:
+                ts = time.mktime(time.strptime(timestamp, LEGACY_TIME_FORMAT))
+            except (ValueError, OverflowError):
+                continue
+            events.append({
+                'ts': ts,
+                'action': config.get(section, 'action', fallback=''),
+                'mod_name': config.get(section, 'mod_name', fallback=None),
+                'migrated': True,
+            })
+        # section名中的时间精确到微秒，同一秒内的记录保持原有顺序
+        events.sort(key=lambda event: event['ts'])
+
+        if events:
+            self.append_many(events)
+        try:
+            os.replace(ini_path, ini_path + ".migrated")
+        except OSError as e:
+            print(f"[警告] 重命名旧版使用日志失败: {e}")
+        return len(events)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -1,12 +1,19 @@
 # -*- mode: python ; coding: utf-8 -*-
+from PyInstaller.utils.hooks import collect_all
+
+datas = [('C:\\Users\\1\\Desktop\\modmanager\\background', 'background'), ('C:\\Users\\1\\Desktop\\modmanager\\json', 'json')]
+binaries = []
+hiddenimports = ['pypinyin', 'py7zr']
+tmp_ret = collect_all('pypinyin')
+datas += tmp_ret[0]; binaries += tmp_ret[1]; hiddenimports += tmp_ret[2]
 
 
 a = Analysis(
     ['C:\\Users\\1\\Desktop\\modmanager\\main.pyw'],
     pathex=[],
-    binaries=[],
-    datas=[('C:\\Users\\1\\Desktop\\modmanager\\background', 'background'), ('C:\\Users\\1\\Desktop\\modmanager\\json', 'json')],
-    hiddenimports=[],
+    binaries=binaries,
+    datas=datas,
+    hiddenimports=hiddenimports,
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],